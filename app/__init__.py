@@ -35,8 +35,13 @@ def create_app(config_name='default'):
     from app.config import config
     app.config.from_object(config[config_name])
     
+    # Apply database performance profile (engine options must be set before init_app)
+    from app.utils.db_performance import configure_engine_options, init_db_performance
+    configure_engine_options(app)
+    
     # Initialize extensions with app
     db.init_app(app)
+    init_db_performance(app, db)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     bcrypt.init_app(app)
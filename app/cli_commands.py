@@ -245,6 +245,148 @@ def run_dividend_processor():
         click.echo(f"✗ Dividend processor job failed: {str(e)}", err=True)
 
 
+@click.command('purge-sentiment-cache')
+@with_appcontext
+def purge_sentiment_cache():
+    """
+    Manually run the sentiment cache purge job
+    
+    Example:
+        flask purge-sentiment-cache
+    """
+    from app.jobs.sentiment_cache_purger import purge_expired_sentiment
+    
+    click.echo("Purging expired sentiment cache entries...")
+    
+    try:
+        deleted = purge_expired_sentiment()
+        click.echo(f"✓ Removed {deleted} expired sentiment cache entries")
+    except Exception as e:
+        click.echo(f"✗ Sentiment cache purge failed: {str(e)}", err=True)
+
+
+@click.command('forecast-universe')
+@click.option('--symbols', default=None, help='Comma-separated list of symbols (default: held or recently ordered stocks)')
+@click.option('--processes', default=None, type=int, help='Worker processes (default: FORECAST_PROCESSES, 0 runs in-process)')
+@with_appcontext
+def forecast_universe_command(symbols, processes):
+    """
+    Precompute predictions for the active universe
+    
+    Example:
+        flask forecast-universe
+        flask forecast-universe --symbols AAPL,MSFT --processes 4
+    """
+    from app.jobs.forecast_runner import forecast_universe
+    from app.services.batch_forecaster import run_details
+    
+    symbol_list = [s.strip().upper() for s in symbols.split(',')] if symbols else None
+    click.echo("Running batch forecasts...")
+    
+    try:
+        job = forecast_universe(symbol_list, processes)
+        
+        for symbol, detail in sorted(run_details(job).items()):
+            if detail['status'] == 'SUCCESS':
+                click.echo(f"  ✓ {symbol} ({detail['seconds']:.1f}s)")
+            else:
+                click.echo(f"  ✗ {symbol} - {detail['error']}")
+        click.echo(f"✓ Forecast run {job.status}: {job.stocks_processed} stored, {job.stocks_failed} failed")
+    except Exception as e:
+        click.echo(f"✗ Forecast run failed: {str(e)}", err=True)
+
+
+@click.command('backtest')
+@click.option('--symbols', default=None, help='Comma-separated list of symbols (default: all active stocks or CSV files)')
+@click.option('--source', default='database', type=click.Choice(['database', 'csv']), help='Price source')
+@click.option('--start', default=None, help='Start date (YYYY-MM-DD)')
+@click.option('--end', default=None, help='End date (YYYY-MM-DD)')
+@click.option('--lookbacks', default=None, help='Comma-separated lookbacks to sweep (default: BACKTEST_LOOKBACK)')
+@click.option('--processes', default=None, type=int, help='Sweep worker processes (default: BACKTEST_PROCESSES)')
+@with_appcontext
+def backtest_command(symbols, source, start, end, lookbacks, processes):
+    """
+    Backtest recommendation signals against stored or CSV prices
+    
+    Example:
+        flask backtest --start 2015-01-01
+        flask backtest --source csv --symbols AAPL,MSFT --lookbacks 10,20,30,60 --processes 4
+    """
+    from app.services.backtester import get_backtester, load_close_matrix
+    
+    symbol_list = [s.strip().upper() for s in symbols.split(',')] if symbols else None
+    start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+    end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+    
+    try:
+        closes = load_close_matrix(symbol_list, start_date, end_date, source)
+        click.echo(f"Backtesting {closes.shape[1]} symbols over {closes.shape[0]} days...")
+        backtester = get_backtester()
+        
+        if lookbacks:
+            if processes is None:
+                processes = current_app.config.get('BACKTEST_PROCESSES', 0)
+            grid = [{'lookback': int(l)} for l in lookbacks.split(',')]
+            table = backtester.sweep(closes, grid, processes)
+            click.echo(table[['lookback', 'horizon', 'total_return', 'cagr', 'sharpe',
+                              'max_drawdown', 'trades', 'commission']].to_string(index=False))
+            return
+        
+        result = backtester.run(closes)
+        metrics = result['metrics']
+        benchmark = result['benchmark_metrics']
+        click.echo(f"  Strategy:     {metrics['total_return']:.2%} return, {metrics['max_drawdown']:.2%} max drawdown, "
+                   f"{metrics['trades']} trades, ${metrics['commission']:,.2f} commission")
+        click.echo(f"  Buy and hold: {benchmark['total_return']:.2%} return, {benchmark['max_drawdown']:.2%} max drawdown")
+        click.echo(f"✓ Final equity ${metrics['final_equity']:,.2f}")
+    except Exception as e:
+        click.echo(f"✗ Backtest failed: {str(e)}", err=True)
+
+
+@click.command('evaluate-models')
+@click.option('--symbols', default=None, help='Comma-separated list of symbols (default: held or recently ordered stocks)')
+@click.option('--models', default=None, help='Comma-separated models (default: EVALUATION_MODELS)')
+@click.option('--years', default=2, type=int, help='Years of history per symbol')
+@click.option('--processes', default=None, type=int, help='Worker processes (default: EVALUATION_PROCESSES, 0 runs in-process)')
+@click.option('--output', default=None, help='Also write per-symbol results to this CSV file')
+@with_appcontext
+def evaluate_models_command(symbols, models, years, processes, output):
+    """
+    Walk-forward evaluation of the prediction models and their parameter grids
+    
+    Example:
+        flask evaluate-models --symbols AAPL,MSFT
+        flask evaluate-models --models arima,lr --processes 8 --output results.csv
+    """
+    from app.services.batch_forecaster import universe_companies
+    from app.services.model_evaluation import DEFAULT_GRIDS, get_model_evaluator, load_frames
+    
+    if symbols:
+        symbol_list = [s.strip().upper() for s in symbols.split(',')]
+    else:
+        symbol_list = [c.symbol for c in universe_companies()]
+    model_list = [m.strip() for m in models.split(',')] if models else current_app.config.get('EVALUATION_MODELS', ['arima', 'lstm', 'lr'])
+    
+    try:
+        frames = load_frames(symbol_list, years)
+        if not frames:
+            click.echo("✗ No price data to evaluate", err=True)
+            return
+        
+        evaluator = get_model_evaluator()
+        if processes is not None:
+            evaluator.processes = processes
+        click.echo(f"Evaluating {', '.join(model_list)} on {len(frames)} symbols...")
+        results = evaluator.evaluate(frames, {m: DEFAULT_GRIDS.get(m, {}) for m in model_list})
+        
+        if output:
+            results.to_csv(output, index=False)
+        click.echo(evaluator.leaderboard(results).to_string(index=False))
+        click.echo(f"✓ Evaluated {len(results)} combinations ({int(results['cached'].sum())} from cache)")
+    except Exception as e:
+        click.echo(f"✗ Evaluation failed: {str(e)}", err=True)
+
+
 @click.command('list-jobs')
 @with_appcontext
 def list_jobs():
@@ -329,6 +471,10 @@ def register_commands(app):
     app.cli.add_command(run_daily_price_update)
     app.cli.add_command(run_intraday_refresh)
     app.cli.add_command(run_dividend_processor)
+    app.cli.add_command(purge_sentiment_cache)
+    app.cli.add_command(forecast_universe_command)
+    app.cli.add_command(backtest_command)
+    app.cli.add_command(evaluate_models_command)
     app.cli.add_command(list_jobs)
     app.cli.add_command(view_job_logs)
 
@@ -6,6 +6,8 @@ import os
 from datetime import timedelta
 from dotenv import load_dotenv
 
+from app.utils.db_performance import DEFAULT_SQLITE_PRAGMAS, DEFAULT_POOL_OPTIONS
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -24,6 +26,12 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {}
     
+    # Database performance profile (applied at engine connect)
+    DB_PERFORMANCE_PROFILE = os.environ.get('DB_PERFORMANCE_PROFILE', 'True').lower() == 'true'
+    SQLITE_PRAGMAS = dict(DEFAULT_SQLITE_PRAGMAS,
+                          busy_timeout=int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)))
+    DB_POOL_OPTIONS = dict(DEFAULT_POOL_OPTIONS)
+    
     # Session Security
     SESSION_TYPE = 'filesystem'
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)  # 24 hour session timeout
@@ -41,6 +49,10 @@ class Config:
     SIMULATION_DATE = os.environ.get('SIMULATION_DATE')  # YYYY-MM-DD for STATIC mode
     STATIC_DATA_DIR = os.path.join(basedir, '..', 'data', 'stocks')
     
+    # Market data provider: 'yfinance' (live) or 'local' (CSV files, offline)
+    MARKET_DATA_PROVIDER = os.environ.get('MARKET_DATA_PROVIDER', 'yfinance')
+    MARKET_DATA_DIRS = [STATIC_DATA_DIR, os.path.join(basedir, '..')]
+    
     # External APIs
     TWITTER_API_KEY = os.environ.get('TWITTER_API_KEY')
     TWITTER_API_SECRET = os.environ.get('TWITTER_API_SECRET')
@@ -52,6 +64,12 @@ class Config:
     SENTIMENT_CACHE_DURATION = int(os.environ.get('SENTIMENT_CACHE_DURATION', 3600))
     SENTIMENT_TWEET_COUNT = int(os.environ.get('SENTIMENT_TWEET_COUNT', 100))
     SENTIMENT_SOURCES = ['TWITTER']
+    SENTIMENT_SOURCE_TIMEOUT = float(os.environ.get('SENTIMENT_SOURCE_TIMEOUT', 8))  # seconds per source fetch
+    SENTIMENT_SCORE_CACHE_SIZE = 50000  # memoized per-text polarity scores
+    SENTIMENT_FRONT_CACHE_SIZE = 512  # in-process results in front of the sentiment_cache table
+    SENTIMENT_STALE_SECONDS = int(os.environ.get('SENTIMENT_STALE_SECONDS', 86400))  # serve expired results while refreshing
+    SENTIMENT_SCORING_PROCESSES = int(os.environ.get('SENTIMENT_SCORING_PROCESSES', 0))  # 0 scores in-process
+    SENTIMENT_DECAY_HALF_LIFE_HOURS = float(os.environ.get('SENTIMENT_DECAY_HALF_LIFE_HOURS', 6))  # rolling sentiment counts halve every N hours
     
     # Trading
     COMMISSION_RATE = 0.001  # 0.1%
@@ -62,6 +80,83 @@ class Config:
     SCHEDULER_API_ENABLED = True
     JOBS_ENABLED = os.environ.get('JOBS_ENABLED', 'True').lower() == 'true'
     
+    # Audit Logging (entries are batched by a background writer)
+    AUDIT_LOG_ASYNC = os.environ.get('AUDIT_LOG_ASYNC', 'True').lower() == 'true'
+    AUDIT_LOG_QUEUE_SIZE = int(os.environ.get('AUDIT_LOG_QUEUE_SIZE', 10000))
+    AUDIT_LOG_BATCH_SIZE = int(os.environ.get('AUDIT_LOG_BATCH_SIZE', 500))
+    
+    # Notifications (seconds an unread count is cached; 0 disables)
+    NOTIFICATION_COUNT_TTL = int(os.environ.get('NOTIFICATION_COUNT_TTL', 30))
+    
+    # Trending stocks (rolling in-memory trade counters)
+    TRENDING_WINDOW_HOURS = 24
+    TRENDING_BUCKET_MINUTES = 5
+    TRENDING_RESYNC_SECONDS = int(os.environ.get('TRENDING_RESYNC_SECONDS', 300))
+    
+    # Price stream (server-sent events from one shared poller per process)
+    PRICE_STREAM_INTERVAL = float(os.environ.get('PRICE_STREAM_INTERVAL', 5))  # seconds
+    PRICE_STREAM_HEARTBEAT = 15  # seconds between keepalive comments
+    PRICE_STREAM_MAX_SYMBOLS = 20
+    PRICE_STREAM_MAX_DURATION = 55  # seconds before the server closes a stream (client reconnects); keep below the worker timeout
+    # Each open stream holds a worker; enable on the dashboard only under a gevent or threaded worker
+    PRICE_STREAM_DASHBOARD = os.environ.get('PRICE_STREAM_DASHBOARD', 'False').lower() == 'true'
+    PRICE_STREAM_REPLAY_ROWS = 30  # STATIC mode: trading days replayed before holding the last close
+    
+    # Portfolio risk analytics
+    RISK_LOOKBACK_DAYS = 365  # calendar days of price history in the returns matrix
+    RISK_VAR_CONFIDENCE = 0.95
+    RISK_MIN_OBSERVATIONS = 20  # aligned trading days required before reporting risk
+    RISK_BENCHMARK_SYMBOL = os.environ.get('RISK_BENCHMARK_SYMBOL', 'SPY')
+    RISK_CACHE_SIZE = 128  # cached returns matrices (one per holding set and price date)
+    
+    # Portfolio optimizer and rebalancing
+    OPTIMIZER_MAX_WEIGHT = 1.0  # largest target weight per asset
+    OPTIMIZER_RISK_FREE_RATE = float(os.environ.get('OPTIMIZER_RISK_FREE_RATE', 0.0))  # annual, for max-Sharpe
+    REBALANCE_MIN_TRADE_VALUE = 50  # skip rebalancing trades smaller than this (dollars)
+    BASKET_MAX_LEGS = 50  # orders per basket (one price snapshot, one commit)
+    
+    # Market screener (in-memory feature table; price writes refresh their company)
+    SCREENER_RESYNC_SECONDS = int(os.environ.get('SCREENER_RESYNC_SECONDS', 3600))
+    SCREENER_MAX_PER_PAGE = 100
+    
+    # Chart series (JSON for client-side rendering; PNGs only as a fallback)
+    CHART_MAX_POINTS = 500  # points per series after downsampling
+    CHART_CACHE_SECONDS = 900  # reuse prediction/forecast results and their charts
+    CHART_PNG_FALLBACK = os.environ.get('CHART_PNG_FALLBACK', 'False').lower() == 'true'
+    CHART_RENDER_TIMEOUT = 30  # seconds to wait for the PNG render worker
+    PRICE_HISTORY_MAX_YEARS = 20  # longest range /api/stocks/<symbol> returns (use interval/points to thin it)
+    
+    # Batch forecasts (flask forecast-universe; /predict serves fresh stored results)
+    # The weekday 5:15 PM ET scheduler job is dormant while init_scheduler is disabled;
+    # until then run flask forecast-universe from cron (see DEPLOYMENT.md)
+    FORECAST_MODELS = ['arima', 'lstm', 'lr']
+    FORECAST_PROCESSES = int(os.environ.get('FORECAST_PROCESSES', 2))  # 0 runs in-process
+    FORECAST_TTL_HOURS = 24  # stored predictions also go stale when a newer price arrives
+    FORECAST_UNIVERSE_ORDER_DAYS = 30  # stocks ordered this recently count as watched
+    
+    # Backtesting (flask backtest; replays recommendation signals on stored or CSV prices)
+    BACKTEST_LOOKBACK = 30  # days in each rolling trend fit that stands in for the forecast
+    BACKTEST_HORIZON = 7  # forecast days averaged, as in RecommendationSystem
+    BACKTEST_CAPITAL = 100000.0  # split equally between the symbols
+    BACKTEST_PROCESSES = int(os.environ.get('BACKTEST_PROCESSES', 0))  # parameter sweep workers, 0 runs in-process
+    
+    # Model evaluation (flask evaluate-models; walk-forward leaderboard for choosing model defaults)
+    EVALUATION_MODELS = ['arima', 'lstm', 'lr']  # 'sophisticated_lstm' is also available
+    EVALUATION_FOLDS = 5  # forecast origins per symbol
+    EVALUATION_HORIZON = 7  # days scored after each origin
+    EVALUATION_PROCESSES = int(os.environ.get('EVALUATION_PROCESSES', 2))  # 0 runs in-process
+    EVALUATION_CACHE_DIR = os.path.join(basedir, '..', 'data', 'evaluation_cache')  # results keyed by inputs
+    
+    # ARIMA order selection (per-symbol (p, d, q) by information criterion, reused until prices drift)
+    ARIMA_AUTO_ORDER = os.environ.get('ARIMA_AUTO_ORDER', 'True').lower() == 'true'  # False uses (6, 1, 0)
+    ARIMA_ORDER_CRITERION = 'aic'  # or 'bic'
+    ARIMA_ORDER_MAX_P = 6
+    ARIMA_ORDER_MAX_Q = 2
+    ARIMA_ORDER_MAX_D = 2  # d is the first order the stationarity test accepts
+    ARIMA_ORDER_PROCESSES = int(os.environ.get('ARIMA_ORDER_PROCESSES', 2))  # one shared search pool per process; 0 fits in-process
+    ARIMA_ORDER_REFRESH_OBSERVATIONS = 63  # re-select after about a quarter of new prices
+    ARIMA_ORDER_DRIFT_RATIO = 1.5  # re-select when recent volatility moves by this factor
+    
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.path.join(basedir, '..', 'logs', 'app.log')
@@ -120,6 +215,8 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
     JOBS_ENABLED = False
+    AUDIT_LOG_ASYNC = False
+    TRENDING_RESYNC_SECONDS = 0
     # SQLite doesn't support pool_size, so override with empty options
     SQLALCHEMY_ENGINE_OPTIONS = {}
 
@@ -0,0 +1,29 @@
+"""
+Forecast Runner
+Precomputes predictions for the held and recently traded universe after the daily price update
+"""
+import logging
+from flask import current_app
+from app.services.batch_forecaster import get_batch_forecaster
+
+logger = logging.getLogger(__name__)
+
+
+def forecast_universe(symbols=None, processes=None):
+    """
+    Run the batch forecaster (run inside an application context)
+    
+    Args:
+        symbols: Optional list of symbols (default: the active universe)
+        processes: Optional worker process count (default: FORECAST_PROCESSES)
+    
+    Returns:
+        JobLog: The completed job entry
+    """
+    forecaster = get_batch_forecaster()
+    if processes is not None:
+        forecaster.processes = processes
+    return forecaster.run(
+        symbols=symbols,
+        order_days=current_app.config.get('FORECAST_UNIVERSE_ORDER_DAYS', 30)
+    )
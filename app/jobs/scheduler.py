@@ -30,6 +30,8 @@ def init_scheduler(app):
     # Import job functions
     # from app.jobs.dividend_processor import process_dividends
     # from app.jobs.price_updater import update_daily_prices, update_intraday_prices
+    from app.jobs.sentiment_cache_purger import purge_expired_sentiment
+    from app.jobs.forecast_runner import forecast_universe
     
     # Dividend processing job - runs daily at 4:00 PM EST
     scheduler.add_job(
@@ -58,6 +60,25 @@ def init_scheduler(app):
         replace_existing=True
     )
     
+    # Batch forecasts - runs at 5:15 PM EST on weekdays (after the daily price update);
+    # dormant with the rest of the scheduler, so use flask forecast-universe from cron meanwhile
+    scheduler.add_job(
+        func=lambda: _run_job_with_app_context(app, forecast_universe),
+        trigger=CronTrigger(day_of_week='mon-fri', hour=17, minute=15, timezone='US/Eastern'),
+        id='forecast_universe',
+        name='Forecast Universe',
+        replace_existing=True
+    )
+    
+    # Sentiment cache purge - runs hourly
+    scheduler.add_job(
+        func=lambda: _run_job_with_app_context(app, purge_expired_sentiment),
+        trigger=CronTrigger(minute=5),
+        id='sentiment_cache_purge',
+        name='Sentiment Cache Purge',
+        replace_existing=True
+    )
+    
     scheduler.start()
     app.logger.info('Background job scheduler started')
 
@@ -0,0 +1,18 @@
+"""
+Sentiment Cache Purger
+Deletes sentiment results that are past expiry and the stale-serving window
+"""
+import logging
+from app.services.sentiment_cache import get_sentiment_cache
+
+logger = logging.getLogger(__name__)
+
+
+def purge_expired_sentiment():
+    """
+    Purge expired sentiment cache rows (run inside an application context)
+    
+    Returns:
+        int: Number of rows deleted
+    """
+    return get_sentiment_cache().purge_expired()
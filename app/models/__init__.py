@@ -16,6 +16,9 @@ from app.models.sentiment_cache import SentimentCache
 from app.models.price_history import PriceHistory
 from app.models.job_log import JobLog
 from app.models.audit_log import AuditLog
+from app.models.forecast import Forecast
+from app.models.sentiment_watermark import SentimentWatermark
+from app.models.arima_order import ArimaOrder
 
 __all__ = [
     'User',
@@ -31,5 +34,8 @@ __all__ = [
     'SentimentCache',
     'PriceHistory',
     'JobLog',
-    'AuditLog'
+    'AuditLog',
+    'Forecast',
+    'SentimentWatermark',
+    'ArimaOrder'
 ]
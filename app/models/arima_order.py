@@ -0,0 +1,29 @@
+"""
+ARIMA Order Model
+Stores the selected ARIMA order per symbol with the data it was selected on
+"""
+from datetime import datetime
+from app import db
+
+
+class ArimaOrder(db.Model):
+    """Selected ARIMA (p, d, q) order for one symbol"""
+    __tablename__ = 'arima_orders'
+    
+    arima_order_id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(10), unique=True, nullable=False, index=True)
+    p = db.Column(db.Integer, nullable=False)
+    d = db.Column(db.Integer, nullable=False)
+    q = db.Column(db.Integer, nullable=False)
+    criterion = db.Column(db.String(10), nullable=False)  # 'aic' or 'bic'
+    score = db.Column(db.Float)
+    tail = db.Column(db.JSON, nullable=False)  # last closes of the series the order was selected on
+    volatility = db.Column(db.Float, nullable=False)  # recent daily log-return volatility at selection
+    selected_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @property
+    def order(self):
+        return (self.p, self.d, self.q)
+    
+    def __repr__(self):
+        return f'<ArimaOrder {self.symbol} ({self.p}, {self.d}, {self.q})>'
@@ -0,0 +1,24 @@
+"""
+Forecast Model
+Stores precomputed model predictions per company
+"""
+from datetime import datetime
+from app import db
+
+
+class Forecast(db.Model):
+    """Batch-computed prediction result model (one row per company)"""
+    __tablename__ = 'forecasts'
+    
+    forecast_id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.company_id'), nullable=False, unique=True)
+    models = db.Column(db.String(50), nullable=False)  # comma-separated model names that were run
+    result = db.Column(db.JSON)  # predict_stock_price result without sentiment
+    errors = db.Column(db.JSON)  # model name -> error message
+    price_date = db.Column(db.Date)  # latest price the models were fitted on
+    duration_ms = db.Column(db.Integer)
+    generated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<Forecast company_id={self.company_id} models={self.models}>'
@@ -11,7 +11,7 @@ class Notification(db.Model):
     __tablename__ = 'notifications'
     
     notification_id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     notification_type = db.Column(
         db.Enum('TRANSACTION', 'DIVIDEND', 'PRICE_ALERT', 'SYSTEM', name='notification_type_enum'),
         nullable=False
@@ -22,5 +22,10 @@ class Notification(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     read_at = db.Column(db.DateTime)
     
+    # Indexes (the composite index serves per-user listing and unread counts)
+    __table_args__ = (
+        db.Index('idx_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+    )
+    
     def __repr__(self):
         return f'<Notification {self.notification_id} {self.notification_type}>'
@@ -0,0 +1,28 @@
+"""
+Sentiment Watermark Model
+Stores the ingestion watermark and decayed rolling counts per symbol and source
+"""
+from datetime import datetime
+from app import db
+
+
+class SentimentWatermark(db.Model):
+    """Ingestion state of one sentiment source for one symbol"""
+    __tablename__ = 'sentiment_watermarks'
+    
+    watermark_id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(10), nullable=False)
+    source = db.Column(db.String(20), nullable=False)
+    watermark = db.Column(db.String(64))  # newest item id or timestamp ingested
+    positive = db.Column(db.Float, nullable=False, default=0.0)
+    negative = db.Column(db.Float, nullable=False, default=0.0)
+    neutral = db.Column(db.Float, nullable=False, default=0.0)
+    polarity = db.Column(db.Float, nullable=False, default=0.0)  # decayed polarity sum
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # time the counts were decayed to
+    
+    __table_args__ = (
+        db.UniqueConstraint('symbol', 'source', name='unique_symbol_source'),
+    )
+    
+    def __repr__(self):
+        return f'<SentimentWatermark {self.symbol} {self.source} watermark={self.watermark}>'
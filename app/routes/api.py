@@ -2,15 +2,28 @@
 API Routes Blueprint
 Provides API endpoints for stock search, discovery, and data access
 """
+import json
 import logging
+import queue
 import time
+from datetime import date, timedelta
 from functools import wraps
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from decimal import Decimal
 
 from app.services.stock_repository import StockRepository
-from app.utils.error_handlers import ValidationError, ExternalAPIError
+from app.services.transaction_engine import TransactionEngine
+from app.services.portfolio_optimizer import PortfolioOptimizer
+from app.services.price_stream import get_price_stream
+from app.services.risk_analytics import RiskAnalyticsService
+from app.services.screener import ScreenerService
+from app.services.chart_data import ChartDataService, price_history_series, validate_series_options
+from app.utils.visualization import get_visualizer
+from app.utils.error_handlers import (
+    ValidationError, ExternalAPIError, InsufficientFundsError, InsufficientSharesError
+)
+from app.utils.validators import validate_stock_symbol
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 logger = logging.getLogger(__name__)
@@ -241,6 +254,108 @@ def trending_stocks():
         }), 500
 
 
+@bp.route('/stocks/stream', methods=['GET'])
+@login_required
+@log_api_call
+def stream_prices():
+    """
+    Stream price updates as server-sent events
+    
+    Prices come from one shared poller per process, so upstream requests
+    scale with distinct symbols rather than connected clients. Each update
+    is sent as a ``price`` event; comment lines keep idle connections open.
+    
+    Query Parameters:
+        symbols: Comma-separated stock symbols (max PRICE_STREAM_MAX_SYMBOLS)
+    
+    Returns:
+        text/event-stream response
+    """
+    symbols = sorted({s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()})
+    max_symbols = current_app.config.get('PRICE_STREAM_MAX_SYMBOLS', 20)
+    
+    if not symbols:
+        return jsonify({'success': False, 'error': 'At least one symbol is required'}), 400
+    if len(symbols) > max_symbols:
+        return jsonify({'success': False, 'error': f'At most {max_symbols} symbols can be streamed'}), 400
+    for symbol in symbols:
+        is_valid, message = validate_stock_symbol(symbol)
+        if not is_valid:
+            return jsonify({'success': False, 'error': f'{symbol}: {message}'}), 400
+    
+    hub = get_price_stream()
+    heartbeat = current_app.config.get('PRICE_STREAM_HEARTBEAT', 15)
+    max_duration = current_app.config.get('PRICE_STREAM_MAX_DURATION')
+    subscription = hub.subscribe(symbols)
+    
+    def generate():
+        deadline = None if max_duration is None else time.monotonic() + max_duration
+        try:
+            yield f"retry: {int(hub.interval * 1000)}\n\n"
+            while deadline is None or time.monotonic() < deadline:
+                timeout = heartbeat if deadline is None else min(heartbeat, max(0.0, deadline - time.monotonic()))
+                try:
+                    update = subscription.updates.get(timeout=timeout)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: price\ndata: {json.dumps(update)}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/stocks/screen', methods=['GET'])
+@login_required
+@log_api_call
+def screen_stocks():
+    """
+    Screen all active companies with filter and sort expressions
+    
+    Query Parameters:
+        filter: Condition over feature fields, e.g. "return_3m > 0.1 and sector == 'Technology'"
+        sort: Comma-separated sort keys, '-' for descending (default: symbol)
+        fields: Comma-separated fields to return (default: all)
+        page: Page number (default: 1)
+        per_page: Items per page (default: 20, max: SCREENER_MAX_PER_PAGE)
+    
+    Returns:
+        JSON response with matching companies and their features
+    """
+    try:
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+        
+        result = ScreenerService().screen(
+            filter_expression=request.args.get('filter'),
+            sort=request.args.get('sort'),
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', 20, type=int),
+            fields=fields or None
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+        
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Stock screen error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to screen stocks'
+        }), 500
+
+
 @bp.route('/stocks/<symbol>', methods=['GET'])
 @login_required
 @log_api_call
@@ -251,6 +366,11 @@ def get_stock_details(symbol):
     Args:
         symbol: Stock symbol
     
+    Query Parameters:
+        years: Years of price history (default: 1, max: PRICE_HISTORY_MAX_YEARS)
+        interval: Bar size - daily, weekly or monthly (default: daily)
+        points: Largest number of bars to return, chosen by LTTB (default: all)
+    
     Returns:
         JSON response with stock details
     """
@@ -270,20 +390,16 @@ def get_stock_details(symbol):
         except Exception:
             current_price = None
         
-        # Get price history (last year)
+        # Get price history, optionally resampled to weekly/monthly bars and downsampled
+        max_years = current_app.config.get('PRICE_HISTORY_MAX_YEARS', 20)
+        years = min(max(request.args.get('years', 1, type=int), 1), max_years)
+        interval = request.args.get('interval', 'daily').lower()
+        points = request.args.get('points', type=int)
+        validate_series_options(interval, points)
         try:
-            price_history = repo.get_price_history(symbol)
-            history_data = [
-                {
-                    'date': ph.date.isoformat(),
-                    'open': float(ph.open),
-                    'high': float(ph.high),
-                    'low': float(ph.low),
-                    'close': float(ph.close),
-                    'volume': ph.volume
-                }
-                for ph in price_history[-365:]  # Last year
-            ]
+            end_date = date.today()
+            prices = repo.get_price_arrays(symbol, start_date=end_date - timedelta(days=365 * years), end_date=end_date)
+            history_data = price_history_series(prices, interval=interval, points=points)
         except Exception:
             history_data = []
         
@@ -306,6 +422,11 @@ def get_stock_details(symbol):
             }
         })
         
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         current_app.logger.error(f"Get stock details error: {str(e)}")
         return jsonify({
@@ -384,6 +505,327 @@ def get_sectors():
         }), 500
 
 
+def _chart_models():
+    """Parse the comma-separated models query parameter"""
+    models = [m.strip().lower() for m in request.args.get('models', '').split(',') if m.strip()]
+    return models or None
+
+
+def _chart_response(results, charts):
+    """Chart payload, with PNG paths when requested and the fallback is enabled"""
+    png_paths = None
+    if request.args.get('png', '').lower() in ('1', 'true') and current_app.config.get('CHART_PNG_FALLBACK', False):
+        png_paths = get_visualizer().render_chart_pngs(
+            charts, results['symbol'], timeout=current_app.config.get('CHART_RENDER_TIMEOUT', 30)
+        )
+    return jsonify({
+        'success': True,
+        'data': ChartDataService.payload(results, charts, png_paths)
+    })
+
+
+@bp.route('/charts/predict/<symbol>', methods=['GET'])
+@login_required
+@log_api_call
+def prediction_charts(symbol):
+    """
+    Get model prediction chart series for client-side rendering
+    
+    Args:
+        symbol: Stock symbol
+    
+    Query Parameters:
+        models: Comma-separated models (arima, lstm, lr; default: all)
+        png: 1 to also return server-rendered PNG paths (requires CHART_PNG_FALLBACK)
+    
+    Returns:
+        JSON response with chart specs keyed by chart name
+    """
+    try:
+        results, charts = ChartDataService().prediction(symbol, _chart_models())
+        return _chart_response(results, charts)
+        
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except ExternalAPIError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    except Exception as e:
+        current_app.logger.error(f"Prediction charts error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to build prediction charts'
+        }), 500
+
+
+@bp.route('/charts/forecast/<symbol>', methods=['GET'])
+@login_required
+@log_api_call
+def forecast_charts(symbol):
+    """
+    Get multi-day forecast chart series for client-side rendering
+    
+    Args:
+        symbol: Stock symbol
+    
+    Query Parameters:
+        days: Days to forecast (default: 30)
+        models: Comma-separated models (arima, lstm, lr; default: all)
+        png: 1 to also return server-rendered PNG paths (requires CHART_PNG_FALLBACK)
+    
+    Returns:
+        JSON response with chart specs keyed by chart name
+    """
+    try:
+        days = request.args.get('days', 30, type=int)
+        results, charts = ChartDataService().forecast(symbol, days, _chart_models())
+        return _chart_response(results, charts)
+        
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except ExternalAPIError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    except Exception as e:
+        current_app.logger.error(f"Forecast charts error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to build forecast charts'
+        }), 500
+
+
+@bp.route('/portfolio/risk', methods=['GET'])
+@login_required
+@log_api_call
+def portfolio_risk():
+    """
+    Get risk metrics for the current user's holdings
+    
+    Query Parameters:
+        lookback_days: Calendar days of price history (default: RISK_LOOKBACK_DAYS)
+        confidence: VaR confidence level between 0.5 and 0.999 (default: RISK_VAR_CONFIDENCE)
+    
+    Returns:
+        JSON response with volatility, VaR/CVaR, beta and correlation matrix
+        (data is null when there is not enough price history)
+    """
+    lookback_days = request.args.get('lookback_days', type=int)
+    confidence = request.args.get('confidence', type=float)
+    if lookback_days is not None and not 30 <= lookback_days <= 3650:
+        return jsonify({'success': False, 'error': 'lookback_days must be between 30 and 3650'}), 400
+    if confidence is not None and not 0.5 <= confidence <= 0.999:
+        return jsonify({'success': False, 'error': 'confidence must be between 0.5 and 0.999'}), 400
+    
+    try:
+        risk = RiskAnalyticsService().get_portfolio_risk(
+            current_user.user_id, lookback_days=lookback_days, confidence=confidence
+        )
+        if risk is not None:
+            risk['as_of'] = risk['as_of'].isoformat()
+        
+        return jsonify({
+            'success': True,
+            'data': risk
+        })
+        
+    except Exception as e:
+        current_app.logger.error(f"Portfolio risk error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to calculate portfolio risk'
+        }), 500
+
+
+def _serialize_plan(plan):
+    """Convert a rebalancing plan's Decimals to floats for JSON"""
+    return {
+        'orders': [
+            {
+                'symbol': order['symbol'],
+                'order_type': order['order_type'],
+                'quantity': order['quantity'],
+                'price_per_share': float(order['price_per_share'])
+            }
+            for order in plan['orders']
+        ],
+        'portfolio_value': float(plan['portfolio_value']),
+        'cash_before': float(plan['cash_before']),
+        'cash_after': float(plan['cash_after']),
+        'turnover': float(plan['turnover'])
+    }
+
+
+def _optimize_from_params(optimizer, params):
+    """Run the optimizer with method, symbols and max_weight from request parameters"""
+    symbols = params.get('symbols') or []
+    if isinstance(symbols, str):
+        symbols = [s for s in symbols.split(',') if s.strip()]
+    max_weight = params.get('max_weight')
+    return optimizer.optimize(
+        current_user.user_id,
+        method=params.get('method', 'max_sharpe'),
+        symbols=[s.strip().upper() for s in symbols],
+        max_weight=float(max_weight) if max_weight not in (None, '') else None
+    )
+
+
+@bp.route('/portfolio/optimize', methods=['GET'])
+@login_required
+@log_api_call
+def optimize_portfolio():
+    """
+    Get target weights for the current user's portfolio and the trades to reach them
+    
+    Query Parameters:
+        method: min_variance, max_sharpe (default) or risk_parity
+        symbols: Comma-separated extra symbols to consider
+        max_weight: Largest weight per asset
+        cash_reserve: Fraction of portfolio value to keep in cash (default: 0)
+    
+    Returns:
+        JSON response with target weights and a rebalancing preview
+    """
+    try:
+        optimizer = PortfolioOptimizer()
+        result = _optimize_from_params(optimizer, request.args)
+        plan = optimizer.plan_rebalance(
+            current_user.user_id, result['weights'],
+            cash_reserve=request.args.get('cash_reserve', 0.0, type=float)
+        )
+        result['as_of'] = result['as_of'].isoformat()
+        result['plan'] = _serialize_plan(plan)
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+        
+    except (ValidationError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Portfolio optimize error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to optimize portfolio'
+        }), 500
+
+
+@bp.route('/portfolio/rebalance', methods=['POST'])
+@login_required
+@log_api_call
+def rebalance_portfolio():
+    """
+    Rebalance the current user's portfolio in one basket of orders
+    
+    JSON Body:
+        targets: Target weight per symbol, or
+        method, symbols, max_weight: Optimizer parameters to derive targets
+        cash_reserve: Fraction of portfolio value to keep in cash (default: 0)
+    
+    Returns:
+        JSON response with the executed orders
+    """
+    try:
+        params = request.get_json(silent=True) or {}
+        optimizer = PortfolioOptimizer()
+        targets = params.get('targets')
+        if targets is None:
+            targets = _optimize_from_params(optimizer, params)['weights']
+        elif not isinstance(targets, dict):
+            raise ValidationError("targets must map symbols to weights")
+        
+        plan = optimizer.plan_rebalance(
+            current_user.user_id, targets, cash_reserve=float(params.get('cash_reserve', 0.0))
+        )
+        orders = optimizer.execute_rebalance(current_user.user_id, plan)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'plan': _serialize_plan(plan),
+                'order_ids': [order.order_id for order in orders]
+            }
+        })
+        
+    except (ValidationError, InsufficientFundsError, InsufficientSharesError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Portfolio rebalance error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to rebalance portfolio'
+        }), 500
+
+
+@bp.route('/orders/basket', methods=['POST'])
+@login_required
+@log_api_call
+def create_basket_order():
+    """
+    Execute several buy and sell orders as one all-or-nothing basket
+    
+    JSON Body:
+        orders: List of {symbol, order_type ('BUY' or 'SELL'), quantity}
+    
+    Returns:
+        JSON response with the completed orders and basket totals
+    """
+    try:
+        params = request.get_json(silent=True) or {}
+        legs = params.get('orders')
+        if not isinstance(legs, list) or not all(isinstance(leg, dict) for leg in legs):
+            raise ValidationError("orders must be a list of {symbol, order_type, quantity}")
+        
+        orders = TransactionEngine().create_basket_order(current_user.user_id, legs)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'orders': [
+                    {
+                        'order_id': order.order_id,
+                        'symbol': order.company.symbol,
+                        'order_type': order.order_type,
+                        'quantity': order.quantity,
+                        'price_per_share': float(order.price_per_share),
+                        'commission_fee': float(order.commission_fee),
+                        'total_amount': float(order.total_amount)
+                    }
+                    for order in orders
+                ],
+                'total_bought': float(sum(o.total_amount for o in orders if o.order_type == 'BUY')),
+                'total_sold': float(sum(o.total_amount for o in orders if o.order_type == 'SELL'))
+            }
+        })
+        
+    except (ValidationError, InsufficientFundsError, InsufficientSharesError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        current_app.logger.error(f"Basket order error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to execute basket order'
+        }), 500
+
 
 # Notification API Endpoints
 
@@ -2,14 +2,14 @@
 Dashboard Routes
 Main dashboard and prediction interface
 """
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
 from flask_login import login_required, current_user
 import logging
 from decimal import Decimal
 from typing import Optional
 
 from app.forms.prediction_forms import PredictionForm, ForecastForm
-from app.services.prediction_service import PredictionService
+from app.services.chart_data import ChartDataService
 from app.services.portfolio_service import PortfolioService
 from app.utils.visualization import get_visualizer
 from app.utils.exceptions import ValidationError, ExternalAPIError
@@ -40,7 +40,7 @@ def index():
         total_worth = wallet_balance + portfolio_value
         
         # Get top 3 holdings by value
-        top_holdings = sorted(holdings, key=lambda h: h.quantity * h.average_purchase_price, reverse=True)[:3] if holdings else []
+        top_holdings = sorted(holdings, key=lambda h: h['quantity'] * h['average_purchase_price'], reverse=True)[:3] if holdings else []
         
         # Get recent transactions (last 5)
         from app.services.transaction_engine import TransactionEngine
@@ -56,7 +56,7 @@ def index():
         portfolio_change = 0
         total_return = 0
         if holdings:
-            total_invested = sum(h.total_invested for h in holdings)
+            total_invested = sum(h['total_invested'] for h in holdings)
             if total_invested > 0:
                 portfolio_change = ((portfolio_value - total_invested) / total_invested) * 100
                 total_return = portfolio_change
@@ -74,7 +74,8 @@ def index():
             recent_transactions=recent_transactions,
             portfolio_change=portfolio_change,
             total_return=total_return,
-            predict_form=predict_form
+            predict_form=predict_form,
+            live_prices=current_app.config.get('PRICE_STREAM_DASHBOARD', False)
         )
         
     except Exception as e:
@@ -108,80 +109,14 @@ def predict():
             
             logger.info(f"User {current_user.user_id} requesting prediction for {symbol} with models: {models}")
             
-            # Get predictions
-            prediction_service = PredictionService()
-            results = prediction_service.predict_stock_price(symbol, models)
+            # Get predictions and their chart series
+            results, charts = ChartDataService().prediction(symbol, models)
             
             if not results['success']:
                 flash(f'Prediction failed for {symbol}. Please try again.', 'error')
                 return render_template('dashboard/predict.html', form=form)
             
-            # Generate visualizations
-            visualizer = get_visualizer()
-            plot_paths = {}
-            
-            # Generate individual model plots
-            for model_name, model_result in results['predictions'].items():
-                if 'actual' in model_result and 'predicted' in model_result:
-                    if model_name == 'arima':
-                        plot_path = visualizer.plot_arima_predictions(
-                            model_result['actual'],
-                            model_result['predicted'],
-                            symbol
-                        )
-                    elif model_name == 'lstm':
-                        plot_path = visualizer.plot_lstm_predictions(
-                            model_result['actual'],
-                            model_result['predicted'],
-                            symbol
-                        )
-                    elif model_name == 'lr':
-                        plot_path = visualizer.plot_linear_regression_predictions(
-                            model_result['actual'],
-                            model_result['predicted'],
-                            symbol
-                        )
-                    
-                    if plot_path:
-                        # Convert to web path
-                        plot_paths[model_name] = plot_path.replace('\\', '/')
-            
-            # Generate comparison plot if multiple models
-            if len(results['predictions']) > 1:
-                actual = None
-                arima_pred = None
-                lstm_pred = None
-                lr_pred = None
-                
-                for model_name, model_result in results['predictions'].items():
-                    if 'actual' in model_result:
-                        actual = model_result['actual']
-                    if model_name == 'arima' and 'predicted' in model_result:
-                        arima_pred = model_result['predicted']
-                    elif model_name == 'lstm' and 'predicted' in model_result:
-                        lstm_pred = model_result['predicted']
-                    elif model_name == 'lr' and 'predicted' in model_result:
-                        lr_pred = model_result['predicted']
-                
-                if actual:
-                    comparison_path = visualizer.plot_comparison(
-                        actual, arima_pred, lstm_pred, lr_pred, symbol
-                    )
-                    if comparison_path:
-                        plot_paths['comparison'] = comparison_path.replace('\\', '/')
-            
-            # Generate sentiment visualization if available
-            if 'sentiment' in results and results['sentiment'].get('enabled', True):
-                sentiment_data = results['sentiment']
-                if 'positive' in sentiment_data:
-                    sentiment_path = visualizer.plot_sentiment_analysis(
-                        sentiment_data['positive'],
-                        sentiment_data['negative'],
-                        sentiment_data['neutral'],
-                        symbol
-                    )
-                    if sentiment_path:
-                        plot_paths['sentiment'] = sentiment_path.replace('\\', '/')
+            plot_paths = _fallback_plot_paths(charts, symbol)
             
             # Determine recommendation based on predictions and sentiment
             recommendation = _generate_recommendation(results['predictions'], results.get('sentiment'))
@@ -192,6 +127,7 @@ def predict():
                 'dashboard/predict_results.html',
                 symbol=symbol,
                 results=results,
+                charts=charts,
                 plot_paths=plot_paths,
                 recommendation=recommendation
             )
@@ -238,28 +174,14 @@ def forecast():
             
             logger.info(f"User {current_user.user_id} requesting {days}-day forecast for {symbol}")
             
-            # Generate forecast
-            prediction_service = PredictionService()
-            results = prediction_service.generate_forecast(symbol, days, models)
+            # Generate forecast and its chart series
+            results, charts = ChartDataService().forecast(symbol, days, models)
             
             if not results['success']:
                 flash(f'Forecast generation failed for {symbol}. Please try again.', 'error')
                 return render_template('dashboard/forecast.html', form=form)
             
-            # Generate visualizations
-            visualizer = get_visualizer()
-            plot_paths = {}
-            
-            # Generate forecast plots for each model
-            for model_name, forecast_result in results['forecasts'].items():
-                if 'forecast' in forecast_result:
-                    plot_path = visualizer.plot_forecast(
-                        forecast_result['forecast'],
-                        symbol,
-                        days
-                    )
-                    if plot_path:
-                        plot_paths[model_name] = plot_path.replace('\\', '/')
+            plot_paths = _fallback_plot_paths(charts, symbol)
             
             # Determine recommendation
             recommendation = _generate_forecast_recommendation(results['forecasts'], days)
@@ -271,6 +193,7 @@ def forecast():
                 symbol=symbol,
                 days=days,
                 results=results,
+                charts=charts,
                 plot_paths=plot_paths,
                 recommendation=recommendation
             )
@@ -292,6 +215,24 @@ def forecast():
     return render_template('dashboard/forecast.html', form=form)
 
 
+def _fallback_plot_paths(charts: dict, symbol: str) -> dict:
+    """
+    Render server-side PNGs for the charts when CHART_PNG_FALLBACK is enabled
+    
+    Args:
+        charts: Chart name -> chart spec
+        symbol: Stock symbol
+        
+    Returns:
+        dict: Chart name -> PNG path (empty when the fallback is disabled)
+    """
+    if not current_app.config.get('CHART_PNG_FALLBACK', False):
+        return {}
+    return get_visualizer().render_chart_pngs(
+        charts, symbol, timeout=current_app.config.get('CHART_RENDER_TIMEOUT', 30)
+    )
+
+
 def _generate_recommendation(predictions: dict, sentiment: Optional[dict] = None) -> dict:
     """
     Generate buy/sell/hold recommendation based on model predictions
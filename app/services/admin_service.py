@@ -3,8 +3,9 @@ Admin Service
 Handles administrative operations for user, company, broker, and system management
 """
 from datetime import datetime, timedelta
-from sqlalchemy import func, desc, or_
+from sqlalchemy import desc, or_
 from sqlalchemy.exc import SQLAlchemyError
+from flask import has_request_context
 from flask_login import current_user
 from app import db
 from app.models.user import User
@@ -19,6 +20,8 @@ from app.models.dividend import Dividend
 from app.models.job_log import JobLog
 from app.utils.exceptions import ValidationError, BusinessLogicError
 from app.services.audit_service import AuditService
+from app.services.trade_counters import get_trade_counters
+from app.utils.validators import validate_stock_symbol
 import logging
 import yfinance as yf
 import csv
@@ -26,6 +29,11 @@ from io import StringIO
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT statement during bulk company imports
+BULK_IMPORT_CHUNK_SIZE = 1000
+# Symbols per IN (...) lookup, below SQLite's default bound-parameter limit
+BULK_IMPORT_LOOKUP_SIZE = 900
+
 
 class AdminService:
     """Service for administrative operations"""
@@ -777,59 +785,104 @@ class AdminService:
             raise Exception(f"Failed to deactivate company: {str(e)}")
     
     @staticmethod
-    def bulk_import_companies(csv_content):
+    def bulk_import_companies(csv_content, chunk_size=BULK_IMPORT_CHUNK_SIZE):
         """
         Bulk import companies from CSV file
         
+        The whole file is validated first, existing symbols are looked up with
+        batched IN queries, and valid rows are inserted in chunks inside a
+        single transaction. Rows are imported as given (no yfinance lookup per
+        symbol); use update_company or create_company to enrich them.
+        
         Args:
             csv_content: CSV file content (string or file object)
+                Expected columns: symbol, company_name, sector, industry
+            chunk_size: Rows per INSERT statement
         
         Returns:
-            dict: Import results with success and error counts
+            dict: Import results with success and error counts and per-row errors
         """
         try:
             # Parse CSV
             if hasattr(csv_content, 'read'):
-                csv_content = csv_content.read().decode('utf-8')
+                csv_content = csv_content.read()
+            if isinstance(csv_content, bytes):
+                csv_content = csv_content.decode('utf-8-sig')
             
             csv_reader = csv.DictReader(StringIO(csv_content))
             
-            success_count = 0
-            error_count = 0
-            errors = []
+            errors = []  # (line number, message)
+            rows = {}  # symbol -> (line number, row values)
             
-            for row in csv_reader:
-                try:
-                    # Expected columns: symbol, company_name, sector, industry
-                    symbol = row.get('symbol', '').strip().upper()
-                    if not symbol:
-                        continue
-                    
-                    # Check if already exists
-                    if Company.query.filter_by(symbol=symbol).first():
-                        error_count += 1
-                        errors.append(f"{symbol}: Already exists")
-                        continue
-                    
-                    # Create company
-                    AdminService.create_company({
-                        'symbol': symbol,
-                        'company_name': row.get('company_name', '').strip(),
-                        'sector': row.get('sector', '').strip(),
-                        'industry': row.get('industry', '').strip()
-                    })
-                    
-                    success_count += 1
-                    
-                except Exception as e:
-                    error_count += 1
-                    errors.append(f"{symbol}: {str(e)}")
-            
-            logger.info(f"Bulk import completed: {success_count} success, {error_count} errors")
+            # Validate every row before touching the database
+            for line_number, row in enumerate(csv_reader, start=2):
+                symbol = (row.get('symbol') or '').strip().upper()
+                if not symbol:
+                    continue
+                
+                is_valid, message = validate_stock_symbol(symbol)
+                if not is_valid:
+                    errors.append((line_number, f"{symbol}: {message}"))
+                    continue
+                
+                if symbol in rows:
+                    errors.append((line_number, f"{symbol}: Duplicate of row {rows[symbol][0]}"))
+                    continue
+                
+                values = {
+                    'symbol': symbol,
+                    'company_name': (row.get('company_name') or '').strip() or symbol,
+                    'sector': (row.get('sector') or '').strip() or None,
+                    'industry': (row.get('industry') or '').strip() or None,
+                }
+                too_long = [
+                    field for field, limit in (('company_name', 255), ('sector', 100), ('industry', 100))
+                    if values[field] and len(values[field]) > limit
+                ]
+                if too_long:
+                    errors.append((line_number, f"{symbol}: Value too long for {', '.join(too_long)}"))
+                    continue
+                
+                rows[symbol] = (line_number, values)
+            
+            # Check duplicates against the database in batches of IN queries
+            symbols = list(rows)
+            for i in range(0, len(symbols), BULK_IMPORT_LOOKUP_SIZE):
+                batch = symbols[i:i + BULK_IMPORT_LOOKUP_SIZE]
+                existing = db.session.query(Company.symbol).filter(Company.symbol.in_(batch)).all()
+                for (symbol,) in existing:
+                    line_number, _ = rows.pop(symbol)
+                    errors.append((line_number, f"{symbol}: Already exists"))
+            
+            # Insert in chunks inside one transaction
+            now = datetime.utcnow()
+            new_rows = [dict(values, is_active=True, last_updated=now) for _, values in rows.values()]
+            try:
+                for i in range(0, len(new_rows), chunk_size):
+                    db.session.execute(Company.__table__.insert(), new_rows[i:i + chunk_size])
+                db.session.commit()
+            except SQLAlchemyError:
+                db.session.rollback()
+                raise
+            
+            success_count = len(new_rows)
+            errors = [f"Row {line_number}: {message}" for line_number, message in sorted(errors)]
+            
+            if success_count:
+                admin_id = current_user.user_id if has_request_context() and current_user.is_authenticated else None
+                AuditService.log_action(
+                    admin_id=admin_id,
+                    action_type='CREATE',
+                    entity_type='COMPANY',
+                    changes={'imported': success_count, 'errors': len(errors)},
+                    description=f"Bulk imported {success_count} companies"
+                )
+            
+            logger.info(f"Bulk import completed: {success_count} success, {len(errors)} errors")
             
             return {
                 'success_count': success_count,
-                'error_count': error_count,
+                'error_count': len(errors),
                 'errors': errors
             }
             
@@ -1106,18 +1159,17 @@ class AdminService:
             }
             
             # Top traded stocks
-            top_stocks_query = db.session.query(
-                Company.symbol,
-                func.count(Order.order_id).label('trade_count')
-            ).join(Order).filter(
-                Order.order_status == 'COMPLETED'
-            ).group_by(Company.symbol).order_by(
-                desc('trade_count')
-            ).limit(5).all()
+            top_traded = get_trade_counters().top_all_time(5)
+            symbols = dict(
+                db.session.query(Company.company_id, Company.symbol).filter(
+                    Company.company_id.in_([company_id for company_id, _ in top_traded])
+                ).all()
+            ) if top_traded else {}
             
             top_stocks = [
-                {'symbol': symbol, 'trades': count}
-                for symbol, count in top_stocks_query
+                {'symbol': symbols[company_id], 'trades': count}
+                for company_id, count in top_traded
+                if company_id in symbols
             ]
             
             return {
@@ -0,0 +1,251 @@
+"""
+ARIMA Orders
+Per-symbol ARIMA order selection, reused until the symbol's prices drift
+"""
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from flask import current_app, has_app_context
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.arima_order import ArimaOrder
+
+logger = logging.getLogger(__name__)
+
+# Closes remembered to find where the selection's data ends in a newer series
+TAIL_LENGTH = 5
+
+
+def recent_volatility(values: np.ndarray, window: int) -> float:
+    """Standard deviation of the last window daily log returns"""
+    returns = np.diff(np.log(values[-(window + 1):]))
+    return float(returns.std(ddof=1)) if len(returns) > 1 else 0.0
+
+
+def new_observations(values: np.ndarray, tail: np.ndarray) -> Optional[int]:
+    """
+    Closes appended to a series since tail was its end
+
+    Args:
+        values: Current closes
+        tail: Last closes of the series the selection was made on
+
+    Returns:
+        int: Closes after the tail's latest occurrence, or None if the tail is
+            not found (the history was replaced or restated)
+    """
+    n = len(tail)
+    if len(values) < n:
+        return None
+    windows = np.lib.stride_tricks.sliding_window_view(values, n)
+    matches = np.flatnonzero(np.all(np.isclose(windows, tail), axis=1))
+    if len(matches) == 0:
+        return None
+    return int(len(values) - matches[-1] - n)
+
+
+class ArimaOrderSelector:
+    """
+    Select and remember an ARIMA order per symbol
+
+    The first request for a symbol runs the order search; later requests reuse
+    its order until refresh_observations new closes have arrived, the recent
+    volatility has moved by more than drift_ratio either way, or the earlier
+    data can no longer be found in the series. A per-symbol lock keeps
+    concurrent requests from searching the same symbol twice.
+
+    With persist, selections are also stored in the arima_orders table while
+    an application context is active, so other processes and later runs
+    reuse them. Searches share one pool of processes worker processes.
+    """
+
+    def __init__(self, criterion: str = 'aic', max_p: int = 6, max_q: int = 2, max_d: int = 2,
+                 processes: int = 0, refresh_observations: int = 63, drift_ratio: float = 1.5,
+                 volatility_window: int = 60, max_entries: int = 1024, persist: bool = False):
+        self.criterion = criterion
+        self.max_p = max_p
+        self.max_q = max_q
+        self.max_d = max_d
+        self.processes = processes
+        self.refresh_observations = refresh_observations
+        self.drift_ratio = drift_ratio
+        self.volatility_window = volatility_window
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._symbol_locks = defaultdict(threading.Lock)
+        self._pool = None
+
+    def order_for(self, symbol: str, df: pd.DataFrame) -> Tuple[int, int, int]:
+        """
+        ARIMA order for a symbol's current data
+
+        Args:
+            symbol: Stock symbol
+            df: Price data with a Close column
+
+        Returns:
+            tuple: (p, d, q)
+        """
+        values = df['Close'].dropna().to_numpy(dtype=float)
+        with self._lock:
+            symbol_lock = self._symbol_locks[symbol]
+        with symbol_lock:
+            entry = self.get(symbol, values)
+            if entry is None:
+                entry = self.select(symbol, values)
+            return entry['order']
+
+    def get(self, symbol: str, values: np.ndarray) -> Optional[Dict]:
+        """Remembered selection for the symbol, or None if there is none or the data drifted"""
+        with self._lock:
+            entry = self._entries.get(symbol)
+        if entry is None:
+            entry = self._load(symbol)
+            if entry is None:
+                return None
+            self._remember(symbol, entry)
+        reason = self.drift_reason(entry, values)
+        if reason:
+            logger.info(f"Re-selecting ARIMA order for {symbol}: {reason}")
+            with self._lock:
+                self._entries.pop(symbol, None)
+            return None
+        return entry
+
+    def drift_reason(self, entry: Dict, values: np.ndarray) -> Optional[str]:
+        """Why a selection no longer fits the data, or None while it still does"""
+        added = new_observations(values, entry['tail'])
+        if added is None:
+            return "price history changed"
+        if added >= self.refresh_observations:
+            return f"{added} new prices"
+        volatility = recent_volatility(values, self.volatility_window)
+        if entry['volatility'] > 0 and volatility > 0:
+            ratio = volatility / entry['volatility']
+            if ratio > self.drift_ratio or ratio < 1 / self.drift_ratio:
+                return f"volatility changed by a factor of {ratio:.2f}"
+        return None
+
+    def select(self, symbol: str, values: np.ndarray) -> Dict:
+        """Run the order search for the symbol and remember the result"""
+        from ml_models.arima_order_selection import select_order
+
+        selection = select_order(values, max_p=self.max_p, max_q=self.max_q, max_d=self.max_d,
+                                 criterion=self.criterion, executor=self._executor())
+        entry = {
+            'order': selection['order'],
+            'score': selection['score'],
+            'fitted': len(selection['fits']),
+            'pruned': selection['pruned'],
+            'tail': values[-TAIL_LENGTH:].copy(),
+            'volatility': recent_volatility(values, self.volatility_window),
+            'selected_at': datetime.utcnow()
+        }
+        logger.info(f"ARIMA order for {symbol}: {entry['order']} ({self.criterion.upper()} {entry['score']:.1f}, "
+                    f"{entry['fitted']} fitted, {entry['pruned']} pruned, {selection['seconds']:.1f}s)")
+        self._remember(symbol, entry)
+        self._save(symbol, entry)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self) -> None:
+        """Stop the search pool's worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _executor(self):
+        """Search pool shared by every selection, created on first use (None fits in-process)"""
+        if self.processes <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes)
+            return self._pool
+
+    def _remember(self, symbol: str, entry: Dict) -> None:
+        with self._lock:
+            self._entries[symbol] = entry
+            self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _persistent(self) -> bool:
+        return self.persist and has_app_context()
+
+    def _load(self, symbol: str) -> Optional[Dict]:
+        """Stored selection for the symbol, if one was made with this criterion"""
+        if not self._persistent():
+            return None
+        try:
+            row = ArimaOrder.query.filter_by(symbol=symbol).first()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning(f"Could not load the stored ARIMA order for {symbol}: {e}")
+            return None
+        if row is None or row.criterion != self.criterion:
+            return None
+        return {
+            'order': row.order,
+            'score': row.score,
+            'tail': np.asarray(row.tail, dtype=float),
+            'volatility': row.volatility,
+            'selected_at': row.selected_at
+        }
+
+    def _save(self, symbol: str, entry: Dict) -> None:
+        """Store a selection so other processes and later runs reuse it"""
+        if not self._persistent():
+            return
+        try:
+            row = ArimaOrder.query.filter_by(symbol=symbol).first()
+            if row is None:
+                row = ArimaOrder(symbol=symbol)
+                db.session.add(row)
+            row.p, row.d, row.q = (int(k) for k in entry['order'])
+            row.criterion = self.criterion
+            row.score = float(entry['score'])
+            row.tail = [float(v) for v in entry['tail']]
+            row.volatility = entry['volatility']
+            row.selected_at = entry['selected_at']
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning(f"Could not store the ARIMA order for {symbol}: {e}")
+
+
+def get_arima_order_selector() -> ArimaOrderSelector:
+    """
+    Get the ARIMA order selector for the current application
+
+    Returns:
+        ArimaOrderSelector configured from the ARIMA_ORDER_* settings
+    """
+    selector = current_app.extensions.get('arima_orders')
+    if selector is None:
+        config = current_app.config
+        selector = ArimaOrderSelector(
+            criterion=config.get('ARIMA_ORDER_CRITERION', 'aic'),
+            max_p=config.get('ARIMA_ORDER_MAX_P', 6),
+            max_q=config.get('ARIMA_ORDER_MAX_Q', 2),
+            max_d=config.get('ARIMA_ORDER_MAX_D', 2),
+            processes=config.get('ARIMA_ORDER_PROCESSES', 2),
+            refresh_observations=config.get('ARIMA_ORDER_REFRESH_OBSERVATIONS', 63),
+            drift_ratio=config.get('ARIMA_ORDER_DRIFT_RATIO', 1.5),
+            persist=True
+        )
+        current_app.extensions['arima_orders'] = selector
+    return selector
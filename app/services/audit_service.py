@@ -5,8 +5,8 @@ Handles audit logging for administrative actions
 import logging
 from datetime import datetime
 from flask import request
-from app import db
 from app.models.audit_log import AuditLog
+from app.services.audit_writer import get_audit_writer
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +19,10 @@ class AuditService:
         """
         Log an administrative action
         
+        The entry is written by the audit log writer on its own connection, so
+        the caller's session is never committed here. With AUDIT_LOG_ASYNC
+        enabled the insert happens in the background; call flush() to wait.
+        
         Args:
             admin_id: ID of the admin user performing the action
             action_type: Type of action (CREATE, UPDATE, DELETE, SUSPEND, ACTIVATE, ADJUST_BALANCE, OTHER)
@@ -28,7 +32,7 @@ class AuditService:
             description: Additional description (optional)
         
         Returns:
-            AuditLog: Created audit log entry
+            AuditLog: Audit log entry handed to the writer (not attached to the session)
         """
         try:
             # Get IP address from request context
@@ -36,34 +40,43 @@ class AuditService:
             if request:
                 ip_address = request.remote_addr or request.environ.get('HTTP_X_FORWARDED_FOR', None)
             
-            # Create audit log entry
-            audit_log = AuditLog(
-                admin_id=admin_id,
-                action_type=action_type,
-                entity_type=entity_type,
-                entity_id=entity_id,
-                changes=changes,
-                description=description,
-                ip_address=ip_address,
-                created_at=datetime.utcnow()
-            )
-            
-            db.session.add(audit_log)
-            db.session.commit()
+            entry = {
+                'admin_id': admin_id,
+                'action_type': action_type,
+                'entity_type': entity_type,
+                'entity_id': entity_id,
+                'changes': changes,
+                'description': description,
+                'ip_address': ip_address,
+                'created_at': datetime.utcnow()
+            }
+            get_audit_writer().submit(entry)
             
             logger.info(
-                f"Audit log created: admin_id={admin_id}, action={action_type}, "
+                f"Audit log queued: admin_id={admin_id}, action={action_type}, "
                 f"entity={entity_type}:{entity_id}, ip={ip_address}"
             )
             
-            return audit_log
+            return AuditLog(**entry)
             
         except Exception as e:
-            db.session.rollback()
             logger.error(f"Failed to create audit log: {str(e)}", exc_info=True)
             # Don't raise exception - audit logging failure shouldn't break the main operation
             return None
     
+    @staticmethod
+    def flush(timeout=5.0):
+        """
+        Wait for queued audit log entries to be written
+        
+        Args:
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            bool: True if every queued entry was written
+        """
+        return get_audit_writer().flush(timeout)
+    
     @staticmethod
     def get_audit_logs(filters=None, page=1, per_page=50):
         """
@@ -83,6 +96,8 @@ class AuditService:
         Returns:
             dict: Paginated audit logs data
         """
+        AuditService.flush()
+        
         try:
             query = AuditLog.query
             
@@ -137,6 +152,8 @@ class AuditService:
         Returns:
             list: List of audit log entries for the entity
         """
+        AuditService.flush()
+        
         try:
             audit_logs = AuditLog.query.filter_by(
                 entity_type=entity_type,
@@ -161,6 +178,8 @@ class AuditService:
         Returns:
             list: List of audit log entries for the admin
         """
+        AuditService.flush()
+        
         try:
             from datetime import timedelta
             
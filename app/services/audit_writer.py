@@ -0,0 +1,170 @@
+"""
+Audit Log Writer
+Buffers audit log entries and writes them in batched inserts
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from flask import current_app
+from app import db
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# How often an idle writer thread checks for shutdown (seconds)
+POLL_INTERVAL = 0.5
+
+
+class AuditLogWriter:
+    """
+    Writes audit log rows on its own connection, outside the caller's session
+
+    In asynchronous mode entries go onto a bounded queue that a daemon thread
+    drains, inserting everything waiting in one executemany per batch. When
+    the queue is full the entry is written inline instead of being dropped,
+    and pending entries are flushed when the interpreter exits. In
+    synchronous mode (used by the test configuration) each entry is inserted
+    before submit returns.
+    """
+
+    def __init__(self, engine, asynchronous=True, queue_size=10000, batch_size=500):
+        self.engine = engine
+        self.asynchronous = asynchronous
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, entry):
+        """
+        Queue an audit entry for writing
+
+        Args:
+            entry: Dictionary of AuditLog column values
+        """
+        if not self.asynchronous or self._stop_event.is_set():
+            self.write_batch([entry])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            logger.warning("Audit log queue full, writing entry inline")
+            self.write_batch([entry])
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued entry has been written
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if the queue was drained
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout=10.0):
+        """
+        Stop the writer thread after writing everything still queued
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+        # Write anything the thread did not get to
+        leftover = self._drain(self._queue.qsize())
+        if leftover:
+            self._write_and_ack(leftover)
+
+    def write_batch(self, entries):
+        """
+        Insert audit entries in a single transaction
+
+        Args:
+            entries: List of dictionaries of AuditLog column values
+
+        Returns:
+            bool: True if the entries were written
+        """
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(AuditLog.__table__.insert(), entries)
+            return True
+        except Exception as e:
+            # Audit logging failure shouldn't break the main operation
+            logger.error(f"Failed to write {len(entries)} audit log entries: {str(e)}", exc_info=True)
+            return False
+
+    def _ensure_started(self):
+        """Start the writer thread on first use"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Drain the queue in batches until shutdown"""
+        while True:
+            try:
+                first = self._queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    return
+                continue
+
+            self._write_and_ack([first] + self._drain(self.batch_size - 1))
+
+    def _drain(self, limit):
+        """Take up to limit entries that are already queued"""
+        entries = []
+        while len(entries) < limit:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return entries
+
+    def _write_and_ack(self, entries):
+        """Write a batch taken from the queue and mark it done"""
+        try:
+            self.write_batch(entries)
+        finally:
+            for _ in entries:
+                self._queue.task_done()
+
+
+def get_audit_writer():
+    """
+    Get the audit log writer for the current application
+
+    Returns:
+        AuditLogWriter: Writer configured from AUDIT_LOG_* settings
+    """
+    writer = current_app.extensions.get('audit_writer')
+    if writer is None:
+        writer = AuditLogWriter(
+            db.engine,
+            asynchronous=current_app.config.get('AUDIT_LOG_ASYNC', True),
+            queue_size=current_app.config.get('AUDIT_LOG_QUEUE_SIZE', 10000),
+            batch_size=current_app.config.get('AUDIT_LOG_BATCH_SIZE', 500)
+        )
+        current_app.extensions['audit_writer'] = writer
+        atexit.register(writer.shutdown)
+    return writer
@@ -0,0 +1,370 @@
+"""
+Backtester
+Vectorized replay of RecommendationSystem signals over many symbols and years
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+from app import db
+from app.models.company import Company
+from app.models.price_history import PriceHistory
+from app.services.market_data import LocalCSVProvider
+from app.services.transaction_engine import TransactionEngine
+from app.utils.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+COMMISSION_RATE = float(TransactionEngine.COMMISSION_RATE)
+
+# Signal codes; STRONG BUY and BUY both open a position
+SELL, HOLD, BUY = -1, 0, 1
+
+
+def load_close_matrix(symbols: Optional[Sequence[str]] = None, start_date: Optional[date] = None,
+                      end_date: Optional[date] = None, source: str = 'database') -> pd.DataFrame:
+    """
+    Load daily closes for many symbols as one (dates x symbols) frame
+
+    Args:
+        symbols: Symbols to load (default: every active company, or every CSV)
+        start_date: First date (default: all history)
+        end_date: Last date (default: all history)
+        source: 'database' (PriceHistory, one query) or 'csv' (MARKET_DATA_DIRS files)
+
+    Returns:
+        DataFrame indexed by date with one column per symbol; NaN before a
+        symbol's first price and on days it did not trade
+
+    Raises:
+        ValidationError: If the source is unknown or nothing was loaded
+    """
+    if source == 'database':
+        query = db.session.query(Company.symbol, PriceHistory.date, PriceHistory.adjusted_close).join(
+            PriceHistory, PriceHistory.company_id == Company.company_id
+        )
+        if symbols:
+            query = query.filter(Company.symbol.in_([s.upper() for s in symbols]))
+        else:
+            query = query.filter(Company.is_active == True)
+        if start_date:
+            query = query.filter(PriceHistory.date >= start_date)
+        if end_date:
+            query = query.filter(PriceHistory.date <= end_date)
+        rows = pd.DataFrame(query.all(), columns=['symbol', 'date', 'close'])
+        closes = rows.pivot(index='date', columns='symbol', values='close').astype(float)
+        closes.index = pd.to_datetime(closes.index)
+    elif source == 'csv':
+        provider = LocalCSVProvider(current_app.config.get('MARKET_DATA_DIRS', []))
+        symbols = [s.upper() for s in symbols] if symbols else provider.available_symbols()
+        frames = {}
+        for symbol in symbols:
+            path = provider._find_file(symbol)
+            if path:
+                frames[symbol] = LocalCSVProvider.read_price_csv(path)['Close']
+        closes = pd.DataFrame(frames)
+        closes = closes.loc[pd.Timestamp(start_date) if start_date else None:
+                            pd.Timestamp(end_date) if end_date else None]
+    else:
+        raise ValidationError("source must be 'database' or 'csv'")
+
+    closes = closes.sort_index().dropna(axis=1, how='all')
+    if closes.empty:
+        raise ValidationError("No price history found for the backtest")
+    return closes
+
+
+def trend_forecast(close: np.ndarray, lookback: int = 30, horizon: int = 7) -> np.ndarray:
+    """
+    Rolling linear-trend forecast of the mean close over the next horizon days
+
+    A least-squares line is fitted to each symbol's last lookback closes on
+    every day, the way LinearRegressionModel extrapolates the close, using
+    rolling sums so the whole matrix is computed at once.
+
+    Args:
+        close: (days x symbols) closes, NaN where missing
+        lookback: Days in each fitted window
+        horizon: Days ahead whose forecast is averaged
+
+    Returns:
+        (days x symbols) forecast means, NaN until a full window of prices exists
+    """
+    close = np.asarray(close, dtype=float)
+    valid = ~np.isnan(close)
+    y = np.where(valid, close, 0.0)
+    t = np.arange(len(close), dtype=float)[:, None]
+
+    def window_sum(values):
+        totals = np.cumsum(values, axis=0)
+        totals[lookback:] = totals[lookback:] - totals[:-lookback]
+        return totals
+
+    count = window_sum(valid.astype(float))
+    sum_y = window_sum(y)
+    # Sum of x*y with x counted from the first day of each window
+    sum_xy = window_sum(t * y) - (t - lookback + 1) * sum_y
+
+    n = float(lookback)
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x ** 2)
+    intercept = (sum_y - slope * sum_x) / n
+    forecast = intercept + slope * (n - 1 + (horizon + 1) / 2)
+
+    forecast[count < lookback] = np.nan
+    return forecast
+
+
+def recommendation_signals(close: np.ndarray, forecast: np.ndarray,
+                           polarity: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    RecommendationSystem.generate_recommendation for every day and symbol at once
+
+    The price trend is RISE when the close is below the forecast mean and
+    FALL otherwise. With sentiment, RISE is a (STRONG) BUY unless sentiment
+    is neutral, FALL with negative sentiment is a SELL, and everything else
+    is a HOLD. Without sentiment history the price trend decides alone.
+
+    Args:
+        close: (days x symbols) closes
+        forecast: (days x symbols) forecast means
+        polarity: (days x symbols) sentiment polarity, or None
+
+    Returns:
+        (days x symbols) int8 signals: BUY (1), HOLD (0) or SELL (-1)
+    """
+    known = ~(np.isnan(close) | np.isnan(forecast))
+    with np.errstate(invalid='ignore'):
+        rise = close < forecast
+    if polarity is None:
+        signals = np.where(rise, BUY, SELL)
+    else:
+        polarity = np.nan_to_num(np.asarray(polarity, dtype=float))
+        signals = np.select(
+            [rise & (polarity != 0), ~rise & (polarity < 0)],
+            [BUY, SELL],
+            default=HOLD
+        )
+    return np.where(known, signals, HOLD).astype(np.int8)
+
+
+def positions_from_signals(signals: np.ndarray) -> np.ndarray:
+    """
+    Long/flat positions: BUY goes long, SELL goes flat, HOLD keeps the last position
+
+    Args:
+        signals: (days x symbols) signals
+
+    Returns:
+        (days x symbols) positions (1.0 long, 0.0 flat) held after each day's close
+    """
+    rows = np.arange(len(signals))[:, None]
+    last_signal_row = np.maximum.accumulate(np.where(signals != HOLD, rows, 0), axis=0)
+    last_signal = np.take_along_axis(signals, last_signal_row, axis=0)
+    return (last_signal == BUY).astype(float)
+
+
+def simulate(close: np.ndarray, positions: np.ndarray, capital: float,
+             commission_rate: float = COMMISSION_RATE) -> Dict[str, np.ndarray]:
+    """
+    Equity of equal sleeves, one per symbol, trading at the close
+
+    Each symbol gets capital / symbols. A sleeve is fully invested while its
+    position is long and in cash otherwise; every entry and exit pays
+    commission_rate of the sleeve value, as TransactionEngine.calculate_commission
+    charges on the order amount (fractional shares, so without cent rounding).
+
+    Args:
+        close: (days x symbols) closes, NaN where missing (treated as unchanged)
+        positions: (days x symbols) positions held after each day's close
+        capital: Starting capital of the whole portfolio
+        commission_rate: Commission per trade as a fraction of the traded amount
+
+    Returns:
+        dict: 'sleeves' (days x symbols) equity, 'commission' (days x symbols)
+            fees paid and 'trades' (days x symbols) 1 where a trade happened
+    """
+    filled = pd.DataFrame(close).ffill().to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.nan_to_num(filled[1:] / filled[:-1] - 1.0)
+    returns = np.vstack([np.zeros((1, close.shape[1])), returns])
+
+    previous = np.vstack([np.zeros((1, positions.shape[1])), positions[:-1]])
+    trades = np.abs(positions - previous)
+    market = 1.0 + previous * returns
+    growth = market * (1.0 - commission_rate * trades)
+
+    sleeves = (capital / close.shape[1]) * np.cumprod(growth, axis=0)
+    before_fees = sleeves / (1.0 - commission_rate * trades)
+    return {
+        'sleeves': sleeves,
+        'commission': before_fees * commission_rate * trades,
+        'trades': trades
+    }
+
+
+def performance_metrics(equity: np.ndarray, capital: float) -> Dict:
+    """
+    Summary statistics of an equity curve
+
+    Args:
+        equity: Portfolio value per day
+        capital: Starting capital
+
+    Returns:
+        dict: total_return, cagr, annualized_volatility, sharpe (zero risk-free
+            rate) and max_drawdown (positive fraction)
+    """
+    daily = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+    years = len(equity) / TRADING_DAYS_PER_YEAR
+    total_return = float(equity[-1] / capital - 1)
+    volatility = float(daily.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)) if len(daily) > 1 else 0.0
+    peaks = np.maximum.accumulate(equity)
+    return {
+        'total_return': total_return,
+        'cagr': float((equity[-1] / capital) ** (1 / years) - 1) if years > 0 and equity[-1] > 0 else None,
+        'annualized_volatility': volatility,
+        'sharpe': float(daily.mean() * TRADING_DAYS_PER_YEAR / volatility) if volatility > 0 else None,
+        'max_drawdown': float(np.max(1 - equity / peaks))
+    }
+
+
+class Backtester:
+    """
+    Backtest RecommendationSystem signals on a close matrix
+
+    Signals for every symbol and day come from the trend forecast (or a
+    supplied forecast matrix) and optional sentiment history, all computed as
+    whole-matrix NumPy operations, so the cost grows with the size of the
+    matrix rather than with one pipeline run per symbol and day.
+    """
+
+    def __init__(self, lookback: int = 30, horizon: int = 7, capital: float = 100000.0,
+                 commission_rate: float = COMMISSION_RATE):
+        if lookback < 2 or horizon < 1:
+            raise ValidationError("lookback must be at least 2 and horizon at least 1")
+        self.lookback = lookback
+        self.horizon = horizon
+        self.capital = capital
+        self.commission_rate = commission_rate
+
+    def run(self, closes: pd.DataFrame, forecast: Optional[pd.DataFrame] = None,
+            polarity: Optional[pd.DataFrame] = None) -> Dict:
+        """
+        Run the backtest
+
+        Args:
+            closes: (dates x symbols) closes, e.g. from load_close_matrix
+            forecast: Forecast means aligned to closes (default: trend_forecast)
+            polarity: Sentiment polarity aligned to closes (default: none)
+
+        Returns:
+            dict: 'equity' and 'benchmark' (equal-weight buy and hold) Series,
+                'metrics', 'benchmark_metrics' and per-symbol 'symbols' stats
+        """
+        close = closes.to_numpy(dtype=float)
+        if forecast is None:
+            forecast_values = trend_forecast(close, self.lookback, self.horizon)
+        else:
+            forecast_values = forecast.reindex_like(closes).to_numpy(dtype=float)
+        polarity_values = None if polarity is None else polarity.reindex_like(closes).to_numpy(dtype=float)
+
+        signals = recommendation_signals(close, forecast_values, polarity_values)
+        positions = positions_from_signals(signals)
+        strategy = simulate(close, positions, self.capital, self.commission_rate)
+
+        # Buy and hold: enter each symbol on its first priced day
+        listed = (~np.isnan(close)).astype(float)
+        benchmark = simulate(close, np.maximum.accumulate(listed, axis=0), self.capital, self.commission_rate)
+
+        equity = strategy['sleeves'].sum(axis=1)
+        benchmark_equity = benchmark['sleeves'].sum(axis=1)
+        sleeve_capital = self.capital / close.shape[1]
+        symbols = pd.DataFrame({
+            'total_return': strategy['sleeves'][-1] / sleeve_capital - 1,
+            'buy_and_hold_return': benchmark['sleeves'][-1] / sleeve_capital - 1,
+            'trades': strategy['trades'].sum(axis=0).astype(int),
+            'commission': strategy['commission'].sum(axis=0),
+            'exposure': positions.mean(axis=0)
+        }, index=closes.columns)
+
+        metrics = performance_metrics(equity, self.capital)
+        metrics.update(
+            trades=int(strategy['trades'].sum()),
+            commission=float(strategy['commission'].sum()),
+            exposure=float(positions.mean()),
+            final_equity=float(equity[-1])
+        )
+        return {
+            'equity': pd.Series(equity, index=closes.index),
+            'benchmark': pd.Series(benchmark_equity, index=closes.index),
+            'metrics': metrics,
+            'benchmark_metrics': performance_metrics(benchmark_equity, self.capital),
+            'symbols': symbols
+        }
+
+    def sweep(self, closes: pd.DataFrame, grid: List[Dict], processes: int = 0) -> pd.DataFrame:
+        """
+        Backtest several lookback/horizon settings, optionally on a process pool
+
+        The close matrix is sent to each worker once rather than with every task.
+
+        Args:
+            closes: (dates x symbols) closes
+            grid: Settings to try, e.g. [{'lookback': 20, 'horizon': 5}, ...]
+            processes: Worker processes (0 runs in-process)
+
+        Returns:
+            DataFrame with one row of settings and metrics per grid entry, best Sharpe first
+        """
+        settings = [dict({'lookback': self.lookback, 'horizon': self.horizon}, **params) for params in grid]
+        if processes > 0 and len(settings) > 1:
+            with ProcessPoolExecutor(max_workers=min(processes, len(settings), os.cpu_count() or 1),
+                                     initializer=_init_sweep_worker, initargs=(closes,)) as pool:
+                results = list(pool.map(_sweep_task, settings,
+                                        [self.capital] * len(settings), [self.commission_rate] * len(settings)))
+        else:
+            results = [_run_settings(closes, params, self.capital, self.commission_rate) for params in settings]
+
+        table = pd.DataFrame([dict(params, **metrics) for params, metrics in zip(settings, results)])
+        return table.sort_values('sharpe', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def _run_settings(closes: pd.DataFrame, params: Dict, capital: float, commission_rate: float) -> Dict:
+    backtester = Backtester(params['lookback'], params['horizon'], capital, commission_rate)
+    return backtester.run(closes)['metrics']
+
+
+_sweep_closes = None
+
+
+def _init_sweep_worker(closes: pd.DataFrame) -> None:
+    """Keep the close matrix in the worker for every task"""
+    global _sweep_closes
+    _sweep_closes = closes
+
+
+def _sweep_task(params: Dict, capital: float, commission_rate: float) -> Dict:
+    return _run_settings(_sweep_closes, params, capital, commission_rate)
+
+
+def get_backtester() -> Backtester:
+    """
+    Create a Backtester from the application config
+
+    Returns:
+        Backtester using BACKTEST_LOOKBACK, BACKTEST_HORIZON and BACKTEST_CAPITAL
+    """
+    return Backtester(
+        lookback=current_app.config.get('BACKTEST_LOOKBACK', 30),
+        horizon=current_app.config.get('BACKTEST_HORIZON', 7),
+        capital=current_app.config.get('BACKTEST_CAPITAL', 100000.0)
+    )
@@ -0,0 +1,282 @@
+"""
+Batch Forecaster
+Runs PredictionService over the active universe in worker processes and stores the results
+"""
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.company import Company
+from app.models.forecast import Forecast
+from app.models.holding import Holdings
+from app.models.job_log import JobLog
+from app.models.order import Order
+from app.models.price_history import PriceHistory
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'forecast_universe'
+DEFAULT_MODELS = ['arima', 'lstm', 'lr']
+
+
+def universe_companies(order_days: int = 30) -> List[Company]:
+    """
+    Active companies that are held by any user or were ordered recently
+
+    Args:
+        order_days: Days of order history that count as watching a stock
+
+    Returns:
+        list: Companies ordered by symbol
+    """
+    since = datetime.utcnow() - timedelta(days=order_days)
+    held = db.session.query(Holdings.company_id).distinct()
+    ordered = db.session.query(Order.company_id).filter(Order.created_at >= since).distinct()
+    company_ids = {row[0] for row in held} | {row[0] for row in ordered}
+    if not company_ids:
+        return []
+    return Company.query.filter(
+        Company.is_active == True,
+        Company.company_id.in_(company_ids)
+    ).order_by(Company.symbol).all()
+
+
+def latest_price_date(company_id: int):
+    """Date of a company's newest stored price, if any"""
+    return db.session.query(func.max(PriceHistory.date)).filter(
+        PriceHistory.company_id == company_id
+    ).scalar()
+
+
+def get_fresh_prediction(symbol: str, models: Optional[List[str]] = None) -> Optional[Dict]:
+    """
+    Get a stored batch prediction if it is still valid
+
+    A stored prediction is fresh while it has not expired, covers every
+    requested model and no newer price has arrived since it was computed.
+
+    Args:
+        symbol: Stock symbol
+        models: Models the caller wants (default: all)
+
+    Returns:
+        dict: predict_stock_price-style result limited to the requested models,
+            with 'precomputed' True, or None when nothing fresh is stored
+    """
+    models = models or DEFAULT_MODELS
+    try:
+        row = Forecast.query.join(Company, Forecast.company_id == Company.company_id).filter(
+            Company.symbol == symbol.upper().strip(),
+            Forecast.expires_at > datetime.utcnow()
+        ).first()
+    except SQLAlchemyError as e:
+        # e.g. a database created before the forecasts table; run the models live
+        db.session.rollback()
+        logger.warning(f"Could not load the stored forecast for {symbol}: {e}")
+        return None
+    if row is None or not set(models) <= set(row.models.split(',')):
+        return None
+    if row.price_date is not None:
+        newest = latest_price_date(row.company_id)
+        if newest is not None and newest > row.price_date:
+            return None
+
+    result = dict(row.result)
+    result['predictions'] = {m: p for m, p in result.get('predictions', {}).items() if m in models}
+    result['errors'] = {m: e for m, e in (row.errors or {}).items() if m in models}
+    if not result['predictions']:
+        return None
+    result['success'] = True
+    result['precomputed'] = True
+    result['generated_at'] = row.generated_at.isoformat()
+    return result
+
+
+def _predict_symbol(symbol: str, models: List[str]) -> Dict:
+    """Run the models for one symbol (inside an application context) and time it"""
+    from app.services.prediction_service import PredictionService
+
+    started = time.perf_counter()
+    try:
+        result = PredictionService().predict_stock_price(symbol, models, include_sentiment=False)
+        error = None
+    except Exception as e:
+        result, error = None, str(e)
+    return {'symbol': symbol, 'result': result, 'error': error, 'seconds': time.perf_counter() - started}
+
+
+_worker_app = None
+
+
+def _init_worker(config_name: str) -> None:
+    """Create the application once per worker process"""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app(config_name)
+    # The batch already runs one symbol per process; search ARIMA orders in-process
+    _worker_app.config['ARIMA_ORDER_PROCESSES'] = 0
+
+
+def _predict_in_worker(symbol: str, models: List[str]) -> Dict:
+    with _worker_app.app_context():
+        return _predict_symbol(symbol, models)
+
+
+class BatchForecaster:
+    """
+    Precompute predictions for the active universe
+
+    Each symbol is predicted in a worker process (or in-process when
+    processes is 0) and the results, including per-model errors and timing,
+    are upserted into the forecasts table by the parent, which is the only
+    writer. The run is recorded in a JobLog entry whose error_message lists
+    each failed symbol with its error.
+    """
+
+    def __init__(self, models: Optional[List[str]] = None, processes: int = 2, ttl_hours: float = 24):
+        self.models = [m for m in DEFAULT_MODELS if m in (models or DEFAULT_MODELS)]
+        self.processes = processes
+        self.ttl_hours = ttl_hours
+
+    def run(self, symbols: Optional[List[str]] = None, order_days: int = 30) -> JobLog:
+        """
+        Forecast the given symbols, or the active universe
+
+        Args:
+            symbols: Symbols to forecast (default: held or recently ordered companies)
+            order_days: Days of order history that count as watching a stock
+
+        Returns:
+            JobLog: The completed job entry
+        """
+        job = JobLog.create(JOB_NAME)
+        if symbols:
+            companies = Company.query.filter(
+                Company.symbol.in_([s.upper().strip() for s in symbols]),
+                Company.is_active == True
+            ).order_by(Company.symbol).all()
+        else:
+            companies = universe_companies(order_days)
+        by_symbol = {c.symbol: c for c in companies}
+
+        logger.info(f"Forecasting {len(by_symbol)} symbols with {self.models} on {self.processes} processes")
+        processed = 0
+        failures = {}
+        for outcome in self._execute(list(by_symbol)):
+            symbol = outcome['symbol']
+            if outcome['result'] is None:
+                failures[symbol] = outcome['error']
+                logger.warning(f"Forecast failed for {symbol}: {outcome['error']}")
+                continue
+            self._store(by_symbol[symbol], outcome)
+            processed += 1
+
+        failed = len(failures)
+        if failed == 0:
+            status = 'SUCCESS'
+        elif processed == 0:
+            status = 'FAILED'
+        else:
+            status = 'PARTIAL'
+        error_message = None
+        if failures:
+            lines = [f"{failed} symbols failed"]
+            for symbol, error in sorted(failures.items()):
+                lines.append(f"{symbol}: {' '.join(str(error).splitlines())}")
+            error_message = '\n'.join(lines)
+        job.complete(
+            status=status,
+            stocks_processed=processed,
+            stocks_failed=failed,
+            error_message=error_message
+        )
+        logger.info(f"Forecast run finished: {processed} stored, {failed} failed")
+        return job
+
+    def _execute(self, symbols: List[str]) -> Iterator[Dict]:
+        """Yield one outcome per symbol as it completes"""
+        if self.processes <= 0 or len(symbols) <= 1:
+            for symbol in symbols:
+                yield _predict_symbol(symbol, self.models)
+            return
+
+        config_name = os.environ.get('FLASK_ENV', 'development')
+        with ProcessPoolExecutor(max_workers=min(self.processes, len(symbols)),
+                                 initializer=_init_worker, initargs=(config_name,)) as pool:
+            futures = {pool.submit(_predict_in_worker, symbol, self.models): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield {'symbol': futures[future], 'result': None, 'error': str(e), 'seconds': 0.0}
+
+    def _store(self, company: Company, outcome: Dict) -> None:
+        """Upsert a company's forecast row"""
+        result = dict(outcome['result'])
+        errors = result.pop('errors', {})
+        result.pop('sentiment', None)
+        now = datetime.utcnow()
+        price_date = latest_price_date(company.company_id)
+
+        row = Forecast.query.filter_by(company_id=company.company_id).first()
+        if row is None:
+            row = Forecast(company_id=company.company_id)
+            db.session.add(row)
+        row.models = ','.join(self.models)
+        row.result = result
+        row.errors = errors
+        row.price_date = price_date
+        row.duration_ms = int(outcome['seconds'] * 1000)
+        row.generated_at = now
+        row.expires_at = now + timedelta(hours=self.ttl_hours)
+        db.session.commit()
+
+
+def run_details(job: JobLog) -> Dict[str, Dict]:
+    """
+    Per-symbol outcome of a forecast run
+
+    Stored symbols come from the forecasts rows the run wrote, failed ones
+    from the job's error_message.
+
+    Args:
+        job: A completed forecast JobLog
+
+    Returns:
+        dict: Symbol -> {'status': 'SUCCESS', 'seconds'} or {'status': 'FAILED', 'error'}
+    """
+    details = {}
+    rows = db.session.query(Company.symbol, Forecast.duration_ms).join(
+        Forecast, Forecast.company_id == Company.company_id
+    ).filter(
+        Forecast.generated_at >= job.started_at,
+        Forecast.generated_at <= (job.completed_at or datetime.utcnow())
+    )
+    for symbol, duration_ms in rows:
+        details[symbol] = {'status': 'SUCCESS', 'seconds': (duration_ms or 0) / 1000}
+    for line in (job.error_message or '').splitlines()[1:]:
+        symbol, _, error = line.partition(': ')
+        details[symbol] = {'status': 'FAILED', 'error': error}
+    return details
+
+
+def get_batch_forecaster() -> BatchForecaster:
+    """
+    Create a BatchForecaster from the application config
+
+    Returns:
+        BatchForecaster using FORECAST_MODELS, FORECAST_PROCESSES and FORECAST_TTL_HOURS
+    """
+    return BatchForecaster(
+        models=current_app.config.get('FORECAST_MODELS', DEFAULT_MODELS),
+        processes=current_app.config.get('FORECAST_PROCESSES', 2),
+        ttl_hours=current_app.config.get('FORECAST_TTL_HOURS', 24)
+    )
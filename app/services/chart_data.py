@@ -0,0 +1,476 @@
+"""
+Chart Data Service
+Compact, downsampled chart series for client-side rendering of predictions and forecasts
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+
+from app.services.batch_forecaster import get_fresh_prediction
+from app.services.prediction_service import PredictionService
+from app.utils.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS = ['arima', 'lstm', 'lr']
+MODEL_LABELS = {'arima': 'ARIMA', 'lstm': 'LSTM', 'lr': 'Linear Regression'}
+VALUE_DECIMALS = 4
+
+
+def compact_values(values: Sequence) -> List[Optional[float]]:
+    """Round values for JSON, with NaN/inf as None"""
+    compacted = []
+    for value in values:
+        value = float(value)
+        compacted.append(round(value, VALUE_DECIMALS) if math.isfinite(value) else None)
+    return compacted
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Choose points with Largest-Triangle-Three-Buckets
+
+    The first and last points are kept. The rest of the series is split into
+    max_points - 2 buckets, and each bucket keeps the point forming the
+    largest triangle with the point kept from the previous bucket and the
+    average of the next bucket. Peaks and troughs survive far better than
+    with even spacing.
+
+    Args:
+        x: X values (increasing)
+        y: Y values (non-finite values are interpolated for selection only)
+        max_points: Number of points to keep (0 or less, or >= len(y), keeps all)
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    length = len(y)
+    if max_points <= 0 or length <= max_points or length <= 2:
+        return np.arange(length)
+    if max_points < 3:
+        return np.array([0, length - 1])
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.isfinite(y)
+    if not finite.all():
+        y = np.interp(x, x[finite], y[finite]) if finite.any() else np.zeros(length)
+
+    # Bucket i spans [edges[i], edges[i + 1]) over the interior points
+    edges = (np.arange(max_points - 1) * (length - 2) / (max_points - 2)).astype(int) + 1
+    edges[-1] = length - 1
+    indices = np.empty(max_points, dtype=int)
+    indices[0], indices[-1] = 0, length - 1
+
+    chosen = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else length
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[chosen] - next_x) * (y[start:end] - y[chosen])
+            - (x[chosen] - x[start:end]) * (next_y - y[chosen])
+        )
+        chosen = start + int(areas.argmax())
+        indices[bucket + 1] = chosen
+    return indices
+
+
+def downsample(values: Sequence, max_points: int) -> Tuple[List[int], List[Optional[float]]]:
+    """
+    Downsample a series with LTTB, always keeping the first and last point
+
+    Args:
+        values: Series values (x is the position)
+        max_points: Largest number of points to return (0 or less keeps all)
+
+    Returns:
+        tuple: (indices into the original series, compacted values)
+    """
+    array = np.asarray(values, dtype=float).ravel()
+    indices = lttb_indices(np.arange(len(array)), array, max_points)
+    return indices.tolist(), compact_values(array[indices])
+
+
+OHLC_INTERVALS = ('daily', 'weekly', 'monthly')
+
+
+def validate_series_options(interval: str, points: Optional[int] = None) -> None:
+    """
+    Check price history options before any prices are loaded
+
+    Raises:
+        ValidationError: If interval is not supported or points is below 2
+    """
+    if interval not in OHLC_INTERVALS:
+        raise ValidationError(f"interval must be one of: {', '.join(OHLC_INTERVALS)}")
+    if points is not None and points < 2:
+        raise ValidationError("points must be at least 2")
+
+
+def resample_ohlc(prices: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """
+    Aggregate daily OHLCV arrays into weekly or monthly bars
+
+    Each bar opens at its first trading day's open, closes at its last
+    day's close, and takes the highest high, lowest low and total volume.
+    Bars are dated by their first trading day.
+
+    Args:
+        prices: Arrays from StockRepository.get_price_arrays (date-ordered)
+        interval: 'daily', 'weekly' (Monday-based weeks) or 'monthly'
+
+    Returns:
+        dict: Arrays with the same keys, one entry per bar
+
+    Raises:
+        ValidationError: If interval is not supported
+    """
+    if interval not in OHLC_INTERVALS:
+        raise ValidationError(f"interval must be one of: {', '.join(OHLC_INTERVALS)}")
+    dates = prices['date']
+    if interval == 'daily' or len(dates) == 0:
+        return prices
+
+    if interval == 'weekly':
+        # Day 0 of datetime64 is a Thursday, so +3 counts from Monday
+        days = dates.astype('datetime64[D]').astype(np.int64)
+        keys = days - (days + 3) % 7
+    else:
+        keys = dates.astype('datetime64[M]').astype(np.int64)
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(dates)] - 1
+    return {
+        'date': dates[starts],
+        'open': prices['open'][starts],
+        'high': np.maximum.reduceat(prices['high'], starts),
+        'low': np.minimum.reduceat(prices['low'], starts),
+        'close': prices['close'][ends],
+        'volume': np.add.reduceat(prices['volume'], starts)
+    }
+
+
+def price_history_series(prices: Dict[str, np.ndarray], interval: str = 'daily',
+                         points: Optional[int] = None) -> List[Dict]:
+    """
+    Price history rows for the API, resampled and downsampled
+
+    Args:
+        prices: Arrays from StockRepository.get_price_arrays
+        interval: Bar size ('daily', 'weekly' or 'monthly')
+        points: If set, keep at most this many bars, chosen by LTTB on the close
+
+    Returns:
+        list: {'date', 'open', 'high', 'low', 'close', 'volume'} dicts in date order
+
+    Raises:
+        ValidationError: If interval or points is invalid
+    """
+    validate_series_options(interval, points)
+    bars = resample_ohlc(prices, interval)
+    if points is not None:
+        keep = lttb_indices(bars['date'].astype(np.int64), bars['close'], points)
+        bars = {key: values[keep] for key, values in bars.items()}
+
+    columns = {key: compact_values(bars[key]) for key in ('open', 'high', 'low', 'close')}
+    return [
+        {
+            'date': str(day),
+            'open': columns['open'][i],
+            'high': columns['high'][i],
+            'low': columns['low'][i],
+            'close': columns['close'][i],
+            'volume': int(volume)
+        }
+        for i, (day, volume) in enumerate(zip(bars['date'], bars['volume']))
+    ]
+
+
+def line_chart(title: str, series: Dict[str, Sequence], max_points: int,
+               xlabel: str = 'Time Period', ylabel: str = 'Price ($)', x_start: int = 0) -> Dict:
+    """
+    Build a line chart spec whose series share one downsampled x axis
+
+    Points are chosen by LTTB on the first series, so it should be the
+    reference series (e.g. the actual price).
+
+    Args:
+        title: Chart title
+        series: Series name -> values (all the same length as the first)
+        max_points: Largest number of points per series
+        xlabel: X axis label
+        ylabel: Y axis label
+        x_start: X value of the first point
+
+    Returns:
+        dict: {'type': 'line', 'title', 'xlabel', 'ylabel', 'x', 'series': [{'name', 'values'}]}
+    """
+    length = min(len(values) for values in series.values())
+    indices, _ = downsample(np.asarray(next(iter(series.values())), dtype=float)[:length], max_points)
+    return {
+        'type': 'line',
+        'title': title,
+        'xlabel': xlabel,
+        'ylabel': ylabel,
+        'x': [x_start + i for i in indices],
+        'series': [
+            {'name': name, 'values': compact_values(np.asarray(values, dtype=float)[:length][indices])}
+            for name, values in series.items()
+        ]
+    }
+
+
+def sentiment_chart(sentiment: Optional[Dict], symbol: str) -> Optional[Dict]:
+    """Build a pie chart spec from a sentiment result, if it has counts"""
+    if not sentiment or not sentiment.get('enabled', True) or 'positive' not in sentiment:
+        return None
+    return {
+        'type': 'pie',
+        'title': f"Sentiment Analysis for {symbol}",
+        'labels': ['Positive', 'Negative', 'Neutral'],
+        'values': [int(sentiment['positive']), int(sentiment['negative']), int(sentiment['neutral'])]
+    }
+
+
+def _forecast_values(result) -> Optional[List[float]]:
+    """Extract the forecast list from a model's forecast result"""
+    values = result.get('forecast') if isinstance(result, dict) else result
+    if values is None or len(values) == 0:
+        return None
+    return [float(v) for v in np.asarray(values, dtype=float).ravel()]
+
+
+def build_prediction_charts(results: Dict, max_points: int) -> Dict[str, Dict]:
+    """
+    Build chart specs for a predict_stock_price result
+
+    Args:
+        results: Result from PredictionService.predict_stock_price
+        max_points: Largest number of points per series
+
+    Returns:
+        dict: Chart name ('arima', 'lstm', 'lr', 'comparison', 'lr_forecast',
+            'sentiment') -> chart spec, for the charts the result has data for
+    """
+    symbol = results['symbol']
+    charts = {}
+    actual = None
+    predicted = {}
+
+    for model_name, model_result in results.get('predictions', {}).items():
+        label = MODEL_LABELS.get(model_name, model_name)
+        if 'actual' in model_result and 'predicted' in model_result:
+            actual = model_result['actual']
+            predicted[label] = model_result['predicted']
+            charts[model_name] = line_chart(
+                f"{label} Model: Actual vs Predicted Prices",
+                {'Actual Price': model_result['actual'], 'Predicted Price': model_result['predicted']},
+                max_points
+            )
+        forecast = _forecast_values(model_result)
+        if forecast:
+            charts[f"{model_name}_forecast"] = line_chart(
+                f"{symbol} - {label} Forecast", {label: forecast}, max_points,
+                xlabel='Days', ylabel='Predicted Price ($)', x_start=1
+            )
+
+    if actual is not None and len(predicted) > 1:
+        charts['comparison'] = line_chart(
+            f"{symbol} - Model Comparison: Actual vs Predicted Prices",
+            dict({'Actual Price': actual}, **predicted),
+            max_points
+        )
+
+    sentiment = sentiment_chart(results.get('sentiment'), symbol)
+    if sentiment:
+        charts['sentiment'] = sentiment
+    return charts
+
+
+def build_forecast_charts(results: Dict, max_points: int) -> Dict[str, Dict]:
+    """
+    Build chart specs for a generate_forecast result
+
+    Args:
+        results: Result from PredictionService.generate_forecast
+        max_points: Largest number of points per series
+
+    Returns:
+        dict: Chart name (one per model, plus 'comparison' and 'sentiment') -> chart spec
+    """
+    symbol = results['symbol']
+    days = results.get('forecast_days')
+    charts = {}
+    forecasts = {}
+
+    for model_name, forecast_result in results.get('forecasts', {}).items():
+        values = _forecast_values(forecast_result)
+        if not values:
+            continue
+        label = MODEL_LABELS.get(model_name, model_name)
+        forecasts[label] = values
+        charts[model_name] = line_chart(
+            f"{symbol} - {days or len(values)}-Day Stock Price Forecast", {label: values}, max_points,
+            xlabel='Days', ylabel='Predicted Price ($)', x_start=1
+        )
+
+    if len(forecasts) > 1:
+        charts['comparison'] = line_chart(
+            f"{symbol} - {days}-Day Forecast Comparison", forecasts, max_points,
+            xlabel='Days', ylabel='Predicted Price ($)', x_start=1
+        )
+
+    sentiment = sentiment_chart(results.get('sentiment'), symbol)
+    if sentiment:
+        charts['sentiment'] = sentiment
+    return charts
+
+
+class ChartDataCache:
+    """Recent prediction/forecast results and their charts, kept for a TTL"""
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: int = 900):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Tuple[Dict, Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple, value: Tuple[Dict, Dict]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def get_chart_cache() -> ChartDataCache:
+    """
+    Get the chart data cache for the current application
+
+    Returns:
+        ChartDataCache with a TTL of CHART_CACHE_SECONDS
+    """
+    cache = current_app.extensions.get('chart_cache')
+    if cache is None:
+        cache = ChartDataCache(ttl_seconds=current_app.config.get('CHART_CACHE_SECONDS', 900))
+        current_app.extensions['chart_cache'] = cache
+    return cache
+
+
+class ChartDataService:
+    """Run predictions and forecasts once per TTL and serve them as chart series"""
+
+    def __init__(self, prediction_service: Optional[PredictionService] = None):
+        self._prediction_service = prediction_service
+        self.max_points = current_app.config.get('CHART_MAX_POINTS', 500)
+
+    @property
+    def prediction_service(self) -> PredictionService:
+        if self._prediction_service is None:
+            self._prediction_service = PredictionService()
+        return self._prediction_service
+
+    def prediction(self, symbol: str, models: Optional[List[str]] = None) -> Tuple[Dict, Dict]:
+        """
+        Get prediction results and their charts
+
+        Fresh results stored by the batch forecaster are served without
+        running the models.
+
+        Args:
+            symbol: Stock symbol
+            models: Models to run (default: all)
+
+        Returns:
+            tuple: (predict_stock_price result, chart name -> chart spec)
+
+        Raises:
+            ValidationError, ExternalAPIError: As raised by the prediction service
+        """
+        symbol, models = self._normalize(symbol, models)
+        key = ('predict', symbol, models)
+        cached = get_chart_cache().get(key)
+        if cached is not None:
+            return cached
+
+        results = get_fresh_prediction(symbol, list(models))
+        if results is not None:
+            results['sentiment'] = self.prediction_service.get_sentiment(symbol)
+        else:
+            results = self.prediction_service.predict_stock_price(symbol, list(models))
+        value = (results, build_prediction_charts(results, self.max_points))
+        get_chart_cache().set(key, value)
+        return value
+
+    def forecast(self, symbol: str, days: int, models: Optional[List[str]] = None) -> Tuple[Dict, Dict]:
+        """
+        Get forecast results and their charts
+
+        Args:
+            symbol: Stock symbol
+            days: Days to forecast
+            models: Models to run (default: all)
+
+        Returns:
+            tuple: (generate_forecast result, chart name -> chart spec)
+
+        Raises:
+            ValidationError, ExternalAPIError: As raised by the prediction service
+        """
+        symbol, models = self._normalize(symbol, models)
+        key = ('forecast', symbol, models, days)
+        cached = get_chart_cache().get(key)
+        if cached is not None:
+            return cached
+
+        results = self.prediction_service.generate_forecast(symbol, days, list(models))
+        value = (results, build_forecast_charts(results, self.max_points))
+        get_chart_cache().set(key, value)
+        return value
+
+    @staticmethod
+    def _normalize(symbol: str, models: Optional[List[str]]) -> Tuple[str, Tuple[str, ...]]:
+        symbol = (symbol or '').upper().strip()
+        if not symbol:
+            raise ValidationError("Stock symbol is required")
+        models = tuple(m for m in DEFAULT_MODELS if m in (models or DEFAULT_MODELS))
+        if not models:
+            raise ValidationError(f"Models must be chosen from: {', '.join(DEFAULT_MODELS)}")
+        return symbol, models
+
+    @staticmethod
+    def payload(results: Dict, charts: Dict, png_paths: Optional[Dict[str, str]] = None) -> Dict:
+        """Build the JSON response body for a chart endpoint"""
+        data = {
+            'symbol': results['symbol'],
+            'generated_at': results.get('timestamp') or datetime.utcnow().isoformat(),
+            'charts': charts
+        }
+        if png_paths is not None:
+            data['png'] = png_paths
+        return data
@@ -169,6 +169,7 @@ class DividendManager:
                         description=f"Dividend payment: {holding.quantity} shares @ ${dividend.dividend_per_share}"
                     )
                     db.session.add(transaction)
+                    db.session.flush()  # Assign transaction_id for the payment record
                     
                     # Create dividend payment record
                     payment = DividendPayment(
@@ -0,0 +1,342 @@
+"""
+Market Data Providers
+Pluggable sources for prices, price history and company information
+"""
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import pandas as pd
+from flask import current_app
+
+from app.utils.exceptions import ExternalAPIError, StockNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataProvider:
+    """Interface for market data sources used by the service layer"""
+
+    name = 'base'
+
+    def get_current_price(self, symbol: str) -> Decimal:
+        """
+        Get the latest price for a symbol
+
+        Raises:
+            StockNotFoundError: If the provider has no price for the symbol
+            ExternalAPIError: If the upstream source fails
+        """
+        raise NotImplementedError
+
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, Decimal]:
+        """
+        Get the latest prices for several symbols at once
+
+        Providers with a batch endpoint override this; the default asks for
+        each symbol in turn.
+
+        Returns:
+            Dict of symbol to price; symbols that could not be priced are omitted
+        """
+        prices = {}
+        for symbol in symbols:
+            try:
+                prices[symbol] = self.get_current_price(symbol)
+            except (StockNotFoundError, ExternalAPIError) as e:
+                logger.warning(f"No price for {symbol}: {str(e)}")
+        return prices
+
+    def get_price_history(self, symbol: str, period_years: int = 2) -> Optional[pd.DataFrame]:
+        """
+        Get daily OHLCV history indexed by date
+
+        Returns:
+            DataFrame with Open, High, Low, Close, Volume columns or None if unavailable
+        """
+        raise NotImplementedError
+
+    def get_company_info(self, symbol: str) -> Dict:
+        """
+        Get descriptive company information for creating a Company record
+
+        Raises:
+            StockNotFoundError: If the symbol is unknown
+            ExternalAPIError: If the upstream source fails
+        """
+        raise NotImplementedError
+
+    def has_symbol(self, symbol: str) -> bool:
+        """Check whether the provider can serve data for a symbol"""
+        return True
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live market data from Yahoo Finance"""
+
+    name = 'yfinance'
+
+    def get_current_price(self, symbol: str) -> Decimal:
+        import yfinance as yf
+
+        try:
+            ticker = yf.Ticker(symbol)
+
+            # Try to get current price from info
+            info = ticker.info
+
+            # Try different price fields
+            price = None
+            for field in ['currentPrice', 'regularMarketPrice', 'previousClose']:
+                if field in info and info[field]:
+                    price = info[field]
+                    break
+
+            if price is None:
+                # Fallback: get latest from history
+                hist = ticker.history(period='1d')
+                if not hist.empty:
+                    price = hist['Close'].iloc[-1]
+
+            if price is None:
+                raise StockNotFoundError(f"Could not fetch price for {symbol}")
+
+            logger.info(f"Fetched live price for {symbol}: ${price}")
+            return Decimal(str(price))
+
+        except Exception as e:
+            logger.error(f"Failed to fetch live price for {symbol}: {str(e)}")
+            raise ExternalAPIError(f"Failed to fetch live price: {str(e)}")
+
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, Decimal]:
+        import yfinance as yf
+
+        if len(symbols) < 2:
+            return super().get_current_prices(symbols)
+
+        prices = {}
+        try:
+            # One download request for every symbol instead of a quote call each
+            closes = yf.download(list(symbols), period='5d', progress=False, auto_adjust=False)['Close']
+            for symbol in symbols:
+                if symbol in closes:
+                    series = closes[symbol].dropna()
+                    if not series.empty:
+                        prices[symbol] = Decimal(str(round(float(series.iloc[-1]), 2)))
+        except Exception as e:
+            logger.warning(f"Batch price download failed, fetching individually: {str(e)}")
+
+        missing = [s for s in symbols if s not in prices]
+        if missing:
+            prices.update(super().get_current_prices(missing))
+        return prices
+
+    def get_price_history(self, symbol: str, period_years: int = 2) -> Optional[pd.DataFrame]:
+        from ml_models.stock_data_processor import StockDataProcessor
+        return StockDataProcessor(debug=False).get_historical_data(symbol, period_years)
+
+    def get_company_info(self, symbol: str) -> Dict:
+        import yfinance as yf
+
+        try:
+            ticker = yf.Ticker(symbol)
+            info = ticker.info
+
+            if not info or 'symbol' not in info:
+                raise StockNotFoundError(f"Stock symbol not found: {symbol}")
+
+            return {
+                'company_name': info.get('longName', info.get('shortName', symbol)),
+                'sector': info.get('sector'),
+                'industry': info.get('industry'),
+                'market_cap': info.get('marketCap'),
+                'description': info.get('longBusinessSummary'),
+                'website': info.get('website'),
+                'ceo': info.get('companyOfficers', [{}])[0].get('name') if info.get('companyOfficers') else None,
+                'employees': info.get('fullTimeEmployees'),
+                'founded_year': None,  # Not available in yfinance
+                'headquarters': f"{info.get('city', '')}, {info.get('state', '')}, {info.get('country', '')}".strip(', ')
+            }
+        except Exception as e:
+            logger.error(f"Failed to fetch company info for {symbol}: {str(e)}")
+            raise ExternalAPIError(f"Failed to fetch company information: {str(e)}")
+
+
+class LocalCSVProvider(MarketDataProvider):
+    """
+    Deterministic market data served from local CSV files
+
+    Reads ``<SYMBOL>.csv`` files in either the plain ``Date,Open,High,...``
+    layout or the three-row header layout written by yfinance. The current
+    price is the close on or before the reference date (SIMULATION_DATE, or
+    the last row when no date is set), so repeated runs see identical prices.
+    """
+
+    name = 'local'
+
+    def __init__(self, data_dirs: List[str], reference_date: Optional[date] = None):
+        """
+        Initialize the provider
+
+        Args:
+            data_dirs: Directories searched in order for <SYMBOL>.csv
+            reference_date: Date treated as "today" for current prices
+        """
+        self.data_dirs = [d for d in data_dirs if d]
+        self.reference_date = reference_date
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _find_file(self, symbol: str) -> Optional[str]:
+        for directory in self.data_dirs:
+            path = os.path.join(directory, f"{symbol}.csv")
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @staticmethod
+    def read_price_csv(path: str) -> pd.DataFrame:
+        """
+        Read a price CSV into a date-indexed OHLCV DataFrame
+
+        Args:
+            path: Path to the CSV file
+
+        Returns:
+            DataFrame sorted by date with a naive DatetimeIndex named 'Date'
+        """
+        with open(path) as f:
+            second_line = f.readlines(4096)[1:2]
+        skiprows = [1, 2] if second_line and second_line[0].startswith('Ticker') else None
+
+        df = pd.read_csv(path, skiprows=skiprows, index_col=0)
+        index = pd.to_datetime(df.index, utc=True, format='mixed')
+        df.index = index.tz_convert(None).normalize()
+        df.index.name = 'Date'
+        df = df.apply(pd.to_numeric, errors='coerce').dropna(subset=['Close'])
+        return df.sort_index()
+
+    def _frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        symbol = symbol.upper().strip()
+        if symbol not in self._frames:
+            with self._lock:
+                if symbol not in self._frames:
+                    path = self._find_file(symbol)
+                    self._frames[symbol] = self.read_price_csv(path) if path else None
+        return self._frames[symbol]
+
+    def has_symbol(self, symbol: str) -> bool:
+        return self._frame(symbol) is not None
+
+    def available_symbols(self) -> List[str]:
+        """List symbols with a CSV file in any data directory"""
+        symbols = set()
+        for directory in self.data_dirs:
+            if os.path.isdir(directory):
+                symbols.update(f[:-4].upper() for f in os.listdir(directory) if f.lower().endswith('.csv'))
+        return sorted(symbols)
+
+    def get_price_on(self, symbol: str, target_date: Optional[date] = None) -> Decimal:
+        """
+        Get the close on or before a date
+
+        Args:
+            symbol: Stock symbol
+            target_date: Date to look up (default: reference date, else last row)
+
+        Returns:
+            Close price as Decimal
+
+        Raises:
+            StockNotFoundError: If there is no file or no row on/before the date
+        """
+        df = self._frame(symbol)
+        if df is None or df.empty:
+            raise StockNotFoundError(f"No local market data for {symbol}")
+
+        target_date = target_date or self.reference_date
+        if target_date is not None:
+            df = df.loc[:pd.Timestamp(target_date)]
+            if df.empty:
+                raise StockNotFoundError(f"No data available for {symbol} on or before {target_date}")
+
+        return Decimal(str(float(df['Close'].iloc[-1])))
+
+    def get_current_price(self, symbol: str) -> Decimal:
+        return self.get_price_on(symbol)
+
+    def get_price_history(self, symbol: str, period_years: int = 2) -> Optional[pd.DataFrame]:
+        df = self._frame(symbol)
+        if df is None or df.empty:
+            return None
+
+        end = pd.Timestamp(self.reference_date) if self.reference_date else df.index[-1]
+        start = end - timedelta(days=365 * period_years)
+        return df.loc[start:end].copy()
+
+    def get_company_info(self, symbol: str) -> Dict:
+        if not self.has_symbol(symbol):
+            raise StockNotFoundError(f"Stock symbol not found: {symbol}")
+        return {'company_name': symbol.upper()}
+
+
+# Provider registry; register_provider lets extensions add new sources
+_PROVIDERS = {
+    YFinanceProvider.name: YFinanceProvider,
+    LocalCSVProvider.name: LocalCSVProvider,
+}
+
+
+def register_provider(name: str, provider_class):
+    """
+    Register a market data provider class under a config name
+
+    Args:
+        name: Value of MARKET_DATA_PROVIDER that selects the provider
+        provider_class: MarketDataProvider subclass; it is built with the app config
+    """
+    _PROVIDERS[name] = provider_class
+
+
+def create_provider(name: str, config: Dict) -> MarketDataProvider:
+    """
+    Build a provider instance from application config
+
+    Args:
+        name: Registered provider name
+        config: Flask config mapping
+
+    Returns:
+        MarketDataProvider instance
+    """
+    if name not in _PROVIDERS:
+        raise ValueError(f"Unknown market data provider '{name}'. Available: {', '.join(sorted(_PROVIDERS))}")
+
+    provider_class = _PROVIDERS[name]
+    if provider_class is LocalCSVProvider:
+        sim_date = config.get('SIMULATION_DATE')
+        reference_date = datetime.strptime(sim_date, '%Y-%m-%d').date() if sim_date else None
+        return LocalCSVProvider(config.get('MARKET_DATA_DIRS') or [config.get('STATIC_DATA_DIR')], reference_date)
+    return provider_class()
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    """
+    Get the market data provider configured for the current app
+
+    The instance is created once per application and shared, so file-backed
+    providers parse each CSV only once.
+
+    Returns:
+        MarketDataProvider for MARKET_DATA_PROVIDER
+    """
+    provider = current_app.extensions.get('market_data_provider')
+    if provider is None:
+        name = current_app.config.get('MARKET_DATA_PROVIDER', YFinanceProvider.name)
+        provider = create_provider(name, current_app.config)
+        current_app.extensions['market_data_provider'] = provider
+        logger.info(f"Market data provider: {provider.name}")
+    return provider
@@ -0,0 +1,382 @@
+"""
+Model Evaluation
+Walk-forward (rolling-origin) evaluation of the prediction models over symbols and hyperparameter grids
+"""
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+from app.utils.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Hyperparameter grids tried when the caller does not pass one
+DEFAULT_GRIDS = {
+    'arima': {'order': [(1, 1, 0), (2, 1, 0), (6, 1, 0), (2, 1, 2)]},
+    'lstm': {'sequence_length': [7, 14, 30], 'epochs': [5]},
+    'lr': {},
+    'sophisticated_lstm': {'sequence_length': [30, 60], 'epochs': [20]},
+}
+
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    """
+    Every combination of a hyperparameter grid
+
+    Args:
+        grid: Parameter name to candidate values, e.g. {'order': [(1, 1, 0), (6, 1, 0)]}
+
+    Returns:
+        list: One params dict per combination ([{}] for an empty grid)
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def walk_forward_origins(n_rows: int, horizon: int, folds: int, min_train: int) -> List[int]:
+    """
+    Forecast origins of the last folds non-overlapping test windows
+
+    Args:
+        n_rows: Rows of history
+        horizon: Test rows after each origin
+        folds: Number of origins wanted
+        min_train: Fewest rows a training window may have
+
+    Returns:
+        list: Row positions where training ends and the test window starts, oldest first
+    """
+    origins = [n_rows - horizon * (i + 1) for i in range(folds)]
+    return sorted(origin for origin in origins if origin >= min_train)
+
+
+def _forecast_arima(train: pd.DataFrame, test: pd.DataFrame, params: Dict) -> np.ndarray:
+    """ARIMAModel's rolling one-step forecasts, refitted on each observed day as in predict"""
+    from ml_models.arima_model import ARIMAModel
+
+    order = tuple(params.get('order', (6, 1, 0)))
+    predictions, info = ARIMAModel(order=order).arima_model(list(train['Close']), list(test['Close']))
+    if info['iterations'] == 0:
+        raise ValueError(f"ARIMA{order} did not fit: {info['errors'][:1]}")
+    return np.asarray(predictions, dtype=float)
+
+
+def _forecast_lr(train: pd.DataFrame, test: pd.DataFrame, params: Dict) -> np.ndarray:
+    """LinearRegressionModel's forecast set for the days after the training window"""
+    from ml_models.linear_regression_model import LinearRegressionModel
+
+    _, _, forecast_set, _, _, success = LinearRegressionModel().predict(train, forecast_days=len(test))
+    if not success:
+        raise ValueError("Linear regression returned no forecast")
+    return np.asarray(forecast_set, dtype=float).ravel()
+
+
+def _forecast_lstm(train: pd.DataFrame, test: pd.DataFrame, params: Dict) -> np.ndarray:
+    """LSTMModel's next-day prediction (the model only forecasts one day)"""
+    from ml_models.lstm_model import LSTMModel
+
+    prediction, _, success = LSTMModel().predict(train, **params)
+    if not success:
+        raise ValueError("LSTM model returned no prediction")
+    return np.array([prediction], dtype=float)
+
+
+def _forecast_sophisticated_lstm(train: pd.DataFrame, test: pd.DataFrame, params: Dict) -> np.ndarray:
+    """SophisticatedLSTMModel trained on the window, then its recursive multi-day forecast"""
+    import sophisticated_lstm_model
+    from sophisticated_lstm_model import ModelConfig, SophisticatedLSTMModel
+
+    if not sophisticated_lstm_model.TENSORFLOW_AVAILABLE:
+        raise ImportError(f"TensorFlow/Keras not available: {sophisticated_lstm_model.TENSORFLOW_ERROR}")
+    model = SophisticatedLSTMModel(ModelConfig(**params))
+    # No checkpoint callbacks: folds must not write model files
+    model.train(train, callbacks=[])
+    return np.asarray(model.forecast(train, n_steps=len(test)), dtype=float).ravel()
+
+
+FORECASTERS = {
+    'arima': _forecast_arima,
+    'lstm': _forecast_lstm,
+    'lr': _forecast_lr,
+    'sophisticated_lstm': _forecast_sophisticated_lstm,
+}
+
+
+def evaluate_model(model: str, params: Dict, frame: pd.DataFrame, origins: List[int],
+                   horizon: int, window: Optional[int] = None) -> Dict:
+    """
+    Score one model and parameter set on one symbol's walk-forward folds
+
+    Each fold trains on the rows before its origin (all of them, or the last
+    window rows) and is scored on the forecasts the model makes for the
+    following horizon rows. A failing fold is counted but does not stop the others.
+
+    Args:
+        model: Key of FORECASTERS
+        params: Hyperparameters passed to the model
+        frame: Preprocessed price data (Open, High, Low, Close, Volume)
+        origins: Fold origins from walk_forward_origins
+        horizon: Test rows per fold
+        window: Rolling training window in rows (default: expanding)
+
+    Returns:
+        dict: folds, failed_folds, points, rmse, mae, mape (percent), seconds and
+            the first fold error (metrics are None when no fold succeeded)
+    """
+    forecaster = FORECASTERS[model]
+    started = time.perf_counter()
+    actual, predicted = [], []
+    failed, first_error = 0, None
+    for origin in origins:
+        train = frame.iloc[max(0, origin - window) if window else 0:origin]
+        test = frame.iloc[origin:origin + horizon]
+        try:
+            forecast = forecaster(train, test, params)[:len(test)]
+        except Exception as e:
+            failed += 1
+            first_error = first_error or str(e)
+            continue
+        actual.extend(test['Close'].to_numpy(dtype=float)[:len(forecast)])
+        predicted.extend(forecast)
+
+    result = {
+        'folds': len(origins) - failed,
+        'failed_folds': failed,
+        'points': len(actual),
+        'rmse': None,
+        'mae': None,
+        'mape': None,
+        'seconds': round(time.perf_counter() - started, 3),
+        'error': first_error
+    }
+    if actual:
+        actual, predicted = np.array(actual), np.array(predicted)
+        errors = predicted - actual
+        result.update(
+            rmse=float(np.sqrt(np.mean(errors ** 2))),
+            mae=float(np.mean(np.abs(errors))),
+            mape=float(np.mean(np.abs(errors) / np.abs(actual)) * 100)
+        )
+    return result
+
+
+class EvaluationCache:
+    """
+    Evaluation results stored as JSON files named by a hash of their inputs
+
+    The key covers the model, its parameters, the fold layout and the price
+    data itself, so a cached score is reused until any of them changes.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, params: Dict, frame: pd.DataFrame, origins: List[int],
+            horizon: int, window: Optional[int]) -> str:
+        """Hash of everything that determines an evaluation result"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([model, params, origins, horizon, window], sort_keys=True, default=list).encode())
+        digest.update(pd.util.hash_pandas_object(frame[['Open', 'High', 'Low', 'Close', 'Volume']]).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = os.path.join(self.directory, f"{key}.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict) -> None:
+        path = os.path.join(self.directory, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+
+_worker_frames = None
+
+
+def _init_worker(frames: Dict[str, pd.DataFrame]) -> None:
+    """Keep every symbol's prices in the worker for all of its tasks"""
+    global _worker_frames
+    _worker_frames = frames
+
+
+def _evaluate_in_worker(task: Dict) -> Dict:
+    return evaluate_model(task['model'], task['params'], _worker_frames[task['symbol']],
+                          task['origins'], task['horizon'], task['window'])
+
+
+class ModelEvaluator:
+    """
+    Walk-forward evaluation of ARIMA, LSTM, linear regression and the sophisticated LSTM
+
+    Every (model, parameters, symbol) combination is one task. Tasks run in
+    worker processes (or in-process when processes is 0), and results are
+    cached on disk by their inputs, so re-running a grid after adding a symbol
+    or a parameter only evaluates what is new.
+    """
+
+    def __init__(self, horizon: int = 7, folds: int = 5, window: Optional[int] = None,
+                 min_train: int = 100, processes: int = 2, cache_dir: Optional[str] = None):
+        if horizon < 1 or folds < 1:
+            raise ValidationError("horizon and folds must be at least 1")
+        self.horizon = horizon
+        self.folds = folds
+        self.window = window
+        self.min_train = min_train
+        self.processes = processes
+        self.cache = EvaluationCache(cache_dir) if cache_dir else None
+
+    def evaluate(self, frames: Dict[str, pd.DataFrame], grids: Optional[Dict[str, Dict[str, List]]] = None) -> pd.DataFrame:
+        """
+        Evaluate every model and parameter combination on every symbol
+
+        Args:
+            frames: Symbol to preprocessed price data, e.g. from load_frames
+            grids: Model to hyperparameter grid (default: DEFAULT_GRIDS for every model)
+
+        Returns:
+            DataFrame with one row per model, params (JSON), symbol and their scores,
+                plus 'cached' True for results read from the cache
+
+        Raises:
+            ValidationError: If a model name is unknown
+        """
+        grids = DEFAULT_GRIDS if grids is None else grids
+        unknown = set(grids) - set(FORECASTERS)
+        if unknown:
+            raise ValidationError(f"Unknown models: {', '.join(sorted(unknown))}")
+
+        rows, tasks = [], []
+        for model, grid in grids.items():
+            for params in expand_grid(grid):
+                for symbol, frame in frames.items():
+                    origins = walk_forward_origins(len(frame), self.horizon, self.folds, self.min_train)
+                    task = {'model': model, 'params': params, 'symbol': symbol, 'origins': origins,
+                            'horizon': self.horizon, 'window': self.window}
+                    if self.cache:
+                        task['key'] = EvaluationCache.key(model, params, frame, origins, self.horizon, self.window)
+                        cached = self.cache.get(task['key'])
+                        if cached is not None:
+                            rows.append(self._row(task, cached, cached=True))
+                            continue
+                    tasks.append(task)
+
+        logger.info(f"Evaluating {len(tasks)} model/symbol combinations ({len(rows)} cached) "
+                    f"on {self.processes} processes")
+        for task, result in self._execute(tasks, frames):
+            if self.cache and result['folds'] > 0:
+                self.cache.put(task['key'], result)
+            rows.append(self._row(task, result, cached=False))
+
+        columns = ['model', 'params', 'symbol', 'folds', 'failed_folds', 'points',
+                   'rmse', 'mae', 'mape', 'seconds', 'error', 'cached']
+        return pd.DataFrame(rows, columns=columns).sort_values(['model', 'params', 'symbol']).reset_index(drop=True)
+
+    def _execute(self, tasks: List[Dict], frames: Dict[str, pd.DataFrame]) -> Iterator:
+        """Yield (task, result) pairs as they complete"""
+        if self.processes <= 0 or len(tasks) <= 1:
+            for task in tasks:
+                yield task, evaluate_model(task['model'], task['params'], frames[task['symbol']],
+                                           task['origins'], task['horizon'], task['window'])
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.processes, len(tasks)),
+                                 initializer=_init_worker, initargs=(frames,)) as pool:
+            futures = {pool.submit(_evaluate_in_worker, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    yield task, future.result()
+                except Exception as e:
+                    yield task, {'folds': 0, 'failed_folds': len(task['origins']), 'points': 0, 'rmse': None,
+                                 'mae': None, 'mape': None, 'seconds': 0.0, 'error': str(e)}
+
+    @staticmethod
+    def _row(task: Dict, result: Dict, cached: bool) -> Dict:
+        return dict(result, model=task['model'], params=json.dumps(task['params'], sort_keys=True, default=list),
+                    symbol=task['symbol'], cached=cached)
+
+    @staticmethod
+    def leaderboard(results: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rank model and parameter combinations across symbols
+
+        MAPE is the ranking key because it is comparable between symbols
+        trading at different prices; RMSE is reported alongside.
+
+        Args:
+            results: Output of evaluate
+
+        Returns:
+            DataFrame with one row per model and params: rank, symbols scored,
+                failed (symbols without a single successful fold), mean and
+                median MAPE, mean RMSE and total seconds, best first
+        """
+        grouped = results.groupby(['model', 'params'], sort=False)
+        board = pd.DataFrame({
+            'symbols': grouped['mape'].count(),
+            'failed': grouped['mape'].apply(lambda mape: int(mape.isna().sum())),
+            'mean_mape': grouped['mape'].mean(),
+            'median_mape': grouped['mape'].median(),
+            'mean_rmse': grouped['rmse'].mean(),
+            'seconds': grouped['seconds'].sum()
+        }).reset_index()
+        board = board.sort_values(['mean_mape', 'failed'], na_position='last').reset_index(drop=True)
+        board.insert(0, 'rank', range(1, len(board) + 1))
+        return board
+
+
+def load_frames(symbols: List[str], period_years: int = 2) -> Dict[str, pd.DataFrame]:
+    """
+    Load and preprocess price data the way PredictionService does before predicting
+
+    Args:
+        symbols: Stock symbols
+        period_years: Years of history per symbol
+
+    Returns:
+        dict: Symbol to preprocessed DataFrame (symbols without data are left out)
+    """
+    from app.services.prediction_service import PredictionService
+
+    service = PredictionService()
+    frames = {}
+    for symbol in symbols:
+        raw = service.get_historical_data(symbol, period_years)
+        frame = service.preprocess_data(raw, symbol) if raw is not None and not raw.empty else None
+        if frame is None or frame.empty:
+            logger.warning(f"No price data to evaluate for {symbol}")
+            continue
+        frames[symbol] = frame
+    return frames
+
+
+def get_model_evaluator() -> ModelEvaluator:
+    """
+    Create a ModelEvaluator from the application config
+
+    Returns:
+        ModelEvaluator using EVALUATION_HORIZON, EVALUATION_FOLDS, EVALUATION_PROCESSES
+            and EVALUATION_CACHE_DIR
+    """
+    return ModelEvaluator(
+        horizon=current_app.config.get('EVALUATION_HORIZON', 7),
+        folds=current_app.config.get('EVALUATION_FOLDS', 5),
+        processes=current_app.config.get('EVALUATION_PROCESSES', 2),
+        cache_dir=current_app.config.get('EVALUATION_CACHE_DIR')
+    )
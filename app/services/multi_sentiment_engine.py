@@ -3,22 +3,20 @@ Multi-Source Sentiment Engine
 Supports Twitter and News API for comprehensive sentiment analysis
 """
 import logging
-import re
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+import requests
+from flask import current_app, has_app_context
+
 # Optional dependencies
-TEXTBLOB_AVAILABLE = False
 TWEEPY_AVAILABLE = False
 NEWSAPI_AVAILABLE = False
 
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except Exception as _e:
-    logging.getLogger(__name__).warning(f"TextBlob not available: {_e}")
-
 try:
     import tweepy
     TWEEPY_AVAILABLE = True
@@ -31,12 +29,60 @@ try:
 except Exception as _e:
     logging.getLogger(__name__).warning(f"newsapi-python not available: {_e}")
 
-from app import db
 from app.models.sentiment_cache import SentimentCache
+from app.services.sentiment_cache import get_sentiment_cache
+from app.services.sentiment_ingestion import get_sentiment_ingestor
+from app.services.text_scoring import PATTERN_LEXICON_AVAILABLE, clean_text, get_text_scorer
 from app.utils.exceptions import ExternalAPIError
 
 logger = logging.getLogger(__name__)
 
+# Polarity comes from TextBlob's lexicon through text_scoring
+TEXTBLOB_AVAILABLE = PATTERN_LEXICON_AVAILABLE
+
+SOURCE_FETCH_WORKERS = 8
+DEFAULT_SOURCE_TIMEOUT = 8.0  # seconds
+
+_source_pool = None
+_http_session = None
+_shared_lock = threading.Lock()
+
+
+def _get_source_pool() -> ThreadPoolExecutor:
+    """
+    Get the thread pool that runs source fetches
+
+    One small pool per process bounds the threads a slow upstream can tie up;
+    fetches that overrun their deadline finish in the background and are
+    discarded.
+    """
+    global _source_pool
+    with _shared_lock:
+        if _source_pool is None:
+            _source_pool = ThreadPoolExecutor(
+                max_workers=SOURCE_FETCH_WORKERS, thread_name_prefix='sentiment-source'
+            )
+        return _source_pool
+
+
+def _get_http_session() -> requests.Session:
+    """Get the HTTP session shared by source clients (keeps connections alive between fetches)"""
+    global _http_session
+    with _shared_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=SOURCE_FETCH_WORKERS)
+            _http_session.mount('https://', adapter)
+            _http_session.mount('http://', adapter)
+        return _http_session
+
+
+def _source_timeout() -> float:
+    """Seconds each source may take before its results are left out"""
+    if has_app_context():
+        return float(current_app.config.get('SENTIMENT_SOURCE_TIMEOUT', DEFAULT_SOURCE_TIMEOUT))
+    return float(os.getenv('SENTIMENT_SOURCE_TIMEOUT', DEFAULT_SOURCE_TIMEOUT))
+
 
 class MultiSentimentEngine:
     """Service for fetching content from multiple sources and analyzing sentiment"""
@@ -95,7 +141,7 @@ class MultiSentimentEngine:
         api_key = os.getenv('NEWS_API_KEY')
         if api_key:
             try:
-                self.news_client = NewsApiClient(api_key=api_key)
+                self.news_client = NewsApiClient(api_key=api_key, session=_get_http_session())
                 self.news_enabled = True
                 logger.info("News API initialized")
             except Exception as e:
@@ -107,122 +153,184 @@ class MultiSentimentEngine:
     
     def clean_text(self, text: str) -> str:
         """Clean text by removing URLs, mentions, hashtags, and special characters"""
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-        # Remove mentions
-        text = re.sub(r'@\w+', '', text)
-        # Remove hashtags (keep text)
-        text = re.sub(r'#', '', text)
-        # Remove special characters
-        text = re.sub(r'[^\w\s]', '', text)
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        return text.strip()
+        return clean_text(text)
     
     def fetch_twitter_content(self, symbol: str, count: int = 50) -> List[str]:
         """Fetch tweets about the stock"""
+        return self.fetch_twitter_since(symbol, None, count)[0]
+    
+    def fetch_twitter_since(self, symbol: str, since_id: Optional[str], count: int = 50) -> Tuple[List[str], Optional[str]]:
+        """
+        Fetch tweets about the stock newer than a tweet ID
+        
+        Args:
+            symbol: Stock symbol
+            since_id: Only return tweets after this ID (None for the latest tweets)
+            count: Maximum number of tweets
+            
+        Returns:
+            Tuple of (tweet texts, newest tweet ID or None if nothing was returned)
+        """
         if not self.twitter_enabled:
-            return []
+            return [], None
         
         try:
             tweets = []
+            ids = []
             query = f"${symbol} OR #{symbol} -is:retweet lang:en"
             
             if hasattr(self, 'twitter_client'):
                 response = self.twitter_client.search_recent_tweets(
                     query=query,
-                    max_results=min(count, 100),
+                    max_results=min(max(count, 10), 100),
+                    since_id=since_id,
                     tweet_fields=['created_at']
                 )
                 if response.data:
-                    tweets = [tweet.text for tweet in response.data]
+                    for tweet in response.data[:count]:
+                        tweets.append(tweet.text)
+                        ids.append(int(tweet.id))
             elif hasattr(self, 'twitter_api'):
                 cursor = tweepy.Cursor(
                     self.twitter_api.search_tweets,
                     q=query,
                     lang='en',
                     result_type='recent',
-                    tweet_mode='extended'
+                    tweet_mode='extended',
+                    since_id=since_id
                 )
                 for tweet in cursor.items(min(count, 100)):
                     tweets.append(tweet.full_text)
+                    ids.append(tweet.id)
             
             logger.info(f"Fetched {len(tweets)} tweets for {symbol}")
-            return tweets
+            return tweets, str(max(ids)) if ids else None
         except Exception as e:
             logger.error(f"Twitter fetch error for {symbol}: {e}")
-            return []
+            return [], None
     
     def fetch_news_content(self, symbol: str, count: int = 50) -> List[str]:
         """Fetch news articles about the stock"""
+        return self.fetch_news_since(symbol, None, count)[0]
+    
+    def fetch_news_since(self, symbol: str, since: Optional[str], count: int = 50) -> Tuple[List[str], Optional[str]]:
+        """
+        Fetch news articles about the stock published after a timestamp
+        
+        Args:
+            symbol: Stock symbol
+            since: Only return articles published after this ISO timestamp (None for the latest)
+            count: Maximum number of articles
+            
+        Returns:
+            Tuple of (article texts, newest publishedAt timestamp or None if nothing was returned)
+        """
         if not self.news_enabled:
-            return []
+            return [], None
         
         try:
             articles = []
+            newest = None
             # Search for company name and stock symbol
             query = f"{symbol} stock"
             
+            params = {}
+            if since:
+                params['from_param'] = since
             response = self.news_client.get_everything(
                 q=query,
                 language='en',
                 sort_by='publishedAt',
-                page_size=min(count, 100)
+                page_size=min(count, 100),
+                **params
             )
             
             if response['status'] == 'ok' and response['articles']:
                 for article in response['articles']:
+                    published = article.get('publishedAt') or ''
+                    # 'from' is inclusive, so drop what the watermark already covers
+                    if since and published <= since:
+                        continue
+                    newest = max(newest or published, published)
                     # Combine title and description for sentiment
                     text = f"{article.get('title', '')} {article.get('description', '')}"
                     if text.strip():
                         articles.append(text)
             
             logger.info(f"Fetched {len(articles)} news articles for {symbol}")
-            return articles
+            return articles, newest or None
         except Exception as e:
             logger.error(f"News API fetch error for {symbol}: {e}")
-            return []
+            return [], None
     
-
-    def calculate_sentiment(self, texts: List[str]) -> Tuple[int, int, int, float]:
-        """Calculate sentiment polarity for a list of texts"""
-        positive = 0
-        negative = 0
-        neutral = 0
-        total_polarity = 0.0
+    def fetch_all_sources(
+        self,
+        symbol: str,
+        count_per_source: int = 50,
+        timeout: Optional[float] = None,
+        watermarks: Optional[Dict[str, Optional[str]]] = None
+    ) -> Tuple[Dict[str, Tuple[List[str], Optional[str]]], List[str]]:
+        """
+        Fetch new content from every enabled source concurrently
         
-        for text in texts:
-            cleaned = self.clean_text(text)
-            if not cleaned:
-                continue
+        All sources start together and share one deadline, so the wait is
+        bounded by the timeout rather than the sum of source latencies.
+        
+        Args:
+            symbol: Stock symbol
+            count_per_source: Number of items to fetch from each source
+            timeout: Seconds to wait for each source (default SENTIMENT_SOURCE_TIMEOUT)
+            watermarks: Newest item already seen per source name (optional)
             
+        Returns:
+            Tuple of ({source: (texts, newest watermark)} for sources that
+            finished in time, names of sources that timed out)
+        """
+        watermarks = watermarks or {}
+        fetchers = []
+        if self.twitter_enabled:
+            fetchers.append(('Twitter', self.fetch_twitter_since))
+        if self.news_enabled:
+            fetchers.append(('News', self.fetch_news_since))
+        
+        timeout = _source_timeout() if timeout is None else timeout
+        pool = _get_source_pool()
+        futures = [
+            (name, pool.submit(fetch, symbol, watermarks.get(name), count_per_source))
+            for name, fetch in fetchers
+        ]
+        deadline = time.monotonic() + timeout
+        
+        results = {}
+        timed_out = []
+        for name, future in futures:
             try:
-                analysis = TextBlob(cleaned)
-                polarity = analysis.sentiment.polarity
-                total_polarity += polarity
-                
-                if polarity > 0.1:
-                    positive += 1
-                elif polarity < -0.1:
-                    negative += 1
-                else:
-                    neutral += 1
+                results[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FuturesTimeoutError:
+                future.cancel()
+                timed_out.append(name)
+                logger.warning(f"{name} fetch for {symbol} exceeded {timeout}s; continuing without it")
             except Exception as e:
-                logger.warning(f"Error analyzing sentiment: {e}")
-                neutral += 1
+                logger.error(f"{name} fetch error for {symbol}: {e}")
+                results[name] = ([], None)
         
-        total_texts = positive + negative + neutral
-        avg_polarity = total_polarity / total_texts if total_texts > 0 else 0.0
-        
-        return positive, negative, neutral, avg_polarity
+        return results, timed_out
+    
+    def calculate_sentiment(self, texts: List[str]) -> Tuple[int, int, int, float]:
+        """Calculate sentiment polarity for a list of texts"""
+        return get_text_scorer().summarize(texts)
     
     def analyze_sentiment(self, symbol: str, count_per_source: int = 50) -> Dict:
         """
         Analyze sentiment from all available sources
         
+        Each source is fetched from its watermark, so only new items are
+        downloaded and scored; counts are a time-decayed aggregate over
+        everything ingested for the symbol (see SentimentIngestor).
+        
         Args:
             symbol: Stock symbol
-            count_per_source: Number of items to fetch from each source
+            count_per_source: Maximum number of new items to fetch from each source
             
         Returns:
             Combined sentiment analysis results
@@ -233,129 +341,75 @@ class MultiSentimentEngine:
         try:
             symbol = symbol.upper().strip()
             logger.info(f"Starting multi-source sentiment analysis for {symbol}")
+            ingestor = get_sentiment_ingestor()
+            scorer = get_text_scorer()
             
-            # Fetch content from all sources
-            all_texts = []
-            sources_used = []
-            
-            if self.twitter_enabled:
-                tweets = self.fetch_twitter_content(symbol, count_per_source)
-                all_texts.extend(tweets)
-                if tweets:
-                    sources_used.append('Twitter')
+            sources = [name for name, enabled in (('Twitter', self.twitter_enabled), ('News', self.news_enabled))
+                       if enabled]
+            watermarks = {name: ingestor.watermark(symbol, name) for name in sources}
             
-            if self.news_enabled:
-                news = self.fetch_news_content(symbol, count_per_source)
-                all_texts.extend(news)
-                if news:
-                    sources_used.append('News')
+            # Fetch new content from all sources concurrently, then fold it into each source's window
+            fetched, timed_out = self.fetch_all_sources(symbol, count_per_source, watermarks=watermarks)
+            new_items = 0
+            for name, (texts, newest) in fetched.items():
+                ingestor.ingest(symbol, name, scorer.score(texts), newest)
+                new_items += len(texts)
             
-            if not all_texts:
+            window = ingestor.snapshot(symbol, sources)
+            if not window['sources']:
                 logger.warning(f"No content found for {symbol}")
-                return {
-                    'symbol': symbol,
-                    'positive': 0,
-                    'negative': 0,
-                    'neutral': 0,
-                    'total_items': 0,
-                    'average_polarity': 0.0,
-                    'sentiment': 'NEUTRAL',
-                    'sources': sources_used,
-                    'timestamp': datetime.utcnow().isoformat()
-                }
-            
-            # Calculate combined sentiment
-            positive, negative, neutral, avg_polarity = self.calculate_sentiment(all_texts)
-            
-            # Determine overall sentiment
-            if positive > negative and positive > neutral:
-                overall_sentiment = 'POSITIVE'
-            elif negative > positive and negative > neutral:
-                overall_sentiment = 'NEGATIVE'
-            else:
-                overall_sentiment = 'NEUTRAL'
             
             result = {
                 'symbol': symbol,
-                'positive': positive,
-                'negative': negative,
-                'neutral': neutral,
-                'total_items': len(all_texts),
-                'average_polarity': round(avg_polarity, 4),
-                'sentiment': overall_sentiment,
-                'sources': sources_used,
+                'positive': window['positive'],
+                'negative': window['negative'],
+                'neutral': window['neutral'],
+                'total_items': window['positive'] + window['negative'] + window['neutral'],
+                'new_items': new_items,
+                'average_polarity': window['average_polarity'],
+                'sentiment': window['sentiment'],
+                'sources': window['sources'],
+                'partial': bool(timed_out),
+                'timed_out_sources': timed_out,
                 'timestamp': datetime.utcnow().isoformat()
             }
             
-            logger.info(f"Sentiment analysis completed for {symbol}: {overall_sentiment} from {sources_used}")
+            logger.info(f"Sentiment analysis completed for {symbol}: {result['sentiment']} from {result['sources']}")
             return result
             
         except Exception as e:
             logger.error(f"Error in sentiment analysis for {symbol}: {e}")
             raise ExternalAPIError(f"Sentiment analysis failed: {str(e)}")
     
+    @property
+    def cache_source(self) -> str:
+        """
+        SentimentCache source results are stored under
+        
+        The table has no combined source, so blended results are stored as
+        NEWS whenever News API is enabled (Twitter-only results match
+        SentimentEngine's TWITTER rows).
+        """
+        return 'NEWS' if self.news_enabled else 'TWITTER'
+    
     def get_cached_sentiment(self, symbol: str) -> Optional[Dict]:
         """Get cached sentiment data if available and valid"""
         try:
-            symbol = symbol.upper().strip()
-            cache_entry = SentimentCache.query.filter_by(symbol=symbol).first()
-            
-            if cache_entry and self.is_cache_valid(cache_entry):
-                logger.info(f"Using cached sentiment data for {symbol}")
-                return {
-                    'symbol': cache_entry.symbol,
-                    'positive': cache_entry.positive_count,
-                    'negative': cache_entry.negative_count,
-                    'neutral': cache_entry.neutral_count,
-                    'total_items': cache_entry.total_tweets,
-                    'average_polarity': float(cache_entry.average_polarity),
-                    'sentiment': cache_entry.overall_sentiment,
-                    'timestamp': cache_entry.analyzed_at.isoformat(),
-                    'cached': True
-                }
-            return None
+            return get_sentiment_cache().peek(symbol, self.cache_source, total_key='total_items')
         except Exception as e:
             logger.error(f"Error retrieving cached sentiment for {symbol}: {e}")
             return None
     
-    def store_sentiment_cache(self, symbol: str, sentiment_data: Dict):
+    def store_sentiment_cache(self, symbol: str, sentiment_data: Dict, cache_duration_hours: int = 1):
         """Store sentiment analysis results in cache"""
-        try:
-            symbol = symbol.upper().strip()
-            cache_entry = SentimentCache.query.filter_by(symbol=symbol).first()
-            
-            if cache_entry:
-                cache_entry.positive_count = sentiment_data['positive']
-                cache_entry.negative_count = sentiment_data['negative']
-                cache_entry.neutral_count = sentiment_data['neutral']
-                cache_entry.total_tweets = sentiment_data['total_items']
-                cache_entry.average_polarity = sentiment_data['average_polarity']
-                cache_entry.overall_sentiment = sentiment_data['sentiment']
-                cache_entry.analyzed_at = datetime.utcnow()
-            else:
-                cache_entry = SentimentCache(
-                    symbol=symbol,
-                    positive_count=sentiment_data['positive'],
-                    negative_count=sentiment_data['negative'],
-                    neutral_count=sentiment_data['neutral'],
-                    total_tweets=sentiment_data['total_items'],
-                    average_polarity=sentiment_data['average_polarity'],
-                    overall_sentiment=sentiment_data['sentiment']
-                )
-                db.session.add(cache_entry)
-            
-            db.session.commit()
-            logger.info(f"Sentiment data cached for {symbol}")
-        except Exception as e:
-            logger.error(f"Error storing sentiment cache for {symbol}: {e}")
-            db.session.rollback()
+        get_sentiment_cache().store(symbol, self.cache_source, sentiment_data, int(cache_duration_hours * 3600))
     
     def is_cache_valid(self, cache_entry: SentimentCache, duration_hours: int = 1) -> bool:
         """Check if cache entry is still valid"""
-        if not cache_entry or not cache_entry.analyzed_at:
+        if not cache_entry or not cache_entry.fetched_at:
             return False
         
-        expiry_time = cache_entry.analyzed_at + timedelta(hours=duration_hours)
+        expiry_time = cache_entry.fetched_at + timedelta(hours=duration_hours)
         return datetime.utcnow() < expiry_time
     
     def get_sentiment_with_cache(
@@ -364,19 +418,17 @@ class MultiSentimentEngine:
         count_per_source: int = 50,
         cache_duration_hours: int = 1
     ) -> Dict:
-        """Get sentiment analysis with caching support"""
-        # Check cache first
-        cached_data = self.get_cached_sentiment(symbol)
-        if cached_data:
-            cache_entry = SentimentCache.query.filter_by(symbol=symbol.upper()).first()
-            if cache_entry and self.is_cache_valid(cache_entry, cache_duration_hours):
-                return cached_data
-        
-        # Perform fresh analysis
-        if not self.is_enabled():
-            raise ExternalAPIError("No sentiment sources are enabled")
-        
-        sentiment_data = self.analyze_sentiment(symbol, count_per_source)
-        self.store_sentiment_cache(symbol, sentiment_data)
+        """
+        Get sentiment analysis with caching support
         
-        return sentiment_data
+        Expired results within SENTIMENT_STALE_SECONDS are served while a
+        background refresh runs. Partial results (a source timed out) are
+        served but not cached, so the next request retries the slow source.
+        """
+        return get_sentiment_cache().get_or_refresh(
+            symbol,
+            self.cache_source,
+            lambda: self.analyze_sentiment(symbol, count_per_source),
+            ttl_seconds=int(cache_duration_hours * 3600),
+            total_key='total_items'
+        )
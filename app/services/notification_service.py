@@ -4,15 +4,76 @@ Handles creation, retrieval, and management of user notifications
 """
 from datetime import datetime
 from typing import List, Dict, Optional
-from sqlalchemy import and_
+from sqlalchemy import and_, event
+from flask import current_app
 from app import db
 from app.models.notification import Notification
 from app.models.user import User
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 
+class UnreadCountCache:
+    """
+    Per-user unread notification counts with a short time-to-live
+    
+    Notifications written through the ORM drop the user's entry (see the
+    mapper listeners below) and NotificationService drops it again once its
+    writes commit, so the next read recounts; the TTL bounds staleness for
+    writes made by other processes.
+    """
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, user_id: int) -> Optional[int]:
+        """Get a cached count, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            count, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return count
+    
+    def set(self, user_id: int, count: int, ttl: float) -> None:
+        """Cache a count for ttl seconds (no-op when ttl is not positive)"""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (max(count, 0), time.monotonic() + ttl)
+    
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop one user's count, or every count if user_id is None"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+unread_counts = UnreadCountCache()
+
+
+@event.listens_for(Notification, 'after_insert')
+@event.listens_for(Notification, 'after_update')
+@event.listens_for(Notification, 'after_delete')
+def _invalidate_unread_count(mapper, connection, target):
+    """Drop the cached count when a notification is written through the ORM"""
+    unread_counts.invalidate(target.user_id)
+
+
+def _count_ttl() -> float:
+    """Seconds an unread count may be served from cache"""
+    return current_app.config.get('NOTIFICATION_COUNT_TTL', 30)
+
+
 class NotificationService:
     """Service for managing user notifications"""
     
@@ -39,8 +100,8 @@ class NotificationService:
             ValueError: If user_id is invalid or notification_type is not valid
         """
         try:
-            # Validate user exists
-            user = User.query.get(user_id)
+            # Validate user exists (served from the identity map when already loaded)
+            user = db.session.get(User, user_id)
             if not user:
                 raise ValueError(f"User with ID {user_id} not found")
             
@@ -61,6 +122,7 @@ class NotificationService:
             
             db.session.add(notification)
             db.session.commit()
+            unread_counts.invalidate(user_id)
             
             logger.info(f"Created notification {notification.notification_id} for user {user_id}")
             return notification
@@ -116,6 +178,8 @@ class NotificationService:
         """
         Get count of unread notifications for a user
         
+        Counts are cached for NOTIFICATION_COUNT_TTL seconds.
+        
         Args:
             user_id: ID of the user
             
@@ -123,10 +187,13 @@ class NotificationService:
             Count of unread notifications
         """
         try:
-            count = Notification.query.filter_by(
-                user_id=user_id,
-                is_read=False
-            ).count()
+            count = unread_counts.get(user_id)
+            if count is None:
+                count = Notification.query.filter_by(
+                    user_id=user_id,
+                    is_read=False
+                ).count()
+                unread_counts.set(user_id, count, _count_ttl())
             return count
         except Exception as e:
             logger.error(f"Error getting unread count for user {user_id}: {str(e)}")
@@ -152,6 +219,7 @@ class NotificationService:
                 notification.is_read = True
                 notification.read_at = datetime.utcnow()
                 db.session.commit()
+                unread_counts.invalidate(notification.user_id)
                 logger.info(f"Marked notification {notification_id} as read")
             
             return True
@@ -172,21 +240,15 @@ class NotificationService:
             Number of notifications marked as read
         """
         try:
-            # Get all unread notifications for the user
-            unread_notifications = Notification.query.filter_by(
+            # Single UPDATE instead of loading every unread row
+            count = Notification.query.filter_by(
                 user_id=user_id,
                 is_read=False
-            ).all()
-            
-            count = len(unread_notifications)
+            ).update({'is_read': True, 'read_at': datetime.utcnow()}, synchronize_session=False)
+            db.session.commit()
+            unread_counts.set(user_id, 0, _count_ttl())
             
             if count > 0:
-                # Mark all as read
-                for notification in unread_notifications:
-                    notification.is_read = True
-                    notification.read_at = datetime.utcnow()
-                
-                db.session.commit()
                 logger.info(f"Marked {count} notifications as read for user {user_id}")
             
             return count
@@ -233,19 +295,14 @@ class NotificationService:
             Number of notifications deleted
         """
         try:
-            # Get all read notifications for the user
-            read_notifications = Notification.query.filter_by(
+            # Single DELETE; the unread count is unaffected
+            count = Notification.query.filter_by(
                 user_id=user_id,
                 is_read=True
-            ).all()
-            
-            count = len(read_notifications)
+            ).delete(synchronize_session=False)
+            db.session.commit()
             
             if count > 0:
-                for notification in read_notifications:
-                    db.session.delete(notification)
-                
-                db.session.commit()
                 logger.info(f"Deleted {count} read notifications for user {user_id}")
             
             return count
@@ -0,0 +1,377 @@
+"""
+Portfolio Optimizer
+Target weights from the cached returns matrix and rebalancing plans to reach them
+"""
+import logging
+from decimal import Decimal, ROUND_FLOOR
+from typing import Dict, List, Optional
+
+import numpy as np
+from flask import current_app
+
+from app import db
+from app.models.company import Company
+from app.models.holding import Holdings
+from app.models.wallet import Wallet
+from app.services.risk_analytics import TRADING_DAYS_PER_YEAR, get_returns_matrix
+from app.services.stock_repository import StockRepository
+from app.services.transaction_engine import TransactionEngine
+from app.utils.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZATION_METHODS = ('min_variance', 'max_sharpe', 'risk_parity')
+
+
+def project_to_simplex(v: np.ndarray, max_weight: float = 1.0) -> np.ndarray:
+    """
+    Euclidean projection onto {w : 0 <= w <= max_weight, sum(w) = 1}
+
+    Without a cap this is the sort-based projection onto the simplex. With
+    one, finds the shift tau with sum(clip(v - tau, 0, max_weight)) = 1 by
+    Newton steps on that piecewise-linear sum, kept inside a bisection
+    bracket.
+    """
+    if max_weight >= 1:
+        u = np.sort(v)[::-1]
+        cumulative = np.cumsum(u) - 1
+        rho = np.nonzero(u * np.arange(1, len(v) + 1) > cumulative)[0][-1]
+        return np.maximum(v - cumulative[rho] / (rho + 1), 0.0)
+
+    low, high = v.min() - max_weight, v.max()
+    tau = (low + high) / 2
+    for _ in range(100):
+        shifted = v - tau
+        excess = np.clip(shifted, 0.0, max_weight).sum() - 1
+        if abs(excess) < 1e-12:
+            break
+        if excess > 0:
+            low = tau
+        else:
+            high = tau
+        free = np.count_nonzero((shifted > 0) & (shifted < max_weight))
+        tau = tau + excess / free if free else (low + high) / 2
+        if not low < tau < high:
+            tau = (low + high) / 2
+    return np.clip(v - tau, 0.0, max_weight)
+
+
+def mean_variance_weights(expected_returns: np.ndarray, covariance: np.ndarray, risk_aversion: float,
+                          max_weight: float = 1.0, start: Optional[np.ndarray] = None,
+                          iterations: int = 2000, tolerance: float = 1e-9) -> np.ndarray:
+    """
+    Long-only weights maximizing mu'w - risk_aversion * w'Sigma w
+
+    Solved by accelerated projected gradient descent, which needs only
+    matrix-vector products and stays fast for hundreds of assets.
+    """
+    n = len(covariance)
+    lipschitz = 2 * risk_aversion * max(float(np.linalg.eigvalsh(covariance)[-1]), 1e-12)
+    step = 1.0 / lipschitz
+
+    w = project_to_simplex(start if start is not None else np.full(n, 1.0 / n), max_weight)
+    momentum, previous = w.copy(), w.copy()
+    t = 1.0
+    for _ in range(iterations):
+        gradient = 2 * risk_aversion * (covariance @ momentum) - expected_returns
+        w = project_to_simplex(momentum - step * gradient, max_weight)
+        if np.abs(w - previous).max() < tolerance:
+            break
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = w + ((t - 1) / t_next) * (w - previous)
+        previous, t = w, t_next
+    return w
+
+
+def min_variance_weights(covariance: np.ndarray, max_weight: float = 1.0) -> np.ndarray:
+    """Long-only minimum-variance weights"""
+    return mean_variance_weights(np.zeros(len(covariance)), covariance, 1.0, max_weight)
+
+
+def max_sharpe_weights(expected_returns: np.ndarray, covariance: np.ndarray, risk_free_rate: float = 0.0,
+                       max_weight: float = 1.0) -> np.ndarray:
+    """
+    Long-only weights with the highest Sharpe ratio on the efficient frontier
+
+    Scans the frontier over log-spaced risk aversions, refines around the
+    best with a golden-section search (each solve warm-started from the
+    nearest one) and keeps the best Sharpe ratio. Falls back to minimum
+    variance when no asset beats the risk-free rate.
+    """
+    excess = expected_returns - risk_free_rate
+    if excess.max() <= 0:
+        return min_variance_weights(covariance, max_weight)
+
+    solutions = {}  # log10 risk aversion -> (sharpe, weights)
+
+    def sharpe_at(log_aversion):
+        # Warm-start from the nearest risk aversion solved so far
+        start = solutions[min(solutions, key=lambda k: abs(k - log_aversion))][1] if solutions else None
+        w = mean_variance_weights(expected_returns, covariance, 10 ** log_aversion, max_weight, start=start)
+        sharpe = (w @ excess) / np.sqrt(max(w @ covariance @ w, 1e-18))
+        solutions[log_aversion] = (sharpe, w)
+        return sharpe
+
+    # Coarse scan of the frontier, then golden-section search around the best point
+    grid = np.linspace(-2, 3, 11)
+    scores = [sharpe_at(x) for x in grid]
+    best = int(np.argmax(scores))
+    low, high = grid[max(best - 1, 0)], grid[min(best + 1, len(grid) - 1)]
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = high - ratio * (high - low), low + ratio * (high - low)
+    score_a, score_b = sharpe_at(a), sharpe_at(b)
+    for _ in range(12):
+        if score_a >= score_b:
+            high, b, score_b = b, a, score_a
+            a = high - ratio * (high - low)
+            score_a = sharpe_at(a)
+        else:
+            low, a, score_a = a, b, score_b
+            b = low + ratio * (high - low)
+            score_b = sharpe_at(b)
+
+    return max(solutions.values(), key=lambda solution: solution[0])[1]
+
+
+def risk_parity_weights(covariance: np.ndarray, iterations: int = 500, tolerance: float = 1e-10) -> np.ndarray:
+    """
+    Weights whose assets contribute equally to portfolio variance
+
+    Cyclical coordinate descent on 0.5 y'Sigma y - sum(log y) / n, each
+    coordinate update solved in closed form, then normalized.
+    """
+    n = len(covariance)
+    variances = np.maximum(np.diag(covariance), 1e-12)
+    budget = 1.0 / n
+    y = 1.0 / np.sqrt(variances)
+    for _ in range(iterations):
+        previous = y.copy()
+        for i in range(n):
+            cross = covariance[i] @ y - covariance[i, i] * y[i]
+            y[i] = (-cross + np.sqrt(cross * cross + 4 * variances[i] * budget)) / (2 * variances[i])
+        if np.abs(y - previous).max() < tolerance * np.abs(y).max():
+            break
+    return y / y.sum()
+
+
+def plan_rebalance(holdings: Dict[str, int], cash: Decimal, prices: Dict[str, Decimal], targets: Dict[str, float],
+                   commission_rate: Decimal = TransactionEngine.COMMISSION_RATE,
+                   min_trade_value: Decimal = Decimal('0'), cash_reserve: float = 0.0) -> Dict:
+    """
+    Turn current holdings and target weights into buy and sell orders
+
+    At most one order is produced per symbol. Trades smaller than
+    min_trade_value are skipped unless they close a position, and buys are
+    trimmed if commissions would leave cash negative.
+
+    Args:
+        holdings: Shares held per symbol
+        cash: Wallet balance
+        prices: Price snapshot per symbol (must cover holdings and targets)
+        targets: Target weight per symbol; held symbols absent here are sold
+        commission_rate: Commission as a fraction of trade value
+        min_trade_value: Smallest trade worth placing
+        cash_reserve: Fraction of portfolio value to leave in cash
+
+    Returns:
+        dict: orders (sells first), portfolio_value, cash_after and turnover
+    """
+    portfolio_value = cash + sum(prices[s] * q for s, q in holdings.items())
+    investable = portfolio_value * Decimal(str(1 - cash_reserve))
+
+    sells, buys = [], []
+    for symbol in sorted(set(holdings) | set(targets)):
+        price = prices[symbol]
+        current = holdings.get(symbol, 0)
+        target_value = investable * Decimal(str(targets.get(symbol, 0.0)))
+        target = int((target_value / price).to_integral_value(rounding=ROUND_FLOOR))
+        delta = target - current
+        if delta == 0 or (abs(delta) * price < min_trade_value and target != 0):
+            continue
+        order = {'symbol': symbol, 'quantity': abs(delta), 'price_per_share': price}
+        if delta < 0:
+            sells.append(dict(order, order_type='SELL'))
+        else:
+            buys.append(dict(order, order_type='BUY'))
+
+    def leg_cash(leg):
+        value = leg['price_per_share'] * leg['quantity']
+        commission = (value * commission_rate).quantize(Decimal('0.01'))
+        return value - commission if leg['order_type'] == 'SELL' else -(value + commission)
+
+    cash_after = cash + sum(leg_cash(leg) for leg in sells + buys)
+    # Commissions can push the buys slightly past the available cash; trim the largest buys
+    while cash_after < 0 and buys:
+        largest = max(buys, key=lambda leg: leg['price_per_share'] * leg['quantity'])
+        cash_after -= leg_cash(largest)
+        largest['quantity'] -= 1
+        if largest['quantity'] == 0:
+            buys.remove(largest)
+        else:
+            cash_after += leg_cash(largest)
+
+    orders = sells + buys
+    return {
+        'orders': orders,
+        'portfolio_value': portfolio_value,
+        'cash_before': cash,
+        'cash_after': cash_after,
+        'turnover': sum(leg['price_per_share'] * leg['quantity'] for leg in orders)
+    }
+
+
+class PortfolioOptimizer:
+    """Service for target allocations and rebalancing"""
+
+    def __init__(self):
+        """Initialize the optimizer"""
+        self.stock_repo = StockRepository()
+
+    def optimize(self, user_id, method='max_sharpe', symbols=None, max_weight=None, lookback_days=None):
+        """
+        Compute target weights over a user's holdings plus optional extra symbols
+
+        Args:
+            user_id: User ID
+            method: One of OPTIMIZATION_METHODS
+            symbols: Additional symbols to consider (optional)
+            max_weight: Largest weight per asset (default OPTIMIZER_MAX_WEIGHT;
+                not applied to risk_parity)
+            lookback_days: Calendar days of history (default RISK_LOOKBACK_DAYS)
+
+        Returns:
+            dict: method, as_of, weights per symbol, and the annualized
+                expected_return, volatility and sharpe of the target portfolio
+
+        Raises:
+            ValidationError: If the method, symbols or price history are unusable
+        """
+        if method not in OPTIMIZATION_METHODS:
+            raise ValidationError(f"Unknown optimization method: {method}")
+        max_weight = max_weight or current_app.config.get('OPTIMIZER_MAX_WEIGHT', 1.0)
+        lookback_days = lookback_days or current_app.config.get('RISK_LOOKBACK_DAYS', 365)
+        risk_free_rate = current_app.config.get('OPTIMIZER_RISK_FREE_RATE', 0.0)
+        min_observations = current_app.config.get('RISK_MIN_OBSERVATIONS', 20)
+
+        held_ids = [row.company_id for row in db.session.query(Holdings.company_id).filter(
+            Holdings.user_id == user_id, Holdings.quantity > 0
+        )]
+        companies = Company.query.filter(
+            db.or_(Company.company_id.in_(held_ids), Company.symbol.in_([s.upper() for s in symbols or []]))
+        ).all()
+        unknown = sorted({s.upper() for s in symbols or []} - {c.symbol for c in companies})
+        if unknown:
+            raise ValidationError(f"Unknown symbols: {', '.join(unknown)}")
+        if not companies:
+            raise ValidationError("No holdings or symbols to optimize")
+
+        matrix = get_returns_matrix([c.company_id for c in companies], lookback_days)
+        if matrix is None or len(matrix.returns) < max(min_observations, 2):
+            raise ValidationError("Not enough price history to optimize this portfolio")
+
+        n = len(matrix.company_ids)
+        if max_weight * n < 1:
+            raise ValidationError(f"max_weight must be at least {1 / n:.4f} for {n} assets")
+
+        expected_returns = matrix.returns.mean(axis=0) * TRADING_DAYS_PER_YEAR
+        covariance = matrix.covariance * TRADING_DAYS_PER_YEAR
+        if method == 'min_variance':
+            weights = min_variance_weights(covariance, max_weight)
+        elif method == 'max_sharpe':
+            weights = max_sharpe_weights(expected_returns, covariance, risk_free_rate, max_weight)
+        else:
+            weights = risk_parity_weights(covariance)
+
+        symbols_by_id = {c.company_id: c.symbol for c in companies}
+        expected_return = float(weights @ expected_returns)
+        volatility = float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+        return {
+            'method': method,
+            'as_of': matrix.as_of,
+            'weights': {
+                symbols_by_id[company_id]: round(float(w), 6)
+                for company_id, w in zip(matrix.company_ids, weights)
+                if w > 1e-6
+            },
+            'excluded': sorted(symbols_by_id[c] for c in set(symbols_by_id) - set(matrix.company_ids)),
+            'expected_return': expected_return,
+            'volatility': volatility,
+            'sharpe': (expected_return - risk_free_rate) / volatility if volatility > 0 else None
+        }
+
+    def plan_rebalance(self, user_id, targets: Dict[str, float], cash_reserve: float = 0.0) -> Dict:
+        """
+        Plan the orders that move a user's holdings to target weights
+
+        Prices for every symbol involved are fetched once into a snapshot
+        that the plan is computed, and later executed, against.
+
+        Args:
+            user_id: User ID
+            targets: Target weight per symbol (summing to at most 1)
+            cash_reserve: Fraction of portfolio value to leave in cash
+
+        Returns:
+            dict: Plan from plan_rebalance plus the price snapshot
+
+        Raises:
+            ValidationError: If targets are invalid or a price is unavailable
+        """
+        targets = {symbol.upper(): float(weight) for symbol, weight in targets.items()}
+        if any(weight < 0 for weight in targets.values()) or sum(targets.values()) > 1 + 1e-6:
+            raise ValidationError("Target weights must be non-negative and sum to at most 1")
+        if not 0 <= cash_reserve < 1:
+            raise ValidationError("cash_reserve must be between 0 and 1")
+
+        wallet = Wallet.query.filter_by(user_id=user_id).first()
+        if not wallet:
+            raise ValidationError("Wallet not found")
+
+        held = db.session.query(Company.symbol, Holdings.quantity).join(
+            Holdings, Holdings.company_id == Company.company_id
+        ).filter(
+            Holdings.user_id == user_id,
+            Holdings.quantity > 0
+        ).all()
+        holdings = {symbol: quantity for symbol, quantity in held}
+
+        prices = self.stock_repo.get_current_prices_with_mode(sorted(set(holdings) | set(targets)))
+
+        plan = plan_rebalance(
+            holdings, wallet.balance, prices, targets,
+            min_trade_value=Decimal(str(current_app.config.get('REBALANCE_MIN_TRADE_VALUE', 0))),
+            cash_reserve=cash_reserve
+        )
+        plan['prices'] = prices
+        return plan
+
+    def execute_rebalance(self, user_id, plan: Dict) -> List:
+        """
+        Execute a rebalancing plan as one basket at its snapshot prices
+
+        Args:
+            user_id: User ID
+            plan: Plan returned by plan_rebalance for this user
+
+        Returns:
+            List of completed Order objects (empty if nothing to trade)
+        """
+        if not plan['orders']:
+            return []
+
+        companies = {
+            company.symbol: company
+            for company in Company.query.filter(Company.symbol.in_([o['symbol'] for o in plan['orders']]))
+        }
+        legs = []
+        for order in plan['orders']:
+            company = companies.get(order['symbol'])
+            if company is None:
+                raise ValidationError(f"Invalid stock symbol: {order['symbol']}")
+            legs.append({
+                'company': company,
+                'order_type': order['order_type'],
+                'quantity': order['quantity'],
+                'price_per_share': order['price_per_share']
+            })
+        return TransactionEngine().execute_basket(user_id, legs)
@@ -12,6 +12,7 @@ from app.models.holding import Holdings
 from app.models.transaction import Transaction
 from app.models.company import Company
 from app.models.price_history import PriceHistory
+from app.services.risk_analytics import RiskAnalyticsService
 from app.utils.exceptions import ValidationError, InsufficientFundsError
 import logging
 
@@ -303,7 +304,7 @@ class PortfolioService:
 
     def get_performance_metrics(self, user_id):
         """
-        Calculate performance metrics including returns and win rate
+        Calculate performance metrics including returns, win rate and risk
         
         Args:
             user_id: User ID
@@ -341,9 +342,21 @@ class PortfolioService:
             best_performer = max(holdings, key=lambda h: h['unrealized_gain_pct'])
             worst_performer = min(holdings, key=lambda h: h['unrealized_gain_pct'])
         
-        # Calculate annualized return (simplified - assumes 1 year holding period)
-        # In a real implementation, this would use actual holding periods
-        annualized_return = total_return_pct  # Simplified
+        # Annualize over the time since the first purchase still held; under a
+        # year the total return is reported as is rather than compounded up
+        annualized_return = total_return_pct
+        first_purchase = min((h['first_purchase_date'] for h in holdings if h['first_purchase_date']), default=None)
+        if first_purchase and summary['total_invested'] > 0:
+            years = Decimal((datetime.utcnow() - first_purchase).days) / Decimal('365.25')
+            growth = 1 + total_return_pct / 100
+            if years >= 1 and growth > 0:
+                annualized_return = Decimal(str((float(growth) ** (1 / float(years)) - 1) * 100))
+        
+        try:
+            risk = RiskAnalyticsService().get_portfolio_risk(user_id)
+        except Exception as e:
+            logger.error(f"Error calculating portfolio risk for user {user_id}: {str(e)}")
+            risk = None
         
         return {
             'total_return_amount': total_return_amount,
@@ -361,7 +374,8 @@ class PortfolioService:
                 'symbol': worst_performer['symbol'],
                 'company_name': worst_performer['company_name'],
                 'return_pct': worst_performer['unrealized_gain_pct']
-            } if worst_performer else None
+            } if worst_performer else None,
+            'risk': risk
         }
     
     def get_sector_allocation(self, user_id):
@@ -4,15 +4,14 @@ Orchestrates ML models for stock price predictions
 """
 import logging
 import pandas as pd
+from flask import current_app
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Tuple
 from decimal import Decimal
 
-from ml_models.arima_model import ARIMAModel
-from ml_models.lstm_model import LSTMModel
-from ml_models.linear_regression_model import LinearRegressionModel
 from ml_models.stock_data_processor import StockDataProcessor
 from app.services.stock_repository import StockRepository
+from app.services.market_data import get_market_data_provider
 from app.services.sentiment_engine import SentimentEngine
 from app.utils.exceptions import ValidationError, ExternalAPIError
 from app.config import Config
@@ -24,20 +23,45 @@ class PredictionService:
     """Service for orchestrating stock price predictions using multiple ML models"""
     
     def __init__(self):
-        """Initialize the prediction service with ML models"""
+        """Initialize the prediction service (ML models are loaded on first use)"""
         self.stock_repo = StockRepository()
         self.data_processor = StockDataProcessor(debug=False)
         
-        # Initialize ML models
-        self.arima_model = ARIMAModel(debug=False)
-        self.lstm_model = LSTMModel(debug=False)
-        self.lr_model = LinearRegressionModel(debug=False)
+        # ML models are created lazily so that importing this service does not
+        # pull statsmodels, scikit-learn or TensorFlow into every web worker
+        self._arima_model = None
+        self._lstm_model = None
+        self._lr_model = None
         
         # Initialize sentiment engine
         self.sentiment_engine = SentimentEngine()
         
         logger.info("PredictionService initialized")
     
+    @property
+    def arima_model(self):
+        """ARIMA model, imported on first use (loads statsmodels)"""
+        if self._arima_model is None:
+            from ml_models.arima_model import ARIMAModel
+            self._arima_model = ARIMAModel(debug=False)
+        return self._arima_model
+    
+    @property
+    def lstm_model(self):
+        """LSTM model, imported on first use (loads TensorFlow/Keras)"""
+        if self._lstm_model is None:
+            from ml_models.lstm_model import LSTMModel
+            self._lstm_model = LSTMModel(debug=False)
+        return self._lstm_model
+    
+    @property
+    def lr_model(self):
+        """Linear Regression model, imported on first use (loads scikit-learn)"""
+        if self._lr_model is None:
+            from ml_models.linear_regression_model import LinearRegressionModel
+            self._lr_model = LinearRegressionModel(debug=False)
+        return self._lr_model
+    
     def get_historical_data(self, symbol: str, period_years: int = 2) -> Optional[pd.DataFrame]:
         """
         Get historical stock data using StockRepository
@@ -62,9 +86,8 @@ class PredictionService:
             )
             
             if not price_history:
-                logger.warning(f"No price history found in database for {symbol}, fetching from yfinance")
-                # Fallback to yfinance
-                return self.data_processor.get_historical_data(symbol, period_years)
+                logger.warning(f"No price history found in database for {symbol}, fetching from market data provider")
+                return get_market_data_provider().get_price_history(symbol, period_years)
             
             # Convert to DataFrame
             data = []
@@ -87,8 +110,7 @@ class PredictionService:
             
         except Exception as e:
             logger.error(f"Error getting historical data for {symbol}: {e}")
-            # Fallback to yfinance
-            return self.data_processor.get_historical_data(symbol, period_years)
+            return get_market_data_provider().get_price_history(symbol, period_years)
     
     def preprocess_data(self, df: pd.DataFrame, symbol: str) -> Optional[pd.DataFrame]:
         """
@@ -107,6 +129,59 @@ class PredictionService:
             logger.error(f"Error preprocessing data for {symbol}: {e}")
             return None
     
+    def get_arima_order(self, symbol: str, df: pd.DataFrame) -> Optional[Tuple[int, int, int]]:
+        """
+        Selected ARIMA order for a symbol when ARIMA_AUTO_ORDER is enabled
+        
+        Args:
+            symbol: Stock symbol
+            df: Preprocessed stock data
+            
+        Returns:
+            (p, d, q), or None to use the model's default order
+        """
+        if not current_app.config.get('ARIMA_AUTO_ORDER', False):
+            return None
+        try:
+            from app.services.arima_orders import get_arima_order_selector
+            return get_arima_order_selector().order_for(symbol, df)
+        except Exception as e:
+            logger.warning(f"ARIMA order selection failed for {symbol}, using the default order: {e}")
+            return None
+    
+    def get_sentiment(self, symbol: str, include_sentiment: bool = True) -> Dict:
+        """
+        Get the (cached) sentiment result attached to predictions and forecasts
+        
+        Args:
+            symbol: Stock symbol
+            include_sentiment: False to skip the lookup
+            
+        Returns:
+            Sentiment result, or a dict with enabled False when unavailable
+        """
+        if not (include_sentiment and self.sentiment_engine.is_enabled()):
+            return {
+                'enabled': False,
+                'message': 'Sentiment analysis is not configured'
+            }
+        
+        try:
+            logger.info(f"Fetching sentiment analysis for {symbol}")
+            sentiment_data = self.sentiment_engine.get_sentiment_with_cache(
+                symbol=symbol,
+                tweet_count=100,
+                cache_duration_hours=1
+            )
+            logger.info(f"Sentiment analysis added: {sentiment_data.get('sentiment')}")
+            return sentiment_data
+        except Exception as e:
+            logger.warning(f"Sentiment analysis failed for {symbol}: {e}")
+            return {
+                'error': str(e),
+                'enabled': False
+            }
+    
     def predict_stock_price(
         self, 
         symbol: str, 
@@ -160,7 +235,8 @@ class PredictionService:
             if 'arima' in models:
                 try:
                     logger.info(f"Running ARIMA model for {symbol}")
-                    arima_raw = self.arima_model.predict(df_processed, symbol)
+                    arima_order = self.get_arima_order(symbol, df_processed)
+                    arima_raw = self.arima_model.predict(df_processed, symbol, order=arima_order)
                     # Expected tuple: (prediction, error, success)
                     if isinstance(arima_raw, tuple) and len(arima_raw) >= 3:
                         arima_pred, arima_err, arima_ok = arima_raw[0], arima_raw[1], arima_raw[2]
@@ -237,27 +313,7 @@ class PredictionService:
                 raise ValidationError(f"All prediction models failed for {symbol}")
             
             # Add sentiment analysis if enabled
-            if include_sentiment and self.sentiment_engine.is_enabled():
-                try:
-                    logger.info(f"Fetching sentiment analysis for {symbol}")
-                    sentiment_data = self.sentiment_engine.get_sentiment_with_cache(
-                        symbol=symbol,
-                        tweet_count=100,
-                        cache_duration_hours=1
-                    )
-                    results['sentiment'] = sentiment_data
-                    logger.info(f"Sentiment analysis added: {sentiment_data.get('sentiment')}")
-                except Exception as e:
-                    logger.warning(f"Sentiment analysis failed for {symbol}: {e}")
-                    results['sentiment'] = {
-                        'error': str(e),
-                        'enabled': False
-                    }
-            else:
-                results['sentiment'] = {
-                    'enabled': False,
-                    'message': 'Sentiment analysis is not configured'
-                }
+            results['sentiment'] = self.get_sentiment(symbol, include_sentiment)
             
             logger.info(f"Prediction completed for {symbol}: {len(results['predictions'])} models succeeded")
             return results
@@ -373,27 +429,7 @@ class PredictionService:
                 raise ValidationError(f"All forecast models failed for {symbol}")
             
             # Add sentiment analysis if enabled
-            if include_sentiment and self.sentiment_engine.is_enabled():
-                try:
-                    logger.info(f"Fetching sentiment analysis for {symbol}")
-                    sentiment_data = self.sentiment_engine.get_sentiment_with_cache(
-                        symbol=symbol,
-                        tweet_count=100,
-                        cache_duration_hours=1
-                    )
-                    results['sentiment'] = sentiment_data
-                    logger.info(f"Sentiment analysis added: {sentiment_data.get('sentiment')}")
-                except Exception as e:
-                    logger.warning(f"Sentiment analysis failed for {symbol}: {e}")
-                    results['sentiment'] = {
-                        'error': str(e),
-                        'enabled': False
-                    }
-            else:
-                results['sentiment'] = {
-                    'enabled': False,
-                    'message': 'Sentiment analysis is not configured'
-                }
+            results['sentiment'] = self.get_sentiment(symbol, include_sentiment)
             
             logger.info(f"Forecast completed for {symbol}: {len(results['forecasts'])} models succeeded")
             return results
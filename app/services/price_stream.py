@@ -0,0 +1,239 @@
+"""
+Price Stream
+Single upstream poller that fans price updates out to server-sent event clients
+"""
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable
+
+import pandas as pd
+from flask import current_app
+
+from app.services.market_data import LocalCSVProvider, get_market_data_provider
+
+logger = logging.getLogger(__name__)
+
+
+class CSVReplaySource:
+    """
+    Replays recent closes from static CSV data, one row per poll
+
+    Each symbol starts replay_rows rows before the reference date
+    (SIMULATION_DATE, or the last row) and then holds the reference close,
+    so STATIC mode streams plausible movement without any network access.
+    """
+
+    def __init__(self, provider: LocalCSVProvider, replay_rows: int = 30):
+        self.provider = provider
+        self.replay_rows = replay_rows
+        self._closes = {}
+        self._positions = Counter()
+
+    def __call__(self, symbol: str) -> Decimal:
+        if symbol not in self._closes:
+            history = self.provider.get_price_history(symbol, period_years=1)
+            if history is None or history.empty:
+                # Raises StockNotFoundError for unknown symbols
+                return self.provider.get_current_price(symbol)
+            if self.provider.reference_date is not None:
+                history = history.loc[:pd.Timestamp(self.provider.reference_date)]
+            self._closes[symbol] = list(history['Close'].iloc[-self.replay_rows:])
+
+        closes = self._closes[symbol]
+        position = min(self._positions[symbol], len(closes) - 1)
+        self._positions[symbol] += 1
+        return Decimal(str(round(float(closes[position]), 2)))
+
+
+class Subscription:
+    """One stream client: its symbols and a bounded queue of pending updates"""
+
+    def __init__(self, subscription_id: int, symbols: Iterable[str], max_pending: int):
+        self.subscription_id = subscription_id
+        self.symbols = frozenset(symbols)
+        self.updates = queue.Queue(maxsize=max_pending)
+
+    def deliver(self, update: Dict) -> None:
+        """Queue an update, dropping the oldest one if the client is falling behind"""
+        while True:
+            try:
+                self.updates.put_nowait(update)
+                return
+            except queue.Full:
+                try:
+                    self.updates.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class PriceStreamHub:
+    """
+    Polls each subscribed symbol once per interval and fans out the results
+
+    The poller thread runs only while there are subscribers. Upstream calls
+    per interval equal the number of distinct subscribed symbols, however
+    many clients are connected. An update is published only when a symbol's
+    price changes; new subscribers receive the last known prices at once.
+    """
+
+    def __init__(self, fetch_price: Callable[[str], Decimal], interval: float = 5.0,
+                 app=None, max_pending: int = 100):
+        """
+        Initialize the hub
+
+        Args:
+            fetch_price: Callable returning the current price for a symbol
+            interval: Seconds between polls
+            app: Flask app whose context the poller runs in (optional)
+            max_pending: Updates buffered per client before the oldest are dropped
+        """
+        self.fetch_price = fetch_price
+        self.interval = interval
+        self.app = app
+        self.max_pending = max_pending
+        self.latest: Dict[str, Dict] = {}
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._symbol_refs = Counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def subscribe(self, symbols: Iterable[str]) -> Subscription:
+        """
+        Register a client for a set of symbols
+
+        Returns:
+            Subscription whose queue receives updates; pass it to unsubscribe when done
+        """
+        with self._lock:
+            subscription = Subscription(next(self._ids), symbols, self.max_pending)
+            self._subscriptions[subscription.subscription_id] = subscription
+            new_symbols = [s for s in subscription.symbols if not self._symbol_refs[s]]
+            self._symbol_refs.update(subscription.symbols)
+            snapshot = [self.latest[s] for s in sorted(subscription.symbols) if s in self.latest]
+            self._ensure_started()
+
+        for update in snapshot:
+            subscription.deliver(update)
+        if new_symbols:
+            self._wakeup.set()  # Fetch new symbols now rather than next interval
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a client; symbols nobody else wants stop being polled"""
+        with self._lock:
+            if self._subscriptions.pop(subscription.subscription_id, None) is None:
+                return
+            self._symbol_refs.subtract(subscription.symbols)
+            for symbol in subscription.symbols:
+                if self._symbol_refs[symbol] <= 0:
+                    del self._symbol_refs[symbol]
+                    self.latest.pop(symbol, None)
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected clients"""
+        return len(self._subscriptions)
+
+    def poll_once(self) -> int:
+        """
+        Fetch every subscribed symbol once and publish changed prices
+
+        Returns:
+            Number of symbols fetched
+        """
+        with self._lock:
+            symbols = sorted(self._symbol_refs)
+
+        for symbol in symbols:
+            try:
+                price = self.fetch_price(symbol)
+            except Exception as e:
+                logger.warning(f"Price stream could not fetch {symbol}: {str(e)}")
+                continue
+
+            update = {
+                'symbol': symbol,
+                'price': float(price),
+                'timestamp': datetime.utcnow().isoformat()
+            }
+            with self._lock:
+                previous = self.latest.get(symbol)
+                if previous is not None and previous['price'] == update['price']:
+                    continue
+                self.latest[symbol] = update
+                targets = [s for s in self._subscriptions.values() if symbol in s.symbols]
+
+            for subscription in targets:
+                subscription.deliver(update)
+
+        return len(symbols)
+
+    def _ensure_started(self) -> None:
+        """Start the poller thread if it is not running (caller holds the lock)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='price-stream-poller', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Poll until the last subscriber leaves"""
+        while True:
+            with self._lock:
+                if not self._subscriptions:
+                    self._thread = None
+                    return
+
+            started = time.monotonic()
+            if self.app is not None:
+                with self.app.app_context():
+                    self.poll_once()
+            else:
+                self.poll_once()
+
+            self._wakeup.wait(max(0.0, self.interval - (time.monotonic() - started)))
+            self._wakeup.clear()
+
+
+def create_price_source(app) -> Callable[[str], Decimal]:
+    """
+    Build the price fetcher for the stream from the app's DATA_MODE
+
+    STATIC mode replays the CSV files in STATIC_DATA_DIR; otherwise prices
+    come from the configured market data provider.
+    """
+    if app.config.get('DATA_MODE') == 'STATIC':
+        sim_date = app.config.get('SIMULATION_DATE')
+        reference_date = datetime.strptime(sim_date, '%Y-%m-%d').date() if sim_date else None
+        provider = LocalCSVProvider([app.config.get('STATIC_DATA_DIR')], reference_date)
+        return CSVReplaySource(provider, app.config.get('PRICE_STREAM_REPLAY_ROWS', 30))
+
+    def fetch_live(symbol: str) -> Decimal:
+        return get_market_data_provider().get_current_price(symbol)
+
+    return fetch_live
+
+
+def get_price_stream() -> PriceStreamHub:
+    """
+    Get the price stream hub for the current application
+
+    Returns:
+        PriceStreamHub shared by every stream client in this process
+    """
+    hub = current_app.extensions.get('price_stream')
+    if hub is None:
+        app = current_app._get_current_object()
+        hub = PriceStreamHub(
+            create_price_source(app),
+            interval=app.config.get('PRICE_STREAM_INTERVAL', 5),
+            app=app
+        )
+        current_app.extensions['price_stream'] = hub
+    return hub
@@ -0,0 +1,317 @@
+"""
+Risk Analytics
+Vectorized portfolio risk (volatility, VaR/CVaR, beta, correlation) from price history
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.models.company import Company
+from app.models.holding import Holdings
+from app.models.price_history import PriceHistory
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class ReturnsMatrix:
+    """
+    Aligned daily returns for a set of companies
+
+    Attributes:
+        company_ids: Column order of returns and covariance
+        dates: Dates of the aligned return rows
+        returns: (days x companies) simple daily returns on adjusted close
+        covariance: (companies x companies) sample covariance of returns
+        last_prices: Latest adjusted close per company, in column order
+        benchmark: Benchmark daily returns on the same dates (NaN where missing), or None
+        as_of: Last price date the matrix was built from
+    """
+
+    def __init__(self, company_ids, dates, returns, last_prices, benchmark=None, as_of=None):
+        self.company_ids = list(company_ids)
+        self.as_of = as_of
+        self.dates = list(dates)
+        self.returns = returns
+        self.last_prices = last_prices
+        self.benchmark = benchmark
+        self.covariance = np.cov(returns, rowvar=False, ddof=1).reshape(
+            len(self.company_ids), len(self.company_ids)
+        ) if len(returns) > 1 else None
+
+
+class CovarianceCache:
+    """
+    Small LRU of returns matrices keyed by company set, benchmark and last price date
+
+    A new day of prices changes the key, so entries never need explicit
+    invalidation; old keys simply fall off the end.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[ReturnsMatrix]:
+        with self._lock:
+            matrix = self._entries.get(key)
+            if matrix is not None:
+                self._entries.move_to_end(key)
+            return matrix
+
+    def set(self, key, matrix: ReturnsMatrix) -> None:
+        with self._lock:
+            self._entries[key] = matrix
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def get_covariance_cache() -> CovarianceCache:
+    """
+    Get the covariance cache for the current application
+
+    Returns:
+        CovarianceCache sized from RISK_CACHE_SIZE
+    """
+    cache = current_app.extensions.get('risk_covariance_cache')
+    if cache is None:
+        cache = CovarianceCache(current_app.config.get('RISK_CACHE_SIZE', 128))
+        current_app.extensions['risk_covariance_cache'] = cache
+    return cache
+
+
+def load_returns_matrix(company_ids: Sequence[int], start_date, benchmark_id: Optional[int] = None) -> ReturnsMatrix:
+    """
+    Build aligned daily returns for companies from a single price history query
+
+    Dates where any company lacks a price are dropped, so every row of the
+    matrix covers the whole set. The benchmark is aligned to those dates but
+    does not restrict them.
+
+    Args:
+        company_ids: Companies to include
+        start_date: First price date to load
+        benchmark_id: Company ID of the benchmark (optional)
+
+    Returns:
+        ReturnsMatrix
+    """
+    company_ids = sorted(set(company_ids))
+    query_ids = company_ids + ([benchmark_id] if benchmark_id is not None and benchmark_id not in company_ids else [])
+
+    rows = db.session.query(
+        PriceHistory.date, PriceHistory.company_id, PriceHistory.adjusted_close
+    ).filter(
+        PriceHistory.company_id.in_(query_ids),
+        PriceHistory.date >= start_date
+    ).all()
+
+    prices = pd.DataFrame(rows, columns=['date', 'company_id', 'close'])
+    prices = prices.pivot(index='date', columns='company_id', values='close').sort_index().astype(float)
+    prices = prices.reindex(columns=query_ids)
+
+    # Companies with no prices in the window are left out rather than emptying every row
+    company_ids = [c for c in company_ids if prices[c].notna().any()]
+    holdings_prices = prices[company_ids]
+    last_prices = holdings_prices.ffill().iloc[-1].to_numpy() if len(prices) else np.full(len(company_ids), np.nan)
+
+    returns = holdings_prices.pct_change(fill_method=None).iloc[1:].dropna()
+
+    benchmark = None
+    if benchmark_id is not None:
+        benchmark_returns = prices[benchmark_id].pct_change(fill_method=None)
+        benchmark = benchmark_returns.reindex(returns.index).to_numpy()
+
+    priced_dates = holdings_prices.dropna(how='all').index
+    as_of = priced_dates[-1] if len(priced_dates) else None
+    return ReturnsMatrix(company_ids, returns.index, returns.to_numpy(), last_prices, benchmark, as_of)
+
+
+def get_returns_matrix(company_ids: Sequence[int], lookback_days: int,
+                       benchmark_id: Optional[int] = None) -> Optional[ReturnsMatrix]:
+    """
+    Get the returns matrix for companies, served from the covariance cache
+
+    The cache key includes the latest price date of the set, so a matrix is
+    rebuilt once per new day of prices.
+
+    Args:
+        company_ids: Companies to include
+        lookback_days: Calendar days of history before the latest price date
+        benchmark_id: Company ID of the benchmark (optional)
+
+    Returns:
+        ReturnsMatrix, or None when the companies have no prices
+    """
+    company_ids = sorted(set(company_ids))
+    last_date = db.session.query(func.max(PriceHistory.date)).filter(
+        PriceHistory.company_id.in_(company_ids)
+    ).scalar()
+    if last_date is None:
+        return None
+
+    cache = get_covariance_cache()
+    key = (frozenset(company_ids), benchmark_id, last_date, lookback_days)
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = load_returns_matrix(company_ids, last_date - timedelta(days=lookback_days), benchmark_id)
+        cache.set(key, matrix)
+    return matrix
+
+
+def compute_risk_metrics(returns: np.ndarray, weights: np.ndarray, covariance: Optional[np.ndarray] = None,
+                         benchmark: Optional[np.ndarray] = None, confidence: float = 0.95) -> Dict:
+    """
+    Compute portfolio risk from a returns matrix and weights
+
+    VaR and CVaR are one-day losses expressed as positive fractions of
+    portfolio value; historical figures use the empirical return
+    distribution, parametric ones assume normal returns.
+
+    Args:
+        returns: (days x assets) daily returns
+        weights: Portfolio weights per asset (summing to 1)
+        covariance: Precomputed covariance of returns (optional)
+        benchmark: Benchmark daily returns aligned to returns rows, NaN where missing (optional)
+        confidence: VaR confidence level
+
+    Returns:
+        dict: Risk metrics
+    """
+    if covariance is None:
+        covariance = np.cov(returns, rowvar=False, ddof=1).reshape(len(weights), len(weights))
+
+    portfolio_returns = returns @ weights
+    mean = float(portfolio_returns.mean())
+    daily_volatility = float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+    tail = 1 - confidence
+
+    # Historical: empirical quantile of portfolio returns
+    cutoff = float(np.quantile(portfolio_returns, tail))
+    historical_var = -cutoff
+    historical_cvar = -float(portfolio_returns[portfolio_returns <= cutoff].mean())
+
+    # Parametric: normal distribution with the sample mean and volatility
+    normal = NormalDist()
+    z = normal.inv_cdf(tail)
+    parametric_var = -(mean + z * daily_volatility)
+    parametric_cvar = -(mean - daily_volatility * normal.pdf(z) / tail)
+
+    # Correlation from covariance; zero-variance assets correlate with nothing
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(std, std)
+    correlation = np.nan_to_num(correlation)
+    np.fill_diagonal(correlation, 1.0)
+
+    beta = None
+    if benchmark is not None:
+        mask = ~np.isnan(benchmark)
+        if mask.sum() > 1:
+            bench = benchmark[mask]
+            bench_variance = float(np.var(bench, ddof=1))
+            if bench_variance > 0:
+                beta = float(np.cov(portfolio_returns[mask], bench, ddof=1)[0, 1] / bench_variance)
+
+    return {
+        'observations': int(len(portfolio_returns)),
+        'confidence': confidence,
+        'daily_volatility': daily_volatility,
+        'annualized_volatility': daily_volatility * float(np.sqrt(TRADING_DAYS_PER_YEAR)),
+        'historical_var': historical_var,
+        'historical_cvar': historical_cvar,
+        'parametric_var': parametric_var,
+        'parametric_cvar': parametric_cvar,
+        'beta': beta,
+        'correlation': correlation
+    }
+
+
+class RiskAnalyticsService:
+    """Service for portfolio risk analytics"""
+
+    def get_portfolio_risk(self, user_id, lookback_days=None, confidence=None):
+        """
+        Calculate risk metrics for a user's current holdings
+
+        Holdings are value-weighted at their latest close. The returns matrix
+        and covariance for the holding set are cached per last price date.
+
+        Args:
+            user_id: User ID
+            lookback_days: Calendar days of history (default RISK_LOOKBACK_DAYS)
+            confidence: VaR confidence level (default RISK_VAR_CONFIDENCE)
+
+        Returns:
+            dict: Risk metrics, with values as fractions and money amounts in
+                portfolio currency, or None when there is not enough history
+        """
+        lookback_days = lookback_days or current_app.config.get('RISK_LOOKBACK_DAYS', 365)
+        confidence = confidence or current_app.config.get('RISK_VAR_CONFIDENCE', 0.95)
+        min_observations = current_app.config.get('RISK_MIN_OBSERVATIONS', 20)
+
+        holdings = db.session.query(
+            Holdings.company_id, Holdings.quantity, Company.symbol
+        ).join(
+            Company, Holdings.company_id == Company.company_id
+        ).filter(
+            Holdings.user_id == user_id,
+            Holdings.quantity > 0
+        ).all()
+        if not holdings:
+            return None
+
+        benchmark_symbol = current_app.config.get('RISK_BENCHMARK_SYMBOL')
+        benchmark_id = None
+        if benchmark_symbol:
+            benchmark_id = db.session.query(Company.company_id).filter_by(symbol=benchmark_symbol).scalar()
+
+        matrix = get_returns_matrix([h.company_id for h in holdings], lookback_days, benchmark_id)
+        if matrix is None or len(matrix.returns) < max(min_observations, 2):
+            logger.info(f"Not enough aligned price history for risk of user {user_id}: "
+                        f"{len(matrix.returns) if matrix else 0} days")
+            return None
+
+        quantities = {h.company_id: h.quantity for h in holdings}
+        symbols = {h.company_id: h.symbol for h in holdings}
+        values = np.array([quantities[c] for c in matrix.company_ids], dtype=float) * matrix.last_prices
+        total_value = float(values.sum())
+        if total_value <= 0:
+            return None
+        weights = values / total_value
+
+        metrics = compute_risk_metrics(
+            matrix.returns, weights, matrix.covariance, matrix.benchmark, confidence
+        )
+
+        ordered_symbols = [symbols[c] for c in matrix.company_ids]
+        correlation = metrics.pop('correlation')
+        metrics.update({
+            'benchmark': benchmark_symbol if metrics['beta'] is not None else None,
+            'as_of': matrix.as_of,
+            'portfolio_value': total_value,
+            'historical_var_amount': metrics['historical_var'] * total_value,
+            'parametric_var_amount': metrics['parametric_var'] * total_value,
+            'weights': dict(zip(ordered_symbols, weights.round(6).tolist())),
+            'correlation': {
+                'symbols': ordered_symbols,
+                'matrix': correlation.round(4).tolist()
+            }
+        })
+        return metrics
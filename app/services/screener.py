@@ -0,0 +1,535 @@
+"""
+Market Screener
+Precomputed per-company features and vectorized filter/sort expressions over the whole universe
+"""
+import ast
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models.company import Company
+from app.models.price_history import PriceHistory
+from app.utils.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+HISTORY_DAYS = 380  # calendar days loaded: a year of trading days plus the 1-year return base
+MAX_EXPRESSION_LENGTH = 500
+DIRTY_COMPANIES_KEY = 'screener_dirty_companies'  # Session.info key for companies changed in the transaction
+
+RETURN_PERIODS = {
+    'change_1d': 1,
+    'return_1w': 5,
+    'return_1m': 21,
+    'return_3m': 63,
+    'return_6m': 126,
+    'return_1y': 252
+}
+VOLATILITY_DAYS = 63
+AVERAGE_VOLUME_DAYS = 20
+
+TEXT_COLUMNS = ('symbol', 'company_name', 'sector', 'industry')
+NUMERIC_COLUMNS = (
+    'market_cap', 'price', *RETURN_PERIODS, 'high_52w', 'low_52w', 'pct_from_52w_high',
+    'pct_from_52w_low', 'volatility', 'avg_volume_20d', 'volume_ratio'
+)
+COLUMNS = (*TEXT_COLUMNS, *NUMERIC_COLUMNS, 'as_of')
+
+
+def compute_features(companies: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute screening features for many companies at once
+
+    Each company's statistics use its own most recent trading days, so a
+    company that missed a day is not compared against another's calendar.
+    Returns and percentages are fractions; volatility is annualized from
+    daily returns on adjusted close.
+
+    Args:
+        companies: Rows of company_id, symbol, company_name, sector, industry, market_cap
+        prices: Rows of company_id, date, close, adjusted_close, high, low, volume
+
+    Returns:
+        DataFrame indexed by company_id with COLUMNS; companies without prices are dropped
+    """
+    prices = prices.sort_values(['company_id', 'date'], ignore_index=True)
+    for column in ('close', 'adjusted_close', 'high', 'low', 'volume'):
+        prices[column] = prices[column].astype(float)
+    prices['adjusted_close'] = prices['adjusted_close'].fillna(prices['close'])
+
+    groups = prices.groupby('company_id', sort=False)
+    # Position counted back from each company's latest row (0 = latest)
+    prices['age'] = groups.cumcount(ascending=False)
+    prices['daily_return'] = groups['adjusted_close'].pct_change(fill_method=None)
+
+    latest = prices[prices['age'] == 0].set_index('company_id')
+    features = pd.DataFrame(index=latest.index)
+    features['price'] = latest['close']
+    features['as_of'] = latest['date']
+
+    for name, days in RETURN_PERIODS.items():
+        base = prices.loc[prices['age'] == days, ['company_id', 'adjusted_close']].set_index('company_id')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features[name] = latest['adjusted_close'] / base['adjusted_close'].reindex(features.index) - 1
+
+    year = prices[prices['age'] < TRADING_DAYS_PER_YEAR].groupby('company_id')
+    features['high_52w'] = year['high'].max()
+    features['low_52w'] = year['low'].min()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        features['pct_from_52w_high'] = features['price'] / features['high_52w'] - 1
+        features['pct_from_52w_low'] = features['price'] / features['low_52w'] - 1
+
+    recent = prices[prices['age'] < VOLATILITY_DAYS].groupby('company_id')['daily_return']
+    features['volatility'] = recent.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    # Average over the days before the latest, so volume_ratio flags today's spike
+    prior = prices[(prices['age'] >= 1) & (prices['age'] <= AVERAGE_VOLUME_DAYS)].groupby('company_id')['volume']
+    features['avg_volume_20d'] = prior.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        features['volume_ratio'] = latest['volume'] / features['avg_volume_20d']
+
+    companies = companies.set_index('company_id')
+    features = features.join(companies[list(TEXT_COLUMNS) + ['market_cap']], how='inner')
+    features['market_cap'] = features['market_cap'].astype(float)
+    features[list(NUMERIC_COLUMNS)] = features[list(NUMERIC_COLUMNS)].replace([np.inf, -np.inf], np.nan)
+    return features[list(COLUMNS)]
+
+
+def load_features(company_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """
+    Load companies and recent prices in two queries and compute their features
+
+    Prices are loaded from HISTORY_DAYS before the latest price date of the
+    set, so companies with no prices in that window are left out as stale.
+
+    Args:
+        company_ids: Companies to load (default: every active company)
+
+    Returns:
+        DataFrame from compute_features
+    """
+    company_query = db.session.query(
+        Company.company_id, Company.symbol, Company.company_name,
+        Company.sector, Company.industry, Company.market_cap
+    ).filter(Company.is_active == True)
+    price_query = db.session.query(
+        PriceHistory.company_id, PriceHistory.date, PriceHistory.close, PriceHistory.adjusted_close,
+        PriceHistory.high, PriceHistory.low, PriceHistory.volume
+    )
+    if company_ids is not None:
+        company_ids = list(company_ids)
+        company_query = company_query.filter(Company.company_id.in_(company_ids))
+        price_query = price_query.filter(PriceHistory.company_id.in_(company_ids))
+
+    last_date = price_query.with_entities(func.max(PriceHistory.date)).scalar()
+    companies = pd.DataFrame(company_query.all(), columns=['company_id', *TEXT_COLUMNS, 'market_cap'])
+    if last_date is None or companies.empty:
+        return pd.DataFrame(columns=list(COLUMNS), index=pd.Index([], name='company_id'))
+
+    rows = price_query.filter(PriceHistory.date >= last_date - timedelta(days=HISTORY_DAYS)).all()
+    prices = pd.DataFrame(rows, columns=['company_id', 'date', 'close', 'adjusted_close', 'high', 'low', 'volume'])
+    return compute_features(companies, prices)
+
+
+class FeatureTable:
+    """
+    Screening features for the whole company universe, kept in memory
+
+    The table is built on first use and again every resync_interval seconds.
+    Price or company rows committed through the ORM mark their company dirty
+    (see the session listeners below), and dirty companies are recomputed
+    before the next screen, so a price update is visible without a full
+    rebuild.
+    """
+
+    def __init__(self, resync_interval=3600):
+        self.resync_interval = resync_interval
+        self._frame = None
+        self._dirty = set()
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, company_id: int) -> None:
+        """Schedule a company's features for recomputation"""
+        with self._lock:
+            if self._frame is not None:
+                self._dirty.add(company_id)
+
+    def needs_rebuild(self) -> bool:
+        """Check whether the table is missing or older than the resync interval"""
+        return self._built_at is None or time.monotonic() - self._built_at >= self.resync_interval
+
+    def rebuild(self) -> None:
+        """Recompute features for every active company"""
+        started = time.perf_counter()
+        frame = load_features()
+        with self._lock:
+            self._frame = frame
+            self._dirty.clear()
+            self._built_at = time.monotonic()
+        logger.info(f"Rebuilt screener features for {len(frame)} companies "
+                    f"in {time.perf_counter() - started:.2f}s")
+
+    def refresh_dirty(self) -> int:
+        """
+        Recompute features for companies marked dirty
+
+        Returns:
+            int: Number of companies recomputed
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return 0
+
+        updated = load_features(dirty)
+        with self._lock:
+            frame = self._frame.drop(index=list(dirty), errors='ignore')
+            self._frame = pd.concat([frame, updated]) if len(updated) else frame
+        return len(dirty)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Current features, one row per company (treat as read-only)"""
+        return self._frame
+
+
+def get_feature_table() -> FeatureTable:
+    """
+    Get the screener feature table for the current application, refreshed
+
+    Returns:
+        FeatureTable: Table resynced every SCREENER_RESYNC_SECONDS
+    """
+    table = current_app.extensions.get('screener_features')
+    if table is None:
+        table = FeatureTable(current_app.config.get('SCREENER_RESYNC_SECONDS', 3600))
+        current_app.extensions['screener_features'] = table
+
+    if table.needs_rebuild():
+        table.rebuild()
+    else:
+        table.refresh_dirty()
+    return table
+
+
+@event.listens_for(PriceHistory, 'after_insert')
+@event.listens_for(PriceHistory, 'after_update')
+@event.listens_for(PriceHistory, 'after_delete')
+@event.listens_for(Company, 'after_insert')
+@event.listens_for(Company, 'after_update')
+@event.listens_for(Company, 'after_delete')
+def _collect_dirty_company(mapper, connection, target):
+    """Note a company whose prices or details were flushed in this transaction"""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(DIRTY_COMPANIES_KEY, set()).add(target.company_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _mark_company_dirty(session):
+    """Recompute changed companies' features once their rows are committed"""
+    dirty = session.info.pop(DIRTY_COMPANIES_KEY, None)
+    if not dirty or not has_app_context():
+        return
+    table = current_app.extensions.get('screener_features')
+    if table is not None:
+        for company_id in dirty:
+            table.mark_dirty(company_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty_companies(session):
+    """Forget changes that were rolled back"""
+    session.info.pop(DIRTY_COMPANIES_KEY, None)
+
+
+class ExpressionEvaluator(ast.NodeVisitor):
+    """
+    Evaluate a screening expression to a column-length array
+
+    Only feature names, numbers, strings, lists of constants, arithmetic
+    (+ - * /), comparisons (including chains and `in`), and `and`/`or`/`not`
+    are allowed, so user input never reaches eval().
+    """
+
+    _BINARY = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+    _COMPARE = {
+        ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater,
+        ast.GtE: np.greater_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal
+    }
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._unknown = np.zeros(len(frame), dtype=bool)  # rows a comparison saw a missing value in
+
+    def evaluate(self, expression: str):
+        """
+        Parse and evaluate an expression
+
+        Args:
+            expression: Expression text, e.g. "sector == 'Technology' and return_3m > 0.1"
+
+        Returns:
+            Array (or scalar for constant expressions) aligned to the frame rows
+
+        Raises:
+            ValidationError: If the expression is too long, malformed or uses anything not allowed
+        """
+        if len(expression) > MAX_EXPRESSION_LENGTH:
+            raise ValidationError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+        try:
+            tree = ast.parse(expression.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValidationError(f"Invalid expression: {e.msg}")
+        return self.visit(tree.body)
+
+    def evaluate_mask(self, expression: str) -> np.ndarray:
+        """
+        Evaluate a filter expression to one boolean per row
+
+        Args:
+            expression: Condition text, e.g. "market_cap > 1e9 and not sector == 'Energy'"
+
+        Returns:
+            np.ndarray: True for rows that meet the condition
+
+        Raises:
+            ValidationError: If the expression is invalid or is not a condition
+        """
+        return self._mask(self.evaluate(expression))
+
+    def generic_visit(self, node):
+        raise ValidationError(f"Unsupported syntax in expression: {type(node).__name__}")
+
+    def visit_Name(self, node):
+        if node.id not in COLUMNS or node.id == 'as_of':
+            raise ValidationError(f"Unknown field: {node.id}")
+        column = self.frame[node.id]
+        return column.to_numpy(dtype=float) if node.id in NUMERIC_COLUMNS else column.to_numpy(dtype=object)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float, str)):
+            raise ValidationError(f"Unsupported constant: {node.value!r}")
+        return node.value
+
+    def visit_List(self, node):
+        return [self._constant(element) for element in node.elts]
+
+    visit_Tuple = visit_List
+
+    def visit_UnaryOp(self, node):
+        if isinstance(node.op, ast.Not):
+            outer, self._unknown = self._unknown, np.zeros(len(self.frame), dtype=bool)
+            operand = self.visit(node.operand)
+            unknown = self._unknown
+            self._unknown = outer | unknown
+            # A condition on a missing value is unknown, and so is its negation
+            return ~self._mask(operand) & ~unknown
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.USub):
+            return -self._number(operand)
+        if isinstance(node.op, ast.UAdd):
+            return self._number(operand)
+        return self.generic_visit(node)
+
+    def visit_BinOp(self, node):
+        operation = self._BINARY.get(type(node.op))
+        if operation is None:
+            return self.generic_visit(node)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = operation(self._number(self.visit(node.left)), self._number(self.visit(node.right)))
+        return np.where(np.isinf(result), np.nan, result) if isinstance(result, np.ndarray) else result
+
+    def visit_BoolOp(self, node):
+        masks = [self._mask(self.visit(value)) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return combine.reduce(masks)
+
+    def visit_Compare(self, node):
+        left = self.visit(node.left)
+        result = None
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(comparator, (ast.List, ast.Tuple)):
+                    raise ValidationError("'in' needs a list of values")
+                values = self.visit(comparator)
+                mask = pd.Series(np.broadcast_to(left, len(self.frame))).isin(values).to_numpy()
+                mask = ~mask if isinstance(op, ast.NotIn) else mask
+                right = left
+            else:
+                right = self.visit(comparator)
+                compare = self._COMPARE.get(type(op)) or self.generic_visit(op)
+                if self._is_number(left) and self._is_number(right):
+                    # Missing values never pass a comparison, including !=
+                    missing = pd.isna(left) | pd.isna(right)
+                    self._unknown = self._unknown | missing
+                    with np.errstate(invalid='ignore'):
+                        mask = compare(left, right) & ~missing
+                elif self._is_number(left) or self._is_number(right):
+                    raise ValidationError("Cannot compare a number with text")
+                elif compare in (np.equal, np.not_equal):
+                    mask = np.asarray(compare(left, right), dtype=bool)
+                else:
+                    raise ValidationError("Text fields only support ==, != and in")
+            result = self._mask(mask) if result is None else result & self._mask(mask)
+            left = right
+        return result
+
+    def _constant(self, node):
+        """Evaluate a list element, which must be a constant"""
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
+            return -self._number(self.visit_Constant(node.operand))
+        if not isinstance(node, ast.Constant):
+            raise ValidationError("Lists may only contain constants")
+        return self.visit_Constant(node)
+
+    def _mask(self, value) -> np.ndarray:
+        """Broadcast a boolean result to one entry per row"""
+        value = np.asarray(value)
+        if value.dtype != bool:
+            raise ValidationError("Expected a condition (comparison) where a value was given")
+        return np.broadcast_to(value, len(self.frame)).copy()
+
+    def _number(self, value):
+        """Check a value is numeric before arithmetic"""
+        if not self._is_number(value):
+            raise ValidationError("Arithmetic is only allowed on numeric fields")
+        return value
+
+    @staticmethod
+    def _is_number(value) -> bool:
+        if isinstance(value, np.ndarray):
+            return value.dtype.kind in 'fiub' and value.dtype != bool
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_sort(frame: pd.DataFrame, sort: str) -> List:
+    """
+    Evaluate a sort specification
+
+    Args:
+        frame: Features to sort
+        sort: Comma-separated expressions; a leading '-' sorts that key descending
+
+    Returns:
+        list: (values array, descending) per key
+    """
+    if len(sort) > MAX_EXPRESSION_LENGTH:
+        raise ValidationError(f"Sort longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(f"({sort.strip()},)", mode='eval')
+    except SyntaxError as e:
+        raise ValidationError(f"Invalid sort: {e.msg}")
+
+    evaluator = ExpressionEvaluator(frame)
+    keys = []
+    for node in tree.body.elts:
+        descending = isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub)
+        values = evaluator.visit(node.operand if descending else node)
+        values = np.asarray(np.broadcast_to(values, len(frame)))
+        if values.dtype == bool:
+            values = values.astype(float)
+        keys.append((values, descending))
+    return keys
+
+
+def screen(frame: pd.DataFrame, filter_expression: Optional[str] = None,
+           sort: Optional[str] = None) -> pd.DataFrame:
+    """
+    Filter and sort features with vectorized expressions
+
+    Rows missing a sort value go last; remaining ties are broken by symbol.
+
+    Args:
+        frame: Features from FeatureTable.frame
+        filter_expression: Condition rows must meet (optional)
+        sort: Sort specification for parse_sort (default: symbol)
+
+    Returns:
+        DataFrame: Matching rows in order
+    """
+    if filter_expression and filter_expression.strip():
+        frame = frame[ExpressionEvaluator(frame).evaluate_mask(filter_expression)]
+
+    keys = parse_sort(frame, sort) if sort and sort.strip() else []
+    order_by = pd.DataFrame({f'key{i}': values for i, (values, _) in enumerate(keys)}, index=frame.index)
+    order_by['symbol'] = frame['symbol']
+    ascending = [not descending for _, descending in keys] + [True]
+    order = order_by.reset_index(drop=True).sort_values(
+        list(order_by.columns), ascending=ascending, na_position='last', kind='mergesort'
+    ).index
+    return frame.iloc[order]
+
+
+def _serialize_row(row: Dict) -> Dict:
+    """Make a features row JSON friendly"""
+    result = {}
+    for column, value in row.items():
+        if column == 'as_of':
+            result[column] = value.isoformat() if value is not None else None
+        elif isinstance(value, float):
+            result[column] = None if np.isnan(value) else round(value, 6)
+        else:
+            result[column] = value
+    return result
+
+
+class ScreenerService:
+    """Service for screening the company universe"""
+
+    def screen(self, filter_expression=None, sort=None, page=1, per_page=20, fields=None):
+        """
+        Screen every active company with a filter and sort expression
+
+        Args:
+            filter_expression: Condition over feature fields, e.g.
+                "return_3m > 0.1 and volatility < 0.4 and sector in ['Technology']"
+            sort: Comma-separated sort keys, '-' for descending, e.g. "-return_3m, symbol"
+            page: Page number (1-based)
+            per_page: Results per page (capped at SCREENER_MAX_PER_PAGE)
+            fields: Feature fields to return (default: all)
+
+        Returns:
+            dict: Matching rows for the page with the total match count
+
+        Raises:
+            ValidationError: If an expression, field or page setting is invalid
+        """
+        max_per_page = current_app.config.get('SCREENER_MAX_PER_PAGE', 100)
+        if page < 1 or per_page < 1:
+            raise ValidationError("page and per_page must be positive")
+        per_page = min(per_page, max_per_page)
+
+        if fields:
+            unknown = [f for f in fields if f not in COLUMNS]
+            if unknown:
+                raise ValidationError(f"Unknown fields: {', '.join(unknown)}")
+            fields = ['symbol'] + [f for f in fields if f != 'symbol']
+        else:
+            fields = list(COLUMNS)
+
+        frame = get_feature_table().frame
+        matches = screen(frame, filter_expression, sort)
+        start = (page - 1) * per_page
+        rows = matches.iloc[start:start + per_page][fields]
+        rows = rows.astype(object).where(rows.notna(), None)
+
+        return {
+            'results': [_serialize_row(row) for row in rows.to_dict('records')],
+            'total': len(matches),
+            'universe': len(frame),
+            'page': page,
+            'per_page': per_page,
+            'total_pages': (len(matches) + per_page - 1) // per_page
+        }
@@ -0,0 +1,262 @@
+"""
+Sentiment Result Cache
+Two-tier (in-process LRU over the sentiment_cache table) cache with stale-while-revalidate
+"""
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app
+
+from app import db
+from app.models.company import Company
+from app.models.sentiment_cache import SentimentCache
+
+logger = logging.getLogger(__name__)
+
+REFRESH_WORKERS = 2
+
+
+def overall_sentiment(positive: int, negative: int, neutral: int) -> str:
+    """Label a result by its largest class (ties are NEUTRAL)"""
+    if positive > negative and positive > neutral:
+        return 'POSITIVE'
+    if negative > positive and negative > neutral:
+        return 'NEGATIVE'
+    return 'NEUTRAL'
+
+
+class CachedSentiment:
+    """A sentiment result with its fetch and expiry times"""
+
+    __slots__ = ('data', 'fetched_at', 'expires_at')
+
+    def __init__(self, data: Dict, fetched_at: datetime, expires_at: datetime):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+
+class SentimentResultCache:
+    """
+    Sentiment results per (symbol, source) in memory, backed by SentimentCache rows
+
+    Lookups try the in-process LRU first and fall back to the database, so a
+    warm symbol costs no queries. An expired result is still served for up to
+    stale_seconds after expiry while one background refresh replaces it;
+    concurrent requests for the same key never start a second refresh. Only
+    a missing or fully stale result makes the caller wait for a fetch.
+    Partial results are returned but never cached.
+    """
+
+    def __init__(self, max_entries: int = 512, stale_seconds: int = 86400, app=None):
+        self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
+        self.app = app
+        self._entries = OrderedDict()
+        self._refreshing = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='sentiment-refresh')
+
+    def get_or_refresh(self, symbol: str, source: str, refresh: Callable[[], Dict],
+                       ttl_seconds: int, total_key: str = 'total_tweets') -> Dict:
+        """
+        Get a cached result, refreshing it in the background when expired
+
+        Args:
+            symbol: Stock symbol
+            source: SentimentCache source ('TWITTER', 'NEWS' or 'REDDIT')
+            refresh: Callable returning a fresh result dict
+            ttl_seconds: Seconds a new result stays fresh
+            total_key: Result key holding the item count ('total_tweets' or 'total_items')
+
+        Returns:
+            dict: Result with 'cached' True when served from cache and 'stale'
+                True when served past expiry
+
+        Raises:
+            Whatever refresh raises, when there is no usable cached result
+        """
+        symbol = symbol.upper().strip()
+        key = (symbol, source)
+        entry = self._get_entry(key, total_key)
+        now = datetime.utcnow()
+
+        if entry is not None and now < entry.expires_at:
+            return dict(entry.data, cached=True)
+
+        if entry is not None and now < entry.expires_at + timedelta(seconds=self.stale_seconds):
+            self._refresh_in_background(key, refresh, ttl_seconds)
+            return dict(entry.data, cached=True, stale=True)
+
+        data = refresh()
+        self._store_complete(symbol, source, data, ttl_seconds)
+        return data
+
+    def peek(self, symbol: str, source: str, total_key: str = 'total_tweets') -> Optional[Dict]:
+        """Get a cached result only if it has not expired"""
+        entry = self._get_entry((symbol.upper().strip(), source), total_key)
+        if entry is None or datetime.utcnow() >= entry.expires_at:
+            return None
+        return dict(entry.data, cached=True)
+
+    def store(self, symbol: str, source: str, data: Dict, ttl_seconds: int) -> None:
+        """
+        Cache a result in memory and in the sentiment_cache table
+
+        The database row is skipped for symbols that are not a known company.
+
+        Args:
+            symbol: Stock symbol
+            source: SentimentCache source
+            data: Result dict with positive, negative, neutral and average_polarity
+            ttl_seconds: Seconds the result stays fresh
+        """
+        symbol = symbol.upper().strip()
+        fetched_at = datetime.utcnow()
+        entry = CachedSentiment(data, fetched_at, fetched_at + timedelta(seconds=ttl_seconds))
+        self._remember((symbol, source), entry)
+
+        try:
+            company_id = db.session.query(Company.company_id).filter_by(symbol=symbol).scalar()
+            if company_id is None:
+                return
+            row = SentimentCache.query.filter_by(company_id=company_id, source=source).first()
+            if row is None:
+                row = SentimentCache(company_id=company_id, source=source)
+                db.session.add(row)
+            row.positive_count = data['positive']
+            row.negative_count = data['negative']
+            row.neutral_count = data['neutral']
+            row.polarity_score = round(float(data['average_polarity']), 2)
+            row.fetched_at = entry.fetched_at
+            row.expires_at = entry.expires_at
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Error storing sentiment cache for {symbol}: {e}")
+            db.session.rollback()
+
+    def purge_expired(self) -> int:
+        """
+        Delete rows and entries past expiry plus the stale window
+
+        Returns:
+            int: Number of database rows deleted
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry.expires_at < cutoff]:
+                del self._entries[key]
+
+        deleted = SentimentCache.query.filter(
+            SentimentCache.expires_at < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        logger.info(f"Purged {deleted} expired sentiment cache rows")
+        return deleted
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for background refreshes in flight"""
+        with self._lock:
+            futures = list(self._refreshing.values())
+        wait(futures, timeout=timeout)
+
+    def clear(self) -> None:
+        """Drop every in-memory entry (database rows are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_entry(self, key: Tuple[str, str], total_key: str) -> Optional[CachedSentiment]:
+        """Look up the LRU, then the database"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._load_row(key, total_key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def _load_row(self, key: Tuple[str, str], total_key: str) -> Optional[CachedSentiment]:
+        """Build an entry from the company's SentimentCache row, if any"""
+        symbol, source = key
+        try:
+            row = SentimentCache.query.join(
+                Company, SentimentCache.company_id == Company.company_id
+            ).filter(
+                Company.symbol == symbol,
+                SentimentCache.source == source
+            ).order_by(SentimentCache.fetched_at.desc()).first()
+        except Exception as e:
+            logger.error(f"Error retrieving cached sentiment for {symbol}: {e}")
+            return None
+        if row is None or row.fetched_at is None:
+            return None
+
+        data = {
+            'symbol': symbol,
+            'positive': row.positive_count,
+            'negative': row.negative_count,
+            'neutral': row.neutral_count,
+            total_key: row.positive_count + row.negative_count + row.neutral_count,
+            'average_polarity': float(row.polarity_score),
+            'sentiment': overall_sentiment(row.positive_count, row.negative_count, row.neutral_count),
+            'timestamp': row.fetched_at.isoformat()
+        }
+        return CachedSentiment(data, row.fetched_at, row.expires_at)
+
+    def _store_complete(self, symbol: str, source: str, data: Dict, ttl_seconds: int) -> None:
+        """Store a refreshed result unless it is partial (some source timed out)"""
+        if data.get('partial'):
+            return
+        self.store(symbol, source, data, ttl_seconds)
+
+    def _remember(self, key: Tuple[str, str], entry: CachedSentiment) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _refresh_in_background(self, key: Tuple[str, str], refresh: Callable[[], Dict], ttl_seconds: int) -> None:
+        """Start one refresh for a key unless one is already running"""
+        app = self.app or current_app._get_current_object()
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing[key] = self._executor.submit(self._run_refresh, app, key, refresh, ttl_seconds)
+
+    def _run_refresh(self, app, key: Tuple[str, str], refresh: Callable[[], Dict], ttl_seconds: int) -> None:
+        symbol, source = key
+        try:
+            with app.app_context():
+                self._store_complete(symbol, source, refresh(), ttl_seconds)
+            logger.info(f"Refreshed stale sentiment for {symbol} ({source})")
+        except Exception as e:
+            logger.warning(f"Background sentiment refresh failed for {symbol} ({source}): {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+
+def get_sentiment_cache() -> SentimentResultCache:
+    """
+    Get the sentiment result cache for the current application
+
+    Returns:
+        SentimentResultCache sized from SENTIMENT_FRONT_CACHE_SIZE and SENTIMENT_STALE_SECONDS
+    """
+    cache = current_app.extensions.get('sentiment_cache')
+    if cache is None:
+        cache = SentimentResultCache(
+            max_entries=current_app.config.get('SENTIMENT_FRONT_CACHE_SIZE', 512),
+            stale_seconds=current_app.config.get('SENTIMENT_STALE_SECONDS', 86400),
+            app=current_app._get_current_object()
+        )
+        current_app.extensions['sentiment_cache'] = cache
+    return cache
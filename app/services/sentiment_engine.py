@@ -3,31 +3,34 @@ Sentiment Engine Service
 Handles Twitter API integration and sentiment analysis for stock symbols
 """
 import logging
-import re
 import os
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 # Optional dependencies
-TEXTBLOB_AVAILABLE = False
 TWEEPY_AVAILABLE = False
-try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
-except Exception as _e:
-    logging.getLogger(__name__).warning(f"TextBlob not available: {_e}")
 try:
     import tweepy  # type: ignore
     TWEEPY_AVAILABLE = True
 except Exception as _e:
     logging.getLogger(__name__).warning(f"tweepy not available: {_e}")
 
-from app import db
 from app.models.sentiment_cache import SentimentCache
+from app.services.sentiment_cache import get_sentiment_cache
+from app.services.sentiment_ingestion import get_sentiment_ingestor
+from app.services.text_scoring import PATTERN_LEXICON_AVAILABLE, clean_text, get_text_scorer
 from app.utils.exceptions import ExternalAPIError
 
 logger = logging.getLogger(__name__)
 
+# Polarity comes from TextBlob's lexicon through text_scoring
+TEXTBLOB_AVAILABLE = PATTERN_LEXICON_AVAILABLE
+
+# SentimentCache source this engine's results are stored under
+CACHE_SOURCE = 'TWITTER'
+# Ingestion window name (shared with MultiSentimentEngine's Twitter source)
+INGEST_SOURCE = 'Twitter'
+
 
 class SentimentEngine:
     """Service for fetching tweets and analyzing sentiment"""
@@ -109,6 +112,23 @@ class SentimentEngine:
         Returns:
             List of tweet texts
             
+        Raises:
+            ExternalAPIError: If Twitter API call fails
+        """
+        return self.fetch_tweets_since(symbol, None, count)[0]
+    
+    def fetch_tweets_since(self, symbol: str, since_id: Optional[str], count: int = 100) -> Tuple[List[str], Optional[str]]:
+        """
+        Fetch tweets newer than a tweet ID
+        
+        Args:
+            symbol: Stock symbol (e.g., 'AAPL')
+            since_id: Only return tweets after this ID (None for the latest tweets)
+            count: Maximum number of tweets to fetch (max: 100)
+            
+        Returns:
+            Tuple of (tweet texts, newest tweet ID or None if nothing was returned)
+            
         Raises:
             ExternalAPIError: If Twitter API call fails
         """
@@ -117,6 +137,7 @@ class SentimentEngine:
         
         try:
             tweets = []
+            newest_id = None
             
             # Build search query
             query = f"${symbol} OR #{symbol} -is:retweet lang:en"
@@ -125,12 +146,15 @@ class SentimentEngine:
             if self.client:
                 response = self.client.search_recent_tweets(
                     query=query,
-                    max_results=min(count, 100),
+                    max_results=min(max(count, 10), 100),
+                    since_id=since_id,
                     tweet_fields=['created_at', 'public_metrics']
                 )
                 
                 if response.data:
-                    tweets = [tweet.text for tweet in response.data]
+                    kept = response.data[:count]
+                    tweets = [tweet.text for tweet in kept]
+                    newest_id = str(max(int(tweet.id) for tweet in kept))
                     logger.info(f"Fetched {len(tweets)} tweets for {symbol} using API v2")
             
             # Fallback to API v1.1
@@ -140,23 +164,23 @@ class SentimentEngine:
                     q=query,
                     lang='en',
                     result_type='recent',
-                    tweet_mode='extended'
+                    tweet_mode='extended',
+                    since_id=since_id
                 )
                 
+                ids = []
                 for tweet in cursor.items(min(count, 100)):
                     tweets.append(tweet.full_text)
+                    ids.append(tweet.id)
+                newest_id = str(max(ids)) if ids else None
                 
                 logger.info(f"Fetched {len(tweets)} tweets for {symbol} using API v1.1")
             
-            return tweets
+            return tweets, newest_id
             
         except Exception as e:
             logger.error(f"Twitter API error fetching tweets for {symbol}: {e}")
             raise ExternalAPIError(f"Failed to fetch tweets: {str(e)}")
-        
-        except Exception as e:
-            logger.error(f"Unexpected error fetching tweets for {symbol}: {e}")
-            raise ExternalAPIError(f"Failed to fetch tweets: {str(e)}")
     
     def clean_tweet(self, text: str) -> str:
         """
@@ -168,22 +192,7 @@ class SentimentEngine:
         Returns:
             Cleaned tweet text
         """
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-        
-        # Remove mentions (@username)
-        text = re.sub(r'@\w+', '', text)
-        
-        # Remove hashtags (keep the text, remove #)
-        text = re.sub(r'#', '', text)
-        
-        # Remove special characters and emojis
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        return text.strip()
+        return clean_text(text)
     
     def calculate_polarity(self, tweets: List[str]) -> Tuple[int, int, int, float]:
         """
@@ -195,39 +204,8 @@ class SentimentEngine:
         Returns:
             Tuple of (positive_count, negative_count, neutral_count, average_polarity)
         """
-        positive = 0
-        negative = 0
-        neutral = 0
-        total_polarity = 0.0
-        
-        for tweet in tweets:
-            # Clean the tweet
-            cleaned = self.clean_tweet(tweet)
-            
-            if not cleaned:
-                continue
-            
-            # Analyze sentiment using TextBlob
-            try:
-                analysis = TextBlob(cleaned)
-                polarity = analysis.sentiment.polarity
-                total_polarity += polarity
-                
-                # Classify sentiment
-                if polarity > 0.1:
-                    positive += 1
-                elif polarity < -0.1:
-                    negative += 1
-                else:
-                    neutral += 1
-                    
-            except Exception as e:
-                logger.warning(f"Error analyzing tweet sentiment: {e}")
-                neutral += 1
-        
-        # Calculate average polarity
-        total_tweets = positive + negative + neutral
-        avg_polarity = total_polarity / total_tweets if total_tweets > 0 else 0.0
+        # Cleaned, deduplicated and memoized by the shared scorer
+        positive, negative, neutral, avg_polarity = get_text_scorer().summarize(tweets)
         
         logger.info(f"Sentiment analysis: {positive} positive, {negative} negative, {neutral} neutral")
         
@@ -235,11 +213,15 @@ class SentimentEngine:
     
     def analyze_sentiment(self, symbol: str, tweet_count: int = 100) -> Dict:
         """
-        Fetch tweets and analyze sentiment for a stock symbol
+        Fetch new tweets and update the rolling sentiment for a stock symbol
+        
+        Only tweets newer than the last one ingested for the symbol are
+        fetched and scored; counts are a time-decayed aggregate over
+        everything ingested (see SentimentIngestor).
         
         Args:
             symbol: Stock symbol (e.g., 'AAPL')
-            tweet_count: Number of tweets to analyze (default: 100)
+            tweet_count: Maximum number of new tweets to fetch (default: 100)
             
         Returns:
             Dictionary with sentiment analysis results
@@ -253,46 +235,27 @@ class SentimentEngine:
         try:
             symbol = symbol.upper().strip()
             logger.info(f"Starting sentiment analysis for {symbol}")
+            ingestor = get_sentiment_ingestor()
             
-            # Fetch tweets
-            tweets = self.fetch_tweets(symbol, tweet_count)
-            
-            if not tweets:
-                logger.warning(f"No tweets found for {symbol}")
-                return {
-                    'symbol': symbol,
-                    'positive': 0,
-                    'negative': 0,
-                    'neutral': 0,
-                    'total_tweets': 0,
-                    'average_polarity': 0.0,
-                    'sentiment': 'NEUTRAL',
-                    'timestamp': datetime.utcnow().isoformat()
-                }
-            
-            # Calculate sentiment
-            positive, negative, neutral, avg_polarity = self.calculate_polarity(tweets)
-            
-            # Determine overall sentiment
-            if positive > negative and positive > neutral:
-                overall_sentiment = 'POSITIVE'
-            elif negative > positive and negative > neutral:
-                overall_sentiment = 'NEGATIVE'
-            else:
-                overall_sentiment = 'NEUTRAL'
+            # Fetch and score only what arrived since the last refresh
+            tweets, newest_id = self.fetch_tweets_since(symbol, ingestor.watermark(symbol, INGEST_SOURCE), tweet_count)
+            ingestor.ingest(symbol, INGEST_SOURCE, get_text_scorer().score(tweets), newest_id)
             
+            window = ingestor.snapshot(symbol, [INGEST_SOURCE])
             result = {
                 'symbol': symbol,
-                'positive': positive,
-                'negative': negative,
-                'neutral': neutral,
-                'total_tweets': len(tweets),
-                'average_polarity': round(avg_polarity, 4),
-                'sentiment': overall_sentiment,
+                'positive': window['positive'],
+                'negative': window['negative'],
+                'neutral': window['neutral'],
+                'total_tweets': window['positive'] + window['negative'] + window['neutral'],
+                'new_tweets': len(tweets),
+                'average_polarity': window['average_polarity'],
+                'sentiment': window['sentiment'],
                 'timestamp': datetime.utcnow().isoformat()
             }
             
-            logger.info(f"Sentiment analysis completed for {symbol}: {overall_sentiment}")
+            logger.info(f"Sentiment analysis completed for {symbol}: {result['sentiment']} "
+                        f"({len(tweets)} new tweets)")
             return result
             
         except ExternalAPIError:
@@ -312,73 +275,21 @@ class SentimentEngine:
             Cached sentiment data or None if not available/expired
         """
         try:
-            symbol = symbol.upper().strip()
-            
-            # Query cache
-            cache_entry = SentimentCache.query.filter_by(symbol=symbol).first()
-            
-            if cache_entry and self.is_cache_valid(cache_entry):
-                logger.info(f"Using cached sentiment data for {symbol}")
-                return {
-                    'symbol': cache_entry.symbol,
-                    'positive': cache_entry.positive_count,
-                    'negative': cache_entry.negative_count,
-                    'neutral': cache_entry.neutral_count,
-                    'total_tweets': cache_entry.total_tweets,
-                    'average_polarity': float(cache_entry.average_polarity),
-                    'sentiment': cache_entry.overall_sentiment,
-                    'timestamp': cache_entry.analyzed_at.isoformat(),
-                    'cached': True
-                }
-            
-            return None
-            
+            return get_sentiment_cache().peek(symbol, CACHE_SOURCE)
         except Exception as e:
             logger.error(f"Error retrieving cached sentiment for {symbol}: {e}")
             return None
     
-    def store_sentiment_cache(self, symbol: str, sentiment_data: Dict):
+    def store_sentiment_cache(self, symbol: str, sentiment_data: Dict, cache_duration_hours: int = 1):
         """
         Store sentiment analysis results in cache
         
         Args:
             symbol: Stock symbol
             sentiment_data: Sentiment analysis results
+            cache_duration_hours: Cache validity duration in hours (default: 1)
         """
-        try:
-            symbol = symbol.upper().strip()
-            
-            # Check if cache entry exists
-            cache_entry = SentimentCache.query.filter_by(symbol=symbol).first()
-            
-            if cache_entry:
-                # Update existing entry
-                cache_entry.positive_count = sentiment_data['positive']
-                cache_entry.negative_count = sentiment_data['negative']
-                cache_entry.neutral_count = sentiment_data['neutral']
-                cache_entry.total_tweets = sentiment_data['total_tweets']
-                cache_entry.average_polarity = sentiment_data['average_polarity']
-                cache_entry.overall_sentiment = sentiment_data['sentiment']
-                cache_entry.analyzed_at = datetime.utcnow()
-            else:
-                # Create new entry
-                cache_entry = SentimentCache(
-                    symbol=symbol,
-                    positive_count=sentiment_data['positive'],
-                    negative_count=sentiment_data['negative'],
-                    neutral_count=sentiment_data['neutral'],
-                    total_tweets=sentiment_data['total_tweets'],
-                    average_polarity=sentiment_data['average_polarity'],
-                    overall_sentiment=sentiment_data['sentiment']
-                )
-                db.session.add(cache_entry)
-            
-            db.session.commit()
-            logger.info(f"Sentiment data cached for {symbol}")
-            
-        except Exception as e:
-            logger.error(f"Error storing sentiment cache for {symbol}: {e}")
-            db.session.rollback()
+        get_sentiment_cache().store(symbol, CACHE_SOURCE, sentiment_data, int(cache_duration_hours * 3600))
     
     def is_cache_valid(self, cache_entry: SentimentCache, duration_hours: int = 1) -> bool:
         """
@@ -391,14 +302,14 @@ class SentimentEngine:
         Returns:
             True if cache is still valid, False otherwise
         """
-        if not cache_entry or not cache_entry.analyzed_at:
+        if not cache_entry or not cache_entry.fetched_at:
             return False
         
-        expiry_time = cache_entry.analyzed_at + timedelta(hours=duration_hours)
+        expiry_time = cache_entry.fetched_at + timedelta(hours=duration_hours)
         is_valid = datetime.utcnow() < expiry_time
         
         if not is_valid:
-            logger.info(f"Cache expired for {cache_entry.symbol}")
+            logger.info(f"Cache expired for company {cache_entry.company_id}")
         
         return is_valid
     
@@ -411,6 +322,10 @@ class SentimentEngine:
         """
         Get sentiment analysis with caching support
         
+        Served from the in-process cache, then the sentiment_cache table. An
+        expired result within SENTIMENT_STALE_SECONDS is returned immediately
+        (marked stale) while a background refresh replaces it.
+        
         Args:
             symbol: Stock symbol
             tweet_count: Number of tweets to analyze if cache miss
@@ -418,23 +333,13 @@ class SentimentEngine:
             
         Returns:
             Sentiment analysis results (from cache or fresh analysis)
+            
+        Raises:
+            ExternalAPIError: If there is no usable cached result and the analysis fails
         """
-        # Check cache first
-        cached_data = self.get_cached_sentiment(symbol)
-        
-        if cached_data:
-            # Verify cache is still valid with custom duration
-            cache_entry = SentimentCache.query.filter_by(symbol=symbol.upper()).first()
-            if cache_entry and self.is_cache_valid(cache_entry, cache_duration_hours):
-                return cached_data
-        
-        # Cache miss or expired - perform fresh analysis
-        if not self.enabled:
-            raise ExternalAPIError("Sentiment analysis is not enabled")
-        
-        sentiment_data = self.analyze_sentiment(symbol, tweet_count)
-        
-        # Store in cache
-        self.store_sentiment_cache(symbol, sentiment_data)
-        
-        return sentiment_data
+        return get_sentiment_cache().get_or_refresh(
+            symbol,
+            CACHE_SOURCE,
+            lambda: self.analyze_sentiment(symbol, tweet_count),
+            ttl_seconds=int(cache_duration_hours * 3600)
+        )
@@ -0,0 +1,263 @@
+"""
+Sentiment Ingestion
+Per-symbol, per-source watermarks and time-decayed rolling sentiment counts
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from app import db
+from app.models.sentiment_watermark import SentimentWatermark
+from app.services.sentiment_cache import overall_sentiment
+from app.services.text_scoring import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentWindow:
+    """
+    Rolling sentiment for one symbol and source
+
+    Counts and the polarity sum decay exponentially with the configured
+    half-life, so old items fade out without being stored or rescored.
+    """
+
+    __slots__ = ('watermark', 'positive', 'negative', 'neutral', 'polarity', 'updated_at')
+
+    def __init__(self):
+        self.watermark = None
+        self.positive = 0.0
+        self.negative = 0.0
+        self.neutral = 0.0
+        self.polarity = 0.0
+        self.updated_at = None
+
+    @property
+    def weight(self) -> float:
+        return self.positive + self.negative + self.neutral
+
+    @classmethod
+    def from_row(cls, row: SentimentWatermark) -> 'SentimentWindow':
+        """Window holding a stored row's watermark and counts"""
+        window = cls()
+        window.watermark = row.watermark
+        window.positive = row.positive or 0.0
+        window.negative = row.negative or 0.0
+        window.neutral = row.neutral or 0.0
+        window.polarity = row.polarity or 0.0
+        window.updated_at = row.updated_at
+        return window
+
+    def to_row(self, row: SentimentWatermark) -> None:
+        """Copy the watermark and counts onto a stored row"""
+        row.watermark = self.watermark
+        row.positive = self.positive
+        row.negative = self.negative
+        row.neutral = self.neutral
+        row.polarity = self.polarity
+        row.updated_at = self.updated_at
+
+    def decay(self, now: datetime, half_life_seconds: float) -> None:
+        """Age the counts to now"""
+        if self.updated_at is not None and now > self.updated_at:
+            factor = 0.5 ** ((now - self.updated_at).total_seconds() / half_life_seconds)
+            self.positive *= factor
+            self.negative *= factor
+            self.neutral *= factor
+            self.polarity *= factor
+        if self.updated_at is None or now > self.updated_at:
+            self.updated_at = now
+
+    def add(self, scores: Iterable[Optional[float]]) -> int:
+        """Add newly scored items (None scores are skipped); returns the number added"""
+        added = 0
+        for score in scores:
+            if score is None:
+                continue
+            if score > POSITIVE_THRESHOLD:
+                self.positive += 1
+            elif score < NEGATIVE_THRESHOLD:
+                self.negative += 1
+            else:
+                self.neutral += 1
+            self.polarity += score
+            added += 1
+        return added
+
+
+class SentimentIngestor:
+    """
+    Watermarks and rolling windows for every (symbol, source)
+
+    A refresh fetches only items newer than the source's watermark, scores
+    them once and folds them into the window, so its cost follows the amount
+    of new content rather than the fetch size. With persist, windows are kept
+    in the sentiment_watermarks table whenever an application context is
+    active, so every worker process sees the same watermarks and counts and
+    they survive restarts; otherwise they live in this process only. If the
+    table is unavailable (a database created before it; rerun flask init-db)
+    the ingestor logs one warning and keeps windows in this process.
+    """
+
+    def __init__(self, half_life_hours: float = 6.0, persist: bool = False):
+        self.half_life_seconds = half_life_hours * 3600
+        self.persist = persist
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def _persistent(self) -> bool:
+        return self.persist and has_app_context()
+
+    def _stop_persisting(self, error: Exception) -> None:
+        """Fall back to in-process windows after the table turned out to be unusable"""
+        db.session.rollback()
+        self.persist = False
+        logger.warning(f"sentiment_watermarks unavailable, keeping sentiment windows in this process "
+                       f"(run flask init-db to create it): {error}")
+
+    def watermark(self, symbol: str, source: str) -> Optional[str]:
+        """Get the newest item id or timestamp already ingested for a source"""
+        symbol = symbol.upper()
+        if self._persistent():
+            try:
+                row = SentimentWatermark.query.filter_by(symbol=symbol, source=source).first()
+                return row.watermark if row else None
+            except OperationalError as e:
+                self._stop_persisting(e)
+        with self._lock:
+            window = self._windows.get((symbol, source))
+            return window.watermark if window else None
+
+    def ingest(self, symbol: str, source: str, scores: List[Optional[float]],
+               watermark: Optional[str] = None, at: Optional[datetime] = None) -> int:
+        """
+        Fold newly fetched item scores into a source's window
+
+        Args:
+            symbol: Stock symbol
+            source: Source name (e.g. 'Twitter', 'News')
+            scores: Polarity per new item (None for items with no scorable text)
+            watermark: Newest item id/timestamp fetched (keeps the old one if None)
+            at: Time of the fetch (default now, UTC)
+
+        Returns:
+            int: Number of items added
+        """
+        symbol = symbol.upper()
+        now = at or datetime.utcnow()
+        if self._persistent():
+            try:
+                row = SentimentWatermark.query.filter_by(symbol=symbol, source=source).with_for_update().first()
+                if row is None:
+                    row = SentimentWatermark(symbol=symbol, source=source)
+                    db.session.add(row)
+                    window = SentimentWindow()
+                else:
+                    window = SentimentWindow.from_row(row)
+                added = self._fold(window, scores, watermark, now)
+                window.to_row(row)
+                db.session.commit()
+                return added
+            except OperationalError as e:
+                self._stop_persisting(e)
+            except SQLAlchemyError:
+                db.session.rollback()
+                raise
+        with self._lock:
+            window = self._windows.setdefault((symbol, source), SentimentWindow())
+            return self._fold(window, scores, watermark, now)
+
+    def _fold(self, window: SentimentWindow, scores: List[Optional[float]],
+              watermark: Optional[str], now: datetime) -> int:
+        window.decay(now, self.half_life_seconds)
+        added = window.add(scores)
+        if watermark is not None:
+            window.watermark = watermark
+        return added
+
+    def snapshot(self, symbol: str, sources: Iterable[str], at: Optional[datetime] = None) -> Dict:
+        """
+        Combine the decayed windows of several sources
+
+        Args:
+            symbol: Stock symbol
+            sources: Source names to combine
+            at: Time to decay to (default now, UTC)
+
+        Returns:
+            dict: Rounded positive/negative/neutral counts, their unrounded
+                weights, average_polarity, sentiment label and the sources with content
+        """
+        symbol = symbol.upper()
+        sources = list(sources)
+        now = at or datetime.utcnow()
+        windows = None
+        if self._persistent():
+            try:
+                rows = SentimentWatermark.query.filter(
+                    SentimentWatermark.symbol == symbol,
+                    SentimentWatermark.source.in_(sources)
+                ).all()
+                stored = {row.source: SentimentWindow.from_row(row) for row in rows}
+                windows = [(source, stored[source]) for source in sources if source in stored]
+            except OperationalError as e:
+                self._stop_persisting(e)
+        if windows is None:
+            with self._lock:
+                windows = [(source, self._windows[(symbol, source)]) for source in sources
+                           if (symbol, source) in self._windows]
+
+        positive = negative = neutral = polarity = 0.0
+        with_content = []
+        with self._lock:
+            for source, window in windows:
+                window.decay(now, self.half_life_seconds)
+                positive += window.positive
+                negative += window.negative
+                neutral += window.neutral
+                polarity += window.polarity
+                if window.weight > 0:
+                    with_content.append(source)
+
+        weight = positive + negative + neutral
+        counts = [int(round(value)) for value in (positive, negative, neutral)]
+        return {
+            'positive': counts[0],
+            'negative': counts[1],
+            'neutral': counts[2],
+            'weights': {
+                'positive': round(positive, 4),
+                'negative': round(negative, 4),
+                'neutral': round(neutral, 4)
+            },
+            'average_polarity': round(polarity / weight, 4) if weight > 0 else 0.0,
+            'sentiment': overall_sentiment(positive, negative, neutral),
+            'sources': with_content
+        }
+
+
+_ingestor = None
+_ingestor_lock = threading.Lock()
+
+
+def get_sentiment_ingestor() -> SentimentIngestor:
+    """
+    Get the process-wide sentiment ingestor
+
+    Configured from SENTIMENT_DECAY_HALF_LIFE_HOURS when first used inside an
+    application context, with the default otherwise. Its windows are stored in
+    the sentiment_watermarks table while an application context is active.
+
+    Returns:
+        SentimentIngestor
+    """
+    global _ingestor
+    with _ingestor_lock:
+        if _ingestor is None:
+            config = current_app.config if has_app_context() else {}
+            _ingestor = SentimentIngestor(config.get('SENTIMENT_DECAY_HALF_LIFE_HOURS', 6.0), persist=True)
+        return _ingestor
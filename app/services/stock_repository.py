@@ -8,21 +8,23 @@ from datetime import datetime, date, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Tuple
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from sqlalchemy import or_, and_, desc, func
+from sqlalchemy import or_, and_, desc
 from sqlalchemy.exc import SQLAlchemyError
 from flask import current_app
 
 from app import db
 from app.models.company import Company
 from app.models.price_history import PriceHistory
-from app.models.order import Order
 from app.utils.exceptions import (
     ValidationError, 
     ExternalAPIError, 
     StockNotFoundError
 )
 from app.utils.error_handlers import handle_errors
+from app.services.market_data import get_market_data_provider, LocalCSVProvider
+from app.services.trade_counters import get_trade_counters
 
 logger = logging.getLogger(__name__)
 
@@ -119,7 +121,7 @@ class StockRepository:
     
     def _fetch_company_info_from_yfinance(self, symbol: str) -> Dict:
         """
-        Fetch company information from yfinance
+        Fetch company information from the configured market data provider
         
         Args:
             symbol: Stock symbol
@@ -130,28 +132,7 @@ class StockRepository:
         Raises:
             ExternalAPIError: If fetch fails
         """
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            
-            if not info or 'symbol' not in info:
-                raise StockNotFoundError(f"Stock symbol not found: {symbol}")
-            
-            return {
-                'company_name': info.get('longName', info.get('shortName', symbol)),
-                'sector': info.get('sector'),
-                'industry': info.get('industry'),
-                'market_cap': info.get('marketCap'),
-                'description': info.get('longBusinessSummary'),
-                'website': info.get('website'),
-                'ceo': info.get('companyOfficers', [{}])[0].get('name') if info.get('companyOfficers') else None,
-                'employees': info.get('fullTimeEmployees'),
-                'founded_year': None,  # Not available in yfinance
-                'headquarters': f"{info.get('city', '')}, {info.get('state', '')}, {info.get('country', '')}".strip(', ')
-            }
-        except Exception as e:
-            logger.error(f"Failed to fetch company info for {symbol}: {str(e)}")
-            raise ExternalAPIError(f"Failed to fetch company information: {str(e)}")
+        return get_market_data_provider().get_company_info(symbol)
     
     @handle_errors('database')
     def update_company(self, company_id: int, data: Dict) -> Company:
@@ -256,34 +237,24 @@ class StockRepository:
         Returns:
             List of dictionaries with stock info and trade count
         """
-        # Get stocks with most orders in last 24 hours
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        
-        trending = db.session.query(
-            Company.company_id,
-            Company.symbol,
-            Company.company_name,
-            Company.sector,
-            func.count(Order.order_id).label('trade_count')
-        ).join(
-            Order, Company.company_id == Order.company_id
-        ).filter(
-            Order.created_at >= yesterday,
-            Order.order_status == 'COMPLETED'
-        ).group_by(
-            Company.company_id
-        ).order_by(
-            desc('trade_count')
-        ).limit(limit).all()
+        # Most completed orders over the rolling window (last 24 hours)
+        top = get_trade_counters().top_window(limit)
+        companies = {
+            company.company_id: company
+            for company in Company.query.filter(Company.company_id.in_([cid for cid, _ in top])).all()
+        } if top else {}
         
         result = []
-        for item in trending:
+        for company_id, trade_count in top:
+            company = companies.get(company_id)
+            if company is None:
+                continue
             result.append({
-                'company_id': item.company_id,
-                'symbol': item.symbol,
-                'company_name': item.company_name,
-                'sector': item.sector,
-                'trade_count': item.trade_count
+                'company_id': company.company_id,
+                'symbol': company.symbol,
+                'company_name': company.company_name,
+                'sector': company.sector,
+                'trade_count': trade_count
             })
         
         logger.info(f"Retrieved {len(result)} trending stocks")
@@ -362,7 +333,7 @@ class StockRepository:
     @handle_errors('external_api')
     def fetch_live_price(self, symbol: str) -> Decimal:
         """
-        Fetch live price from yfinance
+        Fetch live price from the configured market data provider
         
         Args:
             symbol: Stock symbol
@@ -373,34 +344,7 @@ class StockRepository:
         Raises:
             ExternalAPIError: If fetch fails
         """
-        try:
-            ticker = yf.Ticker(symbol)
-            
-            # Try to get current price from info
-            info = ticker.info
-            
-            # Try different price fields
-            price = None
-            for field in ['currentPrice', 'regularMarketPrice', 'previousClose']:
-                if field in info and info[field]:
-                    price = info[field]
-                    break
-            
-            if price is None:
-                # Fallback: get latest from history
-                hist = ticker.history(period='1d')
-                if not hist.empty:
-                    price = hist['Close'].iloc[-1]
-            
-            if price is None:
-                raise StockNotFoundError(f"Could not fetch price for {symbol}")
-            
-            logger.info(f"Fetched live price for {symbol}: ${price}")
-            return Decimal(str(price))
-            
-        except Exception as e:
-            logger.error(f"Failed to fetch live price for {symbol}: {str(e)}")
-            raise ExternalAPIError(f"Failed to fetch live price: {str(e)}")
+        return get_market_data_provider().get_current_price(symbol)
     
     @handle_errors('database')
     def get_price_history(
@@ -440,6 +384,53 @@ class StockRepository:
         logger.info(f"Retrieved {len(history)} price records for {symbol}")
         return history
     
+    @handle_errors('database')
+    def get_price_arrays(
+        self,
+        symbol: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get price history as column arrays, without loading PriceHistory objects
+        
+        Args:
+            symbol: Stock symbol
+            start_date: Start date (default: 1 year before end_date)
+            end_date: End date (default: today)
+            
+        Returns:
+            Dict of date (datetime64[D]), open, high, low, close (float) and
+            volume (int) arrays, in date order
+        """
+        company = self.get_company_by_symbol(symbol)
+        if not company:
+            raise ValidationError(f"Company not found: {symbol}")
+        
+        if not end_date:
+            end_date = date.today()
+        if not start_date:
+            start_date = end_date - timedelta(days=365)
+        
+        rows = db.session.query(
+            PriceHistory.date, PriceHistory.open, PriceHistory.high,
+            PriceHistory.low, PriceHistory.close, PriceHistory.volume
+        ).filter(
+            PriceHistory.company_id == company.company_id,
+            PriceHistory.date >= start_date,
+            PriceHistory.date <= end_date
+        ).order_by(PriceHistory.date).all()
+        
+        columns = list(zip(*rows)) if rows else [()] * 6
+        return {
+            'date': np.array(columns[0], dtype='datetime64[D]'),
+            'open': np.array(columns[1], dtype=float),
+            'high': np.array(columns[2], dtype=float),
+            'low': np.array(columns[3], dtype=float),
+            'close': np.array(columns[4], dtype=float),
+            'volume': np.array([v or 0 for v in columns[5]], dtype=np.int64)
+        }
+    
     @handle_errors('database')
     def update_price_history(self, symbol: str, data: pd.DataFrame) -> int:
         """
@@ -557,16 +548,16 @@ class StockRepository:
         Raises:
             ValidationError: If CSV file not found or date not in file
         """
-        static_dir = current_app.config.get('STATIC_DATA_DIR')
-        csv_path = os.path.join(static_dir, f"{symbol}.csv")
+        # Parsed CSVs are kept on the app so each file is read once
+        provider = current_app.extensions.get('static_market_data')
+        if provider is None:
+            provider = LocalCSVProvider([current_app.config.get('STATIC_DATA_DIR')])
+            current_app.extensions['static_market_data'] = provider
         
-        if not os.path.exists(csv_path):
+        if not provider.has_symbol(symbol):
             raise ValidationError(f"Static data file not found for {symbol}")
         
         try:
-            # Read CSV file
-            df = pd.read_csv(csv_path, parse_dates=['Date'], index_col='Date')
-            
             # Determine target date
             if not target_date:
                 sim_date_str = current_app.config.get('SIMULATION_DATE')
@@ -575,20 +566,12 @@ class StockRepository:
                 else:
                     target_date = date.today()
             
-            # Find the closest date in the CSV (on or before target date)
-            df_dates = df.index.date
-            valid_dates = [d for d in df_dates if d <= target_date]
-            
-            if not valid_dates:
-                raise ValidationError(f"No data available for {symbol} on or before {target_date}")
-            
-            closest_date = max(valid_dates)
-            price_row = df[df.index.date == closest_date].iloc[0]
-            
-            price = Decimal(str(price_row['Close']))
-            logger.info(f"Retrieved static price for {symbol} on {closest_date}: ${price}")
+            price = provider.get_price_on(symbol, target_date)
+            logger.info(f"Retrieved static price for {symbol} on or before {target_date}: ${price}")
             return price
             
+        except StockNotFoundError as e:
+            raise ValidationError(str(e))
         except Exception as e:
             logger.error(f"Failed to read static price for {symbol}: {str(e)}")
             raise ValidationError(f"Failed to read static data: {str(e)}")
@@ -610,6 +593,58 @@ class StockRepository:
         else:
             return self.get_current_price(symbol)
     
+    def get_current_prices_with_mode(self, symbols: List[str]) -> Dict[str, Decimal]:
+        """
+        Get current prices for several symbols in one pass, respecting DATA_MODE
+        
+        In LIVE mode cached prices are used first, then today's stored closes
+        (one query for all symbols), then one batch request to the market
+        data provider for whatever is left.
+        
+        Args:
+            symbols: Stock symbols
+            
+        Returns:
+            Dict of symbol to current price
+            
+        Raises:
+            ValidationError: If any symbol cannot be priced
+        """
+        symbols = sorted({symbol.upper().strip() for symbol in symbols})
+        
+        if current_app.config.get('DATA_MODE', 'LIVE') == 'STATIC':
+            return {symbol: self._get_static_price(symbol) for symbol in symbols}
+        
+        prices = {}
+        now = datetime.utcnow()
+        for symbol in symbols:
+            cached = self.price_cache.get(f"{symbol}_price")
+            if cached and (now - cached['timestamp']).total_seconds() < self.cache_duration:
+                prices[symbol] = cached['price']
+        
+        remaining = [symbol for symbol in symbols if symbol not in prices]
+        if remaining:
+            todays_closes = db.session.query(Company.symbol, PriceHistory.close).join(
+                PriceHistory, PriceHistory.company_id == Company.company_id
+            ).filter(
+                Company.symbol.in_(remaining),
+                PriceHistory.date == date.today()
+            ).all()
+            for symbol, close in todays_closes:
+                prices[symbol] = close
+                self._cache_price(symbol, close)
+        
+        remaining = [symbol for symbol in symbols if symbol not in prices]
+        if remaining:
+            for symbol, price in get_market_data_provider().get_current_prices(remaining).items():
+                prices[symbol] = price
+                self._cache_price(symbol, price)
+        
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            raise ValidationError(f"Unable to fetch current price for {', '.join(missing)}")
+        return prices
+    
     def download_and_save_stock_data(
         self, 
         symbol: str, 
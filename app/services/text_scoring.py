@@ -0,0 +1,224 @@
+"""
+Text Scoring
+Batched, memoized sentiment polarity scoring shared by the sentiment engines
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from flask import current_app, has_app_context
+
+# Optional dependency: TextBlob's bundled pattern lexicon
+PATTERN_LEXICON_AVAILABLE = False
+try:
+    from textblob.en import sentiment as pattern_sentiment
+    PATTERN_LEXICON_AVAILABLE = True
+except Exception as _e:
+    logging.getLogger(__name__).warning(f"TextBlob lexicon not available: {_e}")
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+# URLs, mentions, then any other non-word character (which covers '#'), in one pass
+_CLEAN_PATTERN = re.compile(r'http\S+|www\S+|@\w+|[^\w\s]')
+
+
+def clean_text(text: str) -> str:
+    """
+    Remove URLs, mentions, hashtag marks and special characters, and collapse whitespace
+
+    Args:
+        text: Raw tweet or headline text
+
+    Returns:
+        Cleaned text ('' when nothing scorable is left)
+    """
+    return ' '.join(_CLEAN_PATTERN.sub('', text).split())
+
+
+def lexicon_polarity(text: str) -> float:
+    """
+    Score one cleaned text with TextBlob's pattern lexicon
+
+    This is the lookup TextBlob(text).sentiment performs, without building a
+    TextBlob per text. Texts score 0.0 (neutral) when TextBlob is not installed.
+
+    Args:
+        text: Cleaned text
+
+    Returns:
+        float: Polarity in [-1, 1]
+    """
+    if not PATTERN_LEXICON_AVAILABLE:
+        return 0.0
+    return float(pattern_sentiment(text)[0])
+
+
+def _score_chunk(texts: List[str]) -> List[float]:
+    """Score a chunk of texts in a worker process"""
+    return [lexicon_polarity(text) for text in texts]
+
+
+def _content_key(text: str) -> bytes:
+    """Fixed-size key for a cleaned text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class ScoreCache:
+    """Bounded LRU of polarity scores keyed by cleaned-text hash"""
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, float]:
+        """Get cached scores for the keys that have one"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                score = self._entries.get(key)
+                if score is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = score
+        return found
+
+    def set_many(self, scores: Dict[bytes, float]) -> None:
+        """Store scores, evicting the least recently used past max_entries"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, score in scores.items():
+                self._entries[key] = score
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TextScorer:
+    """
+    Scores batches of texts: clean once, dedupe by content, score only what is new
+
+    Retweets and syndicated headlines clean to the same text, so each distinct
+    text is scored once per batch and then served from the LRU across symbols
+    and refreshes. Large batches of new texts are split across a process pool
+    when processes is positive.
+    """
+
+    def __init__(self, polarity: Optional[Callable[[str], float]] = None, cache_size: int = 50000,
+                 processes: int = 0, min_parallel_batch: int = 2000):
+        self.polarity = polarity or lexicon_polarity
+        self.cache = ScoreCache(cache_size)
+        self.processes = processes
+        self.min_parallel_batch = min_parallel_batch
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def score(self, texts: Sequence[str]) -> List[Optional[float]]:
+        """
+        Get the polarity of each text
+
+        Args:
+            texts: Raw texts
+
+        Returns:
+            list: Polarity per text, or None where the cleaned text is empty
+        """
+        cleaned = [clean_text(text) for text in texts]
+        keys = [_content_key(text) if text else None for text in cleaned]
+
+        unique = {}
+        for key, text in zip(keys, cleaned):
+            if key is not None:
+                unique.setdefault(key, text)
+
+        scores = self.cache.get_many(list(unique))
+        missing = [key for key in unique if key not in scores]
+        if missing:
+            new_scores = dict(zip(missing, self._score_new([unique[key] for key in missing])))
+            self.cache.set_many(new_scores)
+            scores.update(new_scores)
+
+        return [scores[key] if key is not None else None for key in keys]
+
+    def summarize(self, texts: Sequence[str]) -> Tuple[int, int, int, float]:
+        """
+        Classify texts and average their polarity
+
+        Texts that clean to nothing are not counted.
+
+        Args:
+            texts: Raw texts
+
+        Returns:
+            Tuple of (positive_count, negative_count, neutral_count, average_polarity)
+        """
+        scores = [score for score in self.score(texts) if score is not None]
+        positive = sum(1 for score in scores if score > POSITIVE_THRESHOLD)
+        negative = sum(1 for score in scores if score < NEGATIVE_THRESHOLD)
+        neutral = len(scores) - positive - negative
+        average = sum(scores) / len(scores) if scores else 0.0
+        return positive, negative, neutral, average
+
+    def _score_new(self, texts: List[str]) -> List[float]:
+        """Score texts not in the cache, on the process pool for large batches"""
+        if self.processes > 0 and self.polarity is lexicon_polarity and len(texts) >= self.min_parallel_batch:
+            try:
+                chunk_size = -(-len(texts) // (self.processes * 4))
+                chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+                return [score for chunk in self._get_pool().map(_score_chunk, chunks) for score in chunk]
+            except Exception as e:
+                logger.warning(f"Process pool scoring failed, scoring in-process: {e}")
+
+        scores = []
+        for text in texts:
+            try:
+                scores.append(float(self.polarity(text)))
+            except Exception as e:
+                logger.warning(f"Error analyzing sentiment: {e}")
+                scores.append(0.0)
+        return scores
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes)
+            return self._pool
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_text_scorer() -> TextScorer:
+    """
+    Get the process-wide text scorer
+
+    Configured from SENTIMENT_SCORE_CACHE_SIZE and SENTIMENT_SCORING_PROCESSES
+    when first used inside an application context, with defaults otherwise.
+
+    Returns:
+        TextScorer
+    """
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            config = current_app.config if has_app_context() else {}
+            _scorer = TextScorer(
+                cache_size=config.get('SENTIMENT_SCORE_CACHE_SIZE', 50000),
+                processes=config.get('SENTIMENT_SCORING_PROCESSES', 0)
+            )
+        return _scorer
@@ -0,0 +1,179 @@
+"""
+Trade Counters
+Rolling in-memory counts of completed orders per company
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models.order import Order
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class TradeCounters:
+    """
+    Completed-order counts per company, all time and over a rolling window
+
+    The window is kept as fixed-width time buckets (5 minutes over 24 hours by
+    default), so expiring old trades subtracts whole buckets instead of
+    rescanning orders. Counts are rebuilt from the database on first use and
+    again every resync_interval seconds, which picks up orders completed by
+    other processes.
+    """
+
+    def __init__(self, window=timedelta(hours=24), bucket=timedelta(minutes=5), resync_interval=300):
+        self.bucket_seconds = int(bucket.total_seconds())
+        self.bucket_count = max(1, int(window.total_seconds() // self.bucket_seconds))
+        self.resync_interval = resync_interval
+        self._buckets = deque()  # (bucket index, Counter), oldest first
+        self._window_counts = Counter()
+        self._all_time_counts = Counter()
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def record(self, company_id: int, at: Optional[datetime] = None) -> None:
+        """
+        Count a completed order
+
+        Args:
+            company_id: Company the order was for
+            at: Order time (default now, UTC)
+        """
+        with self._lock:
+            if self._synced_at is None:
+                return  # The next rebuild will include this order
+            self._all_time_counts[company_id] += 1
+
+            index = self._bucket_index(at or datetime.utcnow())
+            if index <= self._current_index() - self.bucket_count:
+                return
+            self._add_to_window(index, company_id, 1)
+
+    def top_window(self, k: int) -> List[Tuple[int, int]]:
+        """Get the k companies with most orders in the rolling window as (company_id, count)"""
+        with self._lock:
+            self._expire()
+            return self._top(self._window_counts, k)
+
+    def top_all_time(self, k: int) -> List[Tuple[int, int]]:
+        """Get the k companies with most orders overall as (company_id, count)"""
+        with self._lock:
+            return self._top(self._all_time_counts, k)
+
+    def needs_rebuild(self) -> bool:
+        """Check whether the counts are missing or older than the resync interval"""
+        return self._synced_at is None or time.monotonic() - self._synced_at >= self.resync_interval
+
+    def rebuild(self) -> None:
+        """Reload all counts from completed orders in the database"""
+        window_start = EPOCH + timedelta(
+            seconds=(self._current_index() - self.bucket_count + 1) * self.bucket_seconds
+        )
+
+        all_time = db.session.query(
+            Order.company_id, func.count(Order.order_id)
+        ).filter(
+            Order.order_status == 'COMPLETED'
+        ).group_by(Order.company_id).all()
+
+        recent = db.session.query(Order.company_id, Order.created_at).filter(
+            Order.order_status == 'COMPLETED',
+            Order.created_at >= window_start
+        ).all()
+
+        self.load(all_time, recent)
+        logger.info(f"Rebuilt trade counters: {len(self._all_time_counts)} companies, "
+                    f"{len(recent)} orders in window")
+
+    def load(self, all_time_counts, recent_orders) -> None:
+        """
+        Replace all counts
+
+        Args:
+            all_time_counts: Iterable of (company_id, completed order count)
+            recent_orders: Iterable of (company_id, created_at) for orders in the window
+        """
+        with self._lock:
+            self._buckets.clear()
+            self._window_counts = Counter()
+            self._all_time_counts = Counter(dict(all_time_counts))
+            for company_id, created_at in sorted(recent_orders, key=lambda row: row[1]):
+                self._add_to_window(self._bucket_index(created_at), company_id, 1)
+            self._synced_at = time.monotonic()
+
+    def _add_to_window(self, index: int, company_id: int, amount: int) -> None:
+        """Add to a bucket, creating it in order (caller holds the lock)"""
+        if self._buckets and self._buckets[-1][0] == index:
+            self._buckets[-1][1][company_id] += amount
+        elif not self._buckets or self._buckets[-1][0] < index:
+            self._buckets.append((index, Counter({company_id: amount})))
+        else:
+            # Late arrival for an older bucket
+            for bucket_index, counts in self._buckets:
+                if bucket_index == index:
+                    counts[company_id] += amount
+                    break
+            else:
+                self._buckets.append((index, Counter({company_id: amount})))
+                self._buckets = deque(sorted(self._buckets, key=lambda bucket: bucket[0]))
+        self._window_counts[company_id] += amount
+
+    def _expire(self) -> None:
+        """Drop buckets that have left the window (caller holds the lock)"""
+        oldest = self._current_index() - self.bucket_count + 1
+        while self._buckets and self._buckets[0][0] < oldest:
+            _, counts = self._buckets.popleft()
+            self._window_counts.subtract(counts)
+            for company_id in counts:
+                if self._window_counts[company_id] <= 0:
+                    del self._window_counts[company_id]
+
+    def _bucket_index(self, at: datetime) -> int:
+        """Bucket number for a naive UTC datetime"""
+        return int((at - EPOCH).total_seconds() // self.bucket_seconds)
+
+    def _current_index(self) -> int:
+        """Bucket number for the current time"""
+        return self._bucket_index(datetime.utcnow())
+
+    @staticmethod
+    def _top(counts: Counter, k: int) -> List[Tuple[int, int]]:
+        """Heap-select the k largest counts, ties broken by lower company_id"""
+        return heapq.nlargest(k, counts.items(), key=lambda item: (item[1], -item[0]))
+
+
+def get_trade_counters() -> TradeCounters:
+    """
+    Get the trade counters for the current application, rebuilding when stale
+
+    Returns:
+        TradeCounters: Counters configured from TRENDING_* settings
+    """
+    counters = current_app.extensions.get('trade_counters')
+    if counters is None:
+        counters = TradeCounters(
+            window=timedelta(hours=current_app.config.get('TRENDING_WINDOW_HOURS', 24)),
+            bucket=timedelta(minutes=current_app.config.get('TRENDING_BUCKET_MINUTES', 5)),
+            resync_interval=current_app.config.get('TRENDING_RESYNC_SECONDS', 300)
+        )
+        current_app.extensions['trade_counters'] = counters
+
+    if counters.needs_rebuild():
+        counters.rebuild()
+    return counters
+
+
+def record_completed_order(order: Order) -> None:
+    """Count a completed order in the application's trade counters, if loaded"""
+    counters = current_app.extensions.get('trade_counters')
+    if counters is not None:
+        counters.record(order.company_id, order.created_at)
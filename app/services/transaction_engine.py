@@ -17,6 +17,7 @@ from app.models.holding import Holdings
 from app.models.company import Company
 from app.services.stock_repository import StockRepository
 from app.services.notification_service import NotificationService
+from app.services.trade_counters import record_completed_order
 from app.utils.error_handlers import (
     ValidationError,
     InsufficientFundsError,
@@ -252,79 +253,16 @@ class TransactionEngine:
         if not wallet:
             raise ValidationError("Wallet not found")
         
-        # Double-check balance with lock
-        if wallet.balance < total_cost:
-            raise InsufficientFundsError(
-                f"Insufficient funds. Required: ${total_cost:,.2f}, Available: ${wallet.balance:,.2f}"
-            )
-        
-        # Record balance before transaction
-        balance_before = wallet.balance
-        
-        # Deduct from wallet
-        wallet.balance -= total_cost
-        wallet.last_updated = datetime.utcnow()
-        
-        # Create or update holding
         holding = db.session.query(Holdings).filter_by(
             user_id=user_id,
             company_id=company_id
         ).with_for_update().first()
         
-        if holding:
-            # Update existing holding - recalculate average purchase price
-            total_shares = holding.quantity + quantity
-            total_investment = holding.total_invested + (price_per_share * quantity)
-            holding.average_purchase_price = total_investment / total_shares
-            holding.quantity = total_shares
-            holding.total_invested = total_investment
-            holding.last_updated = datetime.utcnow()
-        else:
-            # Create new holding
-            holding = Holdings(
-                user_id=user_id,
-                company_id=company_id,
-                quantity=quantity,
-                average_purchase_price=price_per_share,
-                total_invested=price_per_share * quantity,
-                first_purchase_date=datetime.utcnow()
-            )
-            db.session.add(holding)
-        
-        # Create transaction record for the purchase
-        buy_transaction = Transaction(
-            user_id=user_id,
-            transaction_type='BUY',
-            order_id=order.order_id,
-            company_id=company_id,
-            amount=-(price_per_share * quantity),  # Negative because it's a debit
-            balance_before=balance_before,
-            balance_after=wallet.balance + commission,  # Before commission deduction
-            description=f"Purchased {quantity} shares of {order.company.symbol} at ${price_per_share}/share",
-            created_at=datetime.utcnow()
-        )
-        db.session.add(buy_transaction)
-        
-        # Create transaction record for commission
-        fee_transaction = Transaction(
-            user_id=user_id,
-            transaction_type='FEE',
-            order_id=order.order_id,
-            company_id=company_id,
-            amount=-commission,  # Negative because it's a debit
-            balance_before=wallet.balance + commission,
-            balance_after=wallet.balance,
-            description=f"Commission fee for buy order (0.1%)",
-            created_at=datetime.utcnow()
-        )
-        db.session.add(fee_transaction)
-        
-        # Update order status
-        order.order_status = 'COMPLETED'
-        order.executed_at = datetime.utcnow()
+        self._apply_buy(order, wallet, holding)
         
         # Commit all changes
         db.session.commit()
+        record_completed_order(order)
         
         # Create notification for order completion
         try:
@@ -451,6 +389,131 @@ class TransactionEngine:
             company_id=company_id
         ).with_for_update().first()
         
+        realized_gain_loss = self._apply_sell(order, wallet, holding)
+        
+        # Commit all changes
+        db.session.commit()
+        record_completed_order(order)
+        
+        # Create notification for order completion
+        try:
+            gain_loss_text = f"Gain: ${realized_gain_loss:.2f}" if realized_gain_loss >= 0 else f"Loss: ${abs(realized_gain_loss):.2f}"
+            self.notification_service.create_notification(
+                user_id=user_id,
+                notification_type='TRANSACTION',
+                title='Sell Order Completed',
+                message=f'Successfully sold {quantity} shares of {order.company.symbol} at ${price_per_share:.2f}/share. Proceeds: ${net_proceeds:.2f}. {gain_loss_text}'
+            )
+        except Exception as e:
+            logger.error(f"Failed to create notification for sell order {order.order_id}: {str(e)}")
+    
+    def _apply_buy(self, order: Order, wallet: Wallet, holding: Optional[Holdings]) -> Holdings:
+        """
+        Apply a priced buy order to locked wallet and holding rows
+        
+        Adds the purchase and commission transactions and marks the order
+        completed; the caller commits.
+        
+        Args:
+            order: Pending BUY order with price, commission and total set
+            wallet: User's wallet, locked
+            holding: Existing holding for the company, locked (None if not held)
+            
+        Returns:
+            The created or updated holding
+        """
+        quantity = order.quantity
+        price_per_share = order.price_per_share
+        commission = order.commission_fee
+        total_cost = order.total_amount
+        
+        # Double-check balance with lock
+        if wallet.balance < total_cost:
+            raise InsufficientFundsError(
+                f"Insufficient funds. Required: ${total_cost:,.2f}, Available: ${wallet.balance:,.2f}"
+            )
+        
+        # Record balance before transaction
+        balance_before = wallet.balance
+        
+        # Deduct from wallet
+        wallet.balance -= total_cost
+        wallet.last_updated = datetime.utcnow()
+        
+        if holding:
+            # Update existing holding - recalculate average purchase price
+            total_shares = holding.quantity + quantity
+            total_investment = holding.total_invested + (price_per_share * quantity)
+            holding.average_purchase_price = total_investment / total_shares
+            holding.quantity = total_shares
+            holding.total_invested = total_investment
+            holding.last_updated = datetime.utcnow()
+        else:
+            # Create new holding
+            holding = Holdings(
+                user_id=order.user_id,
+                company_id=order.company_id,
+                quantity=quantity,
+                average_purchase_price=price_per_share,
+                total_invested=price_per_share * quantity,
+                first_purchase_date=datetime.utcnow()
+            )
+            db.session.add(holding)
+        
+        # Create transaction record for the purchase
+        buy_transaction = Transaction(
+            user_id=order.user_id,
+            transaction_type='BUY',
+            order_id=order.order_id,
+            company_id=order.company_id,
+            amount=-(price_per_share * quantity),  # Negative because it's a debit
+            balance_before=balance_before,
+            balance_after=wallet.balance + commission,  # Before commission deduction
+            description=f"Purchased {quantity} shares of {order.company.symbol} at ${price_per_share}/share",
+            created_at=datetime.utcnow()
+        )
+        db.session.add(buy_transaction)
+        
+        # Create transaction record for commission
+        fee_transaction = Transaction(
+            user_id=order.user_id,
+            transaction_type='FEE',
+            order_id=order.order_id,
+            company_id=order.company_id,
+            amount=-commission,  # Negative because it's a debit
+            balance_before=wallet.balance + commission,
+            balance_after=wallet.balance,
+            description=f"Commission fee for buy order (0.1%)",
+            created_at=datetime.utcnow()
+        )
+        db.session.add(fee_transaction)
+        
+        # Update order status
+        order.order_status = 'COMPLETED'
+        order.executed_at = datetime.utcnow()
+        return holding
+    
+    def _apply_sell(self, order: Order, wallet: Wallet, holding: Optional[Holdings]) -> Decimal:
+        """
+        Apply a priced sell order to locked wallet and holding rows
+        
+        Adds the sale and commission transactions, deletes the holding when
+        it is emptied and marks the order completed; the caller commits.
+        
+        Args:
+            order: Pending SELL order with price, commission and total set
+            wallet: User's wallet, locked
+            holding: Holding for the company, locked (None if not held)
+            
+        Returns:
+            Realized gain or loss
+        """
+        quantity = order.quantity
+        price_per_share = order.price_per_share
+        commission = order.commission_fee
+        gross_proceeds = price_per_share * quantity
+        net_proceeds = order.total_amount
+        
         if not holding:
             raise InsufficientSharesError(f"You do not own any shares of this stock")
         
@@ -473,21 +536,21 @@ class TransactionEngine:
         wallet.last_updated = datetime.utcnow()
         
         # Update or delete holding
-        holding.quantity -= quantity
-        holding.total_invested -= cost_basis
-        
-        if holding.quantity == 0:
-            # Delete holding if no shares left
+        if holding.quantity == quantity:
+            # Delete holding if no shares left (before touching quantity, so an
+            # autoflush never writes a zero quantity against the check constraint)
             db.session.delete(holding)
         else:
+            holding.quantity -= quantity
+            holding.total_invested -= cost_basis
             holding.last_updated = datetime.utcnow()
         
         # Create transaction record for the sale
         sell_transaction = Transaction(
-            user_id=user_id,
+            user_id=order.user_id,
             transaction_type='SELL',
             order_id=order.order_id,
-            company_id=company_id,
+            company_id=order.company_id,
             amount=gross_proceeds,  # Positive because it's a credit
             balance_before=balance_before,
             balance_after=wallet.balance + commission,  # Before commission deduction
@@ -498,10 +561,10 @@ class TransactionEngine:
         
         # Create transaction record for commission
         fee_transaction = Transaction(
-            user_id=user_id,
+            user_id=order.user_id,
             transaction_type='FEE',
             order_id=order.order_id,
-            company_id=company_id,
+            company_id=order.company_id,
             amount=-commission,  # Negative because it's a debit
             balance_before=wallet.balance + commission,
             balance_after=wallet.balance,
@@ -513,21 +576,222 @@ class TransactionEngine:
         # Update order status
         order.order_status = 'COMPLETED'
         order.executed_at = datetime.utcnow()
+        return realized_gain_loss
+    
+    @handle_errors('database')
+    def create_basket_order(self, user_id: int, orders: List[Dict]) -> List[Order]:
+        """
+        Create and execute a multi-stock basket of buy and sell orders
         
-        # Commit all changes
-        db.session.commit()
+        Companies and prices for every leg are fetched in one batch, shares
+        and the net cost of the whole basket are validated once, and the
+        legs then execute together: either every order completes or none do.
+        
+        Args:
+            user_id: User ID
+            orders: Dicts with symbol, order_type ('BUY' or 'SELL') and quantity
+            
+        Returns:
+            Completed Order objects, sells first
+            
+        Raises:
+            ValidationError: If a leg is invalid or a price is unavailable
+            InsufficientFundsError: If the basket costs more than the wallet holds
+            InsufficientSharesError: If a sell exceeds the shares held
+        """
+        max_legs = current_app.config.get('BASKET_MAX_LEGS', 50)
+        if not orders:
+            raise ValidationError("A basket needs at least one order")
+        if len(orders) > max_legs:
+            raise ValidationError(f"A basket can contain at most {max_legs} orders")
+        
+        legs = []
+        for order in orders:
+            symbol = str(order.get('symbol') or '').upper().strip()
+            order_type = str(order.get('order_type') or '').upper().strip()
+            try:
+                quantity = int(order.get('quantity'))
+            except (TypeError, ValueError):
+                raise ValidationError(f"Quantity for {symbol or 'order'} must be a positive integer")
+            
+            if not symbol:
+                raise ValidationError("Every order needs a symbol")
+            if order_type not in ('BUY', 'SELL'):
+                raise ValidationError(f"Order type for {symbol} must be BUY or SELL")
+            if quantity <= 0:
+                raise ValidationError(f"Quantity for {symbol} must be a positive integer")
+            legs.append({'symbol': symbol, 'order_type': order_type, 'quantity': quantity})
+        
+        symbols = [leg['symbol'] for leg in legs]
+        duplicates = sorted({symbol for symbol in symbols if symbols.count(symbol) > 1})
+        if duplicates:
+            raise ValidationError(f"Each stock may appear only once per basket: {', '.join(duplicates)}")
+        
+        companies = {
+            company.symbol: company
+            for company in Company.query.filter(Company.symbol.in_(symbols))
+        }
+        unknown = [symbol for symbol in symbols if symbol not in companies]
+        if unknown:
+            raise ValidationError(f"Invalid stock symbol: {', '.join(unknown)}")
+        
+        # One price snapshot for the whole basket
+        prices = self.stock_repo.get_current_prices_with_mode(symbols)
+        
+        wallet = Wallet.query.filter_by(user_id=user_id).first()
+        if not wallet:
+            raise ValidationError("Wallet not found")
+        
+        held = {
+            holding.company_id: holding.quantity
+            for holding in Holdings.query.filter(
+                Holdings.user_id == user_id,
+                Holdings.company_id.in_([company.company_id for company in companies.values()])
+            )
+        }
+        
+        net_cost = Decimal('0.00')
+        for leg in legs:
+            company = companies[leg['symbol']]
+            price_per_share = prices[leg['symbol']]
+            subtotal = price_per_share * leg['quantity']
+            commission = self.calculate_commission(subtotal)
+            
+            if leg['order_type'] == 'SELL':
+                owned = held.get(company.company_id, 0)
+                if owned < leg['quantity']:
+                    raise InsufficientSharesError(
+                        f"Insufficient shares to sell. "
+                        f"You own {owned} shares of {leg['symbol']}, "
+                        f"but attempted to sell {leg['quantity']} shares"
+                    )
+                net_cost -= subtotal - commission
+            else:
+                net_cost += subtotal + commission
+            
+            leg['company'] = company
+            leg['price_per_share'] = price_per_share
+        
+        if net_cost > wallet.balance:
+            raise InsufficientFundsError(
+                f"Insufficient funds for this basket. "
+                f"Required: ${net_cost:,.2f}, Available: ${wallet.balance:,.2f}"
+            )
+        
+        return self.execute_basket(user_id, legs)
+    
+    @handle_errors('database')
+    def execute_basket(self, user_id: int, legs: List[Dict]) -> List[Order]:
+        """
+        Execute several orders atomically at snapshot prices
+        
+        Sells run before buys so their proceeds can fund the purchases. The
+        wallet and affected holdings are locked once, every leg is committed
+        together and one summary notification is sent. If any leg fails,
+        none are applied.
+        
+        Args:
+            user_id: User ID
+            legs: Dicts with company, order_type ('BUY' or 'SELL'), quantity
+                and price_per_share
+            
+        Returns:
+            Completed Order objects, sells first
+            
+        Raises:
+            ValidationError: If a leg is malformed, exceeds 1,000,000 shares or
+                the wallet is missing
+            InsufficientFundsError: If the buys cost more than the wallet holds
+            InsufficientSharesError: If a sell exceeds the shares held
+        """
+        legs = sorted(legs, key=lambda leg: leg['order_type'] != 'SELL')
+        if not legs:
+            raise ValidationError("No orders to execute")
+        
+        try:
+            wallet = db.session.query(Wallet).filter_by(user_id=user_id).with_for_update().first()
+            if not wallet:
+                raise ValidationError("Wallet not found")
+            
+            company_ids = {leg['company'].company_id for leg in legs}
+            if len(company_ids) != len(legs):
+                raise ValidationError("Each stock may appear only once per basket")
+            holdings = {
+                holding.company_id: holding
+                for holding in db.session.query(Holdings).filter(
+                    Holdings.user_id == user_id,
+                    Holdings.company_id.in_(company_ids)
+                ).with_for_update()
+            }
+            
+            orders = []
+            now = datetime.utcnow()
+            for leg in legs:
+                order_type, quantity, price_per_share = leg['order_type'], leg['quantity'], leg['price_per_share']
+                if order_type not in ('BUY', 'SELL'):
+                    raise ValidationError(f"Invalid order type: {order_type}")
+                if quantity <= 0:
+                    raise ValidationError("Quantity must be a positive integer")
+                if quantity > 1000000:
+                    raise ValidationError(
+                        f"Quantity for {leg['company'].symbol} cannot exceed 1,000,000 shares per order"
+                    )
+                if price_per_share <= 0:
+                    raise ValidationError("Price per share must be positive")
+                
+                subtotal = price_per_share * quantity
+                commission = self.calculate_commission(subtotal)
+                order = Order(
+                    user_id=user_id,
+                    company_id=leg['company'].company_id,
+                    order_type=order_type,
+                    quantity=quantity,
+                    price_per_share=price_per_share,
+                    commission_fee=commission,
+                    total_amount=subtotal + commission if order_type == 'BUY' else subtotal - commission,
+                    order_status='PENDING',
+                    created_at=now
+                )
+                db.session.add(order)
+                orders.append(order)
+            db.session.flush()  # Get order_ids without committing
+            
+            for order in orders:
+                if order.order_type == 'SELL':
+                    self._apply_sell(order, wallet, holdings.get(order.company_id))
+                else:
+                    holdings[order.company_id] = self._apply_buy(order, wallet, holdings.get(order.company_id))
+            
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        for order in orders:
+            record_completed_order(order)
+        
+        bought = sum(o.total_amount for o in orders if o.order_type == 'BUY')
+        sold = sum(o.total_amount for o in orders if o.order_type == 'SELL')
+        logger.info(
+            f"Basket executed: user={user_id}, orders={len(orders)}, "
+            f"bought=${bought}, sold=${sold}"
+        )
         
-        # Create notification for order completion
         try:
-            gain_loss_text = f"Gain: ${realized_gain_loss:.2f}" if realized_gain_loss >= 0 else f"Loss: ${abs(realized_gain_loss):.2f}"
             self.notification_service.create_notification(
                 user_id=user_id,
                 notification_type='TRANSACTION',
-                title='Sell Order Completed',
-                message=f'Successfully sold {quantity} shares of {order.company.symbol} at ${price_per_share:.2f}/share. Proceeds: ${net_proceeds:.2f}. {gain_loss_text}'
+                title='Orders Completed',
+                message=(
+                    f'Executed {len(orders)} orders: '
+                    f'{sum(1 for o in orders if o.order_type == "BUY")} buys totalling ${bought:,.2f}, '
+                    f'{sum(1 for o in orders if o.order_type == "SELL")} sells with proceeds of ${sold:,.2f}.'
+                )
             )
         except Exception as e:
-            logger.error(f"Failed to create notification for sell order {order.order_id}: {str(e)}")
+            logger.error(f"Failed to create notification for basket of user {user_id}: {str(e)}")
+        
+        return orders
     
     @handle_errors('database')
     def get_order_history(
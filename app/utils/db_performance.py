@@ -0,0 +1,182 @@
+"""
+Database Performance Profile
+Engine options and per-connection tuning applied when the app binds its database
+"""
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+logger = logging.getLogger(__name__)
+
+
+# Default PRAGMAs for file-backed SQLite. WAL lets readers proceed while an
+# order is being written, busy_timeout makes writers queue instead of failing
+# with "database is locked", and synchronous=NORMAL is durable under WAL.
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,          # milliseconds
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,        # 256 MB
+    'cache_size': -65536,          # negative value = KiB, i.e. 64 MB
+}
+
+# Default pool settings for PostgreSQL (and other server databases)
+DEFAULT_POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+}
+
+# PRAGMAs that only make sense for an on-disk database
+_FILE_ONLY_PRAGMAS = ('journal_mode', 'mmap_size')
+
+
+def get_backend_name(database_uri: Optional[str]) -> str:
+    """
+    Get the backend name for a database URI
+
+    Args:
+        database_uri: SQLAlchemy database URI
+
+    Returns:
+        Backend name (e.g. 'sqlite', 'postgresql', 'mysql') or '' if unknown
+    """
+    if not database_uri:
+        return ''
+    try:
+        return make_url(database_uri).get_backend_name()
+    except Exception:
+        return ''
+
+
+def is_memory_sqlite(database_uri: Optional[str]) -> bool:
+    """Check whether a URI points at an in-memory SQLite database"""
+    if get_backend_name(database_uri) != 'sqlite':
+        return False
+    database = make_url(database_uri).database
+    return not database or database == ':memory:' or 'mode=memory' in str(database_uri)
+
+
+def build_engine_options(
+    database_uri: Optional[str],
+    engine_options: Optional[Dict] = None,
+    pool_options: Optional[Dict] = None,
+    busy_timeout_ms: Optional[int] = None
+) -> Dict:
+    """
+    Build SQLAlchemy engine options for the configured backend
+
+    Explicitly configured options always win over the profile defaults.
+
+    Args:
+        database_uri: SQLAlchemy database URI
+        engine_options: Options already set in SQLALCHEMY_ENGINE_OPTIONS
+        pool_options: Pool defaults for server databases
+        busy_timeout_ms: SQLite busy_timeout PRAGMA (default: DEFAULT_SQLITE_PRAGMAS)
+
+    Returns:
+        Merged engine options dictionary
+    """
+    options = {}
+    backend = get_backend_name(database_uri)
+
+    if backend in ('postgresql', 'mysql'):
+        options.update(pool_options if pool_options is not None else DEFAULT_POOL_OPTIONS)
+    elif backend == 'sqlite' and not is_memory_sqlite(database_uri):
+        # The busy_timeout PRAGMA set on connect replaces the driver's lock wait,
+        # so give the driver the same value for the connect itself
+        if busy_timeout_ms is None:
+            busy_timeout_ms = DEFAULT_SQLITE_PRAGMAS['busy_timeout']
+        options['connect_args'] = {'timeout': busy_timeout_ms / 1000, 'check_same_thread': False}
+
+    options.update(engine_options or {})
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict, in_memory: bool = False) -> Dict:
+    """
+    Apply PRAGMA settings to a raw SQLite DBAPI connection
+
+    Args:
+        dbapi_connection: sqlite3 connection
+        pragmas: Mapping of PRAGMA name to value
+        in_memory: Skip PRAGMAs that only apply to on-disk databases
+
+    Returns:
+        Dictionary of PRAGMA name to the value SQLite reports after setting it
+    """
+    applied = {}
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if in_memory and name in _FILE_ONLY_PRAGMAS:
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+            row = cursor.execute(f"PRAGMA {name}").fetchone()
+            applied[name] = row[0] if row else None
+    finally:
+        cursor.close()
+    return applied
+
+
+def register_sqlite_pragmas(engine: Engine, pragmas: Dict, in_memory: bool = False):
+    """
+    Register a connect listener that applies PRAGMAs to every new connection
+
+    Args:
+        engine: SQLAlchemy engine bound to a SQLite database
+        pragmas: Mapping of PRAGMA name to value
+        in_memory: Whether the engine targets an in-memory database
+    """
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        try:
+            apply_sqlite_pragmas(dbapi_connection, pragmas, in_memory=in_memory)
+        except Exception as e:
+            logger.warning(f"Failed to apply SQLite PRAGMAs: {str(e)}")
+
+
+def configure_engine_options(app):
+    """
+    Merge the performance profile into SQLALCHEMY_ENGINE_OPTIONS
+
+    Must run before ``db.init_app`` so the engine is created with these options.
+
+    Args:
+        app: Flask application instance
+    """
+    if not app.config.get('DB_PERFORMANCE_PROFILE', True):
+        return
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(
+        app.config.get('SQLALCHEMY_DATABASE_URI'),
+        app.config.get('SQLALCHEMY_ENGINE_OPTIONS'),
+        app.config.get('DB_POOL_OPTIONS'),
+        app.config.get('SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS).get('busy_timeout')
+    )
+
+
+def init_db_performance(app, db):
+    """
+    Attach per-connection tuning to the application's database engine
+
+    Args:
+        app: Flask application instance
+        db: Flask-SQLAlchemy extension already initialised with the app
+    """
+    if not app.config.get('DB_PERFORMANCE_PROFILE', True):
+        return
+
+    database_uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if get_backend_name(database_uri) != 'sqlite':
+        return
+
+    pragmas = app.config.get('SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+    with app.app_context():
+        register_sqlite_pragmas(db.engine, pragmas, in_memory=is_memory_sqlite(database_uri))
+
+    logger.info(f"SQLite performance profile registered: {pragmas}")
@@ -180,9 +180,9 @@ def validate_stock_symbol(symbol: str) -> Tuple[bool, str]:
     if len(symbol) > 10:
         return False, "Stock symbol is too long (maximum 10 characters)"
     
-    # Stock symbols should only contain letters and possibly dots
-    if not re.match(r'^[A-Z.]+$', symbol):
-        return False, "Stock symbol can only contain letters and dots"
+    # Letters, digits, dots and hyphens cover class shares (BRK-B, BF.B) and listings like 7203.T
+    if not re.match(r'^[A-Z0-9.\-]+$', symbol):
+        return False, "Stock symbol can only contain letters, digits, dots and hyphens"
     
     return True, ""
 
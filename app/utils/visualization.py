@@ -3,20 +3,102 @@ Data Visualization Module
 Handles creation of charts and graphs for stock market data visualization
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for server environments
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import os
+import hashlib
+import json
 import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
-# Set style for better-looking plots
-plt.style.use('ggplot')
+
+class _LazyPyplot:
+    """
+    Stand-in for ``matplotlib.pyplot`` that imports it on first use
+    
+    matplotlib costs noticeable import time and memory, so it is only loaded
+    when a plot is actually rendered rather than when the routes are imported.
+    """
+    _module = None
+    
+    def _load(self):
+        if _LazyPyplot._module is None:
+            import matplotlib
+            matplotlib.use('Agg')  # Use non-interactive backend for server environments
+            import matplotlib.pyplot as pyplot
+            
+            # Set style for better-looking plots
+            pyplot.style.use('ggplot')
+            _LazyPyplot._module = pyplot
+        return _LazyPyplot._module
+    
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+
+plt = _LazyPyplot()
+
+SERIES_COLORS = {
+    'Actual Price': '#2E86AB',
+    'ARIMA': '#A23B72',
+    'LSTM': '#F18F01',
+    'Linear Regression': '#06A77D'
+}
+SENTIMENT_COLORS = ['#28a745', '#dc3545', '#6c757d']
+
+
+def render_chart(spec: Dict, filepath: str) -> str:
+    """
+    Render a chart spec from app.services.chart_data to a PNG file
+    
+    Runs in the render worker process, so matplotlib is only ever imported
+    there. The image is written to a temporary name and moved into place,
+    so readers never see a partial file.
+    
+    Args:
+        spec: Chart spec ('line' with x and series, or 'pie' with labels and values)
+        filepath: Destination PNG path
+        
+    Returns:
+        filepath
+    """
+    try:
+        if spec['type'] == 'pie':
+            plt.figure(figsize=(10, 8))
+            plt.pie(spec['values'], explode=(0.1, 0, 0), labels=spec['labels'],
+                    colors=SENTIMENT_COLORS, autopct='%1.1f%%', shadow=True,
+                    startangle=140, textprops={'fontsize': 12})
+            plt.axis('equal')
+            plt.title(spec['title'], fontsize=16, fontweight='bold', pad=20)
+        else:
+            plt.figure(figsize=(12, 6))
+            markers = len(spec['x']) <= 60
+            for series in spec['series']:
+                values = [np.nan if v is None else v for v in series['values']]
+                plt.plot(spec['x'], values, label=series['name'], linewidth=2,
+                         marker='o' if markers else None, markersize=5,
+                         color=SERIES_COLORS.get(series['name']))
+            if len(spec['series']) > 1:
+                plt.legend(loc='best', fontsize=11)
+            plt.title(spec['title'], fontsize=16, fontweight='bold')
+            plt.xlabel(spec.get('xlabel', ''), fontsize=12)
+            plt.ylabel(spec.get('ylabel', ''), fontsize=12)
+            plt.grid(True, alpha=0.3)
+        plt.tight_layout()
+        
+        partial = f"{filepath}.{os.getpid()}.tmp"
+        plt.savefig(partial, dpi=100, bbox_inches='tight', format='png')
+        os.replace(partial, filepath)
+        return filepath
+    finally:
+        plt.close('all')
 
 
 class DataVisualizer:
@@ -30,6 +112,9 @@ class DataVisualizer:
             plots_dir: Directory to save plot images (default: 'static/plots')
         """
         self.plots_dir = plots_dir
+        self._pool = None
+        self._pending = {}
+        self._lock = threading.RLock()
         
         # Create plots directory if it doesn't exist
         if not os.path.exists(self.plots_dir):
@@ -384,6 +469,82 @@ class DataVisualizer:
             plt.close()
             return None
     
+    def chart_filename(self, name: str, spec: Dict, symbol: str = None) -> str:
+        """
+        Content-addressed path for a rendered chart spec
+        
+        The same data always maps to the same file, so a chart is rendered
+        once and then served from disk.
+        
+        Args:
+            name: Chart name (e.g. 'arima', 'sentiment')
+            spec: Chart spec
+            symbol: Optional stock symbol to include in filename
+            
+        Returns:
+            Full path to the plot file
+        """
+        canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:20]
+        prefix = f"{symbol}_{name}" if symbol else name
+        return os.path.join(self.plots_dir, f"{prefix}_{digest}.png")
+    
+    def render_chart_pngs(
+        self,
+        charts: Dict[str, Dict],
+        symbol: str = None,
+        timeout: float = 30
+    ) -> Dict[str, str]:
+        """
+        Render chart specs to PNG in the render worker process, reusing cached files
+        
+        Args:
+            charts: Chart name -> chart spec
+            symbol: Optional stock symbol to include in filenames
+            timeout: Seconds to wait for the worker before giving up on the rest
+            
+        Returns:
+            Chart name -> web path, for the charts that are on disk
+        """
+        futures = {}
+        for name, spec in charts.items():
+            filepath = self.chart_filename(name, spec, symbol)
+            if os.path.exists(filepath):
+                futures[name] = filepath
+            else:
+                futures[name] = self._submit_render(spec, filepath)
+        
+        deadline = time.monotonic() + timeout
+        paths = {}
+        for name, future in futures.items():
+            if isinstance(future, str):
+                paths[name] = future.replace('\\', '/')
+                continue
+            try:
+                filepath = future.result(timeout=max(deadline - time.monotonic(), 0))
+                paths[name] = filepath.replace('\\', '/')
+            except FutureTimeoutError:
+                logger.warning(f"Timed out rendering {name} chart; it will be served once rendered")
+            except Exception as e:
+                logger.error(f"Error rendering {name} chart: {e}")
+        return paths
+    
+    def _submit_render(self, spec: Dict, filepath: str):
+        """Queue one render per file, sharing the future with concurrent requests"""
+        with self._lock:
+            future = self._pending.get(filepath)
+            if future is None:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=1)
+                future = self._pool.submit(render_chart, spec, filepath)
+                self._pending[filepath] = future
+                future.add_done_callback(lambda _: self._forget(filepath))
+            return future
+    
+    def _forget(self, filepath: str) -> None:
+        with self._lock:
+            self._pending.pop(filepath, None)
+    
     def cleanup_old_plots(self, days_old: int = 7):
         """
         Remove plot files older than specified days
@@ -392,7 +553,6 @@ class DataVisualizer:
             days_old: Remove files older than this many days (default: 7)
         """
         try:
-            import time
             current_time = time.time()
             cutoff_time = current_time - (days_old * 86400)  # 86400 seconds in a day
             
@@ -1,8 +1,11 @@
 """Code analyzer for parsing Python source files."""
 
 import ast
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from diagram_generator.core.types import (
     FileAnalysis,
@@ -16,6 +19,25 @@ from diagram_generator.core.types import (
 )
 from diagram_generator.core.exceptions import ParseError, AnalysisError
 
+# Below this many files to parse, process start-up costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+
+def _analyze_file_in_worker(file_path: str) -> Tuple[Optional[FileAnalysis], Optional[str]]:
+    """Analyze one file in a pool worker.
+
+    The AST tree is dropped so only the extracted information is pickled
+    back to the parent process.
+
+    Returns:
+        Tuple of (analysis, None) on success or (None, error message)
+    """
+    try:
+        analysis = CodeAnalyzer().analyze_file(file_path)
+        return replace(analysis, ast_tree=None), None
+    except ParseError as e:
+        return None, e.message
+
 
 class CodeAnalyzer:
     """Analyzes Python source code using AST parsing."""
@@ -93,12 +115,25 @@ class CodeAnalyzer:
                 {"file_path": file_path, "error": str(e)}
             )
     
-    def analyze_directory(self, dir_path: str, max_depth: int = 10) -> DirectoryAnalysis:
+    def analyze_directory(
+        self,
+        dir_path: str,
+        max_depth: int = 10,
+        workers: int = 1,
+        cache=None
+    ) -> DirectoryAnalysis:
         """Recursively analyze a directory.
         
+        Files whose content is found in the cache are not parsed again. The
+        remaining files are parsed in a process pool when more than one
+        worker is requested; analyses produced by the pool or the cache do
+        not carry an AST tree.
+        
         Args:
             dir_path: Path to the directory
             max_depth: Maximum depth for recursion
+            workers: Number of processes for parsing (0 uses all CPUs)
+            cache: Optional AnalysisCache used to skip unchanged files
             
         Returns:
             DirectoryAnalysis object containing all file analyses
@@ -120,30 +155,89 @@ class CodeAnalyzer:
                 {"dir_path": dir_path}
             )
         
-        file_analyses = []
-        
-        # Find all Python files
+        # Find all Python files within the depth limit
+        py_files = []
         for py_file in path.rglob('*.py'):
-            # Check depth
             relative_path = py_file.relative_to(path)
             depth = len(relative_path.parts) - 1
             
-            if depth > max_depth:
-                continue
-            
-            try:
-                analysis = self.analyze_file(str(py_file))
-                file_analyses.append(analysis)
-            except ParseError as e:
-                # Log error but continue with other files
-                print(f"Warning: {e.message}")
-                continue
+            if depth <= max_depth:
+                py_files.append(str(py_file))
         
         return DirectoryAnalysis(
             directory_path=str(path),
-            file_analyses=file_analyses
+            file_analyses=self.analyze_files(py_files, workers=workers, cache=cache)
         )
     
+    def analyze_files(self, file_paths: List[str], workers: int = 1, cache=None) -> List[FileAnalysis]:
+        """Analyze a list of Python files, skipping any that fail to parse.
+        
+        Args:
+            file_paths: Paths of the files to analyze
+            workers: Number of processes for parsing (0 uses all CPUs)
+            cache: Optional AnalysisCache used to skip unchanged files
+            
+        Returns:
+            List of FileAnalysis objects in input order
+        """
+        results: List[Optional[FileAnalysis]] = [None] * len(file_paths)
+        content_hashes: List[Optional[str]] = [None] * len(file_paths)
+        to_parse = []
+        duplicates = []
+        pending = set()
+        
+        for index, file_path in enumerate(file_paths):
+            if cache is not None:
+                try:
+                    content_hashes[index] = cache.hash_content(Path(file_path).read_bytes())
+                except OSError:
+                    pass
+                else:
+                    cached = cache.get(content_hashes[index], file_path, self._get_module_name(Path(file_path)))
+                    if cached is not None:
+                        results[index] = cached
+                        continue
+                    # Identical content (e.g. empty __init__.py files) is parsed once
+                    if content_hashes[index] in pending:
+                        duplicates.append(index)
+                        continue
+                    pending.add(content_hashes[index])
+            to_parse.append(index)
+        
+        parsed = self._parse_files([file_paths[i] for i in to_parse], workers)
+        for index, (analysis, error) in zip(to_parse, parsed):
+            if analysis is None:
+                # Log error but continue with other files
+                print(f"Warning: {error}")
+                continue
+            results[index] = analysis
+            if cache is not None and content_hashes[index]:
+                cache.put(content_hashes[index], analysis)
+        
+        for index in duplicates:
+            file_path = file_paths[index]
+            results[index] = cache.get(content_hashes[index], file_path, self._get_module_name(Path(file_path)))
+        
+        return [analysis for analysis in results if analysis is not None]
+    
+    def _parse_files(self, file_paths: List[str], workers: int) -> List[Tuple[Optional[FileAnalysis], Optional[str]]]:
+        """Parse files serially or in a process pool, preserving order."""
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        
+        if workers > 1 and len(file_paths) >= PARALLEL_MIN_FILES:
+            chunksize = max(1, len(file_paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(_analyze_file_in_worker, file_paths, chunksize=chunksize))
+        
+        parsed = []
+        for file_path in file_paths:
+            try:
+                parsed.append((self.analyze_file(file_path), None))
+            except ParseError as e:
+                parsed.append((None, e.message))
+        return parsed
+    
     def extract_classes(self, ast_node: ast.Module) -> List[ClassInfo]:
         """Extract class definitions from AST.
         
@@ -1,7 +1,6 @@
 """Dependency analyzer for building module dependency graphs."""
 
-from typing import List, Dict, Set
-from collections import defaultdict
+from typing import List, Dict, Tuple
 
 from diagram_generator.core.types import (
     DependencyGraph,
@@ -66,50 +65,79 @@ class DependencyAnalyzer:
     def detect_circular_dependencies(self, graph: DependencyGraph) -> List[Cycle]:
         """Detect circular dependency cycles.
         
+        Runs an iterative Tarjan strongly connected components pass, so each
+        group of mutually dependent modules is reported exactly once and deep
+        import chains cannot hit the recursion limit. A component's modules
+        are listed in DFS discovery order with the first module repeated at
+        the end, which reads as the cycle path for simple cycles.
+        
         Args:
             graph: DependencyGraph object
             
         Returns:
             List of Cycle objects representing circular dependencies
         """
-        # Build adjacency list
-        adj_list = defaultdict(list)
-        for edge in graph.edges:
-            adj_list[edge.from_node].append(edge.to_node)
-        
-        # Find cycles using DFS
+        index_of, adjacency = self._build_adjacency(graph)
+        names = list(index_of)
+        count = len(names)
+        
+        order = [-1] * count      # DFS discovery index
+        lowlink = [0] * count
+        on_stack = [False] * count
+        stack = []
         cycles = []
-        visited = set()
-        rec_stack = set()
-        path = []
-        
-        def dfs(node: str):
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
-            
-            for neighbor in adj_list[node]:
-                if neighbor not in visited:
-                    dfs(neighbor)
-                elif neighbor in rec_stack:
-                    # Found a cycle
-                    cycle_start = path.index(neighbor)
-                    cycle_modules = path[cycle_start:] + [neighbor]
-                    cycles.append(Cycle(modules=cycle_modules))
-            
-            path.pop()
-            rec_stack.remove(node)
+        counter = 0
         
-        # Run DFS from each unvisited node
-        for node in graph.nodes:
-            if node.id not in visited:
-                dfs(node.id)
+        for root in range(count):
+            if order[root] != -1:
+                continue
+            
+            # Each frame is (vertex, position of the next neighbor to visit)
+            work = [(root, 0)]
+            while work:
+                vertex, position = work.pop()
+                if position == 0:
+                    order[vertex] = lowlink[vertex] = counter
+                    counter += 1
+                    stack.append(vertex)
+                    on_stack[vertex] = True
+                
+                neighbors = adjacency[vertex]
+                while position < len(neighbors):
+                    neighbor = neighbors[position]
+                    position += 1
+                    if order[neighbor] == -1:
+                        work.append((vertex, position))
+                        work.append((neighbor, 0))
+                        break
+                    if on_stack[neighbor]:
+                        lowlink[vertex] = min(lowlink[vertex], order[neighbor])
+                else:
+                    # All neighbors done: close the component rooted here, if any
+                    if lowlink[vertex] == order[vertex]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            component.append(member)
+                            if member == vertex:
+                                break
+                        if len(component) > 1 or vertex in neighbors:
+                            component.sort(key=order.__getitem__)
+                            modules = [names[m] for m in component]
+                            cycles.append(Cycle(modules=modules + [modules[0]]))
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[vertex])
         
         return cycles
     
     def calculate_coupling(self, module: str, graph: DependencyGraph) -> CouplingMetrics:
         """Calculate coupling metrics for a module.
         
+        Scans the edge list once; use calculate_all_coupling when metrics for
+        every module are needed.
+        
         Args:
             module: Module name
             graph: DependencyGraph object
@@ -126,6 +154,59 @@ class DependencyAnalyzer:
             if edge.from_node == module:
                 efferent += 1
         
+        return self._coupling_metrics(afferent, efferent)
+    
+    def calculate_all_coupling(self, graph: DependencyGraph) -> Dict[str, CouplingMetrics]:
+        """Calculate coupling metrics for every module in one pass over the edges.
+        
+        Args:
+            graph: DependencyGraph object
+            
+        Returns:
+            Dictionary mapping module name to CouplingMetrics
+        """
+        index_of, afferent, efferent = self._count_degrees(graph)
+        return {
+            module: self._coupling_metrics(afferent[index], efferent[index])
+            for module, index in index_of.items()
+        }
+    
+    def _build_adjacency(self, graph: DependencyGraph) -> Tuple[Dict[str, int], List[List[int]]]:
+        """Index every module (nodes and edge endpoints) and build adjacency lists."""
+        index_of: Dict[str, int] = {}
+        for node in graph.nodes:
+            index_of.setdefault(node.id, len(index_of))
+        
+        adjacency: List[List[int]] = [[] for _ in index_of]
+        for edge in graph.edges:
+            for name in (edge.from_node, edge.to_node):
+                if name not in index_of:
+                    index_of[name] = len(index_of)
+                    adjacency.append([])
+            adjacency[index_of[edge.from_node]].append(index_of[edge.to_node])
+        
+        return index_of, adjacency
+    
+    def _count_degrees(self, graph: DependencyGraph) -> Tuple[Dict[str, int], List[int], List[int]]:
+        """Build module index and in/out-degree arrays from the edge list."""
+        index_of: Dict[str, int] = {}
+        for node in graph.nodes:
+            index_of.setdefault(node.id, len(index_of))
+        for edge in graph.edges:
+            index_of.setdefault(edge.from_node, len(index_of))
+            index_of.setdefault(edge.to_node, len(index_of))
+        
+        afferent = [0] * len(index_of)  # Modules that depend on this module
+        efferent = [0] * len(index_of)  # Modules this module depends on
+        for edge in graph.edges:
+            afferent[index_of[edge.to_node]] += 1
+            efferent[index_of[edge.from_node]] += 1
+        
+        return index_of, afferent, efferent
+    
+    @staticmethod
+    def _coupling_metrics(afferent: int, efferent: int) -> CouplingMetrics:
+        """Build CouplingMetrics from degree counts."""
         # Calculate instability (0 = stable, 1 = unstable)
         total = afferent + efferent
         instability = efferent / total if total > 0 else 0.0
@@ -52,6 +52,15 @@ class Config:
     # Maximum depth for directory traversal
     max_depth: int = 10
     
+    # Processes used to parse source files (0 = one per CPU, 1 = serial)
+    parallel_workers: int = 0
+    
+    # Whether to reuse per-file analysis results across runs
+    analysis_cache: bool = True
+    
+    # Analysis cache file (JSON), relative to the output directory
+    cache_file: str = ".diagram_generator_cache.json"
+    
     # Custom templates (not implemented yet)
     custom_templates: Dict[str, str] = field(default_factory=dict)
     
@@ -151,6 +160,15 @@ class ConfigManager:
         if 'max_depth' in data:
             config.max_depth = int(data['max_depth'])
         
+        if 'parallel_workers' in data:
+            config.parallel_workers = int(data['parallel_workers'])
+        
+        if 'analysis_cache' in data:
+            config.analysis_cache = bool(data['analysis_cache'])
+        
+        if 'cache_file' in data:
+            config.cache_file = data['cache_file']
+        
         return config
     
     def get_config(self) -> Config:
@@ -236,6 +254,10 @@ class ConfigManager:
         elif config.max_depth > 20:
             validation_warnings.append(f"Max depth is very high ({config.max_depth}), may cause performance issues")
         
+        # Check parallel workers
+        if config.parallel_workers < 0:
+            validation_errors.append("Parallel workers cannot be negative")
+        
         # Check enabled diagrams
         if not config.enabled_diagrams:
             validation_warnings.append("No diagram types enabled - no diagrams will be generated")
@@ -359,6 +381,19 @@ class ConfigManager:
                 "minimum": 1,
                 "maximum": 20,
                 "description": "Maximum directory depth to traverse"
+            },
+            "parallel_workers": {
+                "type": "integer",
+                "minimum": 0,
+                "description": "Processes used to parse source files (0 = one per CPU)"
+            },
+            "analysis_cache": {
+                "type": "boolean",
+                "description": "Whether to reuse per-file analysis results across runs"
+            },
+            "cache_file": {
+                "type": "string",
+                "description": "Analysis cache file (JSON), relative to the output directory"
             }
         }
         # Check max depth is positive
@@ -20,6 +20,7 @@ from diagram_generator.analyzers.dependency_analyzer import DependencyAnalyzer
 from diagram_generator.analyzers.metadata_extractor import MetadataExtractor
 from diagram_generator.utils.file_manager import FileManager
 from diagram_generator.utils.change_detector import ChangeDetector
+from diagram_generator.utils.analysis_cache import AnalysisCache
 from diagram_generator.core.exceptions import GenerationError
 
 # Set up logging
@@ -40,6 +41,11 @@ class DiagramOrchestrator:
         self.file_manager = FileManager(config.output_dir)
         self.change_detector = ChangeDetector()
         self.status = GenerationStatus()
+        
+        # Per-file analysis cache and the analysis of the last run, reused by update_diagrams
+        self._analysis_cache: Optional[AnalysisCache] = None
+        self._analysis_data: Optional[AnalysisData] = None
+        self._analysis_source: Optional[str] = None
     
     def generate_all_diagrams(self, source_path: str) -> GenerationResult:
         """Generate all configured diagram types with enhanced error handling.
@@ -189,11 +195,13 @@ class DiagramOrchestrator:
             result.warnings.append("Performing full regeneration due to extensive changes")
             return result
         
-        # Regenerate only affected diagrams
+        # Refresh only the changed files, then regenerate only affected diagrams
+        analysis_data = self._refresh_analysis(changes, affected_types)
+        
         for diagram_type in affected_types:
             if diagram_type in self.config.enabled_diagrams:
                 try:
-                    diagram = self.generate_diagram(diagram_type, self.config.source_dir)
+                    diagram = self.generate_diagram(diagram_type, self.config.source_dir, analysis_data)
                     if diagram:
                         result.diagrams.append(diagram)
                         
@@ -222,6 +230,9 @@ class DiagramOrchestrator:
     def _analyze_codebase(self, source_path: str) -> AnalysisData:
         """Analyze the codebase.
         
+        Unchanged files are served from the analysis cache; the rest are
+        parsed in a process pool.
+        
         Args:
             source_path: Path to source code
             
@@ -229,36 +240,123 @@ class DiagramOrchestrator:
             AnalysisData object
         """
         analysis_data = AnalysisData()
+        cache = self._get_analysis_cache()
         
         # Analyze directory
         dir_analysis = self.code_analyzer.analyze_directory(
             source_path,
-            max_depth=self.config.max_depth
+            max_depth=self.config.max_depth,
+            workers=self.config.parallel_workers,
+            cache=cache
         )
         analysis_data.file_analyses = dir_analysis.file_analyses
         
+        if cache is not None:
+            # Entries not seen in this full scan belong to deleted or edited files
+            cache.prune()
+            cache.save()
+            logger.info(f"Analysis cache: {cache.hits} hits, {cache.misses} misses")
+        
         # Build dependency graph
         analysis_data.dependency_graph = self.dependency_analyzer.build_dependency_graph(
-            dir_analysis.file_analyses
+            analysis_data.file_analyses
         )
+        analysis_data.database_schema = self._analyze_models(analysis_data.file_analyses)
+        analysis_data.route_map = self._analyze_routes(analysis_data.file_analyses)
         
-        # Analyze database models
+        self._analysis_data = analysis_data
+        self._analysis_source = source_path
+        return analysis_data
+    
+    def _refresh_analysis(self, changes: Dict[str, List[str]], affected_types: List[DiagramType]) -> AnalysisData:
+        """Update the last analysis with changed, added and deleted files.
+        
+        Only the changed files are re-analyzed. Database and route analysis
+        are redone only when a diagram that depends on them is affected.
+        
+        Args:
+            changes: Dictionary with keys 'changed', 'added', 'deleted' and paths relative to source_dir
+            affected_types: Diagram types that will be regenerated
+            
+        Returns:
+            Updated AnalysisData
+        """
+        source_path = self.config.source_dir
+        if self._analysis_data is None or self._analysis_source != source_path:
+            return self._analyze_codebase(source_path)
+        
+        root = Path(source_path)
+        analyses = {fa.file_path: fa for fa in self._analysis_data.file_analyses}
+        
+        for relative_path in changes.get('deleted', []):
+            analyses.pop(str(root / relative_path), None)
+        
+        updated = [
+            str(root / relative_path)
+            for relative_path in changes.get('changed', []) + changes.get('added', [])
+            if relative_path.endswith('.py') and len(Path(relative_path).parts) - 1 <= self.config.max_depth
+        ]
+        for file_path in updated:
+            analyses.pop(file_path, None)
+        
+        cache = self._get_analysis_cache()
+        for analysis in self.code_analyzer.analyze_files(updated, workers=self.config.parallel_workers, cache=cache):
+            analyses[analysis.file_path] = analysis
+        if cache is not None:
+            cache.save()
+        
+        previous = self._analysis_data
+        analysis_data = AnalysisData(file_analyses=list(analyses.values()))
+        analysis_data.dependency_graph = self.dependency_analyzer.build_dependency_graph(
+            analysis_data.file_analyses
+        )
+        
+        if DiagramType.ER_DIAGRAM in affected_types:
+            analysis_data.database_schema = self._analyze_models(analysis_data.file_analyses)
+        else:
+            analysis_data.database_schema = previous.database_schema
+        
+        if DiagramType.SEQUENCE_DIAGRAM in affected_types or DiagramType.USE_CASE in affected_types:
+            analysis_data.route_map = self._analyze_routes(analysis_data.file_analyses)
+        else:
+            analysis_data.route_map = previous.route_map
+        
+        self._analysis_data = analysis_data
+        return analysis_data
+    
+    def _analyze_models(self, file_analyses):
+        """Analyze database models in files whose path mentions models."""
         model_files = [
-            fa.file_path for fa in dir_analysis.file_analyses
+            fa.file_path for fa in file_analyses
             if 'model' in fa.file_path.lower()
         ]
         if model_files:
-            analysis_data.database_schema = self.database_analyzer.analyze_models(model_files)
-        
-        # Analyze routes
+            return self.database_analyzer.analyze_models(model_files)
+        return None
+    
+    def _analyze_routes(self, file_analyses):
+        """Analyze routes in files whose path mentions routes or APIs."""
         route_files = [
-            fa.file_path for fa in dir_analysis.file_analyses
+            fa.file_path for fa in file_analyses
             if 'route' in fa.file_path.lower() or 'api' in fa.file_path.lower()
         ]
         if route_files:
-            analysis_data.route_map = self.route_analyzer.analyze_routes(route_files)
+            return self.route_analyzer.analyze_routes(route_files)
+        return None
+    
+    def _get_analysis_cache(self) -> Optional[AnalysisCache]:
+        """Get the analysis cache, if caching is enabled.
         
-        return analysis_data
+        The cache lives under the output directory, never inside the analyzed
+        tree, so a checkout cannot supply its own cache file.
+        """
+        if not self.config.analysis_cache:
+            return None
+        
+        cache_path = str(Path(self.config.output_dir) / self.config.cache_file)
+        if self._analysis_cache is None or str(self._analysis_cache.cache_path) != cache_path:
+            self._analysis_cache = AnalysisCache(cache_path)
+        return self._analysis_cache
     
     def _get_output_path(self, diagram_type: DiagramType) -> str:
         """Get output path for diagram type.
@@ -0,0 +1,205 @@
+"""
+Property-based tests for cached, parallel and incremental code analysis.
+
+**Property: Cached analysis equivalence** - analyzing a tree with a warm
+cache, or in a process pool, yields the same file analyses as a serial parse.
+
+**Property: Incremental update equivalence** - update_diagrams re-analyzes
+only changed files and ends with the same analysis as a full run.
+"""
+
+import os
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from hypothesis import given, strategies as st, settings, HealthCheck
+
+from diagram_generator.analyzers.code_analyzer import CodeAnalyzer
+from diagram_generator.core.config import Config
+from diagram_generator.core.orchestrator import DiagramOrchestrator
+from diagram_generator.core.types import DiagramType
+from diagram_generator.utils.analysis_cache import AnalysisCache
+
+
+def write_module(path: Path, class_names, imports=()):
+    """Write a module with the given classes and imports."""
+    lines = [f"import {module}" for module in imports]
+    for name in class_names:
+        lines.extend([f"class {name}:", "    def run(self):", "        return 1", ""])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+
+
+def summary(file_analyses):
+    """Comparable view of file analyses without AST trees."""
+    return sorted(
+        (fa.file_path, fa.module_name, tuple(c.name for c in fa.classes), tuple(i.module for i in fa.imports))
+        for fa in file_analyses
+    )
+
+
+class_names = st.lists(
+    st.sampled_from(['Alpha', 'Beta', 'Gamma', 'Delta', 'Epsilon']),
+    min_size=0, max_size=3, unique=True
+)
+
+
+@settings(max_examples=20, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(modules=st.lists(class_names, min_size=1, max_size=6))
+def test_cached_analysis_matches_fresh_parse(temp_dir, modules):
+    """Property: A warm cache returns the same analyses as parsing every file."""
+    root = temp_dir / f"src_{time.perf_counter_ns()}"
+    for i, names in enumerate(modules):
+        write_module(root / "pkg" / f"mod_{i}.py", names)
+    (root / "pkg" / "__init__.py").write_text("")
+    (root / "other" / "__init__.py").parent.mkdir(parents=True, exist_ok=True)
+    (root / "other" / "__init__.py").write_text("")
+
+    analyzer = CodeAnalyzer()
+    fresh = analyzer.analyze_directory(str(root)).file_analyses
+
+    cache_path = root / "cache.json"
+    cold = AnalysisCache(str(cache_path))
+    analyzer.analyze_directory(str(root), cache=cold)
+    cold.save()
+
+    warm = AnalysisCache(str(cache_path))
+    cached = analyzer.analyze_directory(str(root), cache=warm).file_analyses
+
+    assert summary(cached) == summary(fresh)
+    assert warm.misses == 0
+    assert warm.hits == len(fresh)
+
+
+def test_process_pool_matches_serial_parse(temp_dir):
+    """Property: Parsing in a process pool preserves results and order."""
+    for i in range(40):
+        write_module(temp_dir / f"pkg_{i % 4}" / f"mod_{i}.py", [f"Class{i}"], imports=["os"])
+    (temp_dir / "broken.py").write_text("def broken(:\n")
+
+    analyzer = CodeAnalyzer()
+    serial = analyzer.analyze_directory(str(temp_dir), workers=1).file_analyses
+    parallel = analyzer.analyze_directory(str(temp_dir), workers=2).file_analyses
+
+    assert [fa.file_path for fa in parallel] == [fa.file_path for fa in serial]
+    assert summary(parallel) == summary(serial)
+    assert len(serial) == 40
+
+
+def test_identical_content_is_relabelled(temp_dir):
+    """Property: Files with identical content share an entry but keep their own paths."""
+    write_module(temp_dir / "a" / "same.py", ["Same"])
+    write_module(temp_dir / "b" / "same.py", ["Same"])
+
+    cache = AnalysisCache(str(temp_dir / "cache.json"))
+    analyses = CodeAnalyzer().analyze_directory(str(temp_dir), cache=cache).file_analyses
+
+    assert len(cache) == 1
+    assert {fa.file_path for fa in analyses} == {
+        str(temp_dir / "a" / "same.py"), str(temp_dir / "b" / "same.py")
+    }
+    assert cache.hits == 1
+
+
+def test_incremental_update_reanalyzes_only_changed_files(temp_dir):
+    """Property: update_diagrams parses only changed files and matches a full analysis."""
+    source = temp_dir / "src"
+    for i in range(5):
+        write_module(source / "services" / f"service_{i}.py", [f"Service{i}"])
+
+    config = Config(
+        enabled_diagrams=[DiagramType.ARCHITECTURE, DiagramType.PACKAGE],
+        output_dir=str(temp_dir / "diagrams"),
+        source_dir=str(source),
+        create_backups=False,
+        parallel_workers=1,
+    )
+    orchestrator = DiagramOrchestrator(config)
+    orchestrator.generate_all_diagrams(str(source))
+
+    write_module(source / "services" / "service_2.py", ["Service2", "Helper"])
+    os.remove(source / "services" / "service_4.py")
+    write_module(source / "services" / "service_5.py", ["Service5"])
+
+    parsed = []
+    original_analyze_file = orchestrator.code_analyzer.analyze_file
+
+    def tracking_analyze_file(file_path):
+        parsed.append(Path(file_path).name)
+        return original_analyze_file(file_path)
+
+    orchestrator.code_analyzer.analyze_file = tracking_analyze_file
+    result = orchestrator.update_diagrams({
+        'changed': ['services/service_2.py'],
+        'added': ['services/service_5.py'],
+        'deleted': ['services/service_4.py'],
+    })
+
+    assert sorted(parsed) == ['service_2.py', 'service_5.py']
+    assert not result.errors
+    assert {d.diagram_type for d in result.diagrams} == {DiagramType.ARCHITECTURE, DiagramType.PACKAGE}
+
+    full = CodeAnalyzer().analyze_directory(str(source)).file_analyses
+    assert summary(orchestrator._analysis_data.file_analyses) == summary(full)
+
+
+def test_cache_round_trips_full_analysis(temp_dir):
+    """Property: The JSON cache restores classes, methods, parameters and decorators."""
+    (temp_dir / "rich.py").write_text(
+        "import os\n"
+        "from typing import List\n"
+        "@dataclass(frozen=True)\n"
+        "class Rich(Base):\n"
+        "    \"\"\"Doc.\"\"\"\n"
+        "    count: int = 0\n"
+        "    @property\n"
+        "    def total(self, scale: float = 1.0) -> float:\n"
+        "        return helper(self.count)\n"
+    )
+    analyzer = CodeAnalyzer()
+    fresh = analyzer.analyze_directory(str(temp_dir)).file_analyses
+
+    cold = AnalysisCache(str(temp_dir / "out" / "cache.json"))
+    analyzer.analyze_directory(str(temp_dir), cache=cold)
+    cold.save()
+    cached = analyzer.analyze_directory(str(temp_dir), cache=AnalysisCache(str(cold.cache_path))).file_analyses
+
+    assert [replace(fa, ast_tree=None) for fa in cached] == [replace(fa, ast_tree=None) for fa in fresh]
+
+
+def test_cache_kept_out_of_source_tree(temp_dir):
+    """Property: The cache is written under the output directory, not the analyzed tree."""
+    source = temp_dir / "src"
+    write_module(source / "mod.py", ["Mod"])
+    config = Config(
+        enabled_diagrams=[DiagramType.PACKAGE],
+        output_dir=str(temp_dir / "diagrams"),
+        source_dir=str(source),
+        create_backups=False,
+    )
+    DiagramOrchestrator(config).generate_all_diagrams(str(source))
+
+    assert not list(source.glob(".diagram_generator_cache*"))
+    assert (temp_dir / "diagrams" / config.cache_file).exists()
+
+
+def test_cache_survives_new_orchestrator(temp_dir):
+    """Property: A second run in a new process reuses the persisted cache."""
+    source = temp_dir / "src"
+    for i in range(3):
+        write_module(source / f"mod_{i}.py", [f"Mod{i}"])
+
+    config = Config(
+        enabled_diagrams=[DiagramType.PACKAGE],
+        output_dir=str(temp_dir / "diagrams"),
+        source_dir=str(source),
+        create_backups=False,
+    )
+    DiagramOrchestrator(config).generate_all_diagrams(str(source))
+
+    second = DiagramOrchestrator(config)
+    second.generate_all_diagrams(str(source))
+
+    assert second._analysis_cache.misses == 0
+    assert second._analysis_cache.hits == 3
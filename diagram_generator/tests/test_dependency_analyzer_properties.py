@@ -0,0 +1,107 @@
+"""
+Property-based tests for dependency cycle detection and coupling metrics.
+
+**Property: One cycle per component** - every group of mutually dependent
+modules is reported exactly once, whatever the DFS start order.
+
+**Property: Degree-based coupling** - coupling computed from degree arrays
+matches a direct count over the edge list.
+"""
+
+from hypothesis import given, strategies as st, settings
+
+from diagram_generator.analyzers.dependency_analyzer import DependencyAnalyzer
+from diagram_generator.core.types import DependencyGraph, Node, Edge
+
+
+def make_graph(node_count, pairs):
+    """Build a DependencyGraph over modules m0..mN from (from, to) index pairs."""
+    nodes = [Node(id=f"m{i}", label=f"m{i}", type='module') for i in range(node_count)]
+    edges = [Edge(from_node=f"m{a}", to_node=f"m{b}", label='imports') for a, b in pairs]
+    return DependencyGraph(nodes=nodes, edges=edges)
+
+
+def reachable(graph, start):
+    """Modules reachable from start, by brute-force traversal."""
+    adjacency = {}
+    for edge in graph.edges:
+        adjacency.setdefault(edge.from_node, set()).add(edge.to_node)
+    seen, frontier = set(), [start]
+    while frontier:
+        for neighbor in adjacency.get(frontier.pop(), ()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                frontier.append(neighbor)
+    return seen
+
+
+graphs = st.integers(min_value=1, max_value=12).flatmap(
+    lambda n: st.tuples(
+        st.just(n),
+        st.lists(st.tuples(st.integers(0, n - 1), st.integers(0, n - 1)), max_size=30)
+    )
+)
+
+
+@settings(max_examples=100, deadline=None)
+@given(spec=graphs)
+def test_cycles_match_strongly_connected_components(spec):
+    """Property: Each reported cycle is a maximal mutually reachable group, reported once."""
+    graph = make_graph(*spec)
+    cycles = DependencyAnalyzer().detect_circular_dependencies(graph)
+
+    reach = {node.id: reachable(graph, node.id) for node in graph.nodes}
+    expected = set()
+    for node in graph.nodes:
+        if node.id in reach[node.id]:
+            component = frozenset(m for m in reach[node.id] if node.id in reach[m])
+            expected.add(component)
+
+    reported = [frozenset(cycle.modules[:-1]) for cycle in cycles]
+    assert len(reported) == len(set(reported))
+    assert set(reported) == expected
+    for cycle in cycles:
+        assert cycle.modules[0] == cycle.modules[-1]
+        assert len(cycle.modules) - 1 == len(set(cycle.modules))
+
+
+@settings(max_examples=100, deadline=None)
+@given(spec=graphs)
+def test_coupling_matches_edge_count(spec):
+    """Property: Batch and per-module coupling equal a direct edge count."""
+    graph = make_graph(*spec)
+    analyzer = DependencyAnalyzer()
+    all_metrics = analyzer.calculate_all_coupling(graph)
+
+    for node in graph.nodes:
+        afferent = sum(1 for e in graph.edges if e.to_node == node.id)
+        efferent = sum(1 for e in graph.edges if e.from_node == node.id)
+        for metrics in (all_metrics[node.id], analyzer.calculate_coupling(node.id, graph)):
+            assert metrics.afferent_coupling == afferent
+            assert metrics.efferent_coupling == efferent
+            total = afferent + efferent
+            assert metrics.instability == (efferent / total if total else 0.0)
+
+
+def test_coupling_tracks_graph_changes():
+    """Property: Per-module coupling reflects edges added after the first call."""
+    graph = make_graph(2, [(0, 1)])
+    analyzer = DependencyAnalyzer()
+    assert analyzer.calculate_coupling('m1', graph).afferent_coupling == 1
+
+    graph.edges.append(Edge(from_node='m0', to_node='m1'))
+    assert analyzer.calculate_coupling('m1', graph).afferent_coupling == 2
+    assert analyzer.calculate_coupling('unknown', graph).afferent_coupling == 0
+
+
+def test_deep_chain_does_not_recurse():
+    """Property: A 5,000 module import chain closing into one cycle is handled iteratively."""
+    size = 5000
+    graph = make_graph(size, [(i, i + 1) for i in range(size - 1)] + [(size - 1, 0)])
+    cycles = DependencyAnalyzer().detect_circular_dependencies(graph)
+
+    assert len(cycles) == 1
+    assert cycles[0].modules == [f"m{i}" for i in range(size)] + ["m0"]
+
+    acyclic = make_graph(size, [(i, i + 1) for i in range(size - 1)])
+    assert DependencyAnalyzer().detect_circular_dependencies(acyclic) == []
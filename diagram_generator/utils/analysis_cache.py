@@ -0,0 +1,176 @@
+"""Persistent cache of per-file analysis results keyed by content hash."""
+
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+import hashlib
+import json
+import logging
+
+from diagram_generator.core.types import (
+    AttributeInfo, ClassInfo, DecoratorInfo, FileAnalysis, FunctionInfo, ImportInfo, ParameterInfo
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when CodeAnalyzer output changes so stale entries are discarded
+CACHE_FORMAT_VERSION = 2
+
+
+def _function_from_dict(data: dict) -> FunctionInfo:
+    return FunctionInfo(**dict(
+        data,
+        parameters=[ParameterInfo(**p) for p in data.get('parameters', [])],
+        decorators=[DecoratorInfo(**d) for d in data.get('decorators', [])]
+    ))
+
+
+def _class_from_dict(data: dict) -> ClassInfo:
+    return ClassInfo(**dict(
+        data,
+        methods=[_function_from_dict(m) for m in data.get('methods', [])],
+        attributes=[AttributeInfo(**a) for a in data.get('attributes', [])],
+        decorators=[DecoratorInfo(**d) for d in data.get('decorators', [])]
+    ))
+
+
+def analysis_to_dict(analysis: FileAnalysis) -> dict:
+    """Convert a FileAnalysis (without its AST) to JSON-compatible data."""
+    data = asdict(replace(analysis, ast_tree=None))
+    del data['ast_tree']
+    return data
+
+
+def analysis_from_dict(data: dict) -> FileAnalysis:
+    """Rebuild a FileAnalysis from analysis_to_dict output."""
+    return FileAnalysis(**dict(
+        data,
+        classes=[_class_from_dict(c) for c in data.get('classes', [])],
+        functions=[_function_from_dict(f) for f in data.get('functions', [])],
+        imports=[ImportInfo(**i) for i in data.get('imports', [])]
+    ))
+
+
+class AnalysisCache:
+    """Stores FileAnalysis results keyed by the SHA-256 of the file content.
+
+    Entries are path independent: a hit is re-labelled with the requesting
+    file's path and module name, so identical files (e.g. empty
+    ``__init__.py`` modules) share one entry. AST trees are not stored.
+    The file is plain JSON, so loading it never executes code.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = Path(cache_path)
+        self._entries: Dict[str, FileAnalysis] = {}
+        self._dirty = False
+        self._used = set()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        """Get the cache key for file content.
+
+        Args:
+            content: Raw file bytes
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, content_hash: str, file_path: str, module_name: str) -> Optional[FileAnalysis]:
+        """Look up an analysis for file content.
+
+        Args:
+            content_hash: Hash from hash_content
+            file_path: Path of the file being analyzed
+            module_name: Module name of the file being analyzed
+
+        Returns:
+            FileAnalysis for this path, or None on a miss
+        """
+        entry = self._entries.get(content_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._used.add(content_hash)
+        if entry.file_path == file_path and entry.module_name == module_name:
+            return entry
+        return replace(entry, file_path=file_path, module_name=module_name)
+
+    def put(self, content_hash: str, analysis: FileAnalysis) -> None:
+        """Store an analysis result.
+
+        Args:
+            content_hash: Hash from hash_content
+            analysis: Analysis of the file content
+        """
+        if analysis.ast_tree is not None:
+            analysis = replace(analysis, ast_tree=None)
+        self._entries[content_hash] = analysis
+        self._used.add(content_hash)
+        self._dirty = True
+
+    def prune(self, keep: Optional[Iterable[str]] = None) -> int:
+        """Drop entries whose content no longer exists in the tree.
+
+        Args:
+            keep: Content hashes that are still in use (default: every
+                hash read or written since the cache was loaded)
+
+        Returns:
+            Number of entries removed
+        """
+        keep = self._used if keep is None else set(keep)
+        stale = [h for h in self._entries if h not in keep]
+        for content_hash in stale:
+            del self._entries[content_hash]
+        if stale:
+            self._dirty = True
+        return len(stale)
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed."""
+        if not self._dirty:
+            return
+
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            entries = {h: analysis_to_dict(a) for h, a in self._entries.items()}
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_FORMAT_VERSION, 'entries': entries}, f)
+            tmp_path.replace(self.cache_path)
+            self._dirty = False
+        except Exception as e:
+            logger.warning(f"Could not save analysis cache: {e}")
+
+    def clear(self) -> None:
+        """Remove all entries and the cache file."""
+        self._entries = {}
+        self._used = set()
+        self._dirty = False
+        if self.cache_path.exists():
+            self.cache_path.unlink()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        """Load entries from disk, starting empty if the file is missing or stale."""
+        if not self.cache_path.exists():
+            return
+
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_FORMAT_VERSION:
+                self._entries = {h: analysis_from_dict(a) for h, a in data['entries'].items()}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable analysis cache {self.cache_path}: {e}")
+            self._entries = {}
@@ -44,13 +44,22 @@ class ChangeDetector:
             # Check if file was modified after last generation
             mtime = datetime.fromtimestamp(py_file.stat().st_mtime)
             if mtime > last_generation:
+                # Skip files that were touched but whose content is unchanged
+                file_hash = self._calculate_file_hash(str(py_file))
+                previous_hash = self._file_hashes.get(file_path)
+                self._file_hashes[file_path] = file_hash
+                
                 if file_path in self._known_files:
+                    if file_hash and file_hash == previous_hash:
+                        continue
                     changed_files.append(file_path)
                 else:
                     added_files.append(file_path)
         
         # Find deleted files
         deleted_files = list(self._known_files - current_files)
+        for file_path in deleted_files:
+            self._file_hashes.pop(file_path, None)
         
         # Update state
         self._known_files = current_files
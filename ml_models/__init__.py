@@ -1,12 +1,19 @@
 """
 ML Models Package
 Contains machine learning models for stock price prediction
+
+Model classes are resolved lazily on attribute access so that importing one
+module (e.g. ``ml_models.stock_data_processor``) does not load statsmodels,
+scikit-learn and TensorFlow for the others.
 """
+import importlib
 
-from ml_models.arima_model import ARIMAModel
-from ml_models.lstm_model import LSTMModel
-from ml_models.linear_regression_model import LinearRegressionModel
-from ml_models.stock_data_processor import StockDataProcessor
+_LAZY_IMPORTS = {
+    'ARIMAModel': 'ml_models.arima_model',
+    'LSTMModel': 'ml_models.lstm_model',
+    'LinearRegressionModel': 'ml_models.linear_regression_model',
+    'StockDataProcessor': 'ml_models.stock_data_processor',
+}
 
 __all__ = [
     'ARIMAModel',
@@ -14,3 +21,17 @@ __all__ = [
     'LinearRegressionModel',
     'StockDataProcessor'
 ]
+
+
+def __getattr__(name):
+    """Import model classes on first access"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -7,7 +7,6 @@ import pandas as pd
 import numpy as np
 from statsmodels.tsa.arima.model import ARIMA
 from sklearn.metrics import mean_squared_error
-import matplotlib.pyplot as plt
 import math
 from datetime import datetime, timedelta
 import logging
@@ -167,13 +166,14 @@ class ARIMAModel:
             predictions = [train[-1] if train else 0] * len(test)
             return predictions, model_info
     
-    def predict(self, df, symbol="Unknown"):
+    def predict(self, df, symbol="Unknown", order=None):
         """
         Make stock price predictions using ARIMA model
         
         Args:
             df (pandas.DataFrame): Processed stock data
             symbol (str): Stock symbol for logging
+            order (tuple): ARIMA order for this prediction (default: self.order)
             
         Returns:
             tuple: (arima_pred, error_arima, success) - Prediction, RMSE error, success flag
@@ -218,7 +218,7 @@ class ARIMAModel:
             self.logger.info(f"ARIMA training data: {len(train)} points, testing data: {len(test)} points")
             
             # Fit model and make predictions
-            predictions, model_info = self.arima_model(train, test)
+            predictions, model_info = self.arima_model(train, test, order)
             
             # Calculate prediction and error
             if len(predictions) > 0:
@@ -0,0 +1,165 @@
+"""
+ARIMA Order Selection Module
+Chooses the (p, d, q) order of the ARIMA model by information criterion
+"""
+
+import logging
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.stattools import adfuller
+warnings.filterwarnings("ignore")
+
+logger = logging.getLogger(__name__)
+
+# TimeSeriesValidator lives in the enhanced validator, which needs the optional plotting stack
+try:
+    from enhanced_data_validator import TimeSeriesValidator
+    TIMESERIES_VALIDATOR_AVAILABLE = True
+except ImportError as e:
+    TimeSeriesValidator = None
+    TIMESERIES_VALIDATOR_AVAILABLE = False
+    logger.debug(f"TimeSeriesValidator not available, using adfuller directly: {e}")
+
+CRITERIA = ('aic', 'bic')
+
+
+def check_stationarity(values):
+    """
+    Augmented Dickey-Fuller test of a series
+
+    Uses TimeSeriesValidator.check_stationarity when the enhanced validator can
+    be imported, otherwise the same test (p-value <= 0.05) on statsmodels directly.
+
+    Args:
+        values (array-like): Series to test
+
+    Returns:
+        dict: is_stationary and p_value (or error when the test could not run)
+    """
+    if TIMESERIES_VALIDATOR_AVAILABLE:
+        return TimeSeriesValidator.check_stationarity(pd.DataFrame({'Close': values}), 'Close')
+    data = pd.Series(values).dropna()
+    if len(data) < 10:
+        return {'error': 'Insufficient data for stationarity test'}
+    try:
+        result = adfuller(data, autolag='AIC')
+    except Exception as e:
+        return {'error': f'Stationarity test failed: {str(e)}'}
+    return {'is_stationary': result[1] <= 0.05, 'p_value': result[1]}
+
+
+def choose_d(values, max_d=2):
+    """
+    Smallest differencing order that makes the series stationary
+
+    Args:
+        values (array-like): Price series
+        max_d (int): Highest differencing order to try
+
+    Returns:
+        tuple: (d, tests) - Chosen order (max_d when no order passes) and the
+               stationarity result for each order tried
+    """
+    series = np.asarray(values, dtype=float)
+    tests = []
+    for d in range(max_d + 1):
+        result = check_stationarity(np.diff(series, n=d) if d else series)
+        tests.append(dict(result, d=d))
+        if result.get('is_stationary'):
+            return d, tests
+    return max_d, tests
+
+
+def fit_criteria(values, order):
+    """
+    Fit one ARIMA order and report its information criteria
+
+    Args:
+        values (array-like): Price series
+        order (tuple): (p, d, q)
+
+    Returns:
+        dict: order, aic and bic (None with an error when the fit failed)
+    """
+    try:
+        fitted = ARIMA(values, order=order).fit()
+        return {'order': tuple(order), 'aic': float(fitted.aic), 'bic': float(fitted.bic), 'error': None}
+    except Exception as e:
+        return {'order': tuple(order), 'aic': None, 'bic': None, 'error': str(e)}
+
+
+def select_order(values, max_p=6, max_q=2, max_d=2, criterion='aic', processes=0, patience=1, executor=None):
+    """
+    Search (p, q) for the differencing order chosen by the stationarity test
+
+    Orders are fitted in levels of increasing p + q, each level in parallel.
+    The search stops once patience consecutive levels fail to improve the
+    criterion, so the larger, slower fits are pruned when simpler models
+    already fit as well.
+
+    Args:
+        values (array-like): Price series
+        max_p (int): Highest autoregressive order
+        max_q (int): Highest moving-average order
+        max_d (int): Highest differencing order
+        criterion (str): 'aic' or 'bic'
+        processes (int): Worker processes (0 fits in-process); ignored with executor
+        patience (int): Levels without improvement before the search stops
+        executor (Executor): Existing pool to fit on, left running afterwards
+
+    Returns:
+        dict: order, criterion, score, d, stationarity tests, fits (every
+              order tried), pruned (orders skipped) and seconds
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {CRITERIA}")
+    started = time.perf_counter()
+    values = np.asarray(values, dtype=float)
+    d, tests = choose_d(values, max_d)
+
+    levels = [[(p, d, k - p) for p in range(max_p + 1) if 0 <= k - p <= max_q]
+              for k in range(max_p + max_q + 1)]
+    fits, best, stale = [], None, 0
+    pool = executor
+    if pool is None and processes > 0:
+        pool = ProcessPoolExecutor(max_workers=processes)
+    try:
+        for searched, level in enumerate(levels, start=1):
+            if pool is not None:
+                results = list(pool.map(fit_criteria, [values] * len(level), level))
+            else:
+                results = [fit_criteria(values, order) for order in level]
+            fits.extend(results)
+
+            scored = [r for r in results if r[criterion] is not None and np.isfinite(r[criterion])]
+            level_best = min(scored, key=lambda r: r[criterion]) if scored else None
+            if level_best is not None and (best is None or level_best[criterion] < best[criterion]):
+                best, stale = level_best, 0
+            else:
+                stale += 1
+                if stale >= patience:
+                    break
+    finally:
+        if pool is not None and pool is not executor:
+            pool.shutdown()
+
+    if best is None:
+        raise ValueError(f"No ARIMA order could be fitted: {fits[0]['error'] if fits else 'no data'}")
+    pruned = sum(len(level) for level in levels[searched:])
+    logger.info(f"Selected ARIMA{best['order']} by {criterion.upper()} "
+                f"({len(fits)} fitted, {pruned} pruned)")
+    return {
+        'order': best['order'],
+        'criterion': criterion,
+        'score': best[criterion],
+        'd': d,
+        'stationarity': tests,
+        'fits': fits,
+        'pruned': pruned,
+        'seconds': time.perf_counter() - started
+    }
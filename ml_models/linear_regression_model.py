@@ -5,7 +5,6 @@ Implements the Linear Regression model for stock price prediction
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import math
 import logging
 import warnings
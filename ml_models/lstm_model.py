@@ -5,7 +5,6 @@ Implements the LSTM (Long Short-Term Memory) neural network model for stock pric
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import math
 import logging
 import warnings
@@ -0,0 +1,112 @@
+"""
+Service-Layer Benchmarks
+
+Times the hot service paths against the seeded dataset. Read paths are
+measured as micro benchmarks; order execution and dividend distribution
+write to the database and run as macro benchmarks with fresh inputs per round.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import db
+from app.models import Dividend, Company
+from app.services.admin_service import AdminService
+from app.services.dividend_manager import DividendManager
+from app.services.portfolio_service import PortfolioService
+from app.services.report_service import ReportService
+from app.services.stock_repository import StockRepository
+from app.services.transaction_engine import TransactionEngine
+
+# User 1 owns a large share of the seeded transactions (see seeding.heavy_user_share)
+HEAVY_USER_ID = 1
+TYPICAL_USER_ID = 2
+
+
+class BenchPortfolio:
+    """Portfolio read paths"""
+
+    def bench_get_holdings(self, benchmark, bench_ctx):
+        result = benchmark(PortfolioService().get_holdings, TYPICAL_USER_ID)
+        assert result
+
+    def bench_get_portfolio_summary(self, benchmark, bench_ctx):
+        result = benchmark(PortfolioService().get_portfolio_summary, HEAVY_USER_ID)
+        assert result['number_of_holdings'] > 0
+
+
+class BenchReports:
+    """Report generation"""
+
+    def bench_generate_transaction_report_heavy_user(self, benchmark, bench_ctx):
+        service = ReportService()
+        result = benchmark.pedantic(service.generate_transaction_report, args=(HEAVY_USER_ID,),
+                                    rounds=3, iterations=1)
+        assert result['summary']['total_transactions'] > 0
+
+    def bench_generate_transaction_report_last_30_days(self, benchmark, bench_ctx):
+        service = ReportService()
+        start = date.today() - timedelta(days=30)
+        result = benchmark(service.generate_transaction_report, TYPICAL_USER_ID, start_date=start)
+        assert 'summary' in result
+
+
+class BenchAdmin:
+    """Admin dashboard aggregates"""
+
+    def bench_get_system_metrics(self, benchmark, bench_ctx):
+        result = benchmark.pedantic(AdminService.get_system_metrics, rounds=3, iterations=1)
+        assert result['users']['total'] > 0
+
+
+class BenchStockSearch:
+    """Company search"""
+
+    def bench_search_companies_by_text(self, benchmark, bench_ctx):
+        repo = StockRepository()
+        companies, total = benchmark(repo.search_companies, query='BM00')
+        assert total > 0
+
+    def bench_search_companies_by_sector(self, benchmark, bench_ctx):
+        repo = StockRepository()
+        companies, total = benchmark(repo.search_companies, filters={'sector': 'Technology'})
+        assert total > 0
+
+
+@pytest.mark.macro
+class BenchWrites:
+    """Write paths that change the database on every round"""
+
+    def bench_distribute_dividend(self, benchmark, bench_ctx):
+        manager = DividendManager()
+        company = Company.query.filter_by(symbol='BM0001').first()
+
+        def setup():
+            today = date.today()
+            dividend = Dividend(
+                company_id=company.company_id,
+                dividend_per_share=Decimal('0.2500'),
+                ex_dividend_date=today - timedelta(days=2),
+                record_date=today - timedelta(days=1),
+                payment_date=today
+            )
+            db.session.add(dividend)
+            db.session.commit()
+            return (dividend.dividend_id,), {}
+
+        result = benchmark.pedantic(manager.distribute_dividend, setup=setup, rounds=5, iterations=1)
+        assert result['success']
+
+    def bench_execute_buy_order(self, benchmark, bench_ctx):
+        engine = TransactionEngine()
+        order = benchmark.pedantic(engine.create_buy_order, args=(TYPICAL_USER_ID, 'BM0002', 1),
+                                   rounds=20, iterations=1)
+        assert order.order_status == 'COMPLETED'
+
+    def bench_execute_sell_order(self, benchmark, bench_ctx):
+        engine = TransactionEngine()
+        engine.create_buy_order(TYPICAL_USER_ID, 'BM0003', 50)
+        order = benchmark.pedantic(engine.create_sell_order, args=(TYPICAL_USER_ID, 'BM0003', 1),
+                                   rounds=20, iterations=1)
+        assert order.order_status == 'COMPLETED'
@@ -0,0 +1,86 @@
+"""
+Benchmark Fixtures
+
+Provides a seeded application bound to a file-backed SQLite database.
+Scale and database location are selected with --bench-scale/--bench-db
+(or the BENCH_SCALE/BENCH_DB environment variables); pointing --bench-db at
+an existing file reuses its data instead of seeding again.
+"""
+import logging
+import os
+import sys
+import time
+
+import pytest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BENCH_DIR, '..', '..'))
+BASELINE_STORAGE = os.path.join(BENCH_DIR, '.benchmarks')
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app, db  # noqa: E402
+from app.config import config, TestingConfig  # noqa: E402
+from seeding import get_scale, is_seeded, seed_database, describe_scale  # noqa: E402
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('service benchmarks')
+    group.addoption('--bench-scale', default=os.environ.get('BENCH_SCALE', 'small'),
+                    help='Dataset size: small, medium or large (default: small)')
+    group.addoption('--bench-db', default=os.environ.get('BENCH_DB'),
+                    help='SQLite file to seed or reuse (default: a temporary file)')
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Keep JSON baselines next to the suite regardless of the working directory"""
+    storage = getattr(config.option, 'benchmark_storage', None)
+    if storage in (None, 'file://./.benchmarks'):
+        config.option.benchmark_storage = f'file://{BASELINE_STORAGE}'
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    """Record the dataset scale alongside the saved baseline"""
+    output_json['bench_scale'] = describe_scale(get_scale(config.getoption('--bench-scale')))
+
+
+@pytest.fixture(scope='session')
+def bench_scale(request):
+    """Selected BenchmarkScale"""
+    return get_scale(request.config.getoption('--bench-scale'))
+
+
+@pytest.fixture(scope='session')
+def bench_app(request, bench_scale, tmp_path_factory):
+    """Application bound to a seeded SQLite database"""
+    db_path = request.config.getoption('--bench-db') or str(
+        tmp_path_factory.mktemp('bench') / f'bench_{bench_scale.name}.db'
+    )
+    config['benchmark'] = type('BenchmarkConfig', (TestingConfig,), {
+        'DEBUG': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(db_path)}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'DATA_MODE': 'LIVE',
+    })
+    app = create_app('benchmark')
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    with app.app_context():
+        db.create_all()
+        if not is_seeded():
+            started = time.perf_counter()
+            counts = seed_database(bench_scale)
+            print(f"\nSeeded {bench_scale.name} dataset in {time.perf_counter() - started:.1f}s: {counts}")
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def bench_ctx(bench_app):
+    """Fresh session per benchmark so identity-map caching does not skew timings"""
+    db.session.remove()
+    yield bench_app
+    db.session.rollback()
+    db.session.remove()
@@ -0,0 +1,248 @@
+"""
+Benchmark Database Seeder
+
+Loads a deterministic synthetic dataset straight into the application
+database so service-layer benchmarks run against realistic table sizes.
+Rows are inserted with SQLAlchemy Core in chunks, which keeps seeding a
+million transactions in the tens-of-seconds range on SQLite.
+"""
+
+import random
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app import db
+from app.models import User, Wallet, Company, Holdings, Order, Transaction, PriceHistory
+
+
+CHUNK_SIZE = 10000
+SECTORS = ['Technology', 'Healthcare', 'Finance', 'Energy', 'Consumer', 'Industrial']
+TRANSACTION_TYPES = ['BUY', 'SELL', 'FEE', 'DEPOSIT', 'WITHDRAWAL', 'DIVIDEND']
+TRANSACTION_WEIGHTS = [35, 20, 35, 5, 3, 2]
+
+
+@dataclass
+class BenchmarkScale:
+    """Size of the seeded dataset"""
+    name: str
+    users: int
+    companies: int
+    holdings_per_user: int
+    price_years: int
+    transactions: int
+    orders: int
+    heavy_user_share: float = 0.05  # fraction of transactions owned by user 1
+
+
+SCALES = {
+    'small': BenchmarkScale(
+        name='small', users=100, companies=50, holdings_per_user=10,
+        price_years=1, transactions=20000, orders=5000
+    ),
+    'medium': BenchmarkScale(
+        name='medium', users=1000, companies=200, holdings_per_user=20,
+        price_years=5, transactions=200000, orders=50000
+    ),
+    'large': BenchmarkScale(
+        name='large', users=10000, companies=500, holdings_per_user=20,
+        price_years=5, transactions=1000000, orders=250000
+    ),
+}
+
+
+def get_scale(name):
+    """Get a benchmark scale preset by name"""
+    if name not in SCALES:
+        raise ValueError(f"Unknown benchmark scale '{name}'. Choose from: {', '.join(SCALES)}")
+    return SCALES[name]
+
+
+def _insert_chunked(model, rows):
+    """Bulk insert row dictionaries in chunks"""
+    table = model.__table__
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(table.insert(), rows[start:start + CHUNK_SIZE])
+
+
+def _trading_days(years, end_date):
+    """Weekdays covering the given number of years, always ending on end_date"""
+    start = end_date - timedelta(days=365 * years)
+    days = []
+    current = start
+    while current < end_date:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    days.append(end_date)
+    return days
+
+
+def is_seeded():
+    """Check whether the bound database already holds a benchmark dataset"""
+    return db.session.query(Company.company_id).filter(Company.symbol == 'BM0000').first() is not None
+
+
+def seed_database(scale, seed=42):
+    """
+    Seed the current app's database with a synthetic dataset
+
+    Args:
+        scale: BenchmarkScale to generate
+        seed: Random seed so repeated runs produce identical data
+
+    Returns:
+        Dictionary with the number of rows inserted per table
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    today = date.today()
+    counts = {}
+
+    # Companies
+    companies = [{
+        'company_id': i + 1,
+        'symbol': f'BM{i:04d}',
+        'company_name': f'Benchmark Company {i}',
+        'sector': SECTORS[i % len(SECTORS)],
+        'industry': f'Industry {i % 40}',
+        'market_cap': rng.randint(10**9, 10**12),
+        'is_active': True,
+        'last_updated': now,
+    } for i in range(scale.companies)]
+    _insert_chunked(Company, companies)
+    counts['companies'] = len(companies)
+
+    # Daily prices as a random walk per company, last bar dated today
+    days = _trading_days(scale.price_years, today)
+    last_close = {}
+    prices = []
+    for company in companies:
+        price = rng.uniform(20, 500)
+        for day in days:
+            change = rng.gauss(0.0003, 0.02)
+            open_price = price
+            price = max(1.0, price * (1 + change))
+            high = max(open_price, price) * (1 + abs(rng.gauss(0, 0.005)))
+            low = min(open_price, price) * (1 - abs(rng.gauss(0, 0.005)))
+            prices.append({
+                'company_id': company['company_id'],
+                'date': day,
+                'open': round(open_price, 2),
+                'high': round(high, 2),
+                'low': round(low, 2),
+                'close': round(price, 2),
+                'adjusted_close': round(price, 2),
+                'volume': rng.randint(100000, 50000000),
+                'created_at': now,
+            })
+        last_close[company['company_id']] = round(price, 2)
+        if len(prices) >= CHUNK_SIZE * 5:
+            _insert_chunked(PriceHistory, prices)
+            counts['price_history'] = counts.get('price_history', 0) + len(prices)
+            prices = []
+    _insert_chunked(PriceHistory, prices)
+    counts['price_history'] = counts.get('price_history', 0) + len(prices)
+
+    # Users and wallets
+    users = [{
+        'user_id': i + 1,
+        'email': f'bench_user_{i}@example.com',
+        'password_hash': 'benchmark-not-a-real-hash',
+        'full_name': f'Benchmark User {i}',
+        'risk_tolerance': 'moderate',
+        'is_admin': i == 0,
+        'account_status': 'active',
+        'created_at': now - timedelta(days=rng.randint(0, 365 * scale.price_years)),
+    } for i in range(scale.users)]
+    _insert_chunked(User, users)
+    _insert_chunked(Wallet, [{
+        'user_id': u['user_id'],
+        'balance': Decimal('1000000.00'),
+        'currency': 'USD',
+        'total_deposited': Decimal('1000000.00'),
+        'total_withdrawn': Decimal('0.00'),
+        'created_at': now,
+        'last_updated': now,
+    } for u in users])
+    counts['users'] = len(users)
+
+    # Holdings (unique company per user)
+    holdings = []
+    per_user = min(scale.holdings_per_user, scale.companies)
+    for user in users:
+        for company_id in rng.sample(range(1, scale.companies + 1), per_user):
+            quantity = rng.randint(1, 500)
+            avg_price = round(last_close[company_id] * rng.uniform(0.7, 1.3), 2)
+            holdings.append({
+                'user_id': user['user_id'],
+                'company_id': company_id,
+                'quantity': quantity,
+                'average_purchase_price': avg_price,
+                'total_invested': round(avg_price * quantity, 2),
+                'first_purchase_date': now,
+                'last_updated': now,
+            })
+    _insert_chunked(Holdings, holdings)
+    counts['holdings'] = len(holdings)
+
+    # Completed orders spread over the price window, denser in the last day
+    window_seconds = scale.price_years * 365 * 86400
+    orders = []
+    for i in range(scale.orders):
+        company_id = rng.randint(1, scale.companies)
+        quantity = rng.randint(1, 100)
+        price = last_close[company_id]
+        recent = rng.random() < 0.1
+        created = now - timedelta(seconds=rng.randint(0, 86400 if recent else window_seconds))
+        orders.append({
+            'order_id': i + 1,
+            'user_id': rng.randint(1, scale.users),
+            'company_id': company_id,
+            'order_type': 'BUY' if rng.random() < 0.6 else 'SELL',
+            'quantity': quantity,
+            'price_per_share': price,
+            'commission_fee': round(price * quantity * 0.001, 2),
+            'total_amount': round(price * quantity * 1.001, 2),
+            'order_status': 'COMPLETED',
+            'created_at': created,
+            'executed_at': created,
+        })
+    _insert_chunked(Order, orders)
+    counts['orders'] = len(orders)
+
+    # Transactions, with a share concentrated on user 1 as a power user
+    transactions = []
+    counts['transactions'] = 0
+    heavy_count = int(scale.transactions * scale.heavy_user_share)
+    for i in range(scale.transactions):
+        txn_type = rng.choices(TRANSACTION_TYPES, TRANSACTION_WEIGHTS)[0]
+        amount = round(rng.uniform(10, 20000), 2)
+        if txn_type in ('BUY', 'FEE', 'WITHDRAWAL'):
+            amount = -amount
+        balance_before = round(rng.uniform(1000, 1000000), 2)
+        transactions.append({
+            'user_id': 1 if i < heavy_count else rng.randint(1, scale.users),
+            'transaction_type': txn_type,
+            'order_id': rng.randint(1, scale.orders) if txn_type in ('BUY', 'SELL', 'FEE') and scale.orders else None,
+            'company_id': rng.randint(1, scale.companies) if txn_type not in ('DEPOSIT', 'WITHDRAWAL') else None,
+            'amount': amount,
+            'balance_before': balance_before,
+            'balance_after': round(balance_before + amount, 2),
+            'description': f'Benchmark {txn_type.lower()} transaction',
+            'created_at': now - timedelta(seconds=rng.randint(0, window_seconds)),
+        })
+        if len(transactions) >= CHUNK_SIZE * 5:
+            _insert_chunked(Transaction, transactions)
+            counts['transactions'] += len(transactions)
+            transactions = []
+    _insert_chunked(Transaction, transactions)
+    counts['transactions'] += len(transactions)
+
+    db.session.commit()
+    return counts
+
+
+def describe_scale(scale):
+    """Dictionary form of a scale for reports and baseline metadata"""
+    return asdict(scale)
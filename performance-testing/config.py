@@ -76,6 +76,12 @@ BENCHMARKS = {
         target_value=85.0,
         unit='percentage',
         description='Maximum memory utilization under load'
+    ),
+    'app_startup_time': PerformanceBenchmark(
+        name='Application Startup Time',
+        target_value=3.0,
+        unit='seconds',
+        description='Maximum time to import the app and run create_app() in a fresh worker'
     )
 }
 
@@ -123,6 +129,13 @@ LOAD_TEST_SCENARIOS = {
         spawn_rate=15,
         duration='2h',
         description='Extended duration test for stability'
+    ),
+    'offline': LoadTestScenario(
+        name='Offline Gate Test',
+        users=50,
+        spawn_rate=10,
+        duration='2m',
+        description='Deterministic run against offline_server.py, gated on BENCHMARKS'
     )
 }
 
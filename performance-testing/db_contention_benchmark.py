@@ -0,0 +1,182 @@
+"""
+Database Write-Contention Benchmark
+
+Measures buy-order throughput against a file-backed SQLite database with the
+database performance profile disabled (default rollback journal) and enabled
+(WAL, busy_timeout, synchronous=NORMAL, mmap and cache sizing).
+
+Usage:
+    python performance-testing/db_contention_benchmark.py --threads 8 --orders 50
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app, db  # noqa: E402
+from app.config import config, DevelopmentConfig  # noqa: E402
+
+
+BENCHMARK_SYMBOL = 'BNCH'
+
+
+def build_app(db_path, profile_enabled):
+    """Create an app bound to a scratch SQLite file with the profile on or off"""
+    config_name = f'contention_{"on" if profile_enabled else "off"}'
+    config[config_name] = type(
+        'ContentionBenchmarkConfig',
+        (DevelopmentConfig,),
+        {
+            'DEBUG': False,
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+            'SQLALCHEMY_ENGINE_OPTIONS': {},
+            'DB_PERFORMANCE_PROFILE': profile_enabled,
+            'JOBS_ENABLED': False,
+            'DATA_MODE': 'LIVE',
+        }
+    )
+    return create_app(config_name)
+
+
+def seed_database(app, num_users):
+    """Create one company with today's price and one funded user per worker"""
+    from app.models import User, Wallet, Company, PriceHistory
+
+    with app.app_context():
+        db.create_all()
+
+        company = Company(symbol=BENCHMARK_SYMBOL, company_name='Benchmark Corp', sector='Technology')
+        db.session.add(company)
+        db.session.flush()
+        db.session.add(PriceHistory(
+            company_id=company.company_id,
+            date=date.today(),
+            open=Decimal('100.00'),
+            high=Decimal('101.00'),
+            low=Decimal('99.00'),
+            close=Decimal('100.00'),
+            adjusted_close=Decimal('100.00'),
+            volume=1000000
+        ))
+
+        user_ids = []
+        for i in range(num_users):
+            user = User(email=f'contention_{i}@example.com', password_hash='x', full_name=f'Worker {i}')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Wallet(user_id=user.user_id, balance=Decimal('10000000.00')))
+            user_ids.append(user.user_id)
+
+        db.session.commit()
+        return user_ids
+
+
+def run_workers(app, user_ids, orders_per_thread):
+    """Run concurrent buy orders, one thread per user, and collect timings"""
+    from app.services.transaction_engine import TransactionEngine
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(len(user_ids))
+
+    def worker(user_id):
+        with app.app_context():
+            engine = TransactionEngine()
+            start_barrier.wait()
+            for _ in range(orders_per_thread):
+                started = time.perf_counter()
+                try:
+                    engine.create_buy_order(user_id, BENCHMARK_SYMBOL, 1)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                except Exception as e:
+                    db.session.rollback()
+                    with lock:
+                        errors.append(str(e))
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(uid,)) for uid in user_ids]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall_time = time.perf_counter() - wall_start
+
+    latencies.sort()
+    completed = len(latencies)
+    return {
+        'completed_orders': completed,
+        'failed_orders': len(errors),
+        'wall_time_seconds': round(wall_time, 3),
+        'throughput_orders_per_second': round(completed / wall_time, 2) if wall_time else 0.0,
+        'p50_latency_ms': round(latencies[completed // 2] * 1000, 2) if completed else None,
+        'p95_latency_ms': round(latencies[int(completed * 0.95) - 1] * 1000, 2) if completed else None,
+        'sample_errors': sorted(set(errors))[:3],
+    }
+
+
+def run_benchmark(profile_enabled, threads, orders_per_thread):
+    """Run a single benchmark pass in a fresh scratch database"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'contention.db')
+        app = build_app(db_path, profile_enabled)
+        user_ids = seed_database(app, threads)
+        result = run_workers(app, user_ids, orders_per_thread)
+        with app.app_context():
+            result['journal_mode'] = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+            db.session.remove()
+            db.engine.dispose()
+        return result
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='SQLite write-contention benchmark for order execution')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent order workers')
+    parser.add_argument('--orders', type=int, default=50, help='Buy orders per worker')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    logging.getLogger('app').setLevel(logging.WARNING)
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'threads': args.threads,
+        'orders_per_thread': args.orders,
+        'before': run_benchmark(False, args.threads, args.orders),
+        'after': run_benchmark(True, args.threads, args.orders),
+    }
+
+    before = results['before']['throughput_orders_per_second']
+    after = results['after']['throughput_orders_per_second']
+    results['speedup'] = round(after / before, 2) if before else None
+
+    print("\n=== Order Write-Contention Benchmark ===")
+    for label in ('before', 'after'):
+        r = results[label]
+        print(f"{label.upper():6} journal={r['journal_mode']:8} "
+              f"completed={r['completed_orders']:5} failed={r['failed_orders']:4} "
+              f"throughput={r['throughput_orders_per_second']:8.2f}/s "
+              f"p95={r['p95_latency_ms']}ms")
+    print(f"Speedup: {results['speedup']}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Offline Locust Scenario
+
+Drives the read and trade paths of an app started with offline_server.py.
+Every request targets a symbol served by the local market data provider, so
+runs need no network access and are comparable with each other.
+
+Usage:
+    python performance-testing/offline_server.py --port 5001 --users 200
+    locust -f performance-testing/locustfile_offline.py --host=http://127.0.0.1:5001 \\
+        --headless --users 50 --spawn-rate 10 --run-time 2m --csv reports/offline
+
+Environment:
+    OFFLINE_SYMBOLS: Comma-separated symbols to trade (default: AAPL,GOOGL,MSFT)
+    OFFLINE_USERS: Number of users seeded by offline_server.py (default: 200)
+"""
+
+import itertools
+import os
+import random
+
+from locust import HttpUser, task, between
+
+from offline_server import LOAD_TEST_PASSWORD, load_test_email
+
+
+SYMBOLS = os.environ.get('OFFLINE_SYMBOLS', 'AAPL,GOOGL,MSFT').split(',')
+SEEDED_USERS = int(os.environ.get('OFFLINE_USERS', 200))
+
+# Each simulated user logs in as a different seeded account
+_user_index = itertools.count()
+
+
+class OfflineTrader(HttpUser):
+    """Logged-in user browsing, querying prices and trading"""
+
+    wait_time = between(0.2, 1)
+
+    def on_start(self):
+        """Log in as the next seeded load-test user"""
+        self.email = load_test_email(next(_user_index) % SEEDED_USERS)
+        with self.client.post("/auth/login", data={
+            "email": self.email,
+            "password": LOAD_TEST_PASSWORD
+        }, name="/auth/login", catch_response=True) as response:
+            if response.status_code == 200 and '/auth/login' not in response.url:
+                response.success()
+            else:
+                response.failure(f"Login failed for {self.email}")
+
+    @task(5)
+    def view_dashboard(self):
+        self.client.get("/dashboard", name="/dashboard")
+
+    @task(3)
+    def view_portfolio(self):
+        self.client.get("/portfolio/", name="/portfolio")
+
+    @task(8)
+    def get_price(self):
+        symbol = random.choice(SYMBOLS)
+        self.client.get(f"/api/stocks/{symbol}/price", name="/api/stocks/[symbol]/price")
+
+    @task(4)
+    def search_stocks(self):
+        self.client.get("/api/stocks/search", params={"q": random.choice(SYMBOLS)[:2]},
+                        name="/api/stocks/search")
+
+    @task(2)
+    def view_orders(self):
+        self.client.get("/orders/", name="/orders")
+
+    @task(3)
+    def buy_stock(self):
+        with self.client.post("/orders/buy", data={
+            "symbol": random.choice(SYMBOLS),
+            "quantity": random.randint(1, 5)
+        }, name="/orders/buy", catch_response=True) as response:
+            # A successful order redirects to the order list
+            if response.status_code == 200 and response.url.rstrip('/').endswith('/orders'):
+                response.success()
+            else:
+                response.failure("Buy order was not accepted")
@@ -0,0 +1,149 @@
+"""
+Offline Load-Test Server
+
+Starts the application against a scratch SQLite database with the local
+market data provider, so Locust scenarios run without network access and
+see the same prices on every run. Companies and price history are loaded
+from the static CSV files, and a pool of funded load-test users is created
+for locustfile_offline.py to log in with.
+
+Usage:
+    python performance-testing/offline_server.py --port 5001 --users 50
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app, db  # noqa: E402
+from app.config import config, DevelopmentConfig  # noqa: E402
+
+
+LOAD_TEST_PASSWORD = 'LoadTest123!'
+LOAD_TEST_BALANCE = Decimal('10000000.00')
+
+
+def load_test_email(index):
+    """Email of the nth seeded load-test user"""
+    return f'loadtest_{index}@example.com'
+
+
+def build_app(db_path, data_dirs=None):
+    """Create an app bound to a scratch SQLite file with the local provider"""
+    overrides = {
+        'DEBUG': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'WTF_CSRF_ENABLED': False,
+        'BCRYPT_LOG_ROUNDS': 4,
+        'JOBS_ENABLED': False,
+        'SENTIMENT_ENABLED': False,
+        'DATA_MODE': 'LIVE',
+        'MARKET_DATA_PROVIDER': 'local',
+    }
+    if data_dirs:
+        overrides['MARKET_DATA_DIRS'] = data_dirs
+
+    config['offline'] = type('OfflineLoadTestConfig', (DevelopmentConfig,), overrides)
+    return create_app('offline')
+
+
+def seed_database(app, num_users):
+    """
+    Load companies, price history and load-test users
+
+    Args:
+        app: Application built by build_app
+        num_users: Number of funded users to create
+
+    Returns:
+        List of symbols served by the local provider
+    """
+    from app.models import User, Wallet, Company, PriceHistory
+    from app.services.market_data import get_market_data_provider
+
+    with app.app_context():
+        db.create_all()
+        provider = get_market_data_provider()
+        now = datetime.utcnow()
+
+        symbols = provider.available_symbols()
+        for symbol in symbols:
+            company = Company(symbol=symbol, company_name=symbol, sector='Technology')
+            db.session.add(company)
+            db.session.flush()
+
+            history = provider.get_price_history(symbol, period_years=2)
+            db.session.execute(PriceHistory.__table__.insert(), [{
+                'company_id': company.company_id,
+                'date': day.date(),
+                'open': round(row['Open'], 2),
+                'high': round(row['High'], 2),
+                'low': round(row['Low'], 2),
+                'close': round(row['Close'], 2),
+                'adjusted_close': round(row['Close'], 2),
+                'volume': int(row['Volume']),
+                'created_at': now,
+            } for day, row in history.iterrows()])
+
+        # Hash once; every load-test user shares the password
+        template = User(email='template@example.com', full_name='Template')
+        template.set_password(LOAD_TEST_PASSWORD)
+
+        for i in range(num_users):
+            user = User(email=load_test_email(i), password_hash=template.password_hash,
+                        full_name=f'Load Test User {i}')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(Wallet(user_id=user.user_id, balance=LOAD_TEST_BALANCE,
+                                  total_deposited=LOAD_TEST_BALANCE))
+
+        db.session.commit()
+        return symbols
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Serve the app offline for Locust scenarios')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=5001, help='Port to listen on')
+    parser.add_argument('--users', type=int, default=200, help='Load-test users to create')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    parser.add_argument('--data-dir', action='append',
+                        help='Directory with <SYMBOL>.csv files (repeatable; default: MARKET_DATA_DIRS)')
+    args = parser.parse_args()
+
+    logging.getLogger('app').setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    tmp_dir = None
+    db_path = args.db
+    if not db_path:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp_dir.name, 'offline.db')
+    elif os.path.exists(db_path):
+        os.remove(db_path)
+
+    app = build_app(db_path, args.data_dir)
+    symbols = seed_database(app, args.users)
+    if not symbols:
+        print("No CSV files found for the local market data provider")
+        sys.exit(1)
+
+    print(f"Offline server: {len(symbols)} symbols ({', '.join(symbols)}), {args.users} users")
+    print(f"Listening on http://{args.host}:{args.port}", flush=True)
+    try:
+        app.run(host=args.host, port=args.port, threaded=True, use_reloader=False)
+    finally:
+        if tmp_dir:
+            tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,17 +7,24 @@ Automates execution of all performance test scenarios
 import subprocess
 import sys
 import os
+import urllib.request
 from datetime import datetime
 from config import LOAD_TEST_SCENARIOS, get_all_scenarios
 from monitoring import PerformanceMonitor
+from slo_gate import run_gate
 import time
 
 
+OFFLINE_PORT = 5001
+
+
 class PerformanceTestRunner:
     """Run performance tests and collect results"""
     
-    def __init__(self, host='http://localhost:5000'):
+    def __init__(self, host='http://localhost:5000', locustfile='performance-testing/locustfile.py', gate=False):
         self.host = host
+        self.locustfile = locustfile
+        self.gate = gate
         self.reports_dir = 'performance-testing/reports'
         os.makedirs(self.reports_dir, exist_ok=True)
     
@@ -48,7 +55,7 @@ class PerformanceTestRunner:
         # Build locust command
         cmd = [
             'locust',
-            '-f', 'performance-testing/locustfile.py',
+            '-f', self.locustfile,
             '--host', self.host,
             '--users', str(scenario.users),
             '--spawn-rate', str(scenario.spawn_rate),
@@ -81,11 +88,15 @@ class PerformanceTestRunner:
             
             # Print summary
             summary = monitor.get_metrics_summary()
-            print("\n=== System Metrics Summary ===")
-            print(f"CPU Average: {summary['cpu']['avg']}%")
-            print(f"CPU Max: {summary['cpu']['max']}%")
-            print(f"Memory Average: {summary['memory']['avg']}%")
-            print(f"Memory Max: {summary['memory']['max']}%")
+            if summary:
+                print("\n=== System Metrics Summary ===")
+                print(f"CPU Average: {summary['cpu']['avg']}%")
+                print(f"CPU Max: {summary['cpu']['max']}%")
+                print(f"Memory Average: {summary['memory']['avg']}%")
+                print(f"Memory Max: {summary['memory']['max']}%")
+        
+        if success and self.gate:
+            success = run_gate(report_prefix, output=f'{report_prefix}_gate.json')
         
         if success:
             print(f"\n✓ Test completed successfully")
@@ -135,6 +146,46 @@ class PerformanceTestRunner:
         return self.run_scenario('baseline', headless=True)
 
 
+def run_offline(scenario_name='offline', port=OFFLINE_PORT):
+    """
+    Start offline_server.py, run a scenario against it with the offline
+    locustfile and gate the result on the configured benchmarks
+    """
+    scenario = LOAD_TEST_SCENARIOS[scenario_name]
+    host = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen([
+        sys.executable, 'performance-testing/offline_server.py',
+        '--port', str(port),
+        '--users', str(scenario.users)
+    ])
+    
+    try:
+        # Wait for the server to seed its database and start listening
+        for _ in range(120):
+            if server.poll() is not None:
+                print("✗ Offline server exited before accepting requests")
+                return False
+            try:
+                urllib.request.urlopen(f'{host}/auth/login', timeout=1)
+                break
+            except OSError:
+                time.sleep(0.5)
+        else:
+            print("✗ Offline server did not start in time")
+            return False
+        
+        os.environ['OFFLINE_USERS'] = str(scenario.users)
+        runner = PerformanceTestRunner(
+            host=host,
+            locustfile='performance-testing/locustfile_offline.py',
+            gate=True
+        )
+        return runner.run_scenario(scenario_name, headless=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -150,13 +201,19 @@ def main():
                        help='Run quick smoke test')
     parser.add_argument('--ui', action='store_true',
                        help='Run with web UI (not headless)')
+    parser.add_argument('--offline', action='store_true',
+                       help='Start an offline server with local market data and gate the run')
+    parser.add_argument('--gate', action='store_true',
+                       help='Fail when results miss the thresholds in config.BENCHMARKS')
     
     args = parser.parse_args()
     
-    runner = PerformanceTestRunner(host=args.host)
+    runner = PerformanceTestRunner(host=args.host, gate=args.gate)
     headless = not args.ui
     
-    if args.quick:
+    if args.offline:
+        success = run_offline(args.scenario or 'offline')
+    elif args.quick:
         success = runner.run_quick_test()
     elif args.all:
         success = runner.run_all_scenarios(headless=headless)
@@ -0,0 +1,164 @@
+"""
+Load-Test SLO Gate
+
+Checks a Locust ``--csv`` stats file against the thresholds in
+config.BENCHMARKS: p95 latency per endpoint group, aggregate throughput and
+error rate. Prints a report and exits non-zero when any threshold is missed,
+so headless runs can fail a CI job.
+
+Usage:
+    python performance-testing/slo_gate.py performance-testing/reports/offline_20250101_120000
+"""
+
+import argparse
+import csv
+import json
+import sys
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+from config import get_benchmark
+
+
+AGGREGATED_ROW = 'Aggregated'
+
+# Endpoint name prefix -> latency benchmark; first match wins
+LATENCY_GROUPS = [
+    ('/orders/buy', 'order_processing_time'),
+    ('/orders/sell', 'order_processing_time'),
+    ('/api/', 'api_response_time'),
+]
+DEFAULT_LATENCY_BENCHMARK = 'page_load_time'
+
+
+@dataclass
+class GateCheck:
+    """Result of comparing one measurement against a benchmark"""
+    name: str
+    benchmark: str
+    measured: float
+    threshold: float
+    unit: str
+    passed: bool
+
+
+def latency_benchmark_for(endpoint: str) -> str:
+    """Get the latency benchmark name that applies to an endpoint"""
+    for prefix, benchmark in LATENCY_GROUPS:
+        if endpoint.startswith(prefix):
+            return benchmark
+    return DEFAULT_LATENCY_BENCHMARK
+
+
+def read_stats(report_prefix: str) -> List[Dict]:
+    """Read the rows of ``<prefix>_stats.csv`` written by Locust"""
+    with open(f'{report_prefix}_stats.csv', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def evaluate(rows: List[Dict], min_requests: int = 1) -> List[GateCheck]:
+    """
+    Compare Locust stats rows against the configured benchmarks
+
+    Args:
+        rows: Rows from the Locust stats CSV
+        min_requests: Endpoints with fewer requests are not latency-checked
+
+    Returns:
+        List of GateCheck results
+    """
+    checks = []
+    aggregated: Optional[Dict] = None
+
+    for row in rows:
+        if row['Name'] == AGGREGATED_ROW:
+            aggregated = row
+            continue
+        if int(row['Request Count']) < min_requests:
+            continue
+
+        benchmark = get_benchmark(latency_benchmark_for(row['Name']))
+        p95_seconds = float(row['95%']) / 1000.0
+        checks.append(GateCheck(
+            name=f"p95 {row['Type']} {row['Name']}",
+            benchmark=benchmark.name,
+            measured=round(p95_seconds, 3),
+            threshold=benchmark.target_value,
+            unit='s',
+            passed=p95_seconds <= benchmark.target_value
+        ))
+
+    if aggregated is None:
+        raise ValueError('Locust stats file has no Aggregated row')
+
+    throughput = get_benchmark('throughput')
+    rps = float(aggregated['Requests/s'])
+    checks.append(GateCheck(
+        name='throughput',
+        benchmark=throughput.name,
+        measured=round(rps, 2),
+        threshold=throughput.target_value,
+        unit='req/s',
+        passed=rps >= throughput.target_value
+    ))
+
+    error_rate = get_benchmark('error_rate')
+    requests = int(aggregated['Request Count'])
+    failure_pct = 100.0 * int(aggregated['Failure Count']) / requests if requests else 100.0
+    checks.append(GateCheck(
+        name='error rate',
+        benchmark=error_rate.name,
+        measured=round(failure_pct, 2),
+        threshold=error_rate.target_value,
+        unit='%',
+        passed=failure_pct <= error_rate.target_value
+    ))
+
+    return checks
+
+
+def format_report(checks: List[GateCheck]) -> str:
+    """Render gate results as a text table"""
+    lines = ["\n=== Load-Test SLO Gate ==="]
+    for check in checks:
+        mark = '✓' if check.passed else '✗'
+        comparison = '>=' if check.name == 'throughput' else '<='
+        lines.append(f"{mark} {check.name:45} {check.measured:>10} {check.unit:5} "
+                     f"(target {comparison} {check.threshold})")
+    failed = [c for c in checks if not c.passed]
+    lines.append(f"\n{'✗ FAILED' if failed else '✓ PASSED'}: "
+                 f"{len(checks) - len(failed)}/{len(checks)} checks within thresholds")
+    return '\n'.join(lines)
+
+
+def run_gate(report_prefix: str, min_requests: int = 1, output: Optional[str] = None) -> bool:
+    """
+    Evaluate a Locust report, print the result and optionally save it as JSON
+
+    Returns:
+        True if every check passed
+    """
+    checks = evaluate(read_stats(report_prefix), min_requests)
+    print(format_report(checks))
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump([asdict(c) for c in checks], f, indent=2)
+
+    return all(c.passed for c in checks)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Gate a Locust run on the configured SLO thresholds')
+    parser.add_argument('report_prefix', help='Prefix passed to locust --csv')
+    parser.add_argument('--min-requests', type=int, default=1,
+                        help='Skip latency checks for endpoints with fewer requests')
+    parser.add_argument('--output', help='Write gate results as JSON to this path')
+    args = parser.parse_args()
+
+    sys.exit(0 if run_gate(args.report_prefix, args.min_requests, args.output) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Application Startup Benchmark
+
+Measures how long a fresh worker process takes to import the app and run
+create_app(), how much memory it holds afterwards, and which heavy ML and
+plotting libraries ended up loaded. Fails when the startup budget from
+config.BENCHMARKS['app_startup_time'] is exceeded or when a heavy library is
+imported at startup.
+
+Usage:
+    python performance-testing/startup_benchmark.py --runs 5
+    python performance-testing/startup_benchmark.py --warm-models
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from config import get_benchmark
+
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Libraries that must only be loaded when a prediction or plot is requested
+HEAVY_MODULES = ['tensorflow', 'keras', 'statsmodels', 'sklearn', 'matplotlib']
+
+PROBE_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app({config_name!r})
+startup = time.perf_counter() - started
+if {warm_models!r}:
+    with app.app_context():
+        from app.services.prediction_service import PredictionService
+        service = PredictionService()
+        service.arima_model, service.lr_model, service.lstm_model
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    'startup_seconds': startup,
+    'total_seconds': time.perf_counter() - started,
+    'max_rss_mb': rss_kb / 1024.0,
+    'heavy_modules': [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe_startup(config_name='testing', warm_models=False):
+    """Run one startup measurement in a fresh interpreter"""
+    script = PROBE_SCRIPT.format(config_name=config_name, warm_models=warm_models, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(runs=5, config_name='testing', warm_models=False):
+    """Run several startup probes and summarise them"""
+    samples = [probe_startup(config_name, warm_models) for _ in range(runs)]
+    startup_times = [s['startup_seconds'] for s in samples]
+    return {
+        'runs': runs,
+        'config': config_name,
+        'warm_models': warm_models,
+        'startup_median_seconds': round(statistics.median(startup_times), 3),
+        'startup_max_seconds': round(max(startup_times), 3),
+        'total_median_seconds': round(statistics.median(s['total_seconds'] for s in samples), 3),
+        'max_rss_mb': round(max(s['max_rss_mb'] for s in samples), 1),
+        'heavy_modules': sorted({m for s in samples for m in s['heavy_modules']}),
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Measure application startup time and memory')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes to measure')
+    parser.add_argument('--config', default='testing', help='Configuration name passed to create_app')
+    parser.add_argument('--warm-models', action='store_true',
+                        help='Also load every ML model after startup (prediction worker profile)')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.runs, args.config, args.warm_models)
+    budget = get_benchmark('app_startup_time')
+
+    print("\n=== Application Startup Benchmark ===")
+    print(f"Startup (median): {results['startup_median_seconds']}s "
+          f"(budget {budget.target_value}{budget.unit[0]})")
+    print(f"Startup (max):    {results['startup_max_seconds']}s")
+    print(f"Peak RSS:         {results['max_rss_mb']} MB")
+    print(f"Heavy modules:    {', '.join(results['heavy_modules']) or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.warm_models:
+        sys.exit(0)
+
+    failures = []
+    if results['startup_median_seconds'] > budget.target_value:
+        failures.append(f"startup {results['startup_median_seconds']}s exceeds {budget.target_value}s")
+    if results['heavy_modules']:
+        failures.append(f"heavy modules imported at startup: {', '.join(results['heavy_modules'])}")
+
+    if failures:
+        for failure in failures:
+            print(f"✗ {failure}")
+        sys.exit(1)
+
+    print("✓ Startup within budget")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
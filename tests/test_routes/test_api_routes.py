@@ -133,6 +133,32 @@ class TestStockAPIRoutes:
         assert data['success'] is False
         assert 'error' in data
     
+    def test_get_stock_details_resampled_history(self, authenticated_client, test_company):
+        """Test price history can be resampled to bars and downsampled"""
+        response = authenticated_client.get(f'/api/stocks/{test_company.symbol}?interval=weekly&points=50&years=5')
+        assert response.status_code == 200
+        
+        history = json.loads(response.data)['data']['price_history']
+        assert len(history) == 1
+        assert history[0]['close'] == 152.0
+        
+        response = authenticated_client.get(f'/api/stocks/{test_company.symbol}?interval=hourly')
+        assert response.status_code == 400
+    
+    def test_get_stock_details_history_failure(self, authenticated_client, test_company, monkeypatch):
+        """Test a failing price history load still returns the stock without history"""
+        from app.services.stock_repository import StockRepository
+        from app.utils.exceptions import ValidationError
+        
+        def failing_arrays(self, symbol, start_date=None, end_date=None):
+            # What handle_errors('database') raises for a SQLAlchemyError
+            raise ValidationError("Database operation failed. Please try again.")
+        
+        monkeypatch.setattr(StockRepository, 'get_price_arrays', failing_arrays)
+        response = authenticated_client.get(f'/api/stocks/{test_company.symbol}?interval=weekly')
+        assert response.status_code == 200
+        assert json.loads(response.data)['data']['price_history'] == []
+    
     def test_get_stock_price_requires_login(self, client):
         """Test that stock price requires authentication"""
         response = client.get('/api/stocks/TEST/price')
@@ -36,6 +36,15 @@ class TestDashboardRoutes:
         # Should display portfolio information
         assert b'Portfolio' in response.data or b'portfolio' in response.data
     
+    def test_dashboard_live_prices_opt_in(self, authenticated_client, test_holding, app, monkeypatch):
+        """Test that the dashboard only opens the price stream when enabled"""
+        response = authenticated_client.get('/dashboard')
+        assert b'/api/stocks/stream' not in response.data
+        
+        monkeypatch.setitem(app.config, 'PRICE_STREAM_DASHBOARD', True)
+        response = authenticated_client.get('/dashboard')
+        assert b'/api/stocks/stream' in response.data
+    
     def test_predict_requires_login(self, client):
         """Test that predict endpoint requires authentication"""
         response = client.get('/dashboard/predict')
@@ -0,0 +1,88 @@
+"""
+Unit tests for AdminService bulk company import
+"""
+import pytest
+from io import BytesIO
+from app import db
+from app.models import Company
+from app.services.admin_service import AdminService
+
+
+@pytest.fixture
+def clean_companies(app):
+    """App context whose imported companies are removed afterwards"""
+    with app.app_context():
+        before = {c.company_id for c in Company.query.all()}
+        yield
+        db.session.rollback()
+        Company.query.filter(~Company.company_id.in_(before)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestBulkImportCompanies:
+    """Test AdminService.bulk_import_companies"""
+
+    def test_imports_valid_rows_and_reports_errors(self, clean_companies):
+        """Test valid rows are inserted and each bad row is reported with its line"""
+        db.session.add(Company(symbol='EXIST', company_name='Existing Co'))
+        db.session.commit()
+
+        csv_content = (
+            "symbol,company_name,sector,industry\n"
+            "newa,New A,Technology,Software\n"
+            "EXIST,Existing Again,,\n"
+            "BAD$,Bad Symbol,,\n"
+            ",No Symbol,,\n"
+            "NEWA,Duplicate,,\n"
+            "NEWB,,Energy,\n"
+        )
+
+        result = AdminService.bulk_import_companies(csv_content)
+
+        assert result['success_count'] == 2
+        assert result['error_count'] == 3
+        assert result['errors'][0] == 'Row 3: EXIST: Already exists'
+        assert result['errors'][1].startswith('Row 4: BAD$:')
+        assert result['errors'][2] == 'Row 6: NEWA: Duplicate of row 2'
+
+        new_a = Company.query.filter_by(symbol='NEWA').one()
+        assert (new_a.company_name, new_a.sector, new_a.industry) == ('New A', 'Technology', 'Software')
+        new_b = Company.query.filter_by(symbol='NEWB').one()
+        assert new_b.company_name == 'NEWB'
+        assert new_b.industry is None
+        assert new_b.is_active
+
+    def test_accepts_uploaded_file(self, clean_companies):
+        """Test a file object with a UTF-8 BOM is decoded"""
+        upload = BytesIO('﻿symbol,company_name\nFILEA,File A\n'.encode('utf-8'))
+
+        result = AdminService.bulk_import_companies(upload)
+
+        assert result == {'success_count': 1, 'error_count': 0, 'errors': []}
+        assert Company.query.filter_by(symbol='FILEA').count() == 1
+
+    def test_accepts_class_shares_and_numeric_tickers(self, clean_companies):
+        """Test symbols with hyphens, dots and digits are imported"""
+        csv_content = "symbol,company_name\nBRK-B,Berkshire B\nBF.B,Brown-Forman B\n7203.T,Toyota\n"
+
+        result = AdminService.bulk_import_companies(csv_content)
+
+        assert result == {'success_count': 3, 'error_count': 0, 'errors': []}
+        assert Company.query.filter(Company.symbol.in_(['BRK-B', 'BF.B', '7203.T'])).count() == 3
+
+    def test_large_listing_in_chunks(self, clean_companies):
+        """Test a listing larger than the chunk and lookup sizes imports completely"""
+        symbols = [''.join(chr(65 + (i // 26 ** k) % 26) for k in range(4)) for i in range(2500)]
+        csv_content = "symbol,company_name\n" + "\n".join(f"Q{s},Company {s}" for s in symbols)
+
+        result = AdminService.bulk_import_companies(csv_content, chunk_size=700)
+
+        assert result['success_count'] == 2500
+        assert result['error_count'] == 0
+        assert Company.query.filter(Company.symbol.like('Q%')).count() == 2500
+
+        again = AdminService.bulk_import_companies(csv_content)
+        assert again['success_count'] == 0
+        assert again['error_count'] == 2500
@@ -0,0 +1,170 @@
+"""
+Unit tests for ARIMA order selection and the per-symbol order cache
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from ml_models import arima_order_selection
+from ml_models.arima_order_selection import choose_d, select_order
+from app.services.arima_orders import ArimaOrderSelector, new_observations
+from app.services.prediction_service import PredictionService
+
+
+def random_walk(days=300, seed=5, volatility=0.01):
+    """Closes of a geometric random walk"""
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, volatility, days)))
+
+
+@pytest.fixture
+def counted_search(monkeypatch):
+    """Replace the order search with a fast stand-in that records its calls"""
+    calls = []
+
+    def fake_select(values, **kwargs):
+        calls.append(len(values))
+        return {'order': (1, 1, 0), 'score': 100.0, 'fits': [{}], 'pruned': 0, 'seconds': 0.0}
+
+    monkeypatch.setattr(arima_order_selection, 'select_order', fake_select)
+    return calls
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestOrderSearch:
+    """Test differencing choice and the pruned grid search"""
+
+    def test_choose_d_differences_until_stationary(self):
+        """Test a random walk needs one difference and white noise none"""
+        d, tests = choose_d(random_walk())
+        noise, _ = choose_d(np.random.default_rng(1).normal(size=300))
+
+        assert d == 1
+        assert [t['d'] for t in tests] == [0, 1]
+        assert not tests[0]['is_stationary']
+        assert noise == 0
+
+    def test_search_prunes_larger_orders(self):
+        """Test the search stops once a level of p + q stops improving the criterion"""
+        rng = np.random.default_rng(2)
+        noise = rng.normal(size=400)
+        ar1 = np.zeros(400)
+        for t in range(1, 400):
+            ar1[t] = 0.7 * ar1[t - 1] + noise[t]
+
+        selection = select_order(100 + np.cumsum(ar1), max_p=4, max_q=2, processes=0)
+
+        assert selection['d'] == 1
+        assert selection['order'][1] == 1
+        assert selection['pruned'] > 0
+        assert len(selection['fits']) + selection['pruned'] == 5 * 3
+        best = min(f['aic'] for f in selection['fits'] if f['aic'] is not None)
+        assert selection['score'] == best
+        with pytest.raises(ValueError):
+            select_order(random_walk(), criterion='hqic')
+
+    def test_parallel_search_matches_in_process(self):
+        """Test fitting in worker processes selects the same order"""
+        values = random_walk(200)
+
+        local = select_order(values, max_p=2, max_q=1, criterion='bic', processes=0)
+        pooled = select_order(values, max_p=2, max_q=1, criterion='bic', processes=2)
+
+        assert (local['order'], local['score']) == (pooled['order'], pooled['score'])
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestOrderCache:
+    """Test orders are reused until the data drifts"""
+
+    def test_new_observations(self):
+        """Test appended closes are counted and replaced history is detected"""
+        values = random_walk(100)
+
+        assert new_observations(values, values[80:85]) == 15
+        assert new_observations(values, values[-5:]) == 0
+        assert new_observations(values * 1.1, values[-5:]) is None
+
+    def test_order_reused_until_refresh(self, counted_search):
+        """Test a few new closes reuse the order and many trigger a new search"""
+        values = random_walk(400)
+        selector = ArimaOrderSelector(refresh_observations=20, drift_ratio=1.5)
+
+        assert selector.order_for('AAA', pd.DataFrame({'Close': values[:300]})) == (1, 1, 0)
+        selector.order_for('AAA', pd.DataFrame({'Close': values[5:310]}))
+        assert counted_search == [300]
+
+        selector.order_for('AAA', pd.DataFrame({'Close': values[:330]}))
+        selector.order_for('BBB', pd.DataFrame({'Close': values[:300]}))
+        assert counted_search == [300, 330, 300]
+
+    def test_volatility_change_triggers_search(self, counted_search):
+        """Test a jump in recent volatility counts as drift"""
+        calm = random_walk(300, volatility=0.005)
+        wild = calm[-1] * random_walk(40, seed=9, volatility=0.05) / 100
+        selector = ArimaOrderSelector(refresh_observations=100)
+
+        selector.order_for('AAA', pd.DataFrame({'Close': calm}))
+        selector.order_for('AAA', pd.DataFrame({'Close': np.concatenate([calm, wild])}))
+
+        assert counted_search == [300, 340]
+
+    def test_searches_share_one_pool(self, monkeypatch):
+        """Test every search of a selector runs on the same process pool"""
+        executors = []
+
+        def fake_select(values, **kwargs):
+            executors.append(kwargs['executor'])
+            return {'order': (1, 1, 0), 'score': 100.0, 'fits': [{}], 'pruned': 0, 'seconds': 0.0}
+
+        monkeypatch.setattr(arima_order_selection, 'select_order', fake_select)
+        values = random_walk(300)
+        selector = ArimaOrderSelector(processes=2)
+        try:
+            selector.order_for('AAA', pd.DataFrame({'Close': values}))
+            selector.order_for('BBB', pd.DataFrame({'Close': values}))
+        finally:
+            selector.shutdown()
+
+        assert executors[0] is not None
+        assert executors[0] is executors[1]
+        assert ArimaOrderSelector(processes=0)._executor() is None
+
+    def test_orders_persist_across_selectors(self, app, counted_search):
+        """Test a stored order is reused by another process and ignored for another criterion"""
+        from app import db
+        from app.models import ArimaOrder
+        frame = pd.DataFrame({'Close': random_walk(300)})
+
+        with app.app_context():
+            try:
+                ArimaOrderSelector(persist=True).order_for('AAA', frame)
+                assert ArimaOrderSelector(persist=True).order_for('AAA', frame) == (1, 1, 0)
+                assert counted_search == [300]
+
+                ArimaOrderSelector(criterion='bic', persist=True).order_for('AAA', frame)
+                assert counted_search == [300, 300]
+                row = ArimaOrder.query.filter_by(symbol='AAA').one()
+                assert (row.order, row.criterion) == ((1, 1, 0), 'bic')
+                assert row.tail == pytest.approx(list(frame['Close'][-5:]))
+            finally:
+                ArimaOrder.query.delete()
+                db.session.commit()
+
+    def test_prediction_service_falls_back_to_default(self, app, monkeypatch):
+        """Test a disabled or failing search leaves the model on its default order"""
+        frame = pd.DataFrame({'Close': random_walk(100)})
+
+        def broken(values, **kwargs):
+            raise ValueError("no fit")
+
+        monkeypatch.setattr(arima_order_selection, 'select_order', broken)
+        with app.app_context():
+            app.extensions.pop('arima_orders', None)
+            service = PredictionService()
+            monkeypatch.setitem(app.config, 'ARIMA_AUTO_ORDER', False)
+            assert service.get_arima_order('AAA', frame) is None
+            monkeypatch.setitem(app.config, 'ARIMA_AUTO_ORDER', True)
+            assert service.get_arima_order('AAA', frame) is None
+            app.extensions.pop('arima_orders', None)
@@ -0,0 +1,120 @@
+"""
+Unit tests for audit logging and the buffered audit log writer
+"""
+import pytest
+from datetime import datetime
+from app import db
+from app.models import Company
+from app.models.audit_log import AuditLog
+from app.services.audit_service import AuditService
+from app.services.audit_writer import AuditLogWriter
+
+
+def make_entry(entity_id):
+    """Build an audit entry as AuditService.log_action does"""
+    return {
+        'admin_id': None,
+        'action_type': 'UPDATE',
+        'entity_type': 'USER',
+        'entity_id': entity_id,
+        'changes': {'field': {'old': 1, 'new': 2}},
+        'description': f'entry {entity_id}',
+        'ip_address': None,
+        'created_at': datetime.utcnow()
+    }
+
+
+@pytest.fixture
+def audit_app(app):
+    """App context with an empty audit log table"""
+    with app.app_context():
+        AuditLog.query.delete()
+        db.session.commit()
+        yield app
+        db.session.rollback()
+        AuditLog.query.delete()
+        db.session.commit()
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestAuditService:
+    """Test AuditService logging"""
+
+    def test_log_action_written_synchronously(self, audit_app):
+        """Test the testing config writes entries before log_action returns"""
+        entry = AuditService.log_action(None, 'SUSPEND', 'USER', entity_id=7,
+                                        changes={'status': 'suspended'})
+
+        assert entry.action_type == 'SUSPEND'
+        stored = AuditLog.query.one()
+        assert stored.entity_id == 7
+        assert stored.changes == {'status': 'suspended'}
+
+    def test_log_action_does_not_commit_caller_session(self, audit_app):
+        """Test pending work in the caller's session is left uncommitted"""
+        db.session.add(Company(symbol='AUDT', company_name='Audit Test'))
+
+        AuditService.log_action(None, 'CREATE', 'COMPANY', description='pending')
+        db.session.rollback()
+
+        assert Company.query.filter_by(symbol='AUDT').first() is None
+        assert AuditLog.query.count() == 1
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestAuditLogWriter:
+    """Test the background audit log writer"""
+
+    def test_background_writes_are_batched(self, audit_app):
+        """Test queued entries are written in fewer inserts than entries"""
+        writer = AuditLogWriter(db.engine, asynchronous=True, batch_size=100)
+        batches = []
+        original_write = writer.write_batch
+        writer.write_batch = lambda entries: batches.append(len(entries)) or original_write(entries)
+
+        for i in range(200):
+            writer.submit(make_entry(i))
+
+        assert writer.flush(timeout=10)
+        writer.shutdown()
+
+        assert sum(batches) == 200
+        assert max(batches) <= 100
+        assert AuditLog.query.count() == 200
+
+    def test_shutdown_flushes_pending_entries(self, audit_app):
+        """Test entries still queued at shutdown are written"""
+        writer = AuditLogWriter(db.engine, asynchronous=True)
+        writer._ensure_started = lambda: None  # keep entries queued
+
+        for i in range(5):
+            writer.submit(make_entry(i))
+        assert AuditLog.query.count() == 0
+
+        writer.shutdown()
+
+        assert AuditLog.query.count() == 5
+        assert writer.flush(timeout=0)
+
+    def test_full_queue_writes_inline(self, audit_app):
+        """Test a full queue falls back to an inline write instead of dropping"""
+        writer = AuditLogWriter(db.engine, asynchronous=True, queue_size=1)
+        writer._ensure_started = lambda: None
+
+        writer.submit(make_entry(1))
+        writer.submit(make_entry(2))
+
+        assert [log.entity_id for log in AuditLog.query.all()] == [2]
+        writer.shutdown()
+        assert AuditLog.query.count() == 2
+
+    def test_failed_write_does_not_raise(self, audit_app):
+        """Test a failing batch is logged and reported, not raised"""
+        writer = AuditLogWriter(db.engine, asynchronous=False)
+        bad_entry = make_entry(1)
+        bad_entry['action_type'] = None
+
+        assert writer.write_batch([bad_entry]) is False
+        assert AuditLog.query.count() == 0
@@ -0,0 +1,123 @@
+"""
+Unit tests for the vectorized recommendation backtester
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from decimal import Decimal
+from app.services.backtester import (
+    BUY, HOLD, SELL, Backtester, load_close_matrix, positions_from_signals,
+    recommendation_signals, simulate, trend_forecast
+)
+from app.services.transaction_engine import TransactionEngine
+from app.utils.exceptions import ValidationError
+from recommendation_system import RecommendationSystem
+
+
+def close_matrix(days=300, symbols=3, seed=7):
+    """Random-walk closes on business days, with the last symbol listed halfway through"""
+    rng = np.random.default_rng(seed)
+    values = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (days, symbols)), axis=0))
+    values[:days // 2, -1] = np.nan
+    index = pd.bdate_range('2015-01-01', periods=days)
+    return pd.DataFrame(values, index=index, columns=[f'S{i}' for i in range(symbols)])
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestSignals:
+    """Test the vectorized forecast, signals and positions"""
+
+    def test_trend_forecast_matches_polyfit(self):
+        """Test each day's forecast equals a least-squares line fitted to the window"""
+        close = close_matrix().to_numpy()
+        forecast = trend_forecast(close, lookback=20, horizon=5)
+
+        for day, symbol in [(19, 0), (200, 1), (250, 2)]:
+            slope, intercept = np.polyfit(np.arange(20), close[day - 19:day + 1, symbol], 1)
+            expected = np.mean(intercept + slope * np.arange(20, 25))
+            assert forecast[day, symbol] == pytest.approx(expected)
+        assert np.isnan(forecast[18, 0])
+        assert np.isnan(forecast[150 + 18, 2]) and not np.isnan(forecast[150 + 19, 2])
+
+    def test_signals_match_recommendation_system(self):
+        """Test every trend/sentiment combination maps as generate_recommendation does"""
+        recommender = RecommendationSystem()
+        actions = {'STRONG BUY': BUY, 'BUY': BUY, 'HOLD': HOLD, 'SELL': SELL}
+        errors = {'arima': 1.0, 'lstm': 1.0, 'lr': 1.0}
+
+        for forecast in [90.0, 110.0]:
+            for polarity in [-0.5, 0.0, 0.5]:
+                expected = recommender.generate_recommendation(
+                    'TEST', pd.DataFrame({'Close': [100.0]}), [forecast], polarity, errors
+                )['recommendation']
+                signal = recommendation_signals(np.array([[100.0]]), np.array([[forecast]]), np.array([[polarity]]))
+                assert signal[0, 0] == actions[expected], (forecast, polarity)
+
+        assert recommendation_signals(np.array([[100.0, 100.0]]), np.array([[110.0, 90.0]])).tolist() == [[BUY, SELL]]
+        assert recommendation_signals(np.array([[np.nan]]), np.array([[110.0]]))[0, 0] == HOLD
+
+    def test_positions_carry_through_holds(self):
+        """Test BUY opens, SELL closes and HOLD keeps the previous position"""
+        signals = np.array([HOLD, BUY, HOLD, HOLD, SELL, HOLD, BUY], dtype=np.int8)[:, None]
+
+        assert positions_from_signals(signals)[:, 0].tolist() == [0, 1, 1, 1, 0, 0, 1]
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestBacktest:
+    """Test equity curves, commission and parameter sweeps"""
+
+    def test_commission_matches_transaction_engine(self, app):
+        """Test a round trip pays the TransactionEngine rate on entry and exit"""
+        close = np.array([[100.0], [110.0], [110.0]])
+        result = simulate(close, np.array([[1.0], [0.0], [0.0]]), capital=10000.0)
+
+        with app.app_context():
+            engine = TransactionEngine()
+            entry = float(engine.calculate_commission(Decimal('10000')))
+            exit_fee = float(engine.calculate_commission(Decimal('10989')))
+        assert result['commission'][:, 0].tolist() == pytest.approx([entry, exit_fee, 0.0], abs=0.01)
+        assert result['sleeves'][-1, 0] == pytest.approx(10000 * 0.999 * 1.1 * 0.999)
+        assert result['trades'].sum() == 2
+
+    def test_run_reports_equity_and_benchmark(self):
+        """Test the strategy and buy and hold curves and their metrics"""
+        closes = close_matrix()
+        result = Backtester(lookback=20, horizon=5, capital=30000.0).run(closes)
+
+        assert len(result['equity']) == len(closes)
+        assert result['equity'].iloc[0] == pytest.approx(30000.0)
+        assert list(result['symbols'].index) == list(closes.columns)
+        assert result['metrics']['trades'] == result['symbols']['trades'].sum()
+        assert 0 <= result['metrics']['max_drawdown'] < 1
+        # Buy and hold only pays to enter, each symbol on its first priced day
+        held = closes.ffill().iloc[-1] / closes.bfill().iloc[0]
+        assert result['benchmark'].iloc[-1] == pytest.approx((held * 10000 * 0.999).sum())
+
+    def test_sweep_in_processes_matches_in_process(self):
+        """Test the process pool gives the same table as running in-process"""
+        closes = close_matrix(days=200)
+        grid = [{'lookback': 10}, {'lookback': 20, 'horizon': 3}]
+        backtester = Backtester(capital=10000.0)
+
+        local = backtester.sweep(closes, grid)
+        pooled = backtester.sweep(closes, grid, processes=2)
+
+        assert set(local['lookback']) == {10, 20}
+        pd.testing.assert_frame_equal(local, pooled)
+        with pytest.raises(ValidationError):
+            Backtester(lookback=1)
+
+    def test_load_close_matrix_from_database(self, app, test_company):
+        """Test stored prices are pivoted into a symbol column"""
+        with app.app_context():
+            closes = load_close_matrix([test_company.symbol.lower()])
+
+            assert list(closes.columns) == [test_company.symbol]
+            assert closes.iloc[-1, 0] == 152.0
+            with pytest.raises(ValidationError):
+                load_close_matrix(['NOPE'])
+            with pytest.raises(ValidationError):
+                load_close_matrix(source='ftp')
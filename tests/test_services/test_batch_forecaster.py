@@ -0,0 +1,134 @@
+"""
+Unit tests for batch forecasting and serving stored predictions
+"""
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from app import db
+from app.models import Forecast, JobLog, PriceHistory
+from app.services.batch_forecaster import BatchForecaster, get_fresh_prediction, run_details, universe_companies
+from app.services.chart_data import ChartDataService
+from app.services.prediction_service import PredictionService
+
+
+def fake_predict(self, symbol, models=None, include_sentiment=True):
+    """Prediction stand-in that fails for symbols starting with 'BAD'"""
+    if symbol.startswith('BAD'):
+        raise ValueError(f"no data for {symbol}")
+    return {
+        'symbol': symbol,
+        'timestamp': '2024-01-02T00:00:00',
+        'data_points': 500,
+        'predictions': {m: {'prediction': 100.0 + i, 'error': 1.5} for i, m in enumerate(models) if m != 'lstm'},
+        'errors': {'lstm': 'LSTM model returned no prediction'} if 'lstm' in models else {},
+        'success': True,
+        'sentiment': {'enabled': False}
+    }
+
+
+@pytest.fixture
+def forecast_rows(app):
+    """Remove stored forecasts and forecast job logs afterwards"""
+    yield
+    with app.app_context():
+        Forecast.query.delete()
+        JobLog.query.filter_by(job_name='forecast_universe').delete()
+        db.session.commit()
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestBatchForecaster:
+    """Test the batch run, its job log and freshness of stored results"""
+
+    def test_universe_includes_held_companies(self, app, test_holding, test_company):
+        """Test held companies are part of the forecast universe"""
+        with app.app_context():
+            assert test_company.symbol in [c.symbol for c in universe_companies()]
+
+    def test_run_stores_results_and_timings(self, app, test_company, forecast_rows, monkeypatch):
+        """Test results and model errors are stored and each symbol is timed in the job log"""
+        monkeypatch.setattr(PredictionService, 'predict_stock_price', fake_predict)
+        with app.app_context():
+            job = BatchForecaster(processes=0).run(symbols=[test_company.symbol, 'NOPE'])
+
+            assert job.status == 'SUCCESS'
+            assert job.stocks_processed == 1
+            details = run_details(job)
+            assert set(details) == {test_company.symbol}
+            assert details[test_company.symbol]['status'] == 'SUCCESS'
+
+            row = Forecast.query.filter_by(company_id=test_company.company_id).one()
+            assert row.models == 'arima,lstm,lr'
+            assert row.errors == {'lstm': 'LSTM model returned no prediction'}
+            assert row.price_date == date.today()
+            assert 'sentiment' not in row.result
+
+    def test_failures_mark_run_partial(self, app, test_company, forecast_rows, monkeypatch):
+        """Test a failing symbol is logged without stopping the run"""
+        monkeypatch.setattr(PredictionService, 'predict_stock_price', fake_predict)
+        original = test_company.symbol
+        with app.app_context():
+            bad = db.session.merge(test_company)
+            bad.symbol = 'BAD' + original[3:]
+            db.session.commit()
+            try:
+                job = BatchForecaster(processes=0).run(symbols=[bad.symbol])
+            finally:
+                bad.symbol = original
+                db.session.commit()
+
+            assert job.status == 'FAILED'
+            assert job.error_message.startswith('1 symbols failed')
+            assert run_details(job)['BAD' + original[3:]]['error'].startswith('no data')
+            assert Forecast.query.count() == 0
+
+    def test_fresh_prediction_served_until_new_price(self, app, test_company, forecast_rows, monkeypatch):
+        """Test stored results are limited to the requested models and go stale on a newer price"""
+        monkeypatch.setattr(PredictionService, 'predict_stock_price', fake_predict)
+        with app.app_context():
+            BatchForecaster(models=['arima', 'lr'], processes=0).run(symbols=[test_company.symbol])
+
+            fresh = get_fresh_prediction(test_company.symbol.lower(), ['lr'])
+            assert fresh['precomputed'] is True
+            assert list(fresh['predictions']) == ['lr']
+            assert get_fresh_prediction(test_company.symbol, ['lstm']) is None
+
+            db.session.add(PriceHistory(
+                company_id=test_company.company_id, date=date.today() + timedelta(days=1),
+                open=Decimal('1'), high=Decimal('1'), low=Decimal('1'), close=Decimal('1'),
+                adjusted_close=Decimal('1'), volume=1
+            ))
+            db.session.commit()
+            assert get_fresh_prediction(test_company.symbol, ['lr']) is None
+
+    def test_missing_forecasts_table_runs_models_live(self, app, test_company):
+        """Test a database without the forecasts table falls back to running the models"""
+        from sqlalchemy import text
+        with app.app_context():
+            db.session.execute(text('ALTER TABLE forecasts RENAME TO forecasts_hidden'))
+            db.session.commit()
+            try:
+                assert get_fresh_prediction(test_company.symbol) is None
+                assert db.session.get(type(test_company), test_company.company_id) is not None
+            finally:
+                db.session.execute(text('ALTER TABLE forecasts_hidden RENAME TO forecasts'))
+                db.session.commit()
+
+    def test_chart_service_serves_stored_prediction(self, app, test_company, forecast_rows, monkeypatch):
+        """Test /predict's chart service uses the stored result instead of running the models"""
+        monkeypatch.setattr(PredictionService, 'predict_stock_price', fake_predict)
+        with app.app_context():
+            BatchForecaster(processes=0).run(symbols=[test_company.symbol])
+            app.extensions.pop('chart_cache', None)
+
+            def not_called(*args, **kwargs):
+                raise AssertionError('models should not run')
+
+            monkeypatch.setattr(PredictionService, 'predict_stock_price', not_called)
+            results, _ = ChartDataService().prediction(test_company.symbol, ['arima', 'lr'])
+            app.extensions.pop('chart_cache', None)
+
+        assert results['precomputed'] is True
+        assert set(results['predictions']) == {'arima', 'lr'}
+        assert 'sentiment' in results
@@ -0,0 +1,172 @@
+"""
+Unit tests for chart series and the PNG fallback renderer
+"""
+import json
+import os
+import numpy as np
+import pytest
+from app.services.chart_data import (
+    ChartDataService, build_forecast_charts, build_prediction_charts, downsample,
+    lttb_indices, price_history_series, resample_ohlc
+)
+from app.utils.exceptions import ValidationError
+from app.utils.visualization import DataVisualizer
+
+
+class FakePredictionService:
+    """Prediction service returning fixed results and counting calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_stock_price(self, symbol, models):
+        self.calls.append(('predict', symbol, models))
+        return {
+            'symbol': symbol,
+            'timestamp': '2024-01-02T00:00:00',
+            'success': True,
+            'predictions': {
+                'arima': {'prediction': 101.0, 'actual': [100.0, 101.0, 102.0], 'predicted': [99.5, 101.2, 102.4]},
+                'lr': {'prediction': 103.0, 'actual': [100.0, 101.0, 102.0], 'predicted': [100.1, 100.9, 102.2],
+                       'forecast': [103.0, 103.5]}
+            },
+            'sentiment': {'positive': 5, 'negative': 2, 'neutral': 3, 'sentiment': 'POSITIVE'}
+        }
+
+    def generate_forecast(self, symbol, days, models):
+        self.calls.append(('forecast', symbol, models, days))
+        return {
+            'symbol': symbol,
+            'forecast_days': days,
+            'success': True,
+            'forecasts': {'arima': {'forecast': [float(i) for i in range(days)]}, 'lstm': {}},
+            'sentiment': {'enabled': False}
+        }
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestChartSeries:
+    """Test chart specs built from prediction and forecast results"""
+
+    def test_downsample_keeps_endpoints(self):
+        """Test long series are thinned to max_points including the first and last point"""
+        indices, values = downsample([float(i) for i in range(1000)], 50)
+
+        assert len(indices) == 50
+        assert (indices[0], indices[-1]) == (0, 999)
+        assert values == [float(i) for i in indices]
+        assert downsample([1.0, float('nan')], 10) == ([0, 1], [1.0, None])
+
+    def test_prediction_charts(self):
+        """Test per-model, comparison, forecast and sentiment charts are built"""
+        charts = build_prediction_charts(FakePredictionService().predict_stock_price('AAPL', None), 500)
+
+        assert set(charts) == {'arima', 'lr', 'lr_forecast', 'comparison', 'sentiment'}
+        assert [s['name'] for s in charts['comparison']['series']] == ['Actual Price', 'ARIMA', 'Linear Regression']
+        assert charts['lr_forecast']['x'] == [1, 2]
+        assert charts['sentiment']['values'] == [5, 2, 3]
+        json.dumps(charts)
+
+    def test_forecast_charts_downsampled(self):
+        """Test forecast series are capped at max_points and empty forecasts skipped"""
+        charts = build_forecast_charts(FakePredictionService().generate_forecast('AAPL', 365, None), 100)
+
+        assert set(charts) == {'arima'}
+        assert len(charts['arima']['x']) == 100
+        assert charts['arima']['x'][-1] == 365
+
+    def test_service_reuses_results(self, app):
+        """Test repeated chart requests run the models once per TTL"""
+        fake = FakePredictionService()
+        with app.app_context():
+            app.extensions.pop('chart_cache', None)
+            service = ChartDataService(prediction_service=fake)
+
+            service.prediction('aapl', ['lr', 'arima'])
+            results, charts = service.prediction('AAPL', ['arima', 'lr'])
+            service.forecast('AAPL', 10)
+            app.extensions.pop('chart_cache', None)
+
+        assert fake.calls == [('predict', 'AAPL', ['arima', 'lr']), ('forecast', 'AAPL', ['arima', 'lstm', 'lr'], 10)]
+        assert ChartDataService.payload(results, charts)['charts'] is charts
+
+
+def daily_prices(start, days):
+    """Weekday OHLCV arrays with close rising by 1 per day from 100"""
+    dates = np.array([d for d in np.arange(np.datetime64(start), np.datetime64(start) + days)
+                      if np.is_busday(d)], dtype='datetime64[D]')
+    close = 100.0 + np.arange(len(dates))
+    return {
+        'date': dates, 'open': close - 0.5, 'high': close + 1.0, 'low': close - 1.0,
+        'close': close, 'volume': np.full(len(dates), 10, dtype=np.int64)
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestDownsampling:
+    """Test LTTB selection and OHLC resampling"""
+
+    def test_lttb_keeps_spikes(self):
+        """Test a single-day spike that even spacing would miss is kept"""
+        y = np.sin(np.linspace(0, 20, 5000))
+        y[1234] = 50.0
+        indices = lttb_indices(np.arange(5000), y, 200)
+
+        assert len(indices) == 200
+        assert (indices[0], indices[-1]) == (0, 4999)
+        assert 1234 in indices
+        assert np.all(np.diff(indices) > 0)
+        assert lttb_indices(np.arange(5), y[:5], 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_weekly_and_monthly_bars(self):
+        """Test bars open on the first day, close on the last and span high/low/volume"""
+        prices = daily_prices('2024-01-01', 60)  # Monday 1 Jan to 29 Feb
+
+        weekly = resample_ohlc(prices, 'weekly')
+        monthly = resample_ohlc(prices, 'monthly')
+
+        assert len(weekly['date']) == 9
+        assert str(weekly['date'][1]) == '2024-01-08'
+        assert (weekly['open'][0], weekly['close'][0]) == (99.5, 104.0)
+        assert (weekly['high'][0], weekly['low'][0], weekly['volume'][0]) == (105.0, 99.0, 50)
+        assert [str(d) for d in monthly['date']] == ['2024-01-01', '2024-02-01']
+        assert monthly['close'][0] == 100.0 + 22
+        assert monthly['volume'].tolist() == [230, 210]
+
+    def test_price_history_series(self):
+        """Test rows are resampled, then thinned to points, and bad parameters rejected"""
+        prices = daily_prices('2020-01-01', 5 * 365)
+
+        rows = price_history_series(prices, interval='weekly', points=50)
+
+        assert len(rows) == 50
+        assert rows[0]['date'] == '2020-01-01'
+        assert rows[-1]['close'] == prices['close'][-1]
+        assert len(price_history_series(prices)) == len(prices['date'])
+        with pytest.raises(ValidationError):
+            price_history_series(prices, interval='hourly')
+        with pytest.raises(ValidationError):
+            price_history_series(prices, points=1)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+def test_png_fallback_is_content_addressed(tmp_path):
+    """Test the same chart renders once in the worker and is then served from disk"""
+    pytest.importorskip('matplotlib')
+    visualizer = DataVisualizer(plots_dir=str(tmp_path))
+    charts = build_prediction_charts(FakePredictionService().predict_stock_price('AAPL', None), 500)
+    charts = {'arima': charts['arima'], 'sentiment': charts['sentiment']}
+
+    try:
+        first = visualizer.render_chart_pngs(charts, 'AAPL', timeout=60)
+        second = visualizer.render_chart_pngs(charts, 'AAPL', timeout=60)
+    finally:
+        visualizer._pool and visualizer._pool.shutdown()
+
+    assert first == second
+    assert set(first) == {'arima', 'sentiment'}
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in first.values())
+    assert visualizer.chart_filename('arima', charts['arima'], 'AAPL') == first['arima']
@@ -0,0 +1,155 @@
+"""
+Unit tests for market data providers
+"""
+import pytest
+from datetime import date
+from decimal import Decimal
+from app.services.market_data import (
+    LocalCSVProvider, YFinanceProvider, create_provider, get_market_data_provider
+)
+from app.utils.exceptions import StockNotFoundError
+
+
+YFINANCE_CSV = """Price,Close,High,Low,Open,Volume
+Ticker,TEST,TEST,TEST,TEST,TEST
+Date,,,,,
+2024-01-03,101.5,102.0,100.0,100.5,1000
+2024-01-02,100.25,101.0,99.0,99.5,900
+2024-01-05,103.0,104.0,102.0,102.5,1100
+"""
+
+PLAIN_CSV = """Date,Open,High,Low,Close,Volume
+2024-01-02 00:00:00-05:00,10.0,11.0,9.0,10.5,100
+2024-01-03 00:00:00-05:00,10.5,12.0,10.0,11.7525,200
+"""
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Directory with one CSV in each supported layout"""
+    (tmp_path / 'TEST.csv').write_text(YFINANCE_CSV)
+    (tmp_path / 'PLAIN.csv').write_text(PLAIN_CSV)
+    return tmp_path
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestLocalCSVProvider:
+    """Test LocalCSVProvider functionality"""
+
+    def test_reads_yfinance_layout_sorted(self, data_dir):
+        """Test the three-row yfinance header is parsed and rows are sorted"""
+        provider = LocalCSVProvider([str(data_dir)])
+        history = provider.get_price_history('TEST')
+
+        assert list(history.index.date) == [date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 5)]
+        assert history['Close'].iloc[0] == 100.25
+
+    def test_reads_plain_layout_with_timezone(self, data_dir):
+        """Test a plain Date column with UTC offsets is normalised to dates"""
+        provider = LocalCSVProvider([str(data_dir)])
+
+        assert provider.get_price_on('PLAIN', date(2024, 1, 3)) == Decimal('11.7525')
+
+    def test_current_price_is_last_close(self, data_dir):
+        """Test the current price without a reference date is the last close"""
+        provider = LocalCSVProvider([str(data_dir)])
+
+        assert provider.get_current_price('test') == Decimal('103.0')
+
+    def test_current_price_respects_reference_date(self, data_dir):
+        """Test the current price uses the close on or before the reference date"""
+        provider = LocalCSVProvider([str(data_dir)], reference_date=date(2024, 1, 4))
+
+        assert provider.get_current_price('TEST') == Decimal('101.5')
+        assert len(provider.get_price_history('TEST')) == 2
+
+    def test_unknown_symbol(self, data_dir):
+        """Test missing symbols raise StockNotFoundError"""
+        provider = LocalCSVProvider([str(data_dir)])
+
+        assert not provider.has_symbol('NOPE')
+        assert provider.get_price_history('NOPE') is None
+        with pytest.raises(StockNotFoundError):
+            provider.get_current_price('NOPE')
+        with pytest.raises(StockNotFoundError):
+            provider.get_company_info('NOPE')
+
+    def test_date_before_first_row(self, data_dir):
+        """Test looking up a date before the data starts"""
+        provider = LocalCSVProvider([str(data_dir)])
+
+        with pytest.raises(StockNotFoundError, match="on or before"):
+            provider.get_price_on('TEST', date(2023, 12, 31))
+
+    def test_available_symbols(self, data_dir):
+        """Test symbols are listed from the data directories"""
+        provider = LocalCSVProvider([str(data_dir), str(data_dir / 'missing')])
+
+        assert provider.available_symbols() == ['PLAIN', 'TEST']
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestProviderSelection:
+    """Test provider registry and app configuration"""
+
+    def test_create_local_provider_from_config(self, data_dir):
+        """Test the local provider picks up data dirs and simulation date"""
+        provider = create_provider('local', {
+            'MARKET_DATA_DIRS': [str(data_dir)],
+            'SIMULATION_DATE': '2024-01-02'
+        })
+
+        assert isinstance(provider, LocalCSVProvider)
+        assert provider.get_current_price('TEST') == Decimal('100.25')
+
+    def test_unknown_provider(self):
+        """Test an unknown provider name is rejected"""
+        with pytest.raises(ValueError, match="Unknown market data provider"):
+            create_provider('bloomberg', {})
+
+    def test_default_provider_is_yfinance(self, app):
+        """Test the app uses yfinance unless configured otherwise"""
+        with app.app_context():
+            assert isinstance(get_market_data_provider(), YFinanceProvider)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestBatchPrices:
+    """Test fetching prices for several symbols at once"""
+
+    def test_default_batch_skips_unpriced(self, data_dir):
+        """Test the default batch omits symbols the provider cannot price"""
+        provider = LocalCSVProvider([str(data_dir)])
+
+        assert provider.get_current_prices(['TEST', 'NOPE']) == {'TEST': Decimal('103.0')}
+
+    def test_repository_uses_stored_closes_then_one_batch(self, app, test_company, monkeypatch):
+        """Test today's stored closes are used and the rest come from one provider call"""
+        from app.services.stock_repository import StockRepository
+        from app.utils.exceptions import ValidationError
+
+        calls = []
+
+        def fake_batch(self, symbols):
+            calls.append(list(symbols))
+            return {symbol: Decimal('42.00') for symbol in symbols if symbol != 'NOPE'}
+
+        monkeypatch.setattr(YFinanceProvider, 'get_current_prices', fake_batch)
+        with app.app_context():
+            repo = StockRepository()
+
+            prices = repo.get_current_prices_with_mode([test_company.symbol, 'aaa', 'BBB'])
+
+            assert prices == {test_company.symbol: Decimal('152.00'), 'AAA': Decimal('42.00'),
+                              'BBB': Decimal('42.00')}
+            assert calls == [['AAA', 'BBB']]
+
+            # Served from the repository cache the second time
+            repo.get_current_prices_with_mode(['AAA', 'BBB'])
+            assert len(calls) == 1
+
+            with pytest.raises(ValidationError, match='NOPE'):
+                repo.get_current_prices_with_mode(['AAA', 'NOPE'])
@@ -0,0 +1,106 @@
+"""
+Unit tests for walk-forward model evaluation
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from app.services import model_evaluation
+from app.services.model_evaluation import (
+    ModelEvaluator, evaluate_model, expand_grid, walk_forward_origins
+)
+from app.utils.exceptions import ValidationError
+
+
+def price_frame(days=200, seed=3):
+    """Preprocessed-style OHLCV frame of a random walk"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, days)))
+    return pd.DataFrame({
+        'Open': close * 0.995, 'High': close * 1.01, 'Low': close * 0.99,
+        'Close': close, 'Volume': np.full(days, 1000)
+    }, index=pd.bdate_range('2022-01-03', periods=days))
+
+
+def last_close(train, test, params):
+    """Naive forecaster repeating the last training close, shifted by params['offset']"""
+    return np.full(len(test), train['Close'].iloc[-1] + params.get('offset', 0.0))
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestWalkForward:
+    """Test folds, grids and per-model scoring"""
+
+    def test_origins_and_grid(self):
+        """Test origins are the last non-overlapping windows and grids expand to every combination"""
+        assert walk_forward_origins(100, 5, 3, 50) == [85, 90, 95]
+        assert walk_forward_origins(100, 20, 5, 50) == [60, 80]
+        assert expand_grid({'order': [(1, 1, 0), (2, 1, 0)], 'trend': ['n']}) == [
+            {'order': (1, 1, 0), 'trend': 'n'}, {'order': (2, 1, 0), 'trend': 'n'}
+        ]
+        assert expand_grid({}) == [{}]
+
+    def test_scores_forecasts_after_each_origin(self, monkeypatch):
+        """Test errors are measured only on the rows after each origin"""
+        monkeypatch.setitem(model_evaluation.FORECASTERS, 'naive', last_close)
+        close = pd.Series([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        frame = pd.DataFrame({'Close': close})
+
+        result = evaluate_model('naive', {}, frame, [2, 4], horizon=2)
+
+        # Folds forecast 2 for [3, 4] and 4 for [5, 6]
+        assert (result['folds'], result['points']) == (2, 4)
+        assert result['mae'] == pytest.approx(1.5)
+        assert result['rmse'] == pytest.approx(np.sqrt(2.5))
+
+    def test_real_models_are_scored(self):
+        """Test ARIMA and linear regression run through their model classes"""
+        frame = price_frame()
+        arima = evaluate_model('arima', {'order': (1, 1, 0)}, frame, [190, 195], horizon=5)
+        lr = evaluate_model('lr', {}, frame, [190, 195], horizon=5)
+
+        assert (arima['folds'], arima['points']) == (2, 10)
+        assert arima['mape'] < 5
+        assert (lr['folds'], lr['points']) == (2, 10)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestModelEvaluator:
+    """Test the evaluator's cache, process pool and leaderboard"""
+
+    def test_leaderboard_and_cache(self, tmp_path, monkeypatch):
+        """Test the most accurate parameters rank first and repeat runs come from the cache"""
+        monkeypatch.setitem(model_evaluation.FORECASTERS, 'naive', last_close)
+        frames = {'AAA': price_frame(seed=1), 'BBB': price_frame(seed=2)}
+        grids = {'naive': {'offset': [0.0, 5.0]}}
+        evaluator = ModelEvaluator(horizon=5, folds=3, processes=0, cache_dir=str(tmp_path))
+
+        first = evaluator.evaluate(frames, grids)
+        monkeypatch.setitem(model_evaluation.FORECASTERS, 'naive', None)
+        second = evaluator.evaluate(frames, grids)
+
+        assert len(first) == 4 and not first['cached'].any()
+        assert second['cached'].all()
+        pd.testing.assert_frame_equal(first.drop(columns='cached'), second.drop(columns='cached'))
+
+        board = ModelEvaluator.leaderboard(first)
+        assert board['params'].tolist() == ['{"offset": 0.0}', '{"offset": 5.0}']
+        assert board['symbols'].tolist() == [2, 2]
+        assert board['rank'].tolist() == [1, 2]
+
+    def test_process_pool_matches_in_process(self):
+        """Test worker processes give the same scores and failures are reported per task"""
+        frames = {'AAA': price_frame(seed=1), 'BBB': price_frame(seed=2)}
+        grids = {'lr': {}, 'arima': {'order': [(-1, 1, 0)]}}
+
+        local = ModelEvaluator(horizon=5, folds=2, processes=0).evaluate(frames, grids)
+        pooled = ModelEvaluator(horizon=5, folds=2, processes=2).evaluate(frames, grids)
+
+        columns = ['model', 'params', 'symbol', 'folds', 'rmse', 'error']
+        pd.testing.assert_frame_equal(local[columns], pooled[columns])
+        assert local.loc[local['model'] == 'lr', 'folds'].tolist() == [2, 2]
+        assert local.loc[local['model'] == 'arima', 'error'].str.contains('did not fit').all()
+        assert ModelEvaluator.leaderboard(local)[['model', 'failed']].values.tolist() == [['lr', 0], ['arima', 2]]
+        with pytest.raises(ValidationError):
+            ModelEvaluator(processes=0).evaluate(frames, {'prophet': {}})
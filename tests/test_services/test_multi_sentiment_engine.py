@@ -0,0 +1,94 @@
+"""
+Unit tests for concurrent, incremental multi-source sentiment fetching
+"""
+import pytest
+import time
+from app.services import sentiment_ingestion
+from app.services.multi_sentiment_engine import MultiSentimentEngine
+from app.services.sentiment_cache import get_sentiment_cache
+from app.services.sentiment_ingestion import SentimentIngestor
+
+
+def slow_source(texts, delay, calls=None):
+    """Source fetch that returns texts after a delay, recording the watermark it was given"""
+    def fetch(symbol, since, count):
+        if calls is not None:
+            calls.append(since)
+        time.sleep(delay)
+        return list(texts), f"{symbol}-{len(calls or [])}"
+    return fetch
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Engine with both sources enabled and a fresh ingestor"""
+    monkeypatch.setattr(sentiment_ingestion, '_ingestor', SentimentIngestor())
+    engine = MultiSentimentEngine()
+    engine.twitter_enabled = True
+    engine.news_enabled = True
+    return engine
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestConcurrentSources:
+    """Test sources are fetched together under one deadline"""
+
+    def test_sources_run_concurrently(self, engine, monkeypatch):
+        """Test total latency is the slowest source, not the sum"""
+        monkeypatch.setattr(engine, 'fetch_twitter_since', slow_source(['up'], 0.3))
+        monkeypatch.setattr(engine, 'fetch_news_since', slow_source(['up', 'more'], 0.3))
+
+        started = time.monotonic()
+        result = engine.analyze_sentiment('aapl')
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.55
+        assert result['total_items'] == 3
+        assert result['sources'] == ['Twitter', 'News']
+        assert result['partial'] is False
+
+    def test_slow_source_left_out(self, app, engine, monkeypatch):
+        """Test a source past the deadline is dropped, marked partial and not cached"""
+        monkeypatch.setitem(app.config, 'SENTIMENT_SOURCE_TIMEOUT', 0.2)
+        monkeypatch.setattr(engine, 'fetch_twitter_since', slow_source(['late'], 2))
+        monkeypatch.setattr(engine, 'fetch_news_since', slow_source(['news'], 0))
+
+        started = time.monotonic()
+        with app.app_context():
+            result = engine.get_sentiment_with_cache('AAPL')
+
+        assert time.monotonic() - started < 1
+        assert result['partial'] is True
+        assert result['timed_out_sources'] == ['Twitter']
+        assert result['sources'] == ['News']
+        assert result['total_items'] == 1
+        with app.app_context():
+            assert get_sentiment_cache().peek('AAPL', engine.cache_source) is None
+
+    def test_failing_source_does_not_fail_analysis(self, engine, monkeypatch):
+        """Test an exception from one source yields results from the other"""
+        def broken(symbol, since, count):
+            raise RuntimeError('upstream down')
+        monkeypatch.setattr(engine, 'fetch_twitter_since', broken)
+        monkeypatch.setattr(engine, 'fetch_news_since', slow_source(['news'], 0))
+
+        result = engine.analyze_sentiment('AAPL')
+
+        assert result['sources'] == ['News']
+        assert result['partial'] is False
+
+    def test_refresh_fetches_from_watermarks(self, engine, monkeypatch):
+        """Test each source is asked only for items after the last one ingested"""
+        twitter_calls, news_calls = [], []
+        monkeypatch.setattr(engine, 'fetch_twitter_since', slow_source(['a', 'b'], 0, twitter_calls))
+        monkeypatch.setattr(engine, 'fetch_news_since', slow_source(['c'], 0, news_calls))
+
+        first = engine.analyze_sentiment('AAPL')
+        second = engine.analyze_sentiment('AAPL')
+
+        assert twitter_calls == [None, 'AAPL-1']
+        assert news_calls == [None, 'AAPL-1']
+        assert first['new_items'] == 3
+        assert second['new_items'] == 3
+        assert second['total_items'] == 6
@@ -0,0 +1,131 @@
+"""
+Unit tests for NotificationService unread counts and bulk read-state updates
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import inspect
+from app import db
+from app.models.notification import Notification
+from app.services.notification_service import NotificationService, unread_counts
+
+
+def insert_without_orm(user_id, is_read=False):
+    """Insert a notification with Core so no ORM events fire"""
+    db.session.execute(Notification.__table__.insert().values(
+        user_id=user_id, notification_type='SYSTEM', title='raw', message='raw',
+        is_read=is_read, created_at=datetime.utcnow()
+    ))
+    db.session.commit()
+
+
+@pytest.fixture
+def service(app, test_user):
+    """NotificationService with an empty count cache"""
+    with app.app_context():
+        unread_counts.invalidate()
+        yield NotificationService()
+        Notification.query.filter_by(user_id=test_user.user_id).delete()
+        db.session.commit()
+        unread_counts.invalidate()
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestUnreadCount:
+    """Test cached unread counts"""
+
+    def test_count_is_cached(self, service, test_user):
+        """Test repeated lookups are served from cache until invalidated"""
+        service.create_notification(test_user.user_id, 'SYSTEM', 'One', 'First')
+        assert service.get_unread_count(test_user.user_id) == 1
+
+        insert_without_orm(test_user.user_id)
+        assert service.get_unread_count(test_user.user_id) == 1
+
+        unread_counts.invalidate(test_user.user_id)
+        assert service.get_unread_count(test_user.user_id) == 2
+
+    def test_cache_disabled_with_zero_ttl(self, app, service, test_user, monkeypatch):
+        """Test a TTL of 0 counts on every call"""
+        monkeypatch.setitem(app.config, 'NOTIFICATION_COUNT_TTL', 0)
+        assert service.get_unread_count(test_user.user_id) == 0
+
+        insert_without_orm(test_user.user_id)
+        assert service.get_unread_count(test_user.user_id) == 1
+
+    def test_create_notification_invalidates_cached_count(self, service, test_user):
+        """Test creating a notification makes the next read recount"""
+        assert service.get_unread_count(test_user.user_id) == 0
+        insert_without_orm(test_user.user_id)  # invisible to the cache
+
+        service.create_notification(test_user.user_id, 'SYSTEM', 'New', 'Message')
+
+        assert service.get_unread_count(test_user.user_id) == 2
+
+    def test_orm_writes_elsewhere_invalidate(self, service, test_user):
+        """Test notifications added directly through the ORM drop the cached count"""
+        assert service.get_unread_count(test_user.user_id) == 0
+
+        db.session.add(Notification(user_id=test_user.user_id, notification_type='SYSTEM',
+                                    title='Direct', message='Added by another service'))
+        db.session.commit()
+
+        assert service.get_unread_count(test_user.user_id) == 1
+
+    def test_create_notification_unknown_user(self, service):
+        """Test notifications for missing users are rejected"""
+        with pytest.raises(ValueError, match="not found"):
+            service.create_notification(999999, 'SYSTEM', 'Nobody', 'Message')
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestReadState:
+    """Test read-state updates keep the count consistent"""
+
+    def test_mark_as_read_decrements(self, service, test_user):
+        """Test marking one notification read lowers the count"""
+        first = service.create_notification(test_user.user_id, 'SYSTEM', 'A', 'A')
+        service.create_notification(test_user.user_id, 'SYSTEM', 'B', 'B')
+        assert service.get_unread_count(test_user.user_id) == 2
+
+        assert service.mark_as_read(first.notification_id)
+        assert service.mark_as_read(first.notification_id)
+
+        assert service.get_unread_count(test_user.user_id) == 1
+
+    def test_mark_all_as_read(self, service, test_user):
+        """Test all unread notifications are marked in one update"""
+        for i in range(3):
+            service.create_notification(test_user.user_id, 'SYSTEM', f'N{i}', 'Message')
+        assert service.get_unread_count(test_user.user_id) == 3
+
+        assert service.mark_all_as_read(test_user.user_id) == 3
+
+        assert service.get_unread_count(test_user.user_id) == 0
+        unread_counts.invalidate()
+        assert service.get_unread_count(test_user.user_id) == 0
+        assert all(n.read_at is not None for n in service.get_user_notifications(test_user.user_id))
+
+    def test_delete_all_read(self, service, test_user):
+        """Test only read notifications are deleted"""
+        read = service.create_notification(test_user.user_id, 'SYSTEM', 'Read', 'Message')
+        service.create_notification(test_user.user_id, 'SYSTEM', 'Unread', 'Message')
+        service.mark_as_read(read.notification_id)
+
+        assert service.delete_all_read(test_user.user_id) == 1
+
+        remaining = service.get_user_notifications(test_user.user_id)
+        assert [n.title for n in remaining] == ['Unread']
+        assert service.get_unread_count(test_user.user_id) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.services
+def test_composite_index_exists(app):
+    """Test the (user_id, is_read, created_at) index is created"""
+    with app.app_context():
+        indexes = inspect(db.engine).get_indexes('notifications')
+
+    columns = {index['name']: index['column_names'] for index in indexes}
+    assert columns['idx_notifications_user_read_created'] == ['user_id', 'is_read', 'created_at']
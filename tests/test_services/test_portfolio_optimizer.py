@@ -0,0 +1,222 @@
+"""
+Unit tests for the portfolio optimizer and rebalancing planner
+"""
+import numpy as np
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from app import db
+from app.models import Company, Holdings, Order, PriceHistory, Transaction, Wallet
+from app.services.portfolio_optimizer import (
+    PortfolioOptimizer,
+    max_sharpe_weights,
+    min_variance_weights,
+    plan_rebalance,
+    project_to_simplex,
+    risk_parity_weights
+)
+from app.utils.exceptions import ValidationError
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestOptimizers:
+    """Test the weight solvers"""
+
+    def test_projection_respects_cap(self):
+        """Test projected weights are non-negative, capped and sum to one"""
+        rng = np.random.default_rng(5)
+        for cap in (1.0, 0.5, 0.25):
+            for _ in range(50):
+                w = project_to_simplex(rng.normal(size=8) * 3, cap)
+                assert w.sum() == pytest.approx(1.0)
+                assert w.min() >= 0
+                assert w.max() <= cap + 1e-12
+
+    def test_min_variance_two_assets(self):
+        """Test the closed-form minimum-variance split of two uncorrelated assets"""
+        covariance = np.diag([0.04, 0.01])
+
+        w = min_variance_weights(covariance)
+
+        np.testing.assert_allclose(w, [0.2, 0.8], atol=1e-6)
+
+    def test_risk_parity_equalizes_contributions(self):
+        """Test each asset contributes the same share of variance"""
+        rng = np.random.default_rng(9)
+        returns = rng.normal(0, 0.01, size=(400, 5)) * [1, 2, 3, 1, 0.5] + rng.normal(0, 0.01, size=(400, 1))
+        covariance = np.cov(returns, rowvar=False)
+
+        w = risk_parity_weights(covariance)
+        contributions = w * (covariance @ w)
+
+        np.testing.assert_allclose(contributions / contributions.sum(), 0.2, atol=1e-6)
+
+    def test_max_sharpe_beats_alternatives(self):
+        """Test the max-Sharpe portfolio beats equal and min-variance weights within the cap"""
+        rng = np.random.default_rng(1)
+        returns = rng.normal(0.0004, 0.01, size=(500, 8)) + rng.normal(0, 0.01, size=(500, 1))
+        mu = returns.mean(axis=0) * 252
+        covariance = np.cov(returns, rowvar=False) * 252
+
+        def sharpe(w):
+            return (w @ mu) / np.sqrt(w @ covariance @ w)
+
+        w = max_sharpe_weights(mu, covariance, max_weight=0.3)
+
+        assert w.max() <= 0.3 + 1e-9
+        assert sharpe(w) >= sharpe(np.full(8, 1 / 8))
+        assert sharpe(w) >= sharpe(min_variance_weights(covariance, 0.3))
+
+    def test_max_sharpe_without_positive_excess_is_min_variance(self):
+        """Test falling back to minimum variance when nothing beats the risk-free rate"""
+        covariance = np.diag([0.04, 0.01])
+
+        w = max_sharpe_weights(np.array([-0.1, -0.2]), covariance)
+
+        np.testing.assert_allclose(w, [0.2, 0.8], atol=1e-6)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestPlanRebalance:
+    """Test plan_rebalance order generation"""
+
+    def test_orders_reach_targets(self):
+        """Test one order per symbol, sells first, unwanted holdings closed"""
+        plan = plan_rebalance(
+            holdings={'AAA': 100, 'BBB': 10, 'CCC': 5},
+            cash=Decimal('1000'),
+            prices={'AAA': Decimal('10'), 'BBB': Decimal('50'), 'CCC': Decimal('20'), 'DDD': Decimal('25')},
+            targets={'AAA': 0.2, 'BBB': 0.5, 'DDD': 0.3},
+            commission_rate=Decimal('0')
+        )
+
+        # Portfolio value 1000 + 1000 + 500 + 100 = 2600
+        assert plan['portfolio_value'] == Decimal('2600')
+        assert [(o['order_type'], o['symbol'], o['quantity']) for o in plan['orders']] == [
+            ('SELL', 'AAA', 48), ('SELL', 'CCC', 5), ('BUY', 'BBB', 16), ('BUY', 'DDD', 31)
+        ]
+        assert plan['cash_after'] == Decimal('2600') - Decimal('520') - Decimal('1300') - Decimal('775')
+
+    def test_small_trades_skipped_but_closes_kept(self):
+        """Test trades below the minimum are dropped unless they close a position"""
+        plan = plan_rebalance(
+            holdings={'AAA': 10, 'BBB': 1},
+            cash=Decimal('0'),
+            prices={'AAA': Decimal('10'), 'BBB': Decimal('5')},
+            targets={'AAA': 1.0},
+            min_trade_value=Decimal('50')
+        )
+
+        assert [(o['symbol'], o['quantity']) for o in plan['orders']] == [('BBB', 1)]
+
+    def test_buys_trimmed_for_commission(self):
+        """Test buys are reduced until commissions fit in the cash available"""
+        plan = plan_rebalance(
+            holdings={},
+            cash=Decimal('1000'),
+            prices={'AAA': Decimal('10')},
+            targets={'AAA': 1.0},
+            commission_rate=Decimal('0.001')
+        )
+
+        assert plan['orders'][0]['quantity'] == 99
+        assert plan['cash_after'] >= 0
+
+
+@pytest.fixture
+def optimizer_portfolio(app, test_user, monkeypatch):
+    """Three priced companies, a holding in one and a fixed price snapshot"""
+    with app.app_context():
+        companies = [Company(symbol=s, company_name=f'{s} Inc.') for s in ('OPTA', 'OPTB', 'OPTC')]
+        db.session.add_all(companies)
+        db.session.flush()
+
+        rng = np.random.default_rng(21)
+        market = rng.normal(0.0005, 0.01, size=60)
+        for company, scale in zip(companies, (0.5, 1.0, 2.0)):
+            price = 50.0
+            moves = scale * market + rng.normal(0, 0.005, size=60)
+            for day, move in enumerate(moves):
+                price *= 1 + move
+                close = Decimal(str(round(price, 2)))
+                db.session.add(PriceHistory(
+                    company_id=company.company_id, date=date(2024, 3, 1) + timedelta(days=day),
+                    open=close, high=close, low=close, close=close, adjusted_close=close, volume=1000
+                ))
+        db.session.add(Holdings(
+            user_id=test_user.user_id, company_id=companies[0].company_id, quantity=100,
+            average_purchase_price=Decimal('50'), total_invested=Decimal('5000')
+        ))
+        wallet = Wallet.query.filter_by(user_id=test_user.user_id).first()
+        wallet.balance = Decimal('5000.00')
+        db.session.commit()
+
+        prices = {'OPTA': Decimal('50.00'), 'OPTB': Decimal('40.00'), 'OPTC': Decimal('25.00')}
+        monkeypatch.setattr('app.services.stock_repository.StockRepository.get_current_prices_with_mode',
+                            lambda self, symbols: {symbol: prices[symbol] for symbol in symbols})
+        yield {c.symbol: c for c in companies}
+
+        db.session.rollback()
+        ids = [c.company_id for c in companies]
+        for model in (Transaction, Order):
+            model.query.filter(model.company_id.in_(ids)).delete(synchronize_session=False)
+        Holdings.query.filter(Holdings.company_id.in_(ids)).delete(synchronize_session=False)
+        PriceHistory.query.filter(PriceHistory.company_id.in_(ids)).delete(synchronize_session=False)
+        Company.query.filter(Company.company_id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        app.extensions.pop('risk_covariance_cache', None)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestPortfolioOptimizer:
+    """Test PortfolioOptimizer against the database"""
+
+    def test_optimize_and_rebalance(self, test_user, optimizer_portfolio):
+        """Test targets cover holdings plus extra symbols and the plan executes as one basket"""
+        optimizer = PortfolioOptimizer()
+
+        result = optimizer.optimize(test_user.user_id, method='min_variance', symbols=['optb', 'OPTC'],
+                                    max_weight=0.6)
+
+        assert result['as_of'] == date(2024, 4, 29)
+        assert set(result['weights']) <= {'OPTA', 'OPTB', 'OPTC'}
+        assert sum(result['weights'].values()) == pytest.approx(1.0, abs=1e-5)
+        assert max(result['weights'].values()) <= 0.6 + 1e-6
+
+        plan = optimizer.plan_rebalance(test_user.user_id, {'OPTA': 0.5, 'OPTB': 0.5})
+        # 125 shares would use all 5000 in cash; one is dropped to pay the commission
+        assert [(o['order_type'], o['symbol'], o['quantity']) for o in plan['orders']] == [('BUY', 'OPTB', 124)]
+
+        orders = optimizer.execute_rebalance(test_user.user_id, plan)
+
+        assert [o.order_status for o in orders] == ['COMPLETED']
+        assert Holdings.query.filter_by(
+            user_id=test_user.user_id, company_id=optimizer_portfolio['OPTB'].company_id
+        ).one().quantity == 124
+
+    def test_rejects_bad_input(self, test_user, optimizer_portfolio):
+        """Test unknown methods, symbols and impossible caps are rejected"""
+        optimizer = PortfolioOptimizer()
+
+        with pytest.raises(ValidationError, match='method'):
+            optimizer.optimize(test_user.user_id, method='best')
+        with pytest.raises(ValidationError, match='NOPE'):
+            optimizer.optimize(test_user.user_id, symbols=['NOPE'])
+        with pytest.raises(ValidationError, match='max_weight'):
+            optimizer.optimize(test_user.user_id, symbols=['OPTB'], max_weight=0.4)
+        with pytest.raises(ValidationError, match='sum'):
+            optimizer.plan_rebalance(test_user.user_id, {'OPTA': 0.7, 'OPTB': 0.7})
+
+    def test_rebalance_endpoint(self, app, test_user, authenticated_client, optimizer_portfolio):
+        """Test POST /api/portfolio/rebalance executes explicit targets"""
+        response = authenticated_client.post('/api/portfolio/rebalance', json={'targets': {'OPTC': 0.4}})
+
+        assert response.status_code == 200, response.get_json()
+        data = response.get_json()['data']
+        assert [(o['order_type'], o['symbol']) for o in data['plan']['orders']] == [
+            ('SELL', 'OPTA', ), ('BUY', 'OPTC')
+        ]
+        assert len(data['order_ids']) == 2
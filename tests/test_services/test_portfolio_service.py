@@ -145,3 +145,30 @@ class TestPortfolioService:
             
             # May be empty or have test_holding depending on fixtures
             assert isinstance(holdings, list)
+    
+    def test_performance_metrics_short_holding_period(self, app, test_user, test_wallet, test_holding, monkeypatch):
+        """Test a holding under a year reports its total return and survives a risk failure"""
+        from app.services.risk_analytics import RiskAnalyticsService
+        
+        def broken_risk(self, user_id, **kwargs):
+            raise RuntimeError("no prices")
+        
+        monkeypatch.setattr(RiskAnalyticsService, 'get_portfolio_risk', broken_risk)
+        with app.app_context():
+            from datetime import date, datetime, timedelta
+            from app.models import Holdings, PriceHistory
+            
+            holding = db.session.get(Holdings, test_holding.holding_id)
+            holding.first_purchase_date = datetime.utcnow() - timedelta(days=73)
+            db.session.add(PriceHistory(
+                company_id=holding.company_id, date=date.today() + timedelta(days=1),
+                open=Decimal('180.00'), high=Decimal('180.00'), low=Decimal('180.00'),
+                close=Decimal('180.00'), adjusted_close=Decimal('180.00'), volume=1000
+            ))
+            db.session.commit()
+            
+            metrics = PortfolioService().get_performance_metrics(test_user.user_id)
+            
+            assert metrics['total_return_pct'] == Decimal('20')
+            assert metrics['annualized_return'] == metrics['total_return_pct']
+            assert metrics['risk'] is None
@@ -0,0 +1,171 @@
+"""
+Unit tests for the shared price stream poller and SSE endpoint
+"""
+import json
+import pytest
+import time
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from app.services.market_data import LocalCSVProvider
+from app.services.price_stream import CSVReplaySource, PriceStreamHub
+
+
+class FakePrices:
+    """Price source that counts upstream calls"""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = Counter()
+
+    def __call__(self, symbol):
+        self.calls[symbol] += 1
+        if symbol not in self.prices:
+            raise KeyError(symbol)
+        return Decimal(str(self.prices[symbol]))
+
+
+def drain(subscription):
+    """Collect queued updates without blocking"""
+    updates = []
+    while not subscription.updates.empty():
+        updates.append(subscription.updates.get_nowait())
+    return [(u['symbol'], u['price']) for u in updates]
+
+
+@pytest.fixture
+def hub():
+    """Hub whose poller thread is driven manually"""
+    source = FakePrices({'AAPL': 100, 'MSFT': 200})
+    hub = PriceStreamHub(source, interval=60)
+    hub._ensure_started = lambda: None
+    hub.source = source
+    return hub
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestPriceStreamHub:
+    """Test fan-out from one upstream poll"""
+
+    def test_each_symbol_fetched_once_per_poll(self, hub):
+        """Test upstream calls scale with distinct symbols, not subscribers"""
+        subscribers = [hub.subscribe(['AAPL', 'MSFT']) for _ in range(25)]
+        subscribers.append(hub.subscribe(['AAPL']))
+
+        assert hub.poll_once() == 2
+
+        assert hub.source.calls == Counter({'AAPL': 1, 'MSFT': 1})
+        assert drain(subscribers[0]) == [('AAPL', 100.0), ('MSFT', 200.0)]
+        assert drain(subscribers[-1]) == [('AAPL', 100.0)]
+
+    def test_only_changes_are_published(self, hub):
+        """Test unchanged prices are not re-sent and new subscribers get a snapshot"""
+        first = hub.subscribe(['AAPL'])
+        hub.poll_once()
+        hub.poll_once()
+        assert drain(first) == [('AAPL', 100.0)]
+
+        hub.source.prices['AAPL'] = 101
+        hub.poll_once()
+        assert drain(first) == [('AAPL', 101.0)]
+
+        late = hub.subscribe(['AAPL'])
+        assert drain(late) == [('AAPL', 101.0)]
+
+    def test_unsubscribe_stops_polling_symbol(self, hub):
+        """Test symbols without subscribers are no longer fetched"""
+        first = hub.subscribe(['AAPL'])
+        second = hub.subscribe(['AAPL', 'MSFT'])
+        hub.unsubscribe(second)
+        hub.unsubscribe(second)
+
+        hub.poll_once()
+
+        assert hub.source.calls == Counter({'AAPL': 1})
+        assert hub.subscriber_count == 1
+        hub.unsubscribe(first)
+        assert hub.poll_once() == 0
+
+    def test_fetch_errors_skip_symbol(self, hub):
+        """Test a failing symbol does not stop updates for the others"""
+        subscription = hub.subscribe(['NOPE', 'MSFT'])
+
+        hub.poll_once()
+
+        assert drain(subscription) == [('MSFT', 200.0)]
+
+    def test_slow_client_keeps_latest(self):
+        """Test a full client queue drops its oldest updates"""
+        source = FakePrices({'AAPL': 1})
+        hub = PriceStreamHub(source, interval=60, max_pending=2)
+        hub._ensure_started = lambda: None
+        subscription = hub.subscribe(['AAPL'])
+
+        for price in (1, 2, 3):
+            source.prices['AAPL'] = price
+            hub.poll_once()
+
+        assert drain(subscription) == [('AAPL', 2.0), ('AAPL', 3.0)]
+
+    def test_poller_thread_runs_while_subscribed(self):
+        """Test the background poller publishes and exits after the last client leaves"""
+        hub = PriceStreamHub(FakePrices({'AAPL': 5}), interval=0.01)
+        subscription = hub.subscribe(['AAPL'])
+
+        update = subscription.updates.get(timeout=5)
+        assert update['symbol'] == 'AAPL'
+
+        hub.unsubscribe(subscription)
+        deadline = time.monotonic() + 5
+        while hub._thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hub._thread is None
+
+
+@pytest.mark.unit
+@pytest.mark.services
+def test_csv_replay_walks_to_reference_date(tmp_path):
+    """Test STATIC mode replays closes up to the simulation date, then holds"""
+    rows = "\n".join(f"2024-01-{day:02d},{day}.0,{day}.0,{day}.0,{day}.0,100" for day in range(1, 11))
+    (tmp_path / 'TEST.csv').write_text("Date,Open,High,Low,Close,Volume\n" + rows + "\n")
+    provider = LocalCSVProvider([str(tmp_path)], reference_date=date(2024, 1, 8))
+
+    replay = CSVReplaySource(provider, replay_rows=3)
+
+    assert [replay('TEST') for _ in range(5)] == [Decimal('6.0'), Decimal('7.0'), Decimal('8.0'),
+                                                  Decimal('8.0'), Decimal('8.0')]
+
+
+@pytest.mark.unit
+@pytest.mark.routes
+class TestStreamEndpoint:
+    """Test the /api/stocks/stream endpoint"""
+
+    def test_streams_price_events(self, app, authenticated_client, monkeypatch):
+        """Test subscribed symbols arrive as SSE price events"""
+        hub = PriceStreamHub(FakePrices({'AAPL': 150.5}), interval=0.01, app=app)
+        monkeypatch.setitem(app.extensions, 'price_stream', hub)
+        monkeypatch.setitem(app.config, 'PRICE_STREAM_MAX_DURATION', 0.5)
+
+        response = authenticated_client.get('/api/stocks/stream?symbols=aapl', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        body = b''.join(response.response).decode()
+        response.close()
+
+        events = [block for block in body.split('\n\n') if block.startswith('event: price')]
+        assert events
+        data = json.loads(events[0].split('data: ', 1)[1])
+        assert data['symbol'] == 'AAPL'
+        assert data['price'] == 150.5
+        assert hub.subscriber_count == 0
+
+    def test_rejects_bad_symbol_lists(self, app, authenticated_client):
+        """Test missing, invalid and oversized symbol lists are rejected"""
+        assert authenticated_client.get('/api/stocks/stream').status_code == 400
+        assert authenticated_client.get('/api/stocks/stream?symbols=BAD$').status_code == 400
+
+        too_many = ','.join(f"S{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(30))
+        assert authenticated_client.get(f'/api/stocks/stream?symbols={too_many}').status_code == 400
@@ -0,0 +1,150 @@
+"""
+Unit tests for vectorized portfolio risk analytics
+"""
+import numpy as np
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from app import db
+from app.models import Company, Holdings, PriceHistory
+from app.services import risk_analytics
+from app.services.risk_analytics import RiskAnalyticsService, compute_risk_metrics, load_returns_matrix
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestComputeRiskMetrics:
+    """Test compute_risk_metrics against direct per-series calculations"""
+
+    def test_matches_portfolio_series(self):
+        """Test volatility, VaR, CVaR and correlation agree with the weighted return series"""
+        rng = np.random.default_rng(7)
+        returns = rng.normal(0.0005, 0.02, size=(500, 3))
+        weights = np.array([0.5, 0.3, 0.2])
+        portfolio = returns @ weights
+
+        metrics = compute_risk_metrics(returns, weights, confidence=0.95)
+
+        assert metrics['observations'] == 500
+        assert metrics['daily_volatility'] == pytest.approx(np.std(portfolio, ddof=1))
+        assert metrics['annualized_volatility'] == pytest.approx(np.std(portfolio, ddof=1) * np.sqrt(252))
+        assert metrics['historical_var'] == pytest.approx(-np.quantile(portfolio, 0.05))
+        assert metrics['historical_cvar'] >= metrics['historical_var']
+        assert metrics['parametric_var'] == pytest.approx(
+            -(portfolio.mean() - 1.6448536 * np.std(portfolio, ddof=1)), rel=1e-6)
+        assert metrics['parametric_cvar'] > metrics['parametric_var']
+        np.testing.assert_allclose(metrics['correlation'], np.corrcoef(returns, rowvar=False))
+        assert metrics['beta'] is None
+
+    def test_beta_against_benchmark(self):
+        """Test beta of a levered benchmark ignoring days the benchmark is missing"""
+        rng = np.random.default_rng(3)
+        benchmark = rng.normal(0, 0.01, size=250)
+        returns = np.column_stack([2 * benchmark, 2 * benchmark])
+        benchmark_with_gaps = benchmark.copy()
+        benchmark_with_gaps[::10] = np.nan
+
+        metrics = compute_risk_metrics(returns, np.array([0.5, 0.5]), benchmark=benchmark_with_gaps)
+
+        assert metrics['beta'] == pytest.approx(2.0)
+
+    def test_constant_asset_correlation(self):
+        """Test a zero-variance asset does not produce NaN correlations"""
+        returns = np.column_stack([np.linspace(-0.01, 0.01, 30), np.zeros(30)])
+
+        metrics = compute_risk_metrics(returns, np.array([0.5, 0.5]))
+
+        assert metrics['correlation'].tolist() == [[1.0, 0.0], [0.0, 1.0]]
+
+
+@pytest.fixture
+def priced_companies(app):
+    """Two holdings companies and a benchmark with 40 days of prices"""
+    with app.app_context():
+        companies = [Company(symbol=s, company_name=f'{s} Inc.') for s in ('RSKA', 'RSKB', 'RSKIDX')]
+        db.session.add_all(companies)
+        db.session.flush()
+
+        start = date(2024, 1, 1)
+        rng = np.random.default_rng(11)
+        index_moves = rng.normal(0, 0.01, size=40)
+        for company, scale in zip(companies, (1.5, 0.5, 1.0)):
+            price = 100.0
+            for day, move in enumerate(index_moves):
+                if company.symbol == 'RSKB' and day == 5:
+                    continue  # A gap that the aligned matrix must drop
+                price *= 1 + scale * move
+                close = Decimal(str(round(price, 2)))
+                db.session.add(PriceHistory(
+                    company_id=company.company_id, date=start + timedelta(days=day),
+                    open=close, high=close, low=close, close=close, adjusted_close=close, volume=1000
+                ))
+        db.session.commit()
+        yield {c.symbol: c for c in companies}
+
+        ids = [c.company_id for c in companies]
+        Holdings.query.filter(Holdings.company_id.in_(ids)).delete(synchronize_session=False)
+        PriceHistory.query.filter(PriceHistory.company_id.in_(ids)).delete(synchronize_session=False)
+        Company.query.filter(Company.company_id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        app.extensions.pop('risk_covariance_cache', None)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestRiskAnalyticsService:
+    """Test risk metrics for a user's holdings"""
+
+    def test_returns_matrix_is_aligned(self, priced_companies):
+        """Test dates missing for any company are dropped from the matrix"""
+        ids = [priced_companies['RSKA'].company_id, priced_companies['RSKB'].company_id]
+
+        matrix = load_returns_matrix(ids, date(2024, 1, 1))
+
+        assert matrix.company_ids == sorted(ids)
+        assert matrix.returns.shape == (37, 2)
+        assert date(2024, 1, 6) not in matrix.dates
+        assert date(2024, 1, 7) not in matrix.dates
+        assert matrix.covariance.shape == (2, 2)
+
+    def test_portfolio_risk(self, app, test_user, priced_companies, monkeypatch):
+        """Test value weights, beta against the benchmark and covariance caching"""
+        monkeypatch.setitem(app.config, 'RISK_BENCHMARK_SYMBOL', 'RSKIDX')
+        for symbol, quantity in (('RSKA', 10), ('RSKB', 30)):
+            db.session.add(Holdings(
+                user_id=test_user.user_id, company_id=priced_companies[symbol].company_id,
+                quantity=quantity, average_purchase_price=Decimal('100'),
+                total_invested=Decimal(100 * quantity)
+            ))
+        db.session.commit()
+
+        loads = []
+        original_load = risk_analytics.load_returns_matrix
+        monkeypatch.setattr(risk_analytics, 'load_returns_matrix',
+                            lambda *args: loads.append(args) or original_load(*args))
+
+        service = RiskAnalyticsService()
+        risk = service.get_portfolio_risk(test_user.user_id)
+        again = service.get_portfolio_risk(test_user.user_id, confidence=0.99)
+
+        assert len(loads) == 1
+        assert risk['as_of'] == date(2024, 2, 9)
+        assert risk['benchmark'] == 'RSKIDX'
+        assert risk['beta'] == pytest.approx(0.75, abs=0.05)  # 1/4 at 1.5x plus 3/4 at 0.5x
+        assert sum(risk['weights'].values()) == pytest.approx(1.0)
+        assert risk['correlation']['symbols'] == ['RSKA', 'RSKB']
+        assert risk['historical_var_amount'] == pytest.approx(risk['historical_var'] * risk['portfolio_value'])
+        assert again['parametric_var'] > risk['parametric_var']
+
+    def test_no_holdings_or_history(self, app, test_user, priced_companies, monkeypatch):
+        """Test None is returned without holdings or with too little history"""
+        service = RiskAnalyticsService()
+        assert service.get_portfolio_risk(test_user.user_id) is None
+
+        db.session.add(Holdings(
+            user_id=test_user.user_id, company_id=priced_companies['RSKA'].company_id,
+            quantity=1, average_purchase_price=Decimal('100'), total_invested=Decimal('100')
+        ))
+        db.session.commit()
+        monkeypatch.setitem(app.config, 'RISK_MIN_OBSERVATIONS', 60)
+        assert service.get_portfolio_risk(test_user.user_id) is None
@@ -0,0 +1,228 @@
+"""
+Unit tests for the vectorized market screener
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from app import db
+from app.models import Company, PriceHistory
+from app.services.screener import ScreenerService, compute_features, get_feature_table, screen
+from app.utils.exceptions import ValidationError
+
+
+def make_prices(company_id, closes, start=date(2024, 1, 1), volumes=None):
+    """Long-format price rows for one company"""
+    volumes = volumes if volumes is not None else [1000] * len(closes)
+    return pd.DataFrame({
+        'company_id': company_id,
+        'date': [start + timedelta(days=i) for i in range(len(closes))],
+        'close': closes, 'adjusted_close': closes, 'high': closes, 'low': closes,
+        'volume': volumes
+    })
+
+
+COMPANIES = pd.DataFrame({
+    'company_id': [1, 2], 'symbol': ['AAA', 'BBB'], 'company_name': ['A', 'B'],
+    'sector': ['Technology', 'Energy'], 'industry': [None, None], 'market_cap': [10 ** 9, None]
+})
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestComputeFeatures:
+    """Test feature computation against per-company calculations"""
+
+    def test_features_use_each_companys_history(self):
+        """Test returns, ranges, volatility and volume from each company's own rows"""
+        rng = np.random.default_rng(4)
+        closes = list(100 * np.cumprod(1 + rng.normal(0, 0.01, size=80)))
+        volumes = [1000] * 79 + [3000]
+        prices = pd.concat([
+            make_prices(1, closes, volumes=volumes),
+            make_prices(2, [10.0, 11.0], start=date(2024, 3, 1))
+        ])
+
+        features = compute_features(COMPANIES, prices.sample(frac=1, random_state=1))
+
+        a, b = features.loc[1], features.loc[2]
+        assert a['price'] == pytest.approx(closes[-1])
+        assert a['change_1d'] == pytest.approx(closes[-1] / closes[-2] - 1)
+        assert a['return_1m'] == pytest.approx(closes[-1] / closes[-22] - 1)
+        assert a['return_3m'] == pytest.approx(closes[-1] / closes[-64] - 1)
+        assert np.isnan(a['return_6m'])
+        assert a['high_52w'] == pytest.approx(max(closes))
+        assert a['volatility'] == pytest.approx(
+            np.std(np.diff(closes[-64:]) / closes[-64:-1], ddof=1) * np.sqrt(252))
+        assert a['volume_ratio'] == pytest.approx(3.0)
+        assert b['change_1d'] == pytest.approx(0.1)
+        assert b['as_of'] == date(2024, 3, 2)
+        assert np.isnan(b['market_cap'])
+
+    def test_companies_without_prices_dropped(self):
+        """Test only companies with price rows appear"""
+        features = compute_features(COMPANIES, make_prices(2, [1.0, 2.0]))
+
+        assert features.index.tolist() == [2]
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestExpressions:
+    """Test filter and sort expressions"""
+
+    @pytest.fixture
+    def frame(self):
+        prices = pd.concat([make_prices(1, [10.0, 12.0]), make_prices(2, [20.0, 19.0])])
+        return compute_features(COMPANIES, prices)
+
+    def test_filters(self, frame):
+        """Test comparisons, chains, membership and missing values"""
+        def symbols(expression):
+            return screen(frame, expression)['symbol'].tolist()
+
+        assert symbols("change_1d > 0") == ['AAA']
+        assert symbols("sector in ['Energy', 'Utilities'] or price > 100") == ['BBB']
+        assert symbols("-0.1 < change_1d < 0 and not sector == 'Technology'") == ['BBB']
+        assert symbols("market_cap / price > 1") == ['AAA']
+        assert symbols("market_cap != 5") == ['AAA']  # Missing values never match
+        assert symbols("not market_cap < 5") == ['AAA']  # ... not even when negated
+        assert symbols("not (market_cap < 5 or price < 5)") == ['AAA']
+
+    def test_sort(self, frame):
+        """Test descending keys, expression keys and missing values last"""
+        assert screen(frame, sort="-price")['symbol'].tolist() == ['BBB', 'AAA']
+        assert screen(frame, sort="-change_1d * 1")['symbol'].tolist() == ['AAA', 'BBB']
+        assert screen(frame, sort="market_cap, -symbol")['symbol'].tolist() == ['AAA', 'BBB']
+        assert screen(frame, sort="-sector")['symbol'].tolist() == ['AAA', 'BBB']
+
+    @pytest.mark.parametrize('expression', [
+        "__import__('os').system('true')", "price.real > 0", "price ** 2 > 1", "unknown > 1",
+        "sector > 'A'", "price == 'A'", "price", "price >", "x" * 600
+    ])
+    def test_rejects_unsafe_or_invalid(self, frame, expression):
+        """Test anything outside the expression grammar is a validation error"""
+        with pytest.raises(ValidationError):
+            screen(frame, expression)
+
+
+@pytest.fixture
+def screened_companies(app):
+    """Three companies with 30 days of prices and a fresh feature table"""
+    with app.app_context():
+        companies = [
+            Company(symbol='SCRA', company_name='Screen A', sector='Technology', market_cap=5 * 10 ** 9),
+            Company(symbol='SCRB', company_name='Screen B', sector='Technology', market_cap=10 ** 9),
+            Company(symbol='SCRC', company_name='Screen C', sector='Energy', market_cap=2 * 10 ** 9)
+        ]
+        db.session.add_all(companies)
+        db.session.flush()
+        start = date.today() - timedelta(days=29)
+        for company, drift in zip(companies, (0.01, -0.005, 0.002)):
+            price = 50.0
+            for day in range(30):
+                price *= 1 + drift
+                close = Decimal(str(round(price, 2)))
+                db.session.add(PriceHistory(
+                    company_id=company.company_id, date=start + timedelta(days=day),
+                    open=close, high=close, low=close, close=close, adjusted_close=close, volume=1000
+                ))
+        db.session.commit()
+        app.extensions.pop('screener_features', None)
+        yield {c.symbol: c for c in companies}
+
+        ids = [c.company_id for c in companies]
+        PriceHistory.query.filter(PriceHistory.company_id.in_(ids)).delete(synchronize_session=False)
+        Company.query.filter(Company.company_id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        app.extensions.pop('screener_features', None)
+
+
+OURS = "symbol in ['SCRA', 'SCRB', 'SCRC']"
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestScreenerService:
+    """Test screening the database universe"""
+
+    def test_screen_and_paginate(self, screened_companies):
+        """Test filtering, sorting, field selection and pages"""
+        service = ScreenerService()
+
+        first = service.screen(f"{OURS} and sector == 'Technology'", sort='-return_1w', per_page=1,
+                               fields=['price', 'return_1w'])
+        second = service.screen(f"{OURS} and sector == 'Technology'", sort='-return_1w', page=2, per_page=1)
+
+        assert first['total'] == 2
+        assert first['total_pages'] == 2
+        assert list(first['results'][0]) == ['symbol', 'price', 'return_1w']
+        assert first['results'][0]['symbol'] == 'SCRA'
+        assert first['results'][0]['return_1w'] == pytest.approx(1.01 ** 5 - 1, abs=1e-3)
+        assert second['results'][0]['symbol'] == 'SCRB'
+        assert second['results'][0]['as_of'] == date.today().isoformat()
+
+        with pytest.raises(ValidationError, match='bogus'):
+            service.screen(fields=['bogus'])
+
+    def test_price_update_refreshes_company(self, app, screened_companies):
+        """Test a new price row is picked up without a full rebuild"""
+        service = ScreenerService()
+        assert service.screen(f"{OURS} and price > 100")['total'] == 0
+
+        table = get_feature_table()
+        rebuilds = []
+        original_rebuild = table.rebuild
+        table.rebuild = lambda: rebuilds.append(1) or original_rebuild()
+
+        company = screened_companies['SCRC']
+        db.session.add(PriceHistory(
+            company_id=company.company_id, date=date.today() + timedelta(days=1), open=Decimal('150'), high=Decimal('150'),
+            low=Decimal('150'), close=Decimal('150'), adjusted_close=Decimal('150'), volume=5000
+        ))
+        db.session.commit()
+
+        result = service.screen(f"{OURS} and price > 100", fields=['volume_ratio'])
+
+        assert not rebuilds
+        assert [r['symbol'] for r in result['results']] == ['SCRC']
+        assert result['results'][0]['volume_ratio'] == pytest.approx(5.0)
+
+    def test_company_marked_dirty_on_commit(self, app, screened_companies):
+        """Test flushed changes are only picked up once committed, and rollbacks never"""
+        table = get_feature_table()
+        company = screened_companies['SCRA']
+
+        company.market_cap = 6 * 10 ** 9
+        db.session.flush()
+        assert table.refresh_dirty() == 0
+        db.session.rollback()
+        db.session.commit()
+        assert table.refresh_dirty() == 0
+
+        company.market_cap = 7 * 10 ** 9
+        db.session.flush()
+        db.session.commit()
+        assert table.refresh_dirty() == 1
+        assert table.frame.loc[company.company_id, 'market_cap'] == 7 * 10 ** 9
+
+
+@pytest.mark.unit
+@pytest.mark.routes
+class TestScreenEndpoint:
+    """Test the /api/stocks/screen endpoint"""
+
+    def test_screen_endpoint(self, authenticated_client, screened_companies):
+        """Test results come back as JSON and bad expressions are rejected"""
+        response = authenticated_client.get('/api/stocks/screen', query_string={
+            'filter': f"{OURS} and market_cap >= 2e9", 'sort': '-market_cap', 'fields': 'market_cap'
+        })
+
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert [r['symbol'] for r in data['results']] == ['SCRA', 'SCRC']
+
+        bad = authenticated_client.get('/api/stocks/screen', query_string={'filter': "open('x')"})
+        assert bad.status_code == 400
+        assert bad.get_json()['success'] is False
@@ -0,0 +1,136 @@
+"""
+Unit tests for the two-tier sentiment result cache
+"""
+import pytest
+import threading
+from datetime import datetime, timedelta
+from app import db
+from app.models import Company, SentimentCache
+from app.services.sentiment_cache import SentimentResultCache
+from app.services.sentiment_engine import SentimentEngine
+
+
+class Refresher:
+    """Refresh callable returning a fixed result and counting calls"""
+
+    def __init__(self, positive=3, gate=None):
+        self.calls = 0
+        self.positive = positive
+        self.gate = gate
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        return {
+            'symbol': 'SNTA', 'positive': self.positive, 'negative': 1, 'neutral': 1,
+            'total_tweets': self.positive + 2, 'average_polarity': 0.3456,
+            'sentiment': 'POSITIVE', 'timestamp': datetime.utcnow().isoformat()
+        }
+
+
+@pytest.fixture
+def sentiment_company(app):
+    """A company whose sentiment rows are removed afterwards"""
+    with app.app_context():
+        company = Company(symbol='SNTA', company_name='Sentiment A')
+        db.session.add(company)
+        db.session.commit()
+        yield company
+
+        SentimentCache.query.filter_by(company_id=company.company_id).delete(synchronize_session=False)
+        db.session.delete(company)
+        db.session.commit()
+        app.extensions.pop('sentiment_cache', None)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestSentimentResultCache:
+    """Test the memory and database tiers and stale-while-revalidate"""
+
+    def test_miss_then_memory_then_database(self, app, sentiment_company):
+        """Test a fetched result is reused from memory and survives a cold front tier"""
+        refresh = Refresher()
+        cache = SentimentResultCache(app=app)
+
+        first = cache.get_or_refresh('snta', 'TWITTER', refresh, ttl_seconds=3600)
+        second = cache.get_or_refresh('SNTA', 'TWITTER', refresh, ttl_seconds=3600)
+        cold = SentimentResultCache(app=app).get_or_refresh('SNTA', 'TWITTER', refresh, ttl_seconds=3600)
+
+        assert refresh.calls == 1
+        assert 'cached' not in first
+        assert second['cached'] is True
+        assert cold['positive'] == 3
+        assert cold['total_tweets'] == 5
+        assert cold['average_polarity'] == pytest.approx(0.35)
+        assert cold['sentiment'] == 'POSITIVE'
+        row = SentimentCache.query.filter_by(company_id=sentiment_company.company_id).one()
+        assert row.source == 'TWITTER'
+        assert row.expires_at > datetime.utcnow()
+
+    def test_stale_result_served_while_one_refresh_runs(self, app, sentiment_company):
+        """Test expired results return immediately and concurrent callers share one refresh"""
+        cache = SentimentResultCache(app=app)
+        cache.store('SNTA', 'TWITTER', Refresher(positive=1)(), ttl_seconds=0)
+        gate = threading.Event()
+        refresh = Refresher(positive=7, gate=gate)
+
+        stale = [cache.get_or_refresh('SNTA', 'TWITTER', refresh, ttl_seconds=3600) for _ in range(3)]
+        gate.set()
+        cache.join(timeout=5)
+
+        assert [r['positive'] for r in stale] == [1, 1, 1]
+        assert all(r['stale'] for r in stale)
+        assert refresh.calls == 1
+        fresh = cache.get_or_refresh('SNTA', 'TWITTER', refresh, ttl_seconds=3600)
+        assert fresh['positive'] == 7
+        assert 'stale' not in fresh
+
+    def test_too_stale_waits_for_refresh(self, app, sentiment_company):
+        """Test results past the stale window are refetched before returning"""
+        cache = SentimentResultCache(stale_seconds=0, app=app)
+        cache.store('SNTA', 'TWITTER', Refresher(positive=1)(), ttl_seconds=0)
+
+        result = cache.get_or_refresh('SNTA', 'TWITTER', Refresher(positive=4), ttl_seconds=3600)
+
+        assert result['positive'] == 4
+
+    def test_partial_results_not_cached(self, app, sentiment_company):
+        """Test a partial result is returned but the next call fetches again"""
+        cache = SentimentResultCache(app=app)
+        refresh = Refresher()
+        partial = lambda: dict(refresh(), partial=True)
+
+        cache.get_or_refresh('SNTA', 'NEWS', partial, ttl_seconds=3600)
+        cache.get_or_refresh('SNTA', 'NEWS', partial, ttl_seconds=3600)
+
+        assert refresh.calls == 2
+
+    def test_purge_expired(self, app, sentiment_company):
+        """Test rows past expiry and the stale window are deleted, newer rows kept"""
+        cache = SentimentResultCache(stale_seconds=60, app=app)
+        cache.store('SNTA', 'TWITTER', Refresher()(), ttl_seconds=3600)
+        cache.store('SNTA', 'NEWS', Refresher()(), ttl_seconds=0)
+        old = SentimentCache.query.filter_by(company_id=sentiment_company.company_id, source='NEWS').one()
+        old.expires_at = datetime.utcnow() - timedelta(minutes=5)
+        db.session.commit()
+
+        assert cache.purge_expired() == 1
+        assert [r.source for r in SentimentCache.query.filter_by(company_id=sentiment_company.company_id)] == ['TWITTER']
+
+
+@pytest.mark.unit
+@pytest.mark.services
+def test_engine_uses_cache(app, sentiment_company, monkeypatch):
+    """Test SentimentEngine.get_sentiment_with_cache analyzes once per fresh window"""
+    engine = SentimentEngine()
+    refresh = Refresher()
+    monkeypatch.setattr(engine, 'analyze_sentiment', lambda symbol, count: refresh())
+
+    engine.get_sentiment_with_cache('SNTA')
+    cached = engine.get_sentiment_with_cache('SNTA')
+
+    assert refresh.calls == 1
+    assert cached['cached'] is True
+    assert engine.get_cached_sentiment('SNTA')['positive'] == 3
@@ -0,0 +1,129 @@
+"""
+Unit tests for watermarked, time-decayed sentiment ingestion
+"""
+import pytest
+from datetime import datetime, timedelta
+from app.services import sentiment_engine, sentiment_ingestion
+from app.services.sentiment_engine import SentimentEngine
+from app.services.sentiment_ingestion import SentimentIngestor
+from app.services.text_scoring import TextScorer
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestSentimentIngestor:
+    """Test watermarks and decayed rolling counts"""
+
+    def test_counts_decay_with_half_life(self):
+        """Test items lose half their weight per half-life"""
+        ingestor = SentimentIngestor(half_life_hours=1)
+        start = datetime(2024, 1, 1, 12)
+
+        ingestor.ingest('aapl', 'Twitter', [0.5, 0.5, -0.5, 0.0], watermark='10', at=start)
+        ingestor.ingest('AAPL', 'Twitter', [0.5, 0.5], watermark='12', at=start + timedelta(hours=1))
+        window = ingestor.snapshot('AAPL', ['Twitter'], at=start + timedelta(hours=1))
+
+        assert ingestor.watermark('AAPL', 'Twitter') == '12'
+        assert window['weights'] == {'positive': 3.0, 'negative': 0.5, 'neutral': 0.5}
+        assert window['positive'] == 3
+        assert window['average_polarity'] == pytest.approx((0.25 + 1.0) / 4)
+        assert window['sentiment'] == 'POSITIVE'
+
+    def test_snapshot_combines_sources_and_skips_unscorable(self):
+        """Test sources are summed, None scores ignored and an empty fetch keeps the watermark"""
+        ingestor = SentimentIngestor()
+        at = datetime(2024, 1, 1)
+
+        ingestor.ingest('MSFT', 'Twitter', [-0.5, None], watermark='5', at=at)
+        ingestor.ingest('MSFT', 'News', [-0.9], watermark='2024-01-01T00:00:00Z', at=at)
+        ingestor.ingest('MSFT', 'Twitter', [], watermark=None, at=at)
+        window = ingestor.snapshot('MSFT', ['Twitter', 'News', 'Reddit'], at=at)
+
+        assert ingestor.watermark('MSFT', 'Twitter') == '5'
+        assert window['negative'] == 2
+        assert window['sources'] == ['Twitter', 'News']
+        assert window['average_polarity'] == pytest.approx(-0.7)
+        assert SentimentIngestor().snapshot('MSFT', ['Twitter'])['sentiment'] == 'NEUTRAL'
+
+
+@pytest.mark.unit
+@pytest.mark.services
+def test_engine_scores_only_new_tweets(monkeypatch):
+    """Test SentimentEngine fetches from the last tweet ID and scores only new tweets"""
+    monkeypatch.setattr(sentiment_ingestion, '_ingestor', SentimentIngestor())
+    scored = []
+    scorer = TextScorer(polarity=lambda text: scored.append(text) or (0.5 if 'up' in text else -0.5))
+    monkeypatch.setattr(sentiment_engine, 'get_text_scorer', lambda: scorer)
+
+    pages = {None: (['AAPL up', 'AAPL down'], '101'), '101': (['AAPL up again'], '102')}
+    since_ids = []
+
+    def fetch(symbol, since_id, count):
+        since_ids.append(since_id)
+        return pages[since_id]
+
+    engine = SentimentEngine()
+    engine.enabled = True
+    monkeypatch.setattr(engine, 'fetch_tweets_since', fetch)
+
+    engine.analyze_sentiment('AAPL')
+    result = engine.analyze_sentiment('AAPL')
+
+    assert since_ids == [None, '101']
+    assert scored == ['AAPL up', 'AAPL down', 'AAPL up again']
+    assert result['new_tweets'] == 1
+    assert (result['positive'], result['negative'], result['total_tweets']) == (2, 1, 3)
+    assert result['sentiment'] == 'POSITIVE'
+
+
+@pytest.mark.unit
+@pytest.mark.services
+def test_persisted_windows_shared_between_processes(app):
+    """Test windows stored in the database are seen by another ingestor and after a restart"""
+    from app import db
+    from app.models import SentimentWatermark
+    at = datetime(2024, 1, 1, 12)
+
+    with app.app_context():
+        try:
+            first = SentimentIngestor(half_life_hours=1, persist=True)
+            second = SentimentIngestor(half_life_hours=1, persist=True)
+            first.ingest('aapl', 'Twitter', [0.5, -0.5], watermark='10', at=at)
+            second.ingest('AAPL', 'Twitter', [0.5], watermark='11', at=at + timedelta(hours=1))
+
+            restarted = SentimentIngestor(half_life_hours=1, persist=True)
+            window = restarted.snapshot('AAPL', ['Twitter', 'News'], at=at + timedelta(hours=1))
+
+            assert first.watermark('AAPL', 'Twitter') == '11'
+            assert window['weights'] == {'positive': 1.5, 'negative': 0.5, 'neutral': 0.0}
+            assert window['sources'] == ['Twitter']
+            assert SentimentWatermark.query.filter_by(symbol='AAPL').count() == 1
+        finally:
+            SentimentWatermark.query.delete()
+            db.session.commit()
+
+
+@pytest.mark.unit
+@pytest.mark.services
+def test_missing_table_falls_back_to_process_windows(app, caplog):
+    """Test a database without sentiment_watermarks keeps windows in memory and warns once"""
+    from sqlalchemy import text
+    from app import db
+    at = datetime(2024, 1, 1, 12)
+
+    with app.app_context():
+        db.session.execute(text('ALTER TABLE sentiment_watermarks RENAME TO sentiment_watermarks_hidden'))
+        db.session.commit()
+        try:
+            ingestor = SentimentIngestor(persist=True)
+            with caplog.at_level('WARNING', logger='app.services.sentiment_ingestion'):
+                assert ingestor.watermark('AAPL', 'Twitter') is None
+                ingestor.ingest('AAPL', 'Twitter', [0.5, -0.5], watermark='10', at=at)
+                window = ingestor.snapshot('AAPL', ['Twitter'], at=at)
+
+            assert ingestor.watermark('AAPL', 'Twitter') == '10'
+            assert (window['positive'], window['negative']) == (1, 1)
+            assert len([r for r in caplog.records if 'sentiment_watermarks' in r.getMessage()]) == 1
+        finally:
+            db.session.execute(text('ALTER TABLE sentiment_watermarks_hidden RENAME TO sentiment_watermarks'))
+            db.session.commit()
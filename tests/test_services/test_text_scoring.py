@@ -0,0 +1,96 @@
+"""
+Unit tests for batched, memoized sentiment text scoring
+"""
+import re
+import pytest
+from app.services import text_scoring
+from app.services.text_scoring import ScoreCache, TextScorer, clean_text
+
+
+def legacy_clean(text):
+    """The per-pass cleaning the sentiment engines used before"""
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'@\w+', '', text)
+    text = re.sub(r'#', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    return ' '.join(text.split()).strip()
+
+
+class CountingLexicon:
+    """Polarity from a tiny word list, counting calls"""
+
+    WORDS = {'great': 0.8, 'good': 0.5, 'bad': -0.7, 'awful': -1.0}
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        scores = [self.WORDS[w] for w in text.lower().split() if w in self.WORDS]
+        return sum(scores) / len(scores) if scores else 0.0
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestTextScorer:
+    """Test cleaning, deduplication and memoization"""
+
+    @pytest.mark.parametrize('text', [
+        "$AAPL looks great!!! https://t.co/abc @trader #bullish",
+        "RT @someone: www.example.com/x earnings were bad...",
+        "  multiple   spaces\tand\nlines ",
+        "émojis 🚀🚀 and ünïcode",
+        "#",
+    ])
+    def test_clean_matches_legacy(self, text):
+        """Test the single-pass cleaner gives the same text as the old regex chain"""
+        assert clean_text(text) == legacy_clean(text)
+
+    def test_duplicates_scored_once(self):
+        """Test retweets of the same text are scored once, across batches too"""
+        lexicon = CountingLexicon()
+        scorer = TextScorer(polarity=lexicon)
+
+        first = scorer.score(["Great quarter https://t.co/1", "Great quarter https://t.co/2 @bob", "!!!"])
+        second = scorer.score(["Great quarter", "awful guidance"])
+
+        assert first == [0.8, 0.8, None]
+        assert second == [0.8, -1.0]
+        assert lexicon.calls == ['Great quarter', 'awful guidance']
+
+    def test_summarize_thresholds(self):
+        """Test classification and average skip texts that clean to nothing"""
+        scorer = TextScorer(polarity=CountingLexicon())
+
+        # 'good bad' averages to -0.1, which is still neutral
+        assert scorer.summarize(['great', 'bad', 'good bad', '', '...']) == (1, 1, 1, pytest.approx(0.0))
+        assert scorer.summarize([]) == (0, 0, 0, 0.0)
+
+    def test_scoring_errors_are_neutral(self):
+        """Test a failing backend scores the text as neutral"""
+        def broken(text):
+            raise ValueError('bad text')
+
+        assert TextScorer(polarity=broken).summarize(['one', 'two']) == (0, 0, 2, 0.0)
+
+    def test_cache_is_bounded_lru(self):
+        """Test the least recently used scores are evicted"""
+        cache = ScoreCache(max_entries=2)
+        cache.set_many({b'a': 1.0, b'b': 2.0})
+        cache.get_many([b'a'])
+        cache.set_many({b'c': 3.0})
+
+        assert cache.get_many([b'a', b'b', b'c']) == {b'a': 1.0, b'c': 3.0}
+        assert len(cache) == 2
+
+    def test_large_batches_use_process_pool(self, monkeypatch):
+        """Test new texts past the batch threshold are scored in worker processes"""
+        monkeypatch.setattr(text_scoring, 'PATTERN_LEXICON_AVAILABLE', False)
+        scorer = TextScorer(processes=2, min_parallel_batch=10)
+        try:
+            scores = scorer.score([f"headline number {i}" for i in range(25)])
+        finally:
+            scorer._pool and scorer._pool.shutdown()
+
+        assert scores == [0.0] * 25
+        assert scorer._pool is not None
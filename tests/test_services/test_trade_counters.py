@@ -0,0 +1,111 @@
+"""
+Unit tests for rolling trade counters and trending stocks
+"""
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from app import db
+from app.models import Company, Order
+from app.services.stock_repository import StockRepository
+from app.services.trade_counters import TradeCounters, get_trade_counters
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestTradeCounters:
+    """Test TradeCounters bucketing and top-K selection"""
+
+    def test_top_k_ordering(self):
+        """Test companies are ranked by count with ties broken by company_id"""
+        counters = TradeCounters()
+        counters.load([], [])
+        for company_id, trades in ((1, 3), (2, 5), (3, 3), (4, 1)):
+            for _ in range(trades):
+                counters.record(company_id)
+
+        assert counters.top_window(3) == [(2, 5), (1, 3), (3, 3)]
+        assert counters.top_all_time(10) == [(2, 5), (1, 3), (3, 3), (4, 1)]
+
+    def test_old_orders_only_count_all_time(self):
+        """Test orders older than the window are excluded from trending"""
+        counters = TradeCounters(window=timedelta(hours=24))
+        now = datetime.utcnow()
+        counters.load([(1, 10), (2, 1)], [(2, now - timedelta(hours=1))])
+
+        counters.record(1, now - timedelta(hours=30))
+        counters.record(2, now - timedelta(minutes=1))
+
+        assert counters.top_window(5) == [(2, 2)]
+        assert counters.top_all_time(5) == [(1, 11), (2, 2)]
+
+    def test_buckets_expire(self):
+        """Test counts leave the window as their bucket ages out"""
+        counters = TradeCounters(window=timedelta(minutes=10), bucket=timedelta(minutes=5))
+        counters.load([], [])
+        start = counters._current_index()
+        counters.record(1)
+        counters.record(1, datetime.utcnow() - timedelta(minutes=5))
+        counters.record(2)
+
+        assert counters.top_window(5) == [(1, 2), (2, 1)]
+
+        counters._current_index = lambda: start + 1
+        assert counters.top_window(5) == [(1, 1), (2, 1)]
+
+        counters._current_index = lambda: start + 2
+        assert counters.top_window(5) == []
+        assert counters.top_all_time(5) == [(1, 2), (2, 1)]
+
+    def test_record_before_load_is_ignored(self):
+        """Test orders recorded before the first rebuild are left to the rebuild"""
+        counters = TradeCounters()
+        counters.record(1)
+
+        assert counters.needs_rebuild()
+        counters.load([], [])
+        assert counters.top_window(5) == []
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestTrendingStocks:
+    """Test trending lookups served from the counters"""
+
+    def test_trending_matches_completed_orders(self, app, test_user):
+        """Test trending counts completed orders from the last 24 hours"""
+        with app.app_context():
+            hot = Company(symbol='HOTX', company_name='Hot Co', sector='Technology')
+            cold = Company(symbol='COLDX', company_name='Cold Co')
+            db.session.add_all([hot, cold])
+            db.session.commit()
+
+            def add_order(company, status='COMPLETED', age=timedelta(0)):
+                db.session.add(Order(
+                    user_id=test_user.user_id, company_id=company.company_id, order_type='BUY',
+                    quantity=1, price_per_share=Decimal('1'), commission_fee=Decimal('0'),
+                    total_amount=Decimal('1'), order_status=status,
+                    created_at=datetime.utcnow() - age
+                ))
+
+            for _ in range(3):
+                add_order(hot)
+            add_order(hot, status='FAILED')
+            add_order(cold)
+            add_order(cold, age=timedelta(days=2))
+            db.session.commit()
+
+            try:
+                trending = {s['symbol']: s for s in StockRepository().get_trending_stocks(limit=50)}
+                assert trending['HOTX']['trade_count'] == 3
+                assert trending['HOTX']['sector'] == 'Technology'
+                assert trending['COLDX']['trade_count'] == 1
+
+                all_time = dict(get_trade_counters().top_all_time(50))
+                assert all_time[hot.company_id] == 3
+                assert all_time[cold.company_id] == 2
+            finally:
+                Order.query.filter(Order.company_id.in_([hot.company_id, cold.company_id])).delete(
+                    synchronize_session=False)
+                db.session.delete(hot)
+                db.session.delete(cold)
+                db.session.commit()
@@ -150,3 +150,155 @@ class TestTransactionEngine:
             # Cleanup
             db.session.delete(other_company)
             db.session.commit()
+
+
+@pytest.fixture
+def basket_cleanup(app, test_user):
+    """Remove orders, transactions and notifications created by basket tests"""
+    yield
+    from app.models import Transaction, Notification
+    db.session.rollback()
+    for model in (Transaction, Order, Notification):
+        model.query.filter_by(user_id=test_user.user_id).delete(synchronize_session=False)
+    db.session.commit()
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestExecuteBasket:
+    """Test TransactionEngine.execute_basket"""
+    
+    def test_executes_all_legs_in_one_commit(self, app, test_user, test_company, test_wallet, test_holding,
+                                              basket_cleanup):
+        """Test sells fund buys, holdings update and one notification is sent"""
+        from app.models import Company, Holdings, Notification
+        other = Company(symbol='BSKT', company_name='Basket Co')
+        db.session.add(other)
+        db.session.commit()
+        wallet = Wallet.query.filter_by(user_id=test_user.user_id).first()
+        wallet.balance = Decimal('1000.00')
+        db.session.commit()
+        
+        try:
+            orders = TransactionEngine().execute_basket(test_user.user_id, [
+                {'company': other, 'order_type': 'BUY', 'quantity': 50, 'price_per_share': Decimal('100.00')},
+                {'company': test_company, 'order_type': 'SELL', 'quantity': 40, 'price_per_share': Decimal('160.00')},
+            ])
+            
+            assert [o.order_type for o in orders] == ['SELL', 'BUY']
+            assert all(o.order_status == 'COMPLETED' for o in orders)
+            assert orders[0].realized_gain_loss == Decimal('400.00')
+            # 1000 + (6400 - 6.40) - (5000 + 5.00)
+            assert Wallet.query.filter_by(user_id=test_user.user_id).first().balance == Decimal('2388.60')
+            assert db.session.get(Holdings, test_holding.holding_id).quantity == 60
+            assert Holdings.query.filter_by(user_id=test_user.user_id, company_id=other.company_id).one().quantity == 50
+            assert Notification.query.filter_by(user_id=test_user.user_id).count() == 1
+        finally:
+            from app.models import Transaction
+            for model in (Transaction, Order, Holdings):
+                model.query.filter_by(company_id=other.company_id).delete()
+            db.session.delete(other)
+            db.session.commit()
+    
+    def test_failing_leg_applies_nothing(self, app, test_user, test_company, test_wallet, test_holding,
+                                         basket_cleanup):
+        """Test an oversized sell rolls back the whole basket"""
+        from app.models import Holdings
+        from app.utils.exceptions import InsufficientSharesError
+        balance = Wallet.query.filter_by(user_id=test_user.user_id).first().balance
+        
+        with pytest.raises(InsufficientSharesError):
+            TransactionEngine().execute_basket(test_user.user_id, [
+                {'company': test_company, 'order_type': 'SELL', 'quantity': 500, 'price_per_share': Decimal('160.00')},
+            ])
+        
+        assert Wallet.query.filter_by(user_id=test_user.user_id).first().balance == balance
+        assert db.session.get(Holdings, test_holding.holding_id).quantity == 100
+        assert Order.query.filter_by(user_id=test_user.user_id).count() == 0
+    
+    def test_share_cap_applies_to_direct_callers(self, app, test_user, test_company, test_wallet, basket_cleanup):
+        """Test legs built outside create_basket_order are held to the per-order share cap"""
+        from app.utils.exceptions import ValidationError
+        
+        with pytest.raises(ValidationError, match="1,000,000 shares"):
+            TransactionEngine().execute_basket(test_user.user_id, [
+                {'company': test_company, 'order_type': 'BUY', 'quantity': 1000001, 'price_per_share': Decimal('0.01')},
+            ])
+        
+        assert Order.query.filter_by(user_id=test_user.user_id).count() == 0
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestCreateBasketOrder:
+    """Test TransactionEngine.create_basket_order"""
+    
+    @pytest.fixture
+    def engine(self, test_company, monkeypatch):
+        """Engine whose price lookups are counted and fixed at 150"""
+        engine = TransactionEngine()
+        engine.price_calls = []
+        
+        def fake_prices(symbols):
+            engine.price_calls.append(sorted(symbols))
+            return {symbol: Decimal('150.00') for symbol in symbols}
+        
+        monkeypatch.setattr(engine.stock_repo, 'get_current_prices_with_mode', fake_prices)
+        return engine
+    
+    def test_prices_fetched_once_for_all_legs(self, app, test_user, test_company, test_wallet, test_holding,
+                                               engine, basket_cleanup):
+        """Test every leg executes from one price snapshot"""
+        from app.models import Company, Holdings
+        other = Company(symbol='BSKU', company_name='Basket Two')
+        db.session.add(other)
+        db.session.commit()
+        
+        try:
+            orders = engine.create_basket_order(test_user.user_id, [
+                {'symbol': 'bsku', 'order_type': 'buy', 'quantity': 10},
+                {'symbol': test_company.symbol, 'order_type': 'SELL', 'quantity': '5'},
+            ])
+            
+            assert engine.price_calls == [sorted(['BSKU', test_company.symbol])]
+            assert [(o.order_type, o.quantity) for o in orders] == [('SELL', 5), ('BUY', 10)]
+            assert all(o.price_per_share == Decimal('150.00') for o in orders)
+            assert Holdings.query.filter_by(user_id=test_user.user_id, company_id=other.company_id).one().quantity == 10
+        finally:
+            from app.models import Transaction
+            for model in (Transaction, Order, Holdings):
+                model.query.filter_by(company_id=other.company_id).delete()
+            db.session.delete(other)
+            db.session.commit()
+    
+    def test_total_cost_checked_before_execution(self, app, test_user, test_company, test_wallet, engine,
+                                                 basket_cleanup):
+        """Test a basket the wallet cannot cover is rejected without creating orders"""
+        from app.utils.exceptions import InsufficientFundsError
+        wallet = Wallet.query.filter_by(user_id=test_user.user_id).first()
+        wallet.balance = Decimal('1000.00')
+        db.session.commit()
+        
+        with pytest.raises(InsufficientFundsError, match='Required: \\$1,501.50'):
+            engine.create_basket_order(test_user.user_id, [
+                {'symbol': test_company.symbol, 'order_type': 'BUY', 'quantity': 10},
+            ])
+        
+        assert Order.query.filter_by(user_id=test_user.user_id).count() == 0
+    
+    @pytest.mark.parametrize('legs, message', [
+        ([], 'at least one'),
+        ([{'symbol': 'ZZZZ', 'order_type': 'BUY', 'quantity': 1}], 'Invalid stock symbol: ZZZZ'),
+        ([{'symbol': 'ZZZZ', 'order_type': 'HOLD', 'quantity': 1}], 'BUY or SELL'),
+        ([{'symbol': 'ZZZZ', 'order_type': 'BUY', 'quantity': 0}], 'positive'),
+        ([{'symbol': 'ZZZZ', 'order_type': 'BUY', 'quantity': 1},
+          {'symbol': 'zzzz', 'order_type': 'SELL', 'quantity': 1}], 'only once'),
+    ])
+    def test_rejects_invalid_legs(self, app, test_user, engine, legs, message):
+        """Test malformed baskets are rejected before any price lookup"""
+        from app.utils.exceptions import ValidationError
+        
+        with pytest.raises(ValidationError, match=message):
+            engine.create_basket_order(test_user.user_id, legs)
+        
+        assert engine.price_calls == []
@@ -0,0 +1,80 @@
+"""
+Unit tests for the database performance profile
+"""
+import sqlite3
+import pytest
+from app.utils.db_performance import (
+    DEFAULT_SQLITE_PRAGMAS,
+    DEFAULT_POOL_OPTIONS,
+    apply_sqlite_pragmas,
+    build_engine_options,
+    get_backend_name,
+    is_memory_sqlite
+)
+
+
+@pytest.mark.unit
+class TestDbPerformanceProfile:
+    """Test engine option building and PRAGMA application"""
+    
+    def test_backend_detection(self):
+        """Test backend names are resolved from URIs"""
+        assert get_backend_name('sqlite:///portfolio.db') == 'sqlite'
+        assert get_backend_name('postgresql://user:pw@localhost/db') == 'postgresql'
+        assert get_backend_name(None) == ''
+    
+    def test_memory_sqlite_detection(self):
+        """Test in-memory SQLite URIs are recognised"""
+        assert is_memory_sqlite('sqlite:///:memory:')
+        assert is_memory_sqlite('sqlite://')
+        assert not is_memory_sqlite('sqlite:///portfolio.db')
+        assert not is_memory_sqlite('postgresql://localhost/db')
+    
+    def test_postgres_gets_pool_options(self):
+        """Test PostgreSQL receives pool sizing and pre-ping"""
+        options = build_engine_options('postgresql://localhost/db')
+        
+        assert options['pool_pre_ping'] is True
+        assert options['pool_size'] == DEFAULT_POOL_OPTIONS['pool_size']
+    
+    def test_explicit_options_win(self):
+        """Test configured engine options override profile defaults"""
+        options = build_engine_options('postgresql://localhost/db', {'pool_size': 50})
+        
+        assert options['pool_size'] == 50
+        assert options['max_overflow'] == DEFAULT_POOL_OPTIONS['max_overflow']
+    
+    def test_file_sqlite_timeout_follows_busy_timeout(self):
+        """Test the driver lock wait matches the busy_timeout PRAGMA"""
+        assert build_engine_options('sqlite:///portfolio.db')['connect_args']['timeout'] == \
+            DEFAULT_SQLITE_PRAGMAS['busy_timeout'] / 1000
+        assert build_engine_options('sqlite:///portfolio.db', busy_timeout_ms=12000)['connect_args']['timeout'] == 12
+    
+    def test_memory_sqlite_has_no_pool_options(self):
+        """Test in-memory SQLite is left untouched"""
+        assert build_engine_options('sqlite:///:memory:') == {}
+    
+    def test_file_sqlite_pragmas_applied(self, tmp_path):
+        """Test WAL and related PRAGMAs are applied to a file database"""
+        connection = sqlite3.connect(str(tmp_path / 'tuning.db'))
+        try:
+            applied = apply_sqlite_pragmas(connection, DEFAULT_SQLITE_PRAGMAS)
+        finally:
+            connection.close()
+        
+        assert applied['journal_mode'] == 'wal'
+        assert applied['busy_timeout'] == DEFAULT_SQLITE_PRAGMAS['busy_timeout']
+        assert applied['synchronous'] == 1  # NORMAL
+        assert applied['cache_size'] == DEFAULT_SQLITE_PRAGMAS['cache_size']
+    
+    def test_memory_sqlite_skips_file_pragmas(self):
+        """Test file-only PRAGMAs are skipped for in-memory databases"""
+        connection = sqlite3.connect(':memory:')
+        try:
+            applied = apply_sqlite_pragmas(connection, DEFAULT_SQLITE_PRAGMAS, in_memory=True)
+        finally:
+            connection.close()
+        
+        assert 'journal_mode' not in applied
+        assert 'mmap_size' not in applied
+        assert applied['busy_timeout'] == DEFAULT_SQLITE_PRAGMAS['busy_timeout']
@@ -0,0 +1,76 @@
+"""
+Import-time budget tests
+Heavy ML and plotting libraries must not be loaded at application startup
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Generous ceiling for a cold create_app() so the check is stable on slow CI runners
+STARTUP_BUDGET_SECONDS = 10.0
+
+HEAVY_MODULES = ['tensorflow', 'keras', 'statsmodels', 'sklearn', 'matplotlib']
+
+
+def _run_probe(code):
+    """Run code in a fresh interpreter and return its JSON output"""
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.unit
+@pytest.mark.performance
+class TestLazyImports:
+    """Test that ML and plotting stacks are loaded on first use only"""
+    
+    def test_create_app_skips_heavy_modules(self):
+        """Test create_app() stays within budget without loading ML libraries"""
+        result = _run_probe(
+            "import json, sys, time\n"
+            "started = time.perf_counter()\n"
+            "from app import create_app\n"
+            "create_app('testing')\n"
+            "print(json.dumps({'seconds': time.perf_counter() - started,\n"
+            f"                  'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+        )
+        
+        assert result['loaded'] == []
+        assert result['seconds'] < STARTUP_BUDGET_SECONDS
+    
+    def test_prediction_service_loads_models_on_first_use(self):
+        """Test statsmodels is only imported when the ARIMA model is accessed"""
+        result = _run_probe(
+            "import json, sys\n"
+            "from app import create_app\n"
+            "app = create_app('testing')\n"
+            "with app.app_context():\n"
+            "    from app.services.prediction_service import PredictionService\n"
+            "    service = PredictionService()\n"
+            "    before = 'statsmodels' in sys.modules\n"
+            "    service.arima_model\n"
+            "    print(json.dumps({'before': before, 'after': 'statsmodels' in sys.modules}))\n"
+        )
+        
+        assert result == {'before': False, 'after': True}
+    
+    def test_visualizer_loads_matplotlib_on_first_plot(self):
+        """Test matplotlib is only imported when a plot is rendered"""
+        result = _run_probe(
+            "import json, sys\n"
+            "from app.utils.visualization import plt\n"
+            "before = 'matplotlib' in sys.modules\n"
+            "plt.close('all')\n"
+            "print(json.dumps({'before': before, 'after': 'matplotlib' in sys.modules}))\n"
+        )
+        
+        assert result == {'before': False, 'after': True}